@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 """Keil uVision -> CMake converter (modular entrypoint)."""
 
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -13,4 +14,6 @@ from keil2cmake.cli import main
 
 
 if __name__ == "__main__":
+    # The frozen exe re-launches itself for spawn-based worker processes.
+    multiprocessing.freeze_support()
     raise SystemExit(main())
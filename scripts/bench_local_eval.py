@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from keil2cmake.tinyml.converter import load_onnx_model  # noqa: E402
+from keil2cmake.tinyml.runtime.local_evaluator import _eval_model  # noqa: E402
+
+
+# Scalar loops equivalent to the previous local_eval kernels, kept here as the
+# baseline for timing and as a cross-check of the vectorized paths.
+def _loop_conv(x, w, b, strides, pads, dilations, groups):
+    n, c_in, h, w_in = x.shape
+    m, c_per_g, k_h, k_w = w.shape
+    oc_per_group = m // groups
+    stride_h, stride_w = strides
+    pad_h0, pad_w0, pad_h1, pad_w1 = pads
+    dil_h, dil_w = dilations
+    out_h = (h + pad_h0 + pad_h1 - dil_h * (k_h - 1) - 1) // stride_h + 1
+    out_w = (w_in + pad_w0 + pad_w1 - dil_w * (k_w - 1) - 1) // stride_w + 1
+    out = np.zeros((n, m, out_h, out_w), dtype=np.float32)
+    for ni in range(n):
+        for oc in range(m):
+            for oh in range(out_h):
+                for ow in range(out_w):
+                    acc = float(b[oc]) if b is not None else 0.0
+                    ic_begin = (oc // oc_per_group) * c_per_g
+                    for ic_local in range(c_per_g):
+                        ic = ic_begin + ic_local
+                        for kh in range(k_h):
+                            for kw in range(k_w):
+                                in_h = oh * stride_h + kh * dil_h - pad_h0
+                                in_w = ow * stride_w + kw * dil_w - pad_w0
+                                if 0 <= in_h < h and 0 <= in_w < w_in:
+                                    acc += x[ni, ic, in_h, in_w] * w[oc, ic_local, kh, kw]
+                    out[ni, oc, oh, ow] = acc
+    return out
+
+
+def _loop_conv_transpose(x, w, b, strides, pads):
+    n, c_in, h, w_in = x.shape
+    _, c_out, k_h, k_w = w.shape
+    stride_h, stride_w = strides
+    pad_h0, pad_w0, pad_h1, pad_w1 = pads
+    out_h = (h - 1) * stride_h - pad_h0 - pad_h1 + (k_h - 1) + 1
+    out_w = (w_in - 1) * stride_w - pad_w0 - pad_w1 + (k_w - 1) + 1
+    out = np.zeros((n, c_out, out_h, out_w), dtype=np.float32)
+    if b is not None:
+        out += b.reshape(1, c_out, 1, 1)
+    for ni in range(n):
+        for ic in range(c_in):
+            for ih in range(h):
+                for iw in range(w_in):
+                    xv = float(x[ni, ic, ih, iw])
+                    for kh in range(k_h):
+                        for kw in range(k_w):
+                            oh = ih * stride_h + kh - pad_h0
+                            ow = iw * stride_w + kw - pad_w0
+                            if 0 <= oh < out_h and 0 <= ow < out_w:
+                                out[ni, :, oh, ow] += xv * w[ic, :, kh, kw]
+    return out
+
+
+def _loop_pool(op, x, kernel, strides, pads):
+    n, c = x.shape[:2]
+    spatial = x.ndim - 2
+    spatial_in = list(x.shape[2:])
+    spatial_out = [
+        (spatial_in[i] + pads[i] + pads[i + spatial] - kernel[i]) // strides[i] + 1 for i in range(spatial)
+    ]
+    out = np.zeros((n, c, *spatial_out), dtype=np.float32)
+    for ni in range(n):
+        for ch in range(c):
+            for out_coord in np.ndindex(*spatial_out):
+                acc = -3.402823466e38 if op == "MaxPool" else 0.0
+                count = 0
+                for k_coord in np.ndindex(*kernel):
+                    in_coord = [out_coord[s] * strides[s] + k_coord[s] - pads[s] for s in range(spatial)]
+                    if not all(0 <= in_coord[s] < spatial_in[s] for s in range(spatial)):
+                        continue
+                    v = float(x[(ni, ch, *in_coord)])
+                    if op == "MaxPool":
+                        acc = max(acc, v)
+                    else:
+                        acc += v
+                        count += 1
+                if op == "AveragePool":
+                    acc = acc / count if count else 0.0
+                out[(ni, ch, *out_coord)] = acc
+    return out
+
+
+def _save(path: Path, node, x_shape, y_shape, inits) -> None:
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, x_shape)
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, y_shape)
+    graph = helper.make_graph([node], "bench_local_eval", [x], [y], inits)
+    onnx.save(helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)]), path)
+
+
+def _conv_case(c_in, c_out, hw, k, group, stride):
+    rng = np.random.default_rng(0)
+    pad = k // 2
+    out_hw = (hw + 2 * pad - k) // stride + 1
+    w = rng.uniform(-1, 1, (c_out, c_in // group, k, k)).astype(np.float32)
+    b = rng.uniform(-1, 1, (c_out,)).astype(np.float32)
+
+    def build(path: Path) -> None:
+        node = helper.make_node(
+            "Conv", ["x", "w", "b"], ["y"], group=group, pads=[pad] * 4, strides=[stride, stride]
+        )
+        _save(
+            path,
+            node,
+            [1, c_in, hw, hw],
+            [1, c_out, out_hw, out_hw],
+            [numpy_helper.from_array(w, "w"), numpy_helper.from_array(b, "b")],
+        )
+
+    def baseline(x):
+        return _loop_conv(x, w, b, [stride, stride], [pad] * 4, [1, 1], group)
+
+    return build, baseline, [1, c_in, hw, hw]
+
+
+def _conv_transpose_case(c_in, c_out, hw, k, stride):
+    rng = np.random.default_rng(0)
+    w = rng.uniform(-1, 1, (c_in, c_out, k, k)).astype(np.float32)
+    b = rng.uniform(-1, 1, (c_out,)).astype(np.float32)
+    out_hw = (hw - 1) * stride - 2 + k
+
+    def build(path: Path) -> None:
+        node = helper.make_node("ConvTranspose", ["x", "w", "b"], ["y"], pads=[1] * 4, strides=[stride, stride])
+        _save(
+            path,
+            node,
+            [1, c_in, hw, hw],
+            [1, c_out, out_hw, out_hw],
+            [numpy_helper.from_array(w, "w"), numpy_helper.from_array(b, "b")],
+        )
+
+    def baseline(x):
+        return _loop_conv_transpose(x, w, b, [stride, stride], [1] * 4)
+
+    return build, baseline, [1, c_in, hw, hw]
+
+
+def _pool_case(op, c, hw, k, stride, pad):
+    out_hw = (hw + 2 * pad - k) // stride + 1
+
+    def build(path: Path) -> None:
+        node = helper.make_node(op, ["x"], ["y"], kernel_shape=[k, k], strides=[stride, stride], pads=[pad] * 4)
+        _save(path, node, [1, c, hw, hw], [1, c, out_hw, out_hw], [])
+
+    def baseline(x):
+        return _loop_pool(op, x, [k, k], [stride, stride], [pad] * 4)
+
+    return build, baseline, [1, c, hw, hw]
+
+
+CASES = {
+    "conv3x3": lambda: _conv_case(8, 8, 16, 3, 1, 1),
+    "conv1x1": lambda: _conv_case(16, 32, 16, 1, 1, 1),
+    "depthwise3x3_s2": lambda: _conv_case(16, 16, 24, 3, 16, 2),
+    "conv_transpose3x3_s2": lambda: _conv_transpose_case(8, 4, 8, 3, 2),
+    "maxpool3x3_s2": lambda: _pool_case("MaxPool", 16, 32, 3, 2, 1),
+    "avgpool2x2": lambda: _pool_case("AveragePool", 16, 32, 2, 2, 0),
+}
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare vectorized local_eval kernels against scalar loops.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("cases", nargs="*", default=list(CASES))
+    args = parser.parse_args()
+    print(f"{'case':<22}{'loop_ms':>12}{'vector_ms':>12}{'speedup':>10}{'max_abs':>12}")
+    with tempfile.TemporaryDirectory() as td:
+        for name in args.cases:
+            build, baseline, x_shape = CASES[name]()
+            model_path = Path(td) / f"{name}.onnx"
+            build(model_path)
+            model = load_onnx_model(str(model_path))
+            x = np.random.default_rng(1).uniform(-1, 1, x_shape).astype(np.float32)
+            ref = baseline(x)
+            got = _eval_model(model, {"x": x})["y"]
+            max_abs = float(np.max(np.abs(ref - got)))
+            loop_s = _best_of(lambda: baseline(x), 1)
+            vec_s = _best_of(lambda: _eval_model(model, {"x": x}), args.repeats)
+            speedup = loop_s / vec_s if vec_s > 0 else float("inf")
+            print(f"{name:<22}{loop_s * 1e3:>12.1f}{vec_s * 1e3:>12.2f}{speedup:>9.0f}x{max_abs:>12.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
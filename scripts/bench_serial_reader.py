@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from threading import Thread
+
+import serial  # type: ignore[import-untyped]
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from openocd_mcp.transport.serial import SerialConfig, SerialManager  # noqa: E402
+from openocd_mcp.transport.serial.framing import cobs_encode  # noqa: E402
+
+
+def _writer(fd: int, payload: bytes) -> None:
+    view = memoryview(payload)
+    while view:
+        written = os.write(fd, view[:65536])
+        view = view[written:]
+
+
+# The previous reader: poll in_waiting, sleep 10 ms when idle, readline() per
+# line. Kept here as the baseline.
+def _legacy_reader(port: str, expected: int) -> int:
+    ser = serial.Serial(port, timeout=0.1)
+    seen = 0
+    try:
+        while seen < expected:
+            if not ser.in_waiting:
+                time.sleep(0.01)
+                continue
+            if ser.readline().strip():
+                seen += 1
+    finally:
+        ser.close()
+    return seen
+
+
+def _manager_reader(port: str, expected: int, framing: str) -> int:
+    mgr = SerialManager(buffer_capacity_bytes=1 << 20)
+    mgr.connect(SerialConfig(port=port, timeout=0.1, framing=framing))
+    deadline = time.monotonic() + 60.0
+    try:
+        while mgr.stats["frames"] < expected and time.monotonic() < deadline:
+            time.sleep(0.001)
+    finally:
+        mgr.close()
+    return mgr.stats["frames"]
+
+
+def _run(name: str, payload: bytes, expected: int, reader) -> None:
+    master, slave = os.openpty()
+    port = os.ttyname(slave)
+    result: list[int] = []
+    thread = Thread(target=lambda: result.append(reader(port, expected)))
+    thread.start()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    _writer(master, payload)
+    thread.join()
+    elapsed = time.perf_counter() - start
+    os.close(master)
+    os.close(slave)
+    mb_s = len(payload) / elapsed / 1e6
+    print(f"{name:<18}{result[0]:>10}{elapsed * 1e3:>12.1f}{expected / elapsed:>14.0f}{mb_s:>10.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sustained serial reader throughput over a pty loopback.")
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--width", type=int, default=64)
+    args = parser.parse_args()
+    lines = [f"{i:08d} ".encode() + b"x" * (args.width - 10) + b"\r\n" for i in range(args.lines)]
+    text = b"".join(lines)
+    frames = b"".join(cobs_encode(line[:-2]) + b"\0" for line in lines)
+    print(f"{'reader':<18}{'frames':>10}{'elapsed_ms':>12}{'frames_per_s':>14}{'MB_s':>10}")
+    _run("legacy_poll", text, args.lines, _legacy_reader)
+    _run("chunked_line", text, args.lines, lambda port, n: _manager_reader(port, n, "line"))
+    _run("chunked_cobs", frames, args.lines, lambda port, n: _manager_reader(port, n, "cobs"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from keil2cmake.tinyml.codegen import generate_c_code  # noqa: E402
+from keil2cmake.tinyml.converter import load_onnx_model  # noqa: E402
+from keil2cmake.tinyml.runtime.c_runner import run_generated_c_model  # noqa: E402
+
+
+def _conv_case(path: Path, c_in: int, c_out: int, hw: int, k: int, group: int, stride: int) -> None:
+    rng = np.random.default_rng(0)
+    pad = k // 2
+    out_hw = (hw + 2 * pad - k) // stride + 1
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, c_in, hw, hw])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, c_out, out_hw, out_hw])
+    w = numpy_helper.from_array(
+        rng.uniform(-1, 1, (c_out, c_in // group, k, k)).astype(np.float32), name="w"
+    )
+    b = numpy_helper.from_array(rng.uniform(-1, 1, (c_out,)).astype(np.float32), name="b")
+    node = helper.make_node(
+        "Conv",
+        ["x", "w", "b"],
+        ["y"],
+        group=group,
+        pads=[pad, pad, pad, pad],
+        strides=[stride, stride],
+    )
+    graph = helper.make_graph([node], "bench_conv", [x], [y], [w, b])
+    onnx.save(helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)]), path)
+
+
+def _gemm_case(path: Path, m: int, k: int, n: int) -> None:
+    rng = np.random.default_rng(0)
+    a = helper.make_tensor_value_info("a", TensorProto.FLOAT, [m, k])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [m, n])
+    b = numpy_helper.from_array(rng.uniform(-1, 1, (n, k)).astype(np.float32), name="b")
+    c = numpy_helper.from_array(rng.uniform(-1, 1, (n,)).astype(np.float32), name="c")
+    node = helper.make_node("Gemm", ["a", "b", "c"], ["y"], transB=1)
+    graph = helper.make_graph([node], "bench_gemm", [a], [y], [b, c])
+    onnx.save(helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)]), path)
+
+
+CASES = {
+    "conv3x3": lambda p: _conv_case(p, 16, 16, 32, 3, 1, 1),
+    "conv3x3_s2": lambda p: _conv_case(p, 16, 32, 32, 3, 1, 2),
+    "conv1x1": lambda p: _conv_case(p, 32, 64, 16, 1, 1, 1),
+    "depthwise3x3": lambda p: _conv_case(p, 32, 32, 32, 3, 32, 1),
+    "gemm_1x256x128": lambda p: _gemm_case(p, 1, 256, 128),
+    "gemm_32x128x64": lambda p: _gemm_case(p, 32, 128, 64),
+}
+
+
+def _time_case(name: str, iterations: int) -> tuple[float, float]:
+    with tempfile.TemporaryDirectory() as td:
+        model_path = Path(td) / f"{name}.onnx"
+        CASES[name](model_path)
+        model = load_onnx_model(str(model_path))
+        shape = [int(v) for v in model.inputs[0].shape]
+        data = np.random.default_rng(1).uniform(-1, 1, shape).astype(np.float32)
+        timings: dict[str, float] = {}
+        for mode in ("reference", "auto"):
+            result = generate_c_code(model, str(Path(td) / mode), name, "flash", kernels=mode)
+            run = run_generated_c_model(
+                model,
+                str(result["source"]),
+                str(result["header"]),
+                data,
+                bench_iterations=iterations,
+                timeout_sec=300.0,
+            )
+            if not run.ok or run.elapsed_us is None:
+                raise RuntimeError(f"{name} ({mode}): {run.reason}")
+            timings[mode] = run.elapsed_us
+        return timings["reference"], timings["auto"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare tinyml C kernels against reference loops.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("cases", nargs="*", default=list(CASES))
+    args = parser.parse_args()
+    print(f"{'case':<18}{'reference_us':>14}{'kernel_us':>12}{'speedup':>10}")
+    for name in args.cases:
+        ref_us, opt_us = _time_case(name, args.iterations)
+        speedup = ref_us / opt_us if opt_us > 0 else float("inf")
+        print(f"{name:<18}{ref_us:>14.1f}{opt_us:>12.1f}{speedup:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
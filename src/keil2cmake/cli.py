@@ -72,6 +72,42 @@ def build_onnx_parser() -> argparse.ArgumentParser:
         choices=['flash', 'ram'],
         help='Weight storage location',
     )
+    parser.add_argument(
+        '--weight-format',
+        default='c',
+        choices=['c', 'incbin'],
+        help='Emit weights as C initializers or as a binary blob pulled in with .incbin',
+    )
+    parser.add_argument(
+        '--optimize',
+        default='speed',
+        choices=['speed', 'size'],
+        help='speed: inline small ops, call shared kernels for large ones; size: call shared kernels wherever one exists',
+    )
+    parser.add_argument(
+        '--code-size',
+        dest='code_size',
+        action='store_true',
+        help='Report the .text size against a fully inlined build (one extra codegen and two compiles).',
+    )
+    parser.add_argument(
+        '--schedule',
+        default='memory',
+        choices=['memory', 'file'],
+        help='memory: reorder nodes to minimise peak activation memory; file: keep the ONNX node order',
+    )
+    parser.add_argument(
+        '--tiling',
+        default='off',
+        choices=['off', 'patch'],
+        help='patch: run the leading Conv/Pool chain patch by patch to shrink the arena',
+    )
+    parser.add_argument(
+        '--no-graph-opt',
+        dest='graph_opt',
+        action='store_false',
+        help='Skip graph passes (constant folding, BN folding, activation fusion, CSE, DCE) before codegen.',
+    )
     parser.add_argument(
         '--emit',
         default='c',
@@ -89,6 +125,23 @@ def build_onnx_parser() -> argparse.ArgumentParser:
         action='store_false',
         help='Allow generation when consistency validation is skipped.',
     )
+    parser.add_argument(
+        '--validation-samples',
+        type=int,
+        default=1,
+        help='Validate with N random samples and report error statistics (default: 1).',
+    )
+    parser.add_argument(
+        '--validation-dataset',
+        default='',
+        help='Validate with input samples from an .npz file (arrays keyed by input name).',
+    )
+    parser.add_argument(
+        '--validation-workers',
+        type=int,
+        default=None,
+        help='Worker processes for reference inference (default: auto).',
+    )
     parser.set_defaults(strict_validation=True)
     return parser
 
@@ -187,6 +240,15 @@ def _main_onnx(argv) -> int:
         args.weights,
         args.emit,
         strict_validation=args.strict_validation,
+        weight_format=args.weight_format,
+        validation_samples=args.validation_samples,
+        validation_dataset=args.validation_dataset,
+        validation_workers=args.validation_workers,
+        optimize=args.optimize,
+        code_size=args.code_size,
+        graph_opt=args.graph_opt,
+        schedule=args.schedule,
+        tiling=args.tiling,
     )
 
     print('\n' + t('cli.onnx.done'))
@@ -194,6 +256,37 @@ def _main_onnx(argv) -> int:
     print(f"  {t('cli.onnx.summary.output')}: {os.path.abspath(result['project_dir'])}")
     print(f"  {t('cli.onnx.summary.backend')}: {result['backend']}")
     print(f"  {t('cli.onnx.summary.weights')}: {result['weights']}")
+    print(f"  {t('cli.onnx.summary.weight_format')}: {args.weight_format}")
+    weight_blob = result.get('weight_blob')
+    if weight_blob:
+        blob_path = os.path.join(result['project_dir'], weight_blob['file'])
+        print(f"  {t('cli.onnx.summary.weight_blob')}: {blob_path} ({weight_blob['bytes']} B)")
+    print(f"  {t('cli.onnx.summary.optimize')}: {args.optimize}")
+    graph_passes = result.get('graph_passes')
+    if graph_passes:
+        print(
+            f"  {t('cli.onnx.summary.graph_passes')}: {graph_passes['nodes_before']} -> "
+            f"{graph_passes['nodes_after']} ({graph_passes['elapsed_ms']:.1f} ms)"
+        )
+    schedule = result.get('schedule')
+    if schedule:
+        print(
+            f"  {t('cli.onnx.summary.peak_memory')}: {schedule['peak_bytes_before']} B -> "
+            f"{schedule['peak_bytes_after']} B ({schedule['strategy']})"
+        )
+    tiling = result.get('tiling')
+    if tiling and tiling.get('applied'):
+        print(
+            f"  {t('cli.onnx.summary.tiling')}: {tiling['arena_bytes_before']} B -> "
+            f"{tiling['arena_bytes_after']} B ({tiling['tiles'][0]}x{tiling['tiles'][1]}, "
+            f"+{tiling['recompute_overhead'] * 100:.1f}% MACs)"
+        )
+    code_size = result.get('code_size') or {}
+    if code_size.get('status') == 'measured':
+        print(
+            f"  {t('cli.onnx.summary.code_size')}: {code_size['text_bytes']} B "
+            f"({code_size['delta_bytes']:+d} B, {code_size['target']})"
+        )
     print(f"  {t('cli.onnx.summary.emit')}: {args.emit}")
     print(f"  {t('cli.onnx.summary.header')}: {result['header']}")
     print(f"  {t('cli.onnx.summary.source')}: {result['source']}")
@@ -219,6 +312,18 @@ def _main_onnx(argv) -> int:
             print(f"  {t('cli.onnx.summary.validation')}: {status_label} ({'; '.join(extras)})")
         else:
             print(f"  {t('cli.onnx.summary.validation')}: {status_label}")
+        samples = getattr(validation, "samples", 0)
+        if samples:
+            failed = getattr(validation, "failed_samples", 0)
+            print(f"  {t('cli.onnx.summary.validation_samples')}: {samples - failed}/{samples}")
+            for stats in getattr(validation, "outputs", {}).values():
+                parts = [f"{key}={value:.3g}" for key, value in stats.percentiles.items()]
+                parts.append(f"max={stats.max_abs:.3g}")
+                if stats.top1_agreement is not None:
+                    parts.append(f"top-1={stats.top1_agreement * 100.0:.1f}%")
+                print(f"    {stats.name}: {', '.join(parts)}")
+    if result.get('validation_report'):
+        print(f"  {t('cli.onnx.summary.validation_report')}: {result['validation_report']}")
     return 0
 
 
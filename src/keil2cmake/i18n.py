@@ -57,12 +57,21 @@ _MESSAGES: dict[str, dict[str, str]] = {
         "cli.onnx.summary.output": "输出目录",
         "cli.onnx.summary.backend": "后端",
         "cli.onnx.summary.weights": "权重位置",
+        "cli.onnx.summary.weight_format": "权重格式",
+        "cli.onnx.summary.weight_blob": "权重文件",
+        "cli.onnx.summary.optimize": "优化目标",
+        "cli.onnx.summary.code_size": "代码段大小（相对全内联）",
+        "cli.onnx.summary.graph_passes": "图优化节点数",
+        "cli.onnx.summary.peak_memory": "激活内存峰值（调度前/后）",
+        "cli.onnx.summary.tiling": "分块执行 arena（前/后）",
         "cli.onnx.summary.emit": "产物类型",
         "cli.onnx.summary.header": "头文件",
         "cli.onnx.summary.source": "源文件",
         "cli.onnx.summary.manifest": "清单",
         "cli.onnx.summary.library": "静态库",
         "cli.onnx.summary.validation": "一致性校验",
+        "cli.onnx.summary.validation_samples": "校验样本（通过/总数）",
+        "cli.onnx.summary.validation_report": "校验报告",
         "cli.onnx.validation.passed": "通过",
         "cli.onnx.validation.skipped": "跳过",
         "cli.onnx.validation.failed": "失败",
@@ -146,12 +155,21 @@ _MESSAGES: dict[str, dict[str, str]] = {
         "cli.onnx.summary.output": "Output",
         "cli.onnx.summary.backend": "Backend",
         "cli.onnx.summary.weights": "Weights",
+        "cli.onnx.summary.weight_format": "Weight Format",
+        "cli.onnx.summary.weight_blob": "Weight Blob",
+        "cli.onnx.summary.optimize": "Optimize",
+        "cli.onnx.summary.code_size": "Text Size (vs. fully inlined)",
+        "cli.onnx.summary.graph_passes": "Graph Passes (nodes)",
+        "cli.onnx.summary.peak_memory": "Peak Activation Memory (before/after scheduling)",
+        "cli.onnx.summary.tiling": "Patch Tiling Arena (before/after)",
         "cli.onnx.summary.emit": "Emit",
         "cli.onnx.summary.header": "Header",
         "cli.onnx.summary.source": "Source",
         "cli.onnx.summary.manifest": "Manifest",
         "cli.onnx.summary.library": "Library",
         "cli.onnx.summary.validation": "Consistency Check",
+        "cli.onnx.summary.validation_samples": "Validation Samples (passed/total)",
+        "cli.onnx.summary.validation_report": "Validation Report",
         "cli.onnx.validation.passed": "passed",
         "cli.onnx.validation.skipped": "skipped",
         "cli.onnx.validation.failed": "failed",
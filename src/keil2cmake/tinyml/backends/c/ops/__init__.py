@@ -168,5 +168,6 @@ from . import split_to_sequence  # noqa: F401
 from . import concat_from_sequence  # noqa: F401
 from . import string_normalizer  # noqa: F401
 from . import tfidf_vectorizer  # noqa: F401
+from . import patch_stage  # noqa: F401
 
 __all__ = ["get_handler", "EmitContext"]
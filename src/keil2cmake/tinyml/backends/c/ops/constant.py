@@ -96,6 +96,12 @@ def emit_constant(ctx: EmitContext, node: NodeInfo) -> None:
     if len(const_data) != size:
         raise ValueError("Constant value size mismatch.")
 
+    if ctx.storage_root(out_name) in ctx.consts and out_name not in ctx.output_ptrs:
+        # The loader already folded the value into a const table (possibly in the
+        # read-only weight blob); writing it again would store through rodata.
+        # Graph outputs still need the copy into the caller's buffer.
+        return
+
     out = ctx.map_ptr(out_name)
     ctype = _ctype(out_dtype)
     if size == 1:
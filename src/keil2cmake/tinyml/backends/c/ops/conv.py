@@ -5,7 +5,9 @@ from __future__ import annotations
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
 from ....operators.utils import emit_op_conv2d
+from .kernel_lib import Conv2dGeometry, emit_conv2d_kernel_call, select_conv2d_kernel
 from .registry import register_op
+from .requant_common import QConvGeometry, bias_to_acc, const_values, emit_qconv2d_int
 
 
 @register_op("Conv")
@@ -67,6 +69,43 @@ def emit_conv(ctx: EmitContext, node: NodeInfo) -> None:
         sx, zx = ctx.qparams(x_name)
         sw, zw = ctx.qparams(w_name)
         so, zo = ctx.qparams(out_tensor)
+        geo = QConvGeometry(
+            n=n,
+            c_in=c_in,
+            h=h,
+            w=w_in,
+            m=m,
+            c_per_g=c_per_g,
+            k_h=k_h,
+            k_w=k_w,
+            out_h=out_h,
+            out_w=out_w,
+            stride_h=stride_h,
+            stride_w=stride_w,
+            pad_h0=pad_h0,
+            pad_w0=pad_w0,
+            dil_h=dil_h,
+            dil_w=dil_w,
+            groups=groups,
+        )
+        acc_bias = bias_to_acc(ctx, b_name, [sx * sw])
+        if acc_bias is not None and so != 0.0 and emit_qconv2d_int(
+            ctx,
+            x=x,
+            w=w,
+            out=out,
+            geo=geo,
+            in_dtype=out_dtype,
+            out_dtype=out_dtype,
+            x_zero=zx,
+            w_zeros=[zw],
+            w_values=const_values(ctx, w_name),
+            real_multipliers=[sx * sw / so],
+            bias=acc_bias,
+            y_zero=zo,
+        ):
+            return
+
         qmin, qmax = (-128, 127) if out_dtype == "int8" else (-32768, 32767)
         qctype = "int8_t" if out_dtype == "int8" else "int16_t"
         bias_scale = sx * sw
@@ -135,6 +174,30 @@ def emit_conv(ctx: EmitContext, node: NodeInfo) -> None:
 
     if out_dtype != "float32":
         raise ValueError("Conv supports float32 or quantized int8/int16 only.")
+    geo = Conv2dGeometry(
+        n=n,
+        c_in=c_in,
+        h=h,
+        w=w_in,
+        m=m,
+        c_per_g=c_per_g,
+        k_h=k_h,
+        k_w=k_w,
+        out_h=out_h,
+        out_w=out_w,
+        stride_h=stride_h,
+        stride_w=stride_w,
+        pad_h=pad_h0,
+        pad_w=pad_w0,
+        dil_h=dil_h,
+        dil_w=dil_w,
+        groups=groups,
+    )
+    act = node.attrs.get("fused_activation")
+    kernel = select_conv2d_kernel(ctx, geo)
+    if kernel is not None:
+        emit_conv2d_kernel_call(ctx, kernel, geo, out, x, w, b, act)
+        return
     emit_op_conv2d(
         ctx.lines,
         out,
@@ -148,4 +211,5 @@ def emit_conv(ctx: EmitContext, node: NodeInfo) -> None:
         [pad_h0, pad_w0, pad_h1, pad_w1],
         [dil_h, dil_w],
         groups,
+        act,
     )
@@ -27,6 +27,7 @@ def emit_dropout(ctx: EmitContext, node: NodeInfo) -> None:
     inp = ctx.map_ptr(x_name)
     out = ctx.map_ptr(out_name)
     size = tensor_size(ctx.shape(out_name))
+    in_place = ctx.shares_storage(out_name, x_name)
 
     if out_dtype not in ("float32", "int8", "int16", "bool"):
         raise ValueError("Dropout supports float32/int8/int16/bool only.")
@@ -38,7 +39,8 @@ def emit_dropout(ctx: EmitContext, node: NodeInfo) -> None:
             si, zi = q_in
             so, zo = q_out
             if abs(si - so) <= 1e-12 and zi == zo:
-                emit_op_copy(ctx.lines, out, inp, size)
+                if not in_place:
+                    emit_op_copy(ctx.lines, out, inp, size)
                 return
             qmin, qmax = (-128, 127) if out_dtype == "int8" else (-32768, 32767)
             ctype = "int8_t" if out_dtype == "int8" else "int16_t"
@@ -51,8 +53,10 @@ def emit_dropout(ctx: EmitContext, node: NodeInfo) -> None:
             ctx.lines.append("  }")
             return
         if q_in is None and q_out is None:
-            emit_op_copy(ctx.lines, out, inp, size)
+            if not in_place:
+                emit_op_copy(ctx.lines, out, inp, size)
             return
         raise ValueError("Dropout quantization params are inconsistent.")
 
-    emit_op_copy(ctx.lines, out, inp, size)
+    if not in_place:
+        emit_op_copy(ctx.lines, out, inp, size)
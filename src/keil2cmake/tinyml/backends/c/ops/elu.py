@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
-from ....operators.utils import emit_op_unary_quant, tensor_size
+from ....operators.utils import tensor_size
+from .lut_common import emit_unary_quant
 from .registry import register_op
 
 
@@ -29,7 +32,19 @@ def emit_elu(ctx: EmitContext, node: NodeInfo) -> None:
         else:
             so, zo = so_zo
         expr = f"(r >= 0.0f ? r : ({alpha:.8f}f * (expf(r) - 1.0f)))"
-        emit_op_unary_quant(ctx.lines, out, inp, size, expr, out_dtype, sa, za, so, zo)
+        emit_unary_quant(
+            ctx,
+            out,
+            inp,
+            size,
+            expr,
+            lambda r: np.where(r >= 0.0, r, alpha * (np.exp(r) - 1.0)),
+            out_dtype,
+            sa,
+            za,
+            so,
+            zo,
+        )
         return
 
     if out_dtype != "float32":
@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
+import math
+
+import numpy as np
+
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
-from ....operators.utils import emit_op_unary_func, emit_op_unary_quant, tensor_size
+from ....operators.utils import emit_op_unary_func, tensor_size
+from .lut_common import emit_unary_quant
 from .registry import register_op
 
 
+_erf = np.vectorize(math.erf, otypes=[np.float64])
+
+
 @register_op("Erf")
 def emit_erf(ctx: EmitContext, node: NodeInfo) -> None:
     if len(node.inputs) != 1:
@@ -26,7 +34,7 @@ def emit_erf(ctx: EmitContext, node: NodeInfo) -> None:
             so, zo = sa, za
         else:
             so, zo = so_zo
-        emit_op_unary_quant(ctx.lines, out, inp, size, "erff(r)", out_dtype, sa, za, so, zo)
+        emit_unary_quant(ctx, out, inp, size, "erff(r)", _erf, out_dtype, sa, za, so, zo)
         return
     if out_dtype != "float32":
         raise ValueError("Erf supports float32 or quantized int8/int16 only.")
@@ -4,8 +4,10 @@ from __future__ import annotations
 
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
-from ....operators.utils import tensor_size
+from ....operators.utils import activation_expr, tensor_size
+from .kernel_lib import emit_gemm_kernel_call, select_gemm_kernel
 from .registry import register_op
+from .requant_common import QMatMulLayout, bias_to_acc, const_values, emit_qmatmul_int
 
 
 def _classify_c(c_shape: list[int], m: int, n: int) -> tuple[str, str]:
@@ -101,6 +103,36 @@ def emit_gemm(ctx: EmitContext, node: NodeInfo) -> None:
         if c_name is not None and c_dtype in ("int8", "int16"):
             sc, zc = ctx.qparams(c_name)
 
+        acc_scale = alpha * sa * sb
+        acc_bias = None
+        if acc_scale > 0.0 and so != 0.0:
+            acc_bias = bias_to_acc(ctx, c_name, [acc_scale], factor=beta, int_scales=[bias_scale])
+        if c_mode == "matrix":
+            bias_index = f"i * {n} + j"
+        elif c_mode == "vec_n":
+            bias_index = "j"
+        elif c_mode == "vec_m":
+            bias_index = "i"
+        else:
+            bias_index = "0"
+        if acc_bias is not None and emit_qmatmul_int(
+            ctx,
+            a=a,
+            b=b,
+            out=out,
+            layout=QMatMulLayout(m=m, k=k1, n=n, trans_a=trans_a == 1, trans_b=trans_b == 1),
+            in_dtype=out_dtype,
+            out_dtype=out_dtype,
+            a_zero=za,
+            b_zero=zb,
+            b_values=const_values(ctx, b_name),
+            real_multiplier=acc_scale / so,
+            bias=acc_bias,
+            bias_index=bias_index,
+            y_zero=zo,
+        ):
+            return
+
         ctx.lines.append(f"  for (size_t i = 0; i < {m}; ++i) {{")
         ctx.lines.append(f"    for (size_t j = 0; j < {n}; ++j) {{")
         ctx.lines.append("      float sum = 0.0f;")
@@ -152,20 +184,34 @@ def emit_gemm(ctx: EmitContext, node: NodeInfo) -> None:
     if c_dtype not in (None, "float32", "int8", "int16", "int32", "int64"):
         raise ValueError("Gemm bias dtype is unsupported.")
 
+    act = node.attrs.get("fused_activation")
+    use_kernel = select_gemm_kernel(ctx, m, k1, n) is not None
+    if use_kernel:
+        # Without alpha/bias the kernel's store is final and takes the activation;
+        # otherwise the loop below finishes each value and activates it.
+        done = alpha == 1.0 and c_name is None
+        emit_gemm_kernel_call(
+            ctx, out, a, b, m, k1, n, trans_a=trans_a == 1, trans_b=trans_b == 1, act=act if done else None
+        )
+        if done:
+            return
     ctx.lines.append(f"  for (size_t i = 0; i < {m}; ++i) {{")
     ctx.lines.append(f"    for (size_t j = 0; j < {n}; ++j) {{")
-    ctx.lines.append("      float sum = 0.0f;")
-    ctx.lines.append(f"      for (size_t t = 0; t < {k1}; ++t) {{")
-    if trans_a == 0:
-        ctx.lines.append(f"        size_t a_idx = i * {a_cols} + t;")
+    if use_kernel:
+        ctx.lines.append(f"      float sum = {out}[i * {n} + j];")
     else:
-        ctx.lines.append(f"        size_t a_idx = t * {a_cols} + i;")
-    if trans_b == 0:
-        ctx.lines.append(f"        size_t b_idx = t * {b_cols} + j;")
-    else:
-        ctx.lines.append(f"        size_t b_idx = j * {b_cols} + t;")
-    ctx.lines.append(f"        sum += (float){a}[a_idx] * (float){b}[b_idx];")
-    ctx.lines.append("      }")
+        ctx.lines.append("      float sum = 0.0f;")
+        ctx.lines.append(f"      for (size_t t = 0; t < {k1}; ++t) {{")
+        if trans_a == 0:
+            ctx.lines.append(f"        size_t a_idx = i * {a_cols} + t;")
+        else:
+            ctx.lines.append(f"        size_t a_idx = t * {a_cols} + i;")
+        if trans_b == 0:
+            ctx.lines.append(f"        size_t b_idx = t * {b_cols} + j;")
+        else:
+            ctx.lines.append(f"        size_t b_idx = j * {b_cols} + t;")
+        ctx.lines.append(f"        sum += (float){a}[a_idx] * (float){b}[b_idx];")
+        ctx.lines.append("      }")
     if alpha != 1.0:
         ctx.lines.append(f"      sum *= {alpha:.8f}f;")
     if c_name is not None:
@@ -182,6 +228,6 @@ def emit_gemm(ctx: EmitContext, node: NodeInfo) -> None:
             ctx.lines.append(f"      sum += {c_expr};")
         else:
             ctx.lines.append(f"      sum += {beta:.8f}f * ({c_expr});")
-    ctx.lines.append(f"      {out}[i * {n} + j] = sum;")
+    ctx.lines.append(f"      {out}[i * {n} + j] = {activation_expr(act, 'sum')};")
     ctx.lines.append("    }")
     ctx.lines.append("  }")
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
+from .lut_common import emit_unary_quant
 from .registry import register_op
-from ....operators.utils import emit_op_unary_quant, tensor_size
+from ....operators.utils import tensor_size
 
 
 @register_op("HardSigmoid")
@@ -32,7 +35,19 @@ def emit_hardsigmoid(ctx: EmitContext, node: NodeInfo) -> None:
             so, zo = sa, za
         else:
             so, zo = so_zo
-        emit_op_unary_quant(ctx.lines, out, inp, size, expr, out_dtype, sa, za, so, zo)
+        emit_unary_quant(
+            ctx,
+            out,
+            inp,
+            size,
+            expr,
+            lambda r: np.clip(alpha * r + beta, 0.0, 1.0),
+            out_dtype,
+            sa,
+            za,
+            so,
+            zo,
+        )
         return
     if out_dtype != "float32":
         raise ValueError("HardSigmoid supports float32 or quantized int8/int16 only.")
@@ -21,5 +21,7 @@ def emit_identity(ctx: EmitContext, node: NodeInfo) -> None:
         raise ValueError("Identity supports float32/int8/int16 only.")
     if ctx.dtype(node.inputs[0]) != out_dtype:
         raise ValueError("Identity requires matching dtypes.")
+    if ctx.shares_storage(out_tensor, node.inputs[0]):
+        return
     emit_op_copy(ctx.lines, out, a, size)
 
@@ -0,0 +1,635 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from ....operators.context import EmitContext
+
+
+# Problems below this many MACs stay on the inline reference loops; the call
+# and helper code would cost more than the loop itself.
+MIN_KERNEL_MACS = 256
+
+FLT_MAX = 3.402823466e38
+
+
+_CONV_GEOM = """typedef struct {
+  int n, c_in, h, w, m, c_per_g, k_h, k_w, out_h, out_w;
+  int stride_h, stride_w, pad_h, pad_w, dil_h, dil_w, groups;
+} k2c_conv2d_geom_t;"""
+
+
+_CONV_BOUNDS = """static int k2c_conv_out_lo(int pad, int k_off, int stride) {
+  int num = pad - k_off;
+  if (num <= 0) return 0;
+  return (num + stride - 1) / stride;
+}
+
+static int k2c_conv_out_hi(int size, int pad, int k_off, int stride, int out) {
+  int num = size - 1 + pad - k_off;
+  if (num < 0) return 0;
+  int hi = num / stride + 1;
+  return hi < out ? hi : out;
+}"""
+
+
+# Fused activation (passes.fuse_activations), applied as each output is
+# stored: v < 0 is scaled by neg_slope, then clamped to [lo, hi].
+_ACT = """typedef struct {
+  float lo, hi, neg_slope;
+} k2c_act_t;
+
+static float k2c_act_f32(const k2c_act_t* act, float v) {
+  if (act == NULL) return v;
+  if (v < 0.0f) v *= act->neg_slope;
+  if (v < act->lo) v = act->lo;
+  if (v > act->hi) v = act->hi;
+  return v;
+}"""
+
+
+_GEMM_F32 = """static void k2c_gemm_f32(
+    const float* a, size_t a_rs, size_t a_cs,
+    const float* b, size_t b_rs, size_t b_cs,
+    float* c, size_t m, size_t k, size_t n, const k2c_act_t* act) {
+  size_t i = 0;
+  for (; i + 4 <= m; i += 4) {
+    const float* a0 = a + (i + 0) * a_rs;
+    const float* a1 = a + (i + 1) * a_rs;
+    const float* a2 = a + (i + 2) * a_rs;
+    const float* a3 = a + (i + 3) * a_rs;
+    size_t j = 0;
+    for (; j + 4 <= n; j += 4) {
+      float c00 = 0.0f, c01 = 0.0f, c02 = 0.0f, c03 = 0.0f;
+      float c10 = 0.0f, c11 = 0.0f, c12 = 0.0f, c13 = 0.0f;
+      float c20 = 0.0f, c21 = 0.0f, c22 = 0.0f, c23 = 0.0f;
+      float c30 = 0.0f, c31 = 0.0f, c32 = 0.0f, c33 = 0.0f;
+      const float* bj = b + j * b_cs;
+      for (size_t t = 0; t < k; ++t) {
+        const float* bt = bj + t * b_rs;
+        float b0 = bt[0];
+        float b1 = bt[b_cs];
+        float b2 = bt[2 * b_cs];
+        float b3 = bt[3 * b_cs];
+        float v0 = a0[t * a_cs];
+        float v1 = a1[t * a_cs];
+        float v2 = a2[t * a_cs];
+        float v3 = a3[t * a_cs];
+        c00 += v0 * b0; c01 += v0 * b1; c02 += v0 * b2; c03 += v0 * b3;
+        c10 += v1 * b0; c11 += v1 * b1; c12 += v1 * b2; c13 += v1 * b3;
+        c20 += v2 * b0; c21 += v2 * b1; c22 += v2 * b2; c23 += v2 * b3;
+        c30 += v3 * b0; c31 += v3 * b1; c32 += v3 * b2; c33 += v3 * b3;
+      }
+      float* r0 = c + (i + 0) * n + j;
+      float* r1 = c + (i + 1) * n + j;
+      float* r2 = c + (i + 2) * n + j;
+      float* r3 = c + (i + 3) * n + j;
+      r0[0] = k2c_act_f32(act, c00); r0[1] = k2c_act_f32(act, c01);
+      r0[2] = k2c_act_f32(act, c02); r0[3] = k2c_act_f32(act, c03);
+      r1[0] = k2c_act_f32(act, c10); r1[1] = k2c_act_f32(act, c11);
+      r1[2] = k2c_act_f32(act, c12); r1[3] = k2c_act_f32(act, c13);
+      r2[0] = k2c_act_f32(act, c20); r2[1] = k2c_act_f32(act, c21);
+      r2[2] = k2c_act_f32(act, c22); r2[3] = k2c_act_f32(act, c23);
+      r3[0] = k2c_act_f32(act, c30); r3[1] = k2c_act_f32(act, c31);
+      r3[2] = k2c_act_f32(act, c32); r3[3] = k2c_act_f32(act, c33);
+    }
+    for (; j < n; ++j) {
+      float s0 = 0.0f, s1 = 0.0f, s2 = 0.0f, s3 = 0.0f;
+      for (size_t t = 0; t < k; ++t) {
+        float bv = b[t * b_rs + j * b_cs];
+        s0 += a0[t * a_cs] * bv;
+        s1 += a1[t * a_cs] * bv;
+        s2 += a2[t * a_cs] * bv;
+        s3 += a3[t * a_cs] * bv;
+      }
+      c[(i + 0) * n + j] = k2c_act_f32(act, s0);
+      c[(i + 1) * n + j] = k2c_act_f32(act, s1);
+      c[(i + 2) * n + j] = k2c_act_f32(act, s2);
+      c[(i + 3) * n + j] = k2c_act_f32(act, s3);
+    }
+  }
+  for (; i < m; ++i) {
+    const float* ai = a + i * a_rs;
+    size_t j = 0;
+    for (; j + 4 <= n; j += 4) {
+      float s0 = 0.0f, s1 = 0.0f, s2 = 0.0f, s3 = 0.0f;
+      const float* bj = b + j * b_cs;
+      for (size_t t = 0; t < k; ++t) {
+        const float* bt = bj + t * b_rs;
+        float av = ai[t * a_cs];
+        s0 += av * bt[0];
+        s1 += av * bt[b_cs];
+        s2 += av * bt[2 * b_cs];
+        s3 += av * bt[3 * b_cs];
+      }
+      c[i * n + j + 0] = k2c_act_f32(act, s0);
+      c[i * n + j + 1] = k2c_act_f32(act, s1);
+      c[i * n + j + 2] = k2c_act_f32(act, s2);
+      c[i * n + j + 3] = k2c_act_f32(act, s3);
+    }
+    for (; j < n; ++j) {
+      float s = 0.0f;
+      for (size_t t = 0; t < k; ++t) {
+        s += ai[t * a_cs] * b[t * b_rs + j * b_cs];
+      }
+      c[i * n + j] = k2c_act_f32(act, s);
+    }
+  }
+}"""
+
+
+_CONV2D_F32_1X1 = """static void k2c_conv2d_f32_1x1(
+    const k2c_conv2d_geom_t* g, const float* x, const float* w, const float* b, float* y,
+    const k2c_act_t* act) {
+  const size_t plane = (size_t)g->h * (size_t)g->w;
+  const size_t c_in = (size_t)g->c_in;
+  for (int ni = 0; ni < g->n; ++ni) {
+    const float* xn = x + (size_t)ni * c_in * plane;
+    float* yn = y + (size_t)ni * (size_t)g->m * plane;
+    int oc = 0;
+    for (; oc + 4 <= g->m; oc += 4) {
+      float* y0 = yn + (size_t)(oc + 0) * plane;
+      float* y1 = yn + (size_t)(oc + 1) * plane;
+      float* y2 = yn + (size_t)(oc + 2) * plane;
+      float* y3 = yn + (size_t)(oc + 3) * plane;
+      const float b0 = b ? b[oc + 0] : 0.0f;
+      const float b1 = b ? b[oc + 1] : 0.0f;
+      const float b2 = b ? b[oc + 2] : 0.0f;
+      const float b3 = b ? b[oc + 3] : 0.0f;
+      for (size_t p = 0; p < plane; ++p) {
+        y0[p] = b0;
+        y1[p] = b1;
+        y2[p] = b2;
+        y3[p] = b3;
+      }
+      for (size_t ic = 0; ic < c_in; ++ic) {
+        const float w0 = w[(size_t)(oc + 0) * c_in + ic];
+        const float w1 = w[(size_t)(oc + 1) * c_in + ic];
+        const float w2 = w[(size_t)(oc + 2) * c_in + ic];
+        const float w3 = w[(size_t)(oc + 3) * c_in + ic];
+        const float* xc = xn + ic * plane;
+        if (act == NULL || ic + 1 < c_in) {
+          for (size_t p = 0; p < plane; ++p) {
+            const float xv = xc[p];
+            y0[p] += w0 * xv;
+            y1[p] += w1 * xv;
+            y2[p] += w2 * xv;
+            y3[p] += w3 * xv;
+          }
+        } else {
+          /* Last input channel: the sums are final, store them activated. */
+          for (size_t p = 0; p < plane; ++p) {
+            const float xv = xc[p];
+            y0[p] = k2c_act_f32(act, y0[p] + w0 * xv);
+            y1[p] = k2c_act_f32(act, y1[p] + w1 * xv);
+            y2[p] = k2c_act_f32(act, y2[p] + w2 * xv);
+            y3[p] = k2c_act_f32(act, y3[p] + w3 * xv);
+          }
+        }
+      }
+    }
+    for (; oc < g->m; ++oc) {
+      float* yo = yn + (size_t)oc * plane;
+      const float bias = b ? b[oc] : 0.0f;
+      for (size_t p = 0; p < plane; ++p) yo[p] = bias;
+      const float* wo = w + (size_t)oc * c_in;
+      for (size_t ic = 0; ic < c_in; ++ic) {
+        const float wv = wo[ic];
+        const float* xc = xn + ic * plane;
+        if (act == NULL || ic + 1 < c_in) {
+          for (size_t p = 0; p < plane; ++p) yo[p] += wv * xc[p];
+        } else {
+          for (size_t p = 0; p < plane; ++p) yo[p] = k2c_act_f32(act, yo[p] + wv * xc[p]);
+        }
+      }
+    }
+  }
+}"""
+
+
+_CONV2D_F32_DEPTHWISE = """static void k2c_conv2d_f32_depthwise(
+    const k2c_conv2d_geom_t* g, const float* x, const float* w, const float* b, float* y,
+    const k2c_act_t* act) {
+  const size_t in_plane = (size_t)g->h * (size_t)g->w;
+  const size_t out_plane = (size_t)g->out_h * (size_t)g->out_w;
+  const int span_h = (g->k_h - 1) * g->dil_h;
+  const int span_w = (g->k_w - 1) * g->dil_w;
+  /* Output rows/cols whose whole receptive field lies inside the input. */
+  const int oh_in_lo = k2c_conv_out_lo(g->pad_h, 0, g->stride_h);
+  const int oh_in_hi = k2c_conv_out_hi(g->h, g->pad_h, span_h, g->stride_h, g->out_h);
+  const int ow_in_lo = k2c_conv_out_lo(g->pad_w, 0, g->stride_w);
+  const int ow_in_hi = k2c_conv_out_hi(g->w, g->pad_w, span_w, g->stride_w, g->out_w);
+  for (int ni = 0; ni < g->n; ++ni) {
+    for (int c = 0; c < g->m; ++c) {
+      const float* xc = x + ((size_t)ni * (size_t)g->c_in + (size_t)c) * in_plane;
+      const float* wc = w + (size_t)c * (size_t)g->k_h * (size_t)g->k_w;
+      float* yc = y + ((size_t)ni * (size_t)g->m + (size_t)c) * out_plane;
+      const float bias = b ? b[c] : 0.0f;
+      for (int oh = 0; oh < g->out_h; ++oh) {
+        const int ih0 = oh * g->stride_h - g->pad_h;
+        const int row_inside = oh >= oh_in_lo && oh < oh_in_hi;
+        int kh_lo = 0;
+        int kh_hi = g->k_h;
+        if (!row_inside) {
+          while (kh_lo < g->k_h && ih0 + kh_lo * g->dil_h < 0) ++kh_lo;
+          while (kh_hi > kh_lo && ih0 + (kh_hi - 1) * g->dil_h >= g->h) --kh_hi;
+        }
+        for (int ow = 0; ow < g->out_w; ++ow) {
+          const int iw0 = ow * g->stride_w - g->pad_w;
+          float sum = bias;
+          if (row_inside && ow >= ow_in_lo && ow < ow_in_hi) {
+            const float* xp = xc + (size_t)ih0 * (size_t)g->w + (size_t)iw0;
+            for (int kh = 0; kh < g->k_h; ++kh) {
+              const float* xr = xp + (size_t)(kh * g->dil_h) * (size_t)g->w;
+              const float* wr = wc + (size_t)kh * (size_t)g->k_w;
+              for (int kw = 0; kw < g->k_w; ++kw) {
+                sum += xr[kw * g->dil_w] * wr[kw];
+              }
+            }
+          } else {
+            int kw_lo = 0;
+            int kw_hi = g->k_w;
+            while (kw_lo < g->k_w && iw0 + kw_lo * g->dil_w < 0) ++kw_lo;
+            while (kw_hi > kw_lo && iw0 + (kw_hi - 1) * g->dil_w >= g->w) --kw_hi;
+            for (int kh = kh_lo; kh < kh_hi; ++kh) {
+              const float* xr = xc + (size_t)(ih0 + kh * g->dil_h) * (size_t)g->w;
+              const float* wr = wc + (size_t)kh * (size_t)g->k_w;
+              for (int kw = kw_lo; kw < kw_hi; ++kw) {
+                sum += xr[iw0 + kw * g->dil_w] * wr[kw];
+              }
+            }
+          }
+          yc[(size_t)oh * (size_t)g->out_w + (size_t)ow] = k2c_act_f32(act, sum);
+        }
+      }
+    }
+  }
+}"""
+
+
+_CONV2D_F32_DIRECT = """static void k2c_conv2d_f32_direct(
+    const k2c_conv2d_geom_t* g, const float* x, const float* w, const float* b, float* y,
+    const k2c_act_t* act) {
+  const int oc_per_g = g->m / g->groups;
+  const size_t in_plane = (size_t)g->h * (size_t)g->w;
+  const size_t out_plane = (size_t)g->out_h * (size_t)g->out_w;
+  for (int ni = 0; ni < g->n; ++ni) {
+    const float* xn = x + (size_t)ni * (size_t)g->c_in * in_plane;
+    float* yn = y + (size_t)ni * (size_t)g->m * out_plane;
+    for (int oc = 0; oc < g->m; ++oc) {
+      float* yo = yn + (size_t)oc * out_plane;
+      const float bias = b ? b[oc] : 0.0f;
+      for (size_t p = 0; p < out_plane; ++p) yo[p] = bias;
+      const int ic_begin = (oc / oc_per_g) * g->c_per_g;
+      for (int icl = 0; icl < g->c_per_g; ++icl) {
+        const float* xc = xn + (size_t)(ic_begin + icl) * in_plane;
+        const float* wk = w + ((size_t)oc * (size_t)g->c_per_g + (size_t)icl) * (size_t)g->k_h * (size_t)g->k_w;
+        for (int kh = 0; kh < g->k_h; ++kh) {
+          const int kh_off = kh * g->dil_h;
+          /* Clamp the output rows/cols per tap so the inner loop never tests bounds. */
+          const int oh_lo = k2c_conv_out_lo(g->pad_h, kh_off, g->stride_h);
+          const int oh_hi = k2c_conv_out_hi(g->h, g->pad_h, kh_off, g->stride_h, g->out_h);
+          for (int kw = 0; kw < g->k_w; ++kw) {
+            const int kw_off = kw * g->dil_w;
+            const int ow_lo = k2c_conv_out_lo(g->pad_w, kw_off, g->stride_w);
+            const int ow_hi = k2c_conv_out_hi(g->w, g->pad_w, kw_off, g->stride_w, g->out_w);
+            if (ow_lo >= ow_hi) continue;
+            const float wv = wk[kh * g->k_w + kw];
+            const int shift = kw_off - g->pad_w;
+            for (int oh = oh_lo; oh < oh_hi; ++oh) {
+              const float* xr = xc + (size_t)(oh * g->stride_h + kh_off - g->pad_h) * (size_t)g->w;
+              float* yr = yo + (size_t)oh * (size_t)g->out_w;
+              if (g->stride_w == 1) {
+                for (int ow = ow_lo; ow < ow_hi; ++ow) yr[ow] += wv * xr[ow + shift];
+              } else {
+                for (int ow = ow_lo; ow < ow_hi; ++ow) yr[ow] += wv * xr[ow * g->stride_w + shift];
+              }
+            }
+          }
+        }
+      }
+      /* Taps are clamped per row/col, so no single tap writes every output last;
+         activate the channel plane while it is still in cache. */
+      if (act != NULL) {
+        for (size_t p = 0; p < out_plane; ++p) yo[p] = k2c_act_f32(act, yo[p]);
+      }
+    }
+  }
+}"""
+
+
+_REQUANT = """static int32_t k2c_requantize(int64_t acc, int32_t mult, int shift, int32_t zero, int32_t qmin, int32_t qmax) {
+  /* Fixed-point round-half-away-from-zero, matching the inline requant loops. */
+  const int64_t prod = acc * (int64_t)mult;
+  const int64_t half = (int64_t)1 << (shift - 1);
+  const int64_t v = prod >= 0 ? ((prod + half) >> shift) : -((half - prod) >> shift);
+  int32_t q = (int32_t)v + zero;
+  if (q < qmin) q = qmin;
+  if (q > qmax) q = qmax;
+  return q;
+}"""
+
+
+_QCONV_DESC = """typedef struct {
+  k2c_conv2d_geom_t g;
+  const int32_t* acc_init;
+  const int32_t* mult;
+  const int8_t* shift;
+  const int32_t* w_zero;
+  int rq_per_channel, wz_per_channel;
+  int32_t x_zero, y_zero;
+} k2c_qconv2d_t;"""
+
+
+_QGEMM_DESC = """typedef struct {
+  int m, k, n;
+  int a_rs, a_cs, b_rs, b_cs;
+  const int32_t* bias;
+  int bias_rs, bias_cs;
+  int32_t a_zero, b_zero, y_zero, mult;
+  int shift;
+} k2c_qgemm_t;"""
+
+
+_QCONV2D = """static void k2c_{name}(const k2c_qconv2d_t* p, const {x_t}* x, const {x_t}* w, {y_t}* y) {{
+  const k2c_conv2d_geom_t* g = &p->g;
+  const int oc_per_g = g->m / g->groups;
+  const size_t in_plane = (size_t)g->h * (size_t)g->w;
+  const size_t k_plane = (size_t)g->k_h * (size_t)g->k_w;
+  for (int ni = 0; ni < g->n; ++ni) {{
+    const {x_t}* xn = x + (size_t)ni * (size_t)g->c_in * in_plane;
+    for (int oc = 0; oc < g->m; ++oc) {{
+      const int rq = p->rq_per_channel ? oc : 0;
+      const int32_t zw = p->w_zero[p->wz_per_channel ? oc : 0];
+      const int32_t init = p->acc_init ? p->acc_init[oc] : 0;
+      const {x_t}* xg = xn + (size_t)((oc / oc_per_g) * g->c_per_g) * in_plane;
+      const {x_t}* wo = w + (size_t)oc * (size_t)g->c_per_g * k_plane;
+      for (int oh = 0; oh < g->out_h; ++oh) {{
+        const int ih0 = oh * g->stride_h - g->pad_h;
+        /* Clamp the taps to the input so padding never reaches the inner loop. */
+        int kh_lo = 0;
+        int kh_hi = g->k_h;
+        while (kh_lo < kh_hi && ih0 + kh_lo * g->dil_h < 0) ++kh_lo;
+        while (kh_hi > kh_lo && ih0 + (kh_hi - 1) * g->dil_h >= g->h) --kh_hi;
+        for (int ow = 0; ow < g->out_w; ++ow) {{
+          const int iw0 = ow * g->stride_w - g->pad_w;
+          int kw_lo = 0;
+          int kw_hi = g->k_w;
+          while (kw_lo < kw_hi && iw0 + kw_lo * g->dil_w < 0) ++kw_lo;
+          while (kw_hi > kw_lo && iw0 + (kw_hi - 1) * g->dil_w >= g->w) --kw_hi;
+          {acc_t} acc = init;
+          for (int icl = 0; icl < g->c_per_g; ++icl) {{
+            const {x_t}* xc = xg + (size_t)icl * in_plane;
+            const {x_t}* wk = wo + (size_t)icl * k_plane;
+            for (int kh = kh_lo; kh < kh_hi; ++kh) {{
+              const {x_t}* xr = xc + (size_t)(ih0 + kh * g->dil_h) * (size_t)g->w;
+              const {x_t}* wr = wk + (size_t)kh * (size_t)g->k_w;
+              for (int kw = kw_lo; kw < kw_hi; ++kw) {{
+                acc += ({acc_t})((int32_t)xr[iw0 + kw * g->dil_w] - p->x_zero) * ({acc_t})((int32_t)wr[kw] - zw);
+              }}
+            }}
+          }}
+          *y++ = ({y_t})k2c_requantize(acc, p->mult[rq], p->shift[rq], p->y_zero, {qmin}, {qmax});
+        }}
+      }}
+    }}
+  }}
+}}"""
+
+
+_QGEMM = """static void k2c_{name}(const k2c_qgemm_t* p, const {x_t}* a, const {x_t}* b, {y_t}* c) {{
+  for (int i = 0; i < p->m; ++i) {{
+    const {x_t}* ai = a + (size_t)i * (size_t)p->a_rs;
+    for (int j = 0; j < p->n; ++j) {{
+      const {x_t}* bj = b + (size_t)j * (size_t)p->b_cs;
+      {acc_t} acc = p->bias ? p->bias[i * p->bias_rs + j * p->bias_cs] : 0;
+      for (int t = 0; t < p->k; ++t) {{
+        acc += ({acc_t})((int32_t)ai[(size_t)t * (size_t)p->a_cs] - p->a_zero)
+            * ({acc_t})((int32_t)bj[(size_t)t * (size_t)p->b_rs] - p->b_zero);
+      }}
+      c[(size_t)i * (size_t)p->n + (size_t)j] = ({y_t})k2c_requantize(acc, p->mult, p->shift, p->y_zero, {qmin}, {qmax});
+    }}
+  }}
+}}"""
+
+
+# dtype -> (name tag, C type, qmin, qmax, accumulator type for that input dtype)
+_QTYPES = {
+    "int8": ("s8", "int8_t", -128, 127, "int32_t"),
+    "int16": ("s16", "int16_t", -32768, 32767, "int64_t"),
+}
+
+
+def quant_kernel_name(op: str, in_dtype: str, out_dtype: str) -> str:
+    tag = _QTYPES[in_dtype][0]
+    if out_dtype != in_dtype:
+        tag = f"{tag}_{_QTYPES[out_dtype][0]}"
+    return f"{op}_{tag}"
+
+
+KERNEL_SOURCES: dict[str, str] = {
+    "act": _ACT,
+    "conv2d_geom": _CONV_GEOM,
+    "conv2d_bounds": _CONV_BOUNDS,
+    "gemm_f32": _GEMM_F32,
+    "conv2d_f32_1x1": _CONV2D_F32_1X1,
+    "conv2d_f32_depthwise": _CONV2D_F32_DEPTHWISE,
+    "conv2d_f32_direct": _CONV2D_F32_DIRECT,
+    "requant": _REQUANT,
+    "qconv2d_desc": _QCONV_DESC,
+    "qgemm_desc": _QGEMM_DESC,
+}
+
+KERNEL_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "gemm_f32": ("act",),
+    "conv2d_f32_1x1": ("act", "conv2d_geom"),
+    "conv2d_f32_depthwise": ("act", "conv2d_geom", "conv2d_bounds"),
+    "conv2d_f32_direct": ("act", "conv2d_geom", "conv2d_bounds"),
+    "qconv2d_desc": ("conv2d_geom",),
+}
+
+def _register_quant_kernels() -> None:
+    for in_dtype, (_, x_t, _, _, acc_t) in _QTYPES.items():
+        for out_dtype, (_, y_t, qmin, qmax, _) in _QTYPES.items():
+            for op, template, desc in (("conv2d", _QCONV2D, "qconv2d_desc"), ("gemm", _QGEMM, "qgemm_desc")):
+                name = quant_kernel_name(op, in_dtype, out_dtype)
+                KERNEL_SOURCES[name] = template.format(name=name, x_t=x_t, y_t=y_t, acc_t=acc_t, qmin=qmin, qmax=qmax)
+                KERNEL_DEPENDENCIES[name] = (desc, "requant")
+
+
+_register_quant_kernels()
+
+
+@dataclass(frozen=True)
+class Conv2dGeometry:
+    n: int
+    c_in: int
+    h: int
+    w: int
+    m: int
+    c_per_g: int
+    k_h: int
+    k_w: int
+    out_h: int
+    out_w: int
+    stride_h: int
+    stride_w: int
+    pad_h: int
+    pad_w: int
+    dil_h: int
+    dil_w: int
+    groups: int
+
+    @property
+    def macs(self) -> int:
+        return self.n * self.m * self.out_h * self.out_w * self.c_per_g * self.k_h * self.k_w
+
+    def initializer(self) -> str:
+        values = (
+            self.n,
+            self.c_in,
+            self.h,
+            self.w,
+            self.m,
+            self.c_per_g,
+            self.k_h,
+            self.k_w,
+            self.out_h,
+            self.out_w,
+            self.stride_h,
+            self.stride_w,
+            self.pad_h,
+            self.pad_w,
+            self.dil_h,
+            self.dil_w,
+            self.groups,
+        )
+        return ", ".join(str(int(v)) for v in values)
+
+
+def require_kernel(ctx: EmitContext, name: str) -> str:
+    for dep in KERNEL_DEPENDENCIES.get(name, ()):
+        require_kernel(ctx, dep)
+    if name not in ctx.kernels:
+        ctx.kernels[name] = KERNEL_SOURCES[name]
+    return f"k2c_{name}"
+
+
+def use_kernel_library(ctx: EmitContext, macs: int) -> bool:
+    # optimize="speed" keeps small problems inline; "size" routes every op that
+    # has a library kernel through it so each variant is emitted only once.
+    if ctx.kernel_mode != "auto":
+        return False
+    return ctx.optimize == "size" or macs >= MIN_KERNEL_MACS
+
+
+def select_conv2d_kernel(ctx: EmitContext, geo: Conv2dGeometry) -> str | None:
+    if not use_kernel_library(ctx, geo.macs):
+        return None
+    if (
+        geo.k_h == 1
+        and geo.k_w == 1
+        and geo.groups == 1
+        and geo.stride_h == 1
+        and geo.stride_w == 1
+        and geo.pad_h == 0
+        and geo.pad_w == 0
+        and geo.out_h == geo.h
+        and geo.out_w == geo.w
+    ):
+        return "conv2d_f32_1x1"
+    if geo.groups == geo.c_in and geo.m == geo.c_in and geo.c_per_g == 1:
+        return "conv2d_f32_depthwise"
+    return "conv2d_f32_direct"
+
+
+def select_gemm_kernel(ctx: EmitContext, m: int, k: int, n: int) -> str | None:
+    if not use_kernel_library(ctx, m * k * n):
+        return None
+    return "gemm_f32"
+
+
+def select_quant_kernel(
+    ctx: EmitContext,
+    op: str,
+    in_dtype: str,
+    out_dtype: str,
+    acc_ctype: str,
+    macs: int,
+) -> str | None:
+    # int8 kernels accumulate in int32; problems that need int64 stay inline.
+    if not use_kernel_library(ctx, macs):
+        return None
+    if in_dtype not in _QTYPES or out_dtype not in _QTYPES:
+        return None
+    if acc_ctype == "int64_t" and _QTYPES[in_dtype][4] != "int64_t":
+        return None
+    return quant_kernel_name(op, in_dtype, out_dtype)
+
+
+def _float_literal(value: float) -> str:
+    if value >= FLT_MAX:
+        return "3.402823466e+38F"
+    if value <= -FLT_MAX:
+        return "-3.402823466e+38F"
+    return f"{value:.8f}f"
+
+
+def emit_activation_desc(ctx: EmitContext, act: dict[str, object] | None) -> str:
+    if not act:
+        return "NULL"
+    op = act.get("op")
+    if op == "Relu":
+        lo, hi, slope = 0.0, FLT_MAX, 1.0
+    elif op == "LeakyRelu":
+        lo, hi, slope = -FLT_MAX, FLT_MAX, float(act["alpha"])
+    elif op == "Clip":
+        lo, hi, slope = float(act["min"]), float(act["max"]), 1.0
+    else:
+        raise ValueError(f"Unsupported fused activation: {op}")
+    require_kernel(ctx, "act")
+    name = ctx.next_symbol("k2c_act")
+    values = ", ".join(_float_literal(v) for v in (lo, hi, slope))
+    ctx.lines.append(f"  static const k2c_act_t {name} = {{ {values} }};")
+    return f"&{name}"
+
+
+def emit_conv2d_kernel_call(
+    ctx: EmitContext,
+    kernel: str,
+    geo: Conv2dGeometry,
+    out: str,
+    x: str,
+    w: str,
+    b: str | None,
+    act: dict[str, object] | None = None,
+) -> None:
+    fn = require_kernel(ctx, kernel)
+    geom = ctx.next_symbol("k2c_conv_geom")
+    ctx.lines.append(f"  static const k2c_conv2d_geom_t {geom} = {{ {geo.initializer()} }};")
+    act_desc = emit_activation_desc(ctx, act)
+    bias = f"(const float*){b}" if b else "NULL"
+    ctx.lines.append(f"  {fn}(&{geom}, (const float*){x}, (const float*){w}, {bias}, {out}, {act_desc});")
+
+
+def emit_gemm_kernel_call(
+    ctx: EmitContext,
+    out: str,
+    a: str,
+    b: str,
+    m: int,
+    k: int,
+    n: int,
+    *,
+    trans_a: bool = False,
+    trans_b: bool = False,
+    act: dict[str, object] | None = None,
+) -> None:
+    fn = require_kernel(ctx, "gemm_f32")
+    act_desc = emit_activation_desc(ctx, act)
+    a_rs, a_cs = (1, m) if trans_a else (k, 1)
+    b_rs, b_cs = (1, k) if trans_b else (n, 1)
+    ctx.lines.append(
+        f"  {fn}((const float*){a}, {a_rs}, {a_cs}, (const float*){b}, {b_rs}, {b_cs}, {out}, {m}, {k}, {n}, {act_desc});"
+    )
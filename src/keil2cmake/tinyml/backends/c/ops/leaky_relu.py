@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
+from .lut_common import emit_unary_quant
 from .registry import register_op
-from ....operators.utils import emit_op_leaky_relu, emit_op_unary_quant, tensor_size
+from ....operators.utils import emit_op_leaky_relu, tensor_size
 
 
 @register_op("LeakyRelu")
@@ -28,7 +31,7 @@ def emit_leaky_relu(ctx: EmitContext, node: NodeInfo) -> None:
         else:
             so, zo = so_zo
         expr = f"(r >= 0.0f ? r : ({alpha:.8f}f * r))"
-        emit_op_unary_quant(ctx.lines, out, a, size, expr, out_dtype, sa, za, so, zo)
+        emit_unary_quant(ctx, out, a, size, expr, lambda r: np.where(r >= 0.0, r, alpha * r), out_dtype, sa, za, so, zo)
         return
     if out_dtype != "float32":
         raise ValueError("LeakyRelu supports float32 or quantized int8/int16 only.")
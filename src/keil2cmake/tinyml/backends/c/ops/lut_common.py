@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import hashlib
+from typing import Callable
+
+import numpy as np
+
+from ....operators.context import EmitContext
+from ....operators.utils import emit_op_unary_quant
+from .requant_common import qrange
+
+
+UnaryRef = Callable[[np.ndarray], np.ndarray]
+
+# int16 tables are interpolated between knots; the coarsest knot spacing whose
+# worst case stays within INT16_LUT_MAX_ERROR LSBs of the exact mapping wins.
+# Functions with steps (Floor, Shrink, ...) fail the check and keep the loop.
+INT16_LUT_SHIFTS = (8, 7, 6)
+INT16_LUT_MAX_ERROR = 1
+
+
+def quantized_unary_table(
+    ref: UnaryRef,
+    q: np.ndarray,
+    sa: float,
+    za: int,
+    so: float,
+    zo: int,
+    qmin: int,
+    qmax: int,
+) -> np.ndarray:
+    r = (q.astype(np.float64) - za) * sa
+    with np.errstate(all="ignore"):
+        v = np.asarray(ref(r), dtype=np.float64) / so
+    v = np.nan_to_num(v, nan=0.0, posinf=float(1 << 32), neginf=-float(1 << 32))
+    # roundf() rounds halfway cases away from zero.
+    rounded = np.sign(v) * np.floor(np.abs(v) + 0.5)
+    return np.clip(rounded + zo, qmin, qmax).astype(np.int64)
+
+
+def interpolated_int16_table(
+    ref: UnaryRef,
+    sa: float,
+    za: int,
+    so: float,
+    zo: int,
+) -> tuple[np.ndarray, int] | None:
+    qmin, qmax, _ = qrange("int16")
+    x = np.arange(1 << 16, dtype=np.int64)
+    exact = quantized_unary_table(ref, x + qmin, sa, za, so, zo, qmin, qmax)
+    for shift in INT16_LUT_SHIFTS:
+        step = 1 << shift
+        knots = quantized_unary_table(ref, np.arange(0, (1 << 16) + step, step) + qmin, sa, za, so, zo, qmin, qmax)
+        lo = knots[x >> shift]
+        hi = knots[(x >> shift) + 1]
+        approx = lo + (((hi - lo) * (x & (step - 1)) + (step >> 1)) >> shift)
+        if int(np.max(np.abs(approx - exact))) <= INT16_LUT_MAX_ERROR:
+            return knots, shift
+    return None
+
+
+def _lut_symbol(ctx: EmitContext, prefix: str, ctype: str, values: np.ndarray) -> str:
+    # Tables are named by content, so nodes with identical qparams (and any
+    # functions that happen to quantize identically) share one definition.
+    digest = hashlib.sha1(values.astype(np.int64).tobytes()).hexdigest()[:12]
+    key = f"{prefix}_{digest}"
+    if key not in ctx.kernels:
+        items = [str(int(v)) for v in values]
+        rows = [", ".join(items[i:i + 16]) for i in range(0, len(items), 16)]
+        body = ",\n  ".join(rows)
+        ctx.kernels[key] = f"static const {ctype} k2c_{key}[{len(items)}] = {{\n  {body}\n}};"
+    return f"k2c_{key}"
+
+
+def emit_unary_quant(
+    ctx: EmitContext,
+    out: str,
+    inp: str,
+    size: int,
+    expr: str,
+    ref: UnaryRef,
+    dtype: str,
+    sa: float,
+    za: int,
+    so: float,
+    zo: int,
+) -> None:
+    if ctx.kernel_mode == "auto" and dtype == "int8":
+        qmin, qmax, ctype = qrange(dtype)
+        table = quantized_unary_table(ref, np.arange(qmin, qmax + 1), sa, za, so, zo, qmin, qmax)
+        lut = _lut_symbol(ctx, "lut_s8", ctype, table)
+        ctx.lines.append(f"  for (size_t i = 0; i < {size}; ++i) {{")
+        ctx.lines.append(f"    {out}[i] = {lut}[(int){inp}[i] + 128];")
+        ctx.lines.append("  }")
+        return
+    if ctx.kernel_mode == "auto" and dtype == "int16":
+        found = interpolated_int16_table(ref, sa, za, so, zo)
+        if found is not None:
+            knots, shift = found
+            lut = _lut_symbol(ctx, f"lut_s16_i{shift}", "int16_t", knots)
+            ctx.lines.append(f"  for (size_t i = 0; i < {size}; ++i) {{")
+            ctx.lines.append(f"    int32_t x = (int32_t){inp}[i] + 32768;")
+            ctx.lines.append(f"    int32_t lo = {lut}[x >> {shift}];")
+            ctx.lines.append(f"    int32_t hi = {lut}[(x >> {shift}) + 1];")
+            ctx.lines.append(
+                f"    {out}[i] = (int16_t)(lo + (((hi - lo) * (x & {(1 << shift) - 1}) + {1 << (shift - 1)}) >> {shift}));"
+            )
+            ctx.lines.append("  }")
+            return
+    emit_op_unary_quant(ctx.lines, out, inp, size, expr, dtype, sa, za, so, zo)
@@ -6,6 +6,8 @@ from ....ir import NodeInfo
 from ....operators.context import EmitContext
 from .registry import register_op
 from ....operators.utils import emit_op_matmul
+from .kernel_lib import emit_gemm_kernel_call, select_gemm_kernel
+from .requant_common import AccBias, QMatMulLayout, const_values, emit_qmatmul_int
 
 
 @register_op("MatMul")
@@ -32,6 +34,22 @@ def emit_matmul(ctx: EmitContext, node: NodeInfo) -> None:
         sa, za = ctx.qparams(a_name)
         sb, zb = ctx.qparams(b_name)
         so, zo = ctx.qparams(out_tensor)
+        if so != 0.0 and emit_qmatmul_int(
+            ctx,
+            a=a,
+            b=b,
+            out=out,
+            layout=QMatMulLayout(m=m, k=k1, n=n),
+            in_dtype=out_dtype,
+            out_dtype=out_dtype,
+            a_zero=za,
+            b_zero=zb,
+            b_values=const_values(ctx, b_name),
+            real_multiplier=sa * sb / so,
+            bias=AccBias(),
+            y_zero=zo,
+        ):
+            return
         qmin, qmax = (-128, 127) if out_dtype == "int8" else (-32768, 32767)
         ctx.lines.append(f"  for (size_t i = 0; i < {m}; ++i) {{")
         ctx.lines.append(f"    for (size_t j = 0; j < {n}; ++j) {{")
@@ -56,5 +74,9 @@ def emit_matmul(ctx: EmitContext, node: NodeInfo) -> None:
         return
     if out_dtype != "float32":
         raise ValueError("MatMul supports float32 or quantized int8/int16 only.")
-    emit_op_matmul(ctx.lines, out, a, b, m, k1, n)
+    act = node.attrs.get("fused_activation")
+    if select_gemm_kernel(ctx, m, k1, n) is not None:
+        emit_gemm_kernel_call(ctx, out, a, b, m, k1, n, act=act)
+        return
+    emit_op_matmul(ctx.lines, out, a, b, m, k1, n, act)
 
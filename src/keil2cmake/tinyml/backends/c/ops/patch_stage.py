@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from typing import Any
+
+from ....ir import NodeInfo
+from ....operators.context import EmitContext
+from ....tiling import PATCH_STAGE_OP, PatchLayer, PatchStage
+from .registry import register_op
+
+
+def _emit_epilogue(lines: list[str], indent: str, var: str, spec: dict[str, Any]) -> None:
+    op = spec.get("op")
+    if op == "Relu":
+        lines.append(f"{indent}{var} = {var} > 0.0f ? {var} : 0.0f;")
+    elif op == "LeakyRelu":
+        lines.append(f"{indent}{var} = {var} >= 0.0f ? {var} : ({float(spec['alpha']):.8f}f * {var});")
+    elif op == "Clip":
+        lines.append(f"{indent}if ({var} < {float(spec['min']):.8f}f) {var} = {float(spec['min']):.8f}f;")
+        lines.append(f"{indent}if ({var} > {float(spec['max']):.8f}f) {var} = {float(spec['max']):.8f}f;")
+    elif op == "Sigmoid":
+        lines.append(f"{indent}{var} = 1.0f / (1.0f + expf(-{var}));")
+    elif op == "Tanh":
+        lines.append(f"{indent}{var} = tanhf({var});")
+    else:
+        raise ValueError(f"Unsupported patch epilogue: {op}")
+
+
+def _emit_layer(
+    ctx: EmitContext,
+    layer: PatchLayer,
+    x: str,
+    x_origin: tuple[str, str, str, str],
+    y: str,
+    y_origin: tuple[str, str, str, str],
+    region: str,
+) -> None:
+    # x_origin/y_origin: (row0, rows, col0, cols) of the stored tile, so that
+    # global coordinates (ih, iw) map to ((c * rows + ih - row0) * cols + iw - col0).
+    lines = ctx.lines
+    node = layer.node
+    _, in_h, in_w = layer.in_shape
+    channels = layer.out_shape[0]
+    kh, kw = layer.kernel
+    sh, sw = layer.stride
+    dh, dw = layer.dilation
+    pad_h, pad_w = layer.pad
+    xr0, xrows, xc0, xcols = x_origin
+    yr0, yrows, yc0, ycols = y_origin
+    indent = "          "
+    conv = node.op_type == "Conv"
+    groups = int(node.attrs.get("group", 1)) if conv else channels
+    c_per_g = layer.in_shape[0] // groups
+    lines.append(f"      for (int oc = 0; oc < {channels}; ++oc) {{")
+    lines.append(f"        for (int oh = r0_{region}; oh < r1_{region}; ++oh) {{")
+    lines.append(f"          for (int ow = c0_{region}; ow < c1_{region}; ++ow) {{")
+    if conv:
+        oc_per_g = channels // groups
+        w = ctx.map_ptr(node.inputs[1])
+        b_name = node.inputs[2] if len(node.inputs) > 2 else ""
+        init = f"{ctx.map_ptr(b_name)}[oc]" if b_name else "0.0f"
+        lines.append(f"{indent}  float acc = {init};")
+        lines.append(f"{indent}  for (int icl = 0; icl < {c_per_g}; ++icl) {{")
+        lines.append(f"{indent}    const int ic = (oc / {oc_per_g}) * {c_per_g} + icl;")
+    else:
+        init = "-3.402823466e+38F" if node.op_type == "MaxPool" else "0.0f"
+        lines.append(f"{indent}  float acc = {init};")
+        lines.append(f"{indent}  int valid = 0;")
+        lines.append(f"{indent}  {{")
+        lines.append(f"{indent}    const int ic = oc;")
+    inner = f"{indent}    "
+    lines.append(f"{inner}for (int kh = 0; kh < {kh}; ++kh) {{")
+    lines.append(f"{inner}  const int ih = oh * {sh} + kh * {dh} - {pad_h};")
+    lines.append(f"{inner}  if (ih < 0 || ih >= {in_h}) continue;")
+    lines.append(f"{inner}  for (int kw = 0; kw < {kw}; ++kw) {{")
+    lines.append(f"{inner}    const int iw = ow * {sw} + kw * {dw} - {pad_w};")
+    lines.append(f"{inner}    if (iw < 0 || iw >= {in_w}) continue;")
+    lines.append(f"{inner}    const float v = {x}[(ic * {xrows} + ih - {xr0}) * {xcols} + iw - {xc0}];")
+    if conv:
+        lines.append(f"{inner}    acc += v * {w}[((oc * {c_per_g} + icl) * {kh} + kh) * {kw} + kw];")
+    elif node.op_type == "MaxPool":
+        lines.append(f"{inner}    if (v > acc) acc = v;")
+    else:
+        lines.append(f"{inner}    acc += v;")
+        lines.append(f"{inner}    valid += 1;")
+    lines.append(f"{inner}  }}")
+    lines.append(f"{inner}}}")
+    lines.append(f"{indent}  }}")
+    if node.op_type == "AveragePool":
+        if int(node.attrs.get("count_include_pad", 0)) == 1:
+            lines.append(f"{indent}  acc = acc / {float(kh * kw):.8f}f;")
+        else:
+            lines.append(f"{indent}  acc = valid > 0 ? acc / (float)valid : 0.0f;")
+    for spec in layer.epilogue:
+        _emit_epilogue(lines, f"{indent}  ", "acc", spec)
+    lines.append(f"{indent}  {y}[(oc * {yrows} + oh - {yr0}) * {ycols} + ow - {yc0}] = acc;")
+    lines.append("          }")
+    lines.append("        }")
+    lines.append("      }")
+
+
+@register_op(PATCH_STAGE_OP)
+def emit_patch_stage(ctx: EmitContext, node: NodeInfo) -> None:
+    # Runs a chain of spatially local layers patch by patch over the output of
+    # the last layer. Each patch recomputes the halo its receptive field needs,
+    # so only one patch of every intermediate tensor is ever stored.
+    stage = node.attrs.get("stage")
+    if not isinstance(stage, PatchStage) or len(stage.layers) < 2:
+        raise ValueError("Patch stage expects a planned chain of at least 2 layers.")
+    layers = stage.layers
+    last = len(layers) - 1
+    tiles_h, tiles_w = stage.tiles
+    _, out_h, out_w = layers[-1].out_shape
+    lines = ctx.lines
+    lines.append(f"  for (int ph = 0; ph < {tiles_h}; ++ph) {{")
+    lines.append(f"    for (int pw = 0; pw < {tiles_w}; ++pw) {{")
+    lines.append(f"      int r0_{last} = ph * {out_h} / {tiles_h};")
+    lines.append(f"      int r1_{last} = (ph + 1) * {out_h} / {tiles_h};")
+    lines.append(f"      int c0_{last} = pw * {out_w} / {tiles_w};")
+    lines.append(f"      int c1_{last} = (pw + 1) * {out_w} / {tiles_w};")
+    # Walk the receptive field back to the first layer (see tiling.patch_regions).
+    for idx in range(last, 0, -1):
+        layer = layers[idx]
+        _, in_h, in_w = layer.in_shape
+        for lo, hi, axis, extent in (("r0", "r1", 0, in_h), ("c0", "c1", 1, in_w)):
+            s, d, p, k = layer.stride[axis], layer.dilation[axis], layer.pad[axis], layer.kernel[axis]
+            reach = (k - 1) * d + 1
+            lines.append(f"      int {lo}_{idx - 1} = {lo}_{idx} * {s} - {p};")
+            lines.append(f"      if ({lo}_{idx - 1} < 0) {lo}_{idx - 1} = 0;")
+            lines.append(f"      int {hi}_{idx - 1} = ({hi}_{idx} - 1) * {s} - {p} + {reach};")
+            lines.append(f"      if ({hi}_{idx - 1} > {extent}) {hi}_{idx - 1} = {extent};")
+    for idx, layer in enumerate(layers):
+        _, in_h, in_w = layer.in_shape
+        if idx == 0:
+            x = ctx.map_ptr(stage.input)
+            x_origin = ("0", str(in_h), "0", str(in_w))
+        else:
+            x = ctx.map_ptr(stage.buffers[idx - 1])
+            prev = idx - 1
+            x_origin = (f"r0_{prev}", f"(r1_{prev} - r0_{prev})", f"c0_{prev}", f"(c1_{prev} - c0_{prev})")
+        if idx == last:
+            y = ctx.map_ptr(stage.output)
+            y_origin = ("0", str(out_h), "0", str(out_w))
+        else:
+            y = ctx.map_ptr(stage.buffers[idx])
+            y_origin = (f"r0_{idx}", f"(r1_{idx} - r0_{idx})", f"c0_{idx}", f"(c1_{idx} - c0_{idx})")
+        _emit_layer(ctx, layer, x, x_origin, y, y_origin, str(idx))
+    lines.append("    }")
+    lines.append("  }")
@@ -6,6 +6,7 @@ from ....ir import NodeInfo
 from ....operators.context import EmitContext
 from ....operators.utils import get_const_ints, get_const_scalar
 from .registry import register_op
+from .requant_common import QConvGeometry, bias_to_acc, const_values, emit_qconv2d_int
 
 
 def _const_float_values(ctx: EmitContext, name: str) -> list[float]:
@@ -98,6 +99,53 @@ def emit_qlinear_conv(ctx: EmitContext, node: NodeInfo) -> None:
     if len(w_zeros) not in (1, m):
         raise ValueError("QLinearConv w_zero_point must be scalar or per-output-channel.")
 
+    b_dtype = ctx.dtype(b_name) if b_name else None
+    if b_dtype not in (None, "float32", "int32", "int64"):
+        raise ValueError("QLinearConv bias supports float32/int32/int64 only.")
+
+    x = ctx.map_ptr(x_name)
+    w = ctx.map_ptr(w_name)
+    out = ctx.map_ptr(out_name)
+
+    if x_dtype == w_dtype:
+        geo = QConvGeometry(
+            n=n,
+            c_in=c_in,
+            h=h,
+            w=w_in,
+            m=m,
+            c_per_g=c_per_g,
+            k_h=k_h,
+            k_w=k_w,
+            out_h=out_h,
+            out_w=out_w,
+            stride_h=stride_h,
+            stride_w=stride_w,
+            pad_h0=pad_h0,
+            pad_w0=pad_w0,
+            dil_h=dil_h,
+            dil_w=dil_w,
+            groups=groups,
+        )
+        acc_scales = [x_scale * float(v) for v in w_scales]
+        acc_bias = bias_to_acc(ctx, b_name, acc_scales)
+        if acc_bias is not None and emit_qconv2d_int(
+            ctx,
+            x=x,
+            w=w,
+            out=out,
+            geo=geo,
+            in_dtype=x_dtype,
+            out_dtype=out_dtype,
+            x_zero=x_zero,
+            w_zeros=[int(v) for v in w_zeros],
+            w_values=const_values(ctx, w_name),
+            real_multipliers=[scale / y_scale for scale in acc_scales],
+            bias=acc_bias,
+            y_zero=y_zero,
+        ):
+            return
+
     w_scale_sym = None
     if len(w_scales) == m:
         w_scale_sym = ctx.next_symbol("k2c_qconv_w_scale")
@@ -109,14 +157,7 @@ def emit_qlinear_conv(ctx: EmitContext, node: NodeInfo) -> None:
         vals = ", ".join(str(int(v)) for v in w_zeros)
         ctx.lines.append(f"  static const int32_t {w_zero_sym}[{m}] = {{ {vals} }};")
 
-    b_dtype = ctx.dtype(b_name) if b_name else None
-    if b_dtype not in (None, "float32", "int32", "int64"):
-        raise ValueError("QLinearConv bias supports float32/int32/int64 only.")
-
-    x = ctx.map_ptr(x_name)
-    w = ctx.map_ptr(w_name)
     b = ctx.map_ptr(b_name) if b_name else None
-    out = ctx.map_ptr(out_name)
 
     if out_dtype == "int8":
         qmin, qmax, out_ctype = -128, 127, "int8_t"
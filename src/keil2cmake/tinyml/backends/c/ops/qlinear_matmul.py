@@ -7,6 +7,7 @@ from ....operators.context import EmitContext
 from ....operators.utils import tensor_size
 from .registry import register_op
 from .matmul_common import build_matmul_batch_plan
+from .requant_common import AccBias, QMatMulLayout, const_values, emit_qmatmul_int
 
 
 def _scalar_int_expr(ctx: EmitContext, name: str) -> str:
@@ -18,6 +19,13 @@ def _scalar_int_expr(ctx: EmitContext, name: str) -> str:
     return f"((int64_t){ptr}[0])"
 
 
+def _const_scalar(ctx: EmitContext, name: str) -> float | None:
+    values = const_values(ctx, name)
+    if values is None or len(values) != 1:
+        return None
+    return float(values[0])
+
+
 def _scalar_float_expr(ctx: EmitContext, name: str) -> str:
     shape = [int(v) for v in ctx.shape(name)]
     size = 1 if len(shape) == 0 else tensor_size(shape)
@@ -67,6 +75,8 @@ def emit_qlinear_matmul(ctx: EmitContext, node: NodeInfo) -> None:
     a = ctx.map_ptr(a_name)
     b = ctx.map_ptr(b_name)
     out = ctx.map_ptr(out_name)
+    if a_dtype == b_dtype and _emit_qlinear_matmul_int(ctx, node, plan, a, b, out, a_dtype, out_dtype):
+        return
     a_scale_sym = ctx.next_symbol("k2c_qmm_a_scale")
     b_scale_sym = ctx.next_symbol("k2c_qmm_b_scale")
     y_scale_sym = ctx.next_symbol("k2c_qmm_y_scale")
@@ -125,3 +135,70 @@ def emit_qlinear_matmul(ctx: EmitContext, node: NodeInfo) -> None:
     ctx.lines.append("      }")
     ctx.lines.append("    }")
     ctx.lines.append("  }")
+
+
+def _emit_qlinear_matmul_int(
+    ctx: EmitContext,
+    node: NodeInfo,
+    plan,
+    a: str,
+    b: str,
+    out: str,
+    in_dtype: str,
+    out_dtype: str,
+) -> bool:
+    consts = [_const_scalar(ctx, node.inputs[idx]) for idx in (1, 2, 4, 5, 6, 7)]
+    if any(v is None for v in consts):
+        return False
+    a_scale, a_zero, b_scale, b_zero, y_scale, y_zero = [float(v) for v in consts]
+    if y_scale == 0.0:
+        y_scale = 1.0
+    batch_rank = len(plan.batch_shape)
+    b_batched = any(int(v) != 0 for v in plan.b_batch_strides)
+    b_values = const_values(ctx, node.inputs[3]) if not b_batched else None
+    lines_before = len(ctx.lines)
+    ctx.lines.append(f"  for (size_t batch_i = 0; batch_i < {plan.batch_size}; ++batch_i) {{")
+    ctx.lines.append("    size_t a_batch_off = 0;")
+    ctx.lines.append("    size_t b_batch_off = 0;")
+    if batch_rank > 0:
+        out_batch_dims = ctx.next_symbol("k2c_qmm_batch_dims")
+        a_batch_strides = ctx.next_symbol("k2c_qmm_a_batch_strides")
+        b_batch_strides = ctx.next_symbol("k2c_qmm_b_batch_strides")
+        dims_vals = ", ".join(str(int(v)) for v in plan.batch_shape)
+        a_stride_vals = ", ".join(str(int(v)) for v in plan.a_batch_strides)
+        b_stride_vals = ", ".join(str(int(v)) for v in plan.b_batch_strides)
+        ctx.lines.append(f"    static const int32_t {out_batch_dims}[{batch_rank}] = {{ {dims_vals} }};")
+        ctx.lines.append(f"    static const int32_t {a_batch_strides}[{batch_rank}] = {{ {a_stride_vals} }};")
+        ctx.lines.append(f"    static const int32_t {b_batch_strides}[{batch_rank}] = {{ {b_stride_vals} }};")
+        ctx.lines.append("    size_t tmp = batch_i;")
+        ctx.lines.append(f"    for (int axis = {batch_rank - 1}; axis >= 0; --axis) {{")
+        ctx.lines.append(f"      size_t coord = tmp % (size_t){out_batch_dims}[axis];")
+        ctx.lines.append(f"      tmp /= (size_t){out_batch_dims}[axis];")
+        ctx.lines.append(f"      a_batch_off += coord * (size_t){a_batch_strides}[axis];")
+        ctx.lines.append(f"      b_batch_off += coord * (size_t){b_batch_strides}[axis];")
+        ctx.lines.append("    }")
+    ctx.lines.append(f"    size_t out_batch_off = batch_i * (size_t){plan.m * plan.n};")
+    ok = emit_qmatmul_int(
+        ctx,
+        a=a,
+        b=b,
+        out=out,
+        layout=QMatMulLayout(m=plan.m, k=plan.k, n=plan.n),
+        in_dtype=in_dtype,
+        out_dtype=out_dtype,
+        a_zero=int(a_zero),
+        b_zero=int(b_zero),
+        b_values=b_values,
+        real_multiplier=a_scale * b_scale / y_scale,
+        bias=AccBias(),
+        y_zero=int(y_zero),
+        indent="    ",
+        a_off="a_batch_off",
+        b_off="b_batch_off" if b_batched else "0",
+        out_off="out_batch_off",
+    )
+    if not ok:
+        del ctx.lines[lines_before:]
+        return False
+    ctx.lines.append("  }")
+    return True
@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+
+import numpy as np
+
+from ....operators.context import EmitContext
+from ....operators.utils import quantize_multiplier
+from .kernel_lib import Conv2dGeometry, require_kernel, select_quant_kernel
+
+
+_INT32_LIMIT = (1 << 31) - 1
+
+
+def qrange(dtype: str) -> tuple[int, int, str]:
+    if dtype == "int8":
+        return -128, 127, "int8_t"
+    if dtype == "int16":
+        return -32768, 32767, "int16_t"
+    raise ValueError("Unsupported quantized dtype.")
+
+
+def const_values(ctx: EmitContext, name: str | None) -> list[float] | None:
+    if not name:
+        return None
+    tensor = ctx.model.tensors.get(name)
+    if tensor is None or tensor.data is None:
+        return None
+    return tensor.data.astype(np.float64).tolist()
+
+
+def requant_params(real_multiplier: float, acc_bound: int) -> tuple[int, int] | None:
+    if not math.isfinite(real_multiplier) or real_multiplier <= 0.0:
+        return None
+    mult, shift = quantize_multiplier(real_multiplier)
+    # Keep |acc * mult| below 2^62 so the product never overflows int64.
+    headroom = 62 - max(1, int(acc_bound)).bit_length()
+    if headroom < 31:
+        drop = 31 - headroom
+        mult = (mult + (1 << (drop - 1))) >> drop
+        shift -= drop
+    if shift > 62:
+        drop = shift - 62
+        mult = (mult + (1 << (drop - 1))) >> drop
+        shift = 62
+    if mult <= 0 or shift < 1:
+        return None
+    return int(mult), int(shift)
+
+
+def acc_ctype(acc_bound: int) -> str:
+    return "int32_t" if acc_bound <= _INT32_LIMIT else "int64_t"
+
+
+def emit_int_table(ctx: EmitContext, prefix: str, ctype: str, values: list[int]) -> str:
+    sym = ctx.next_symbol(prefix)
+    vals = ", ".join(str(int(v)) for v in values)
+    ctx.lines.append(f"  static const {ctype} {sym}[{len(values)}] = {{ {vals} }};")
+    return sym
+
+
+def emit_requant_params(
+    ctx: EmitContext,
+    params: list[tuple[int, int]],
+    index: str,
+) -> tuple[str, str]:
+    if len(set(params)) == 1:
+        mult, shift = params[0]
+        return str(mult), str(shift)
+    mult_sym = emit_int_table(ctx, "k2c_rq_mult", "int32_t", [p[0] for p in params])
+    shift_sym = emit_int_table(ctx, "k2c_rq_shift", "int8_t", [p[1] for p in params])
+    return f"{mult_sym}[{index}]", f"(int){shift_sym}[{index}]"
+
+
+def emit_requant_store(
+    lines: list[str],
+    indent: str,
+    acc: str,
+    mult: str,
+    shift: str,
+    zero: int,
+    out_dtype: str,
+    dst: str,
+) -> None:
+    qmin, qmax, ctype = qrange(out_dtype)
+    # Fixed-point round-half-away-from-zero, matching roundf on the float path.
+    lines.append(f"{indent}int64_t rq_prod = (int64_t){acc} * (int64_t){mult};")
+    lines.append(f"{indent}int64_t rq_half = (int64_t)1 << ({shift} - 1);")
+    lines.append(
+        f"{indent}int64_t rq_val = rq_prod >= 0 ? ((rq_prod + rq_half) >> {shift})"
+        f" : -((rq_half - rq_prod) >> {shift});"
+    )
+    lines.append(f"{indent}int q = (int)rq_val + {zero};")
+    lines.append(f"{indent}if (q < {qmin}) q = {qmin};")
+    lines.append(f"{indent}if (q > {qmax}) q = {qmax};")
+    lines.append(f"{indent}{dst} = ({ctype})q;")
+
+
+def zero_point_range(dtype: str, zero: int) -> int:
+    qmin, qmax, _ = qrange(dtype)
+    return max(abs(qmin - zero), abs(qmax - zero))
+
+
+@dataclass(frozen=True)
+class AccBias:
+    # Bias already expressed in accumulator units: either a constant per-index table
+    # or a runtime integer tensor that shares the accumulator scale.
+    table: list[int] | None = None
+    runtime_ptr: str | None = None
+    bound: int = 0
+
+
+def bias_to_acc(
+    ctx: EmitContext,
+    name: str | None,
+    acc_scales: list[float],
+    *,
+    factor: float = 1.0,
+    int_scales: list[float] | None = None,
+) -> AccBias | None:
+    if not name:
+        return AccBias()
+    int_scales = acc_scales if int_scales is None else int_scales
+    dtype = ctx.dtype(name)
+    values = const_values(ctx, name)
+    if dtype in ("int32", "int64") and values is None:
+        if factor != 1.0 or int_scales != acc_scales:
+            return None
+        return AccBias(runtime_ptr=ctx.map_ptr(name), bound=_INT32_LIMIT)
+    if values is None:
+        return None
+    if dtype in ("int32", "int64"):
+        reals = [v * int_scales[i % len(int_scales)] for i, v in enumerate(values)]
+    elif dtype == "float32":
+        reals = list(values)
+    elif dtype in ("int8", "int16"):
+        qp = ctx.qparams_optional(name)
+        if qp is None:
+            return None
+        sb, zb = qp
+        reals = [(v - zb) * sb for v in values]
+    else:
+        return None
+    table: list[int] = []
+    for idx, real in enumerate(reals):
+        scale = acc_scales[idx % len(acc_scales)]
+        if scale == 0.0:
+            return None
+        table.append(int(round(real * factor / scale)))
+    bound = max((abs(v) for v in table), default=0)
+    return AccBias(table=table, bound=bound)
+
+
+@dataclass(frozen=True)
+class QConvGeometry:
+    n: int
+    c_in: int
+    h: int
+    w: int
+    m: int
+    c_per_g: int
+    k_h: int
+    k_w: int
+    out_h: int
+    out_w: int
+    stride_h: int
+    stride_w: int
+    pad_h0: int
+    pad_w0: int
+    dil_h: int
+    dil_w: int
+    groups: int
+
+
+def emit_qconv2d_int(
+    ctx: EmitContext,
+    *,
+    x: str,
+    w: str,
+    out: str,
+    geo: QConvGeometry,
+    in_dtype: str,
+    out_dtype: str,
+    x_zero: int,
+    w_zeros: list[int],
+    w_values: list[float] | None,
+    real_multipliers: list[float],
+    bias: AccBias,
+    y_zero: int,
+) -> bool:
+    m = geo.m
+    if bias.table is not None and len(bias.table) != m:
+        return False
+    k_elems = geo.c_per_g * geo.k_h * geo.k_w
+    oc_per_group = m // geo.groups
+    w_zero_at = [int(w_zeros[oc % len(w_zeros)]) for oc in range(m)]
+
+    x_abs = max(abs(v) for v in qrange(in_dtype)[:2])
+    if w_values is not None:
+        w_range = 0
+        for oc in range(m):
+            zw = w_zero_at[oc]
+            chunk = w_values[oc * k_elems:(oc + 1) * k_elems]
+            w_range = max(w_range, max((abs(int(v) - zw) for v in chunk), default=0))
+    else:
+        w_range = max(zero_point_range(in_dtype, zw) for zw in set(w_zero_at))
+    # Fold the input zero point into a per-channel constant when weights are known:
+    # sum((x - zx) * w') == sum(x * w') - zx * sum(w'), padding contributes zx * w'.
+    fold_x_zero = w_values is not None and x_zero != 0
+    acc_bound = k_elems * w_range * (x_abs + abs(x_zero)) + bias.bound + 1
+
+    params: list[tuple[int, int]] = []
+    for oc in range(m):
+        p = requant_params(real_multipliers[oc % len(real_multipliers)], acc_bound)
+        if p is None:
+            return False
+        params.append(p)
+    acc_t = acc_ctype(acc_bound)
+
+    macs = geo.n * m * geo.out_h * geo.out_w * k_elems
+    kernel = select_quant_kernel(ctx, "conv2d", in_dtype, out_dtype, acc_t, macs)
+    if kernel is not None and bias.runtime_ptr is None and bias.bound <= _INT32_LIMIT:
+        _emit_qconv2d_call(
+            ctx,
+            kernel,
+            x=x,
+            w=w,
+            out=out,
+            geo=geo,
+            in_dtype=in_dtype,
+            acc_init=list(bias.table) if bias.table is not None else [0] * m,
+            params=params,
+            w_zero_at=w_zero_at,
+            x_zero=x_zero,
+            y_zero=y_zero,
+        )
+        return True
+
+    init_terms: list[str] = []
+    base = list(bias.table) if bias.table is not None else [0] * m
+    if fold_x_zero:
+        assert w_values is not None
+        for oc in range(m):
+            zw = w_zero_at[oc]
+            w_sum = sum(int(v) - zw for v in w_values[oc * k_elems:(oc + 1) * k_elems])
+            base[oc] -= x_zero * w_sum
+    if any(base):
+        base_sym = emit_int_table(ctx, "k2c_qconv_acc_init", acc_t, base)
+        init_terms.append(f"({acc_t}){base_sym}[oc]")
+    if bias.runtime_ptr is not None:
+        init_terms.append(f"({acc_t}){bias.runtime_ptr}[oc]")
+    init_expr = " + ".join(init_terms) if init_terms else "0"
+
+    mult_expr, shift_expr = emit_requant_params(ctx, params, "oc")
+    per_channel_zero = len(set(w_zero_at)) > 1
+    w_zero_sym = ""
+    if per_channel_zero:
+        w_zero_sym = emit_int_table(ctx, "k2c_qconv_w_zero", "int32_t", w_zero_at)
+    x_sub = "" if fold_x_zero or x_zero == 0 else f" - {x_zero}"
+
+    lines = ctx.lines
+    lines.append(f"  for (size_t ni = 0; ni < {geo.n}; ++ni) {{")
+    lines.append(f"    for (size_t oc = 0; oc < {m}; ++oc) {{")
+    if per_channel_zero:
+        lines.append(f"      int32_t zw = {w_zero_sym}[oc];")
+    lines.append(f"      size_t g = oc / {oc_per_group};")
+    lines.append(f"      size_t ic_begin = g * {geo.c_per_g};")
+    lines.append(f"      for (size_t oh = 0; oh < {geo.out_h}; ++oh) {{")
+    lines.append(f"        for (size_t ow = 0; ow < {geo.out_w}; ++ow) {{")
+    lines.append(f"          {acc_t} acc = {init_expr};")
+    lines.append(f"          for (size_t ic_local = 0; ic_local < {geo.c_per_g}; ++ic_local) {{")
+    lines.append("            size_t ic = ic_begin + ic_local;")
+    lines.append(f"            for (size_t kh = 0; kh < {geo.k_h}; ++kh) {{")
+    lines.append(f"              for (size_t kw = 0; kw < {geo.k_w}; ++kw) {{")
+    lines.append(
+        f"                int in_h = (int)(oh * {geo.stride_h} + kh * {geo.dil_h}) - {geo.pad_h0};"
+    )
+    lines.append(
+        f"                int in_w = (int)(ow * {geo.stride_w} + kw * {geo.dil_w}) - {geo.pad_w0};"
+    )
+    lines.append(
+        f"                size_t w_idx = ((oc * {geo.c_per_g} + ic_local) * {geo.k_h} + kh) * {geo.k_w} + kw;"
+    )
+    if per_channel_zero:
+        lines.append(f"                int32_t wv = (int32_t){w}[w_idx] - zw;")
+    elif w_zero_at[0] != 0:
+        lines.append(f"                int32_t wv = (int32_t){w}[w_idx] - {w_zero_at[0]};")
+    else:
+        lines.append(f"                int32_t wv = (int32_t){w}[w_idx];")
+    lines.append(
+        f"                if (in_h >= 0 && in_h < (int){geo.h} && in_w >= 0 && in_w < (int){geo.w}) {{"
+    )
+    lines.append(
+        f"                  size_t in_idx = ((ni * {geo.c_in} + ic) * {geo.h} + (size_t)in_h) * {geo.w} + (size_t)in_w;"
+    )
+    lines.append(f"                  acc += ({acc_t})((int32_t){x}[in_idx]{x_sub}) * ({acc_t})wv;")
+    if fold_x_zero:
+        lines.append("                } else {")
+        lines.append(f"                  acc += ({acc_t}){x_zero} * ({acc_t})wv;")
+    lines.append("                }")
+    lines.append("              }")
+    lines.append("            }")
+    lines.append("          }")
+    emit_requant_store(
+        lines,
+        "          ",
+        "acc",
+        mult_expr,
+        shift_expr,
+        y_zero,
+        out_dtype,
+        f"{out}[((ni * {m} + oc) * {geo.out_h} + oh) * {geo.out_w} + ow]",
+    )
+    lines.append("        }")
+    lines.append("      }")
+    lines.append("    }")
+    lines.append("  }")
+    return True
+
+
+def _emit_qconv2d_call(
+    ctx: EmitContext,
+    kernel: str,
+    *,
+    x: str,
+    w: str,
+    out: str,
+    geo: QConvGeometry,
+    in_dtype: str,
+    acc_init: list[int],
+    params: list[tuple[int, int]],
+    w_zero_at: list[int],
+    x_zero: int,
+    y_zero: int,
+) -> None:
+    # The library kernel subtracts the input zero point per tap instead of
+    # folding it into acc_init; both sums are exact in int32.
+    fn = require_kernel(ctx, kernel)
+    init_sym = emit_int_table(ctx, "k2c_qconv_acc_init", "int32_t", acc_init) if any(acc_init) else "NULL"
+    rq = params if len(set(params)) > 1 else params[:1]
+    mult_sym = emit_int_table(ctx, "k2c_rq_mult", "int32_t", [p[0] for p in rq])
+    shift_sym = emit_int_table(ctx, "k2c_rq_shift", "int8_t", [p[1] for p in rq])
+    w_zeros = w_zero_at if len(set(w_zero_at)) > 1 else w_zero_at[:1]
+    w_zero_sym = emit_int_table(ctx, "k2c_qconv_w_zero", "int32_t", w_zeros)
+    geometry = Conv2dGeometry(
+        n=geo.n,
+        c_in=geo.c_in,
+        h=geo.h,
+        w=geo.w,
+        m=geo.m,
+        c_per_g=geo.c_per_g,
+        k_h=geo.k_h,
+        k_w=geo.k_w,
+        out_h=geo.out_h,
+        out_w=geo.out_w,
+        stride_h=geo.stride_h,
+        stride_w=geo.stride_w,
+        pad_h=geo.pad_h0,
+        pad_w=geo.pad_w0,
+        dil_h=geo.dil_h,
+        dil_w=geo.dil_w,
+        groups=geo.groups,
+    )
+    desc = ctx.next_symbol("k2c_qconv_desc")
+    ctx.lines.append(
+        f"  static const k2c_qconv2d_t {desc} = {{ {{ {geometry.initializer()} }}, {init_sym}, {mult_sym}, "
+        f"{shift_sym}, {w_zero_sym}, {int(len(rq) > 1)}, {int(len(w_zeros) > 1)}, {x_zero}, {y_zero} }};"
+    )
+    in_ctype = qrange(in_dtype)[2]
+    ctx.lines.append(f"  {fn}(&{desc}, (const {in_ctype}*){x}, (const {in_ctype}*){w}, {out});")
+
+
+@dataclass(frozen=True)
+class QMatMulLayout:
+    m: int
+    k: int
+    n: int
+    trans_a: bool = False
+    trans_b: bool = False
+
+    def a_index(self, off: str) -> str:
+        base = "t * {m} + i".format(m=self.m) if self.trans_a else "i * {k} + t".format(k=self.k)
+        return base if off == "0" else f"{off} + {base}"
+
+    def b_index(self, off: str) -> str:
+        base = "j * {k} + t".format(k=self.k) if self.trans_b else "t * {n} + j".format(n=self.n)
+        return base if off == "0" else f"{off} + {base}"
+
+    def b_flat(self, t: int, j: int) -> int:
+        return j * self.k + t if self.trans_b else t * self.n + j
+
+
+def emit_qmatmul_int(
+    ctx: EmitContext,
+    *,
+    a: str,
+    b: str,
+    out: str,
+    layout: QMatMulLayout,
+    in_dtype: str,
+    out_dtype: str,
+    a_zero: int,
+    b_zero: int,
+    b_values: list[float] | None,
+    real_multiplier: float,
+    bias: AccBias,
+    bias_index: str = "0",
+    y_zero: int,
+    indent: str = "  ",
+    a_off: str = "0",
+    b_off: str = "0",
+    out_off: str = "0",
+) -> bool:
+    m, k, n = layout.m, layout.k, layout.n
+    a_abs = max(abs(v) for v in qrange(in_dtype)[:2])
+    if b_values is not None:
+        b_range = max((abs(int(v) - b_zero) for v in b_values), default=0)
+    else:
+        b_range = zero_point_range(in_dtype, b_zero)
+    # With constant B, sum((a - za) * b') == sum(a * b') - za * colsum(b').
+    fold_a_zero = b_values is not None and a_zero != 0 and b_off == "0"
+    acc_bound = k * b_range * (a_abs + abs(a_zero)) + bias.bound + 1
+    params = requant_params(real_multiplier, acc_bound)
+    if params is None:
+        return False
+    mult, shift = params
+    acc_t = acc_ctype(acc_bound)
+
+    kernel = select_quant_kernel(ctx, "gemm", in_dtype, out_dtype, acc_t, m * k * n)
+    bias_strides = {f"i * {n} + j": (n, 1), "j": (0, 1), "i": (1, 0), "0": (0, 0)}.get(bias_index)
+    if kernel is not None and bias.runtime_ptr is None and bias.bound <= _INT32_LIMIT and bias_strides is not None:
+        fn = require_kernel(ctx, kernel)
+        bias_sym = "NULL"
+        if bias.table is not None and any(bias.table):
+            bias_sym = emit_int_table(ctx, "k2c_qmm_bias", "int32_t", bias.table)
+        a_rs, a_cs = (1, m) if layout.trans_a else (k, 1)
+        b_rs, b_cs = (1, k) if layout.trans_b else (n, 1)
+        desc = ctx.next_symbol("k2c_qmm_desc")
+        ctx.lines.append(
+            f"{indent}static const k2c_qgemm_t {desc} = {{ {m}, {k}, {n}, {a_rs}, {a_cs}, {b_rs}, {b_cs}, "
+            f"{bias_sym}, {bias_strides[0]}, {bias_strides[1]}, {a_zero}, {b_zero}, {y_zero}, {mult}, {shift} }};"
+        )
+        in_ctype = qrange(in_dtype)[2]
+        a_ptr = f"(const {in_ctype}*){a}" if a_off == "0" else f"(const {in_ctype}*){a} + {a_off}"
+        b_ptr = f"(const {in_ctype}*){b}" if b_off == "0" else f"(const {in_ctype}*){b} + {b_off}"
+        out_ptr = out if out_off == "0" else f"{out} + {out_off}"
+        ctx.lines.append(f"{indent}{fn}(&{desc}, {a_ptr}, {b_ptr}, {out_ptr});")
+        return True
+
+    init_terms: list[str] = []
+    if fold_a_zero:
+        assert b_values is not None
+        col_fold = []
+        for j in range(n):
+            col_sum = sum(int(b_values[layout.b_flat(t, j)]) - b_zero for t in range(k))
+            col_fold.append(-a_zero * col_sum)
+        fold_sym = emit_int_table(ctx, "k2c_qmm_acc_init", acc_t, col_fold)
+        init_terms.append(f"({acc_t}){fold_sym}[j]")
+    if bias.table is not None and any(bias.table):
+        bias_sym = emit_int_table(ctx, "k2c_qmm_bias", acc_t, bias.table)
+        init_terms.append(f"({acc_t}){bias_sym}[{bias_index}]")
+    if bias.runtime_ptr is not None:
+        init_terms.append(f"({acc_t}){bias.runtime_ptr}[{bias_index}]")
+    init_expr = " + ".join(init_terms) if init_terms else "0"
+    a_sub = "" if fold_a_zero or a_zero == 0 else f" - {a_zero}"
+    b_sub = "" if b_zero == 0 else f" - {b_zero}"
+
+    lines = ctx.lines
+    lines.append(f"{indent}for (size_t i = 0; i < {m}; ++i) {{")
+    lines.append(f"{indent}  for (size_t j = 0; j < {n}; ++j) {{")
+    lines.append(f"{indent}    {acc_t} acc = {init_expr};")
+    lines.append(f"{indent}    for (size_t t = 0; t < {k}; ++t) {{")
+    lines.append(f"{indent}      int32_t av = (int32_t){a}[{layout.a_index(a_off)}]{a_sub};")
+    lines.append(f"{indent}      int32_t bv = (int32_t){b}[{layout.b_index(b_off)}]{b_sub};")
+    lines.append(f"{indent}      acc += ({acc_t})av * ({acc_t})bv;")
+    lines.append(f"{indent}    }}")
+    out_idx = f"i * {n} + j" if out_off == "0" else f"{out_off} + i * {n} + j"
+    emit_requant_store(
+        lines,
+        f"{indent}    ",
+        "acc",
+        str(mult),
+        str(shift),
+        y_zero,
+        out_dtype,
+        f"{out}[{out_idx}]",
+    )
+    lines.append(f"{indent}  }}")
+    lines.append(f"{indent}}}")
+    return True
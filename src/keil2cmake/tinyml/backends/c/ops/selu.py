@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
-from ....operators.utils import emit_op_unary_quant, tensor_size
+from ....operators.utils import tensor_size
+from .lut_common import emit_unary_quant
 from .registry import register_op
 
 
@@ -33,7 +36,19 @@ def emit_selu(ctx: EmitContext, node: NodeInfo) -> None:
             f"(r > 0.0f ? ({gamma:.8f}f * r) "
             f": ({gamma:.8f}f * {alpha:.8f}f * (expf(r) - 1.0f)))"
         )
-        emit_op_unary_quant(ctx.lines, out, inp, size, expr, out_dtype, sa, za, so, zo)
+        emit_unary_quant(
+            ctx,
+            out,
+            inp,
+            size,
+            expr,
+            lambda r: np.where(r > 0.0, gamma * r, gamma * alpha * (np.exp(r) - 1.0)),
+            out_dtype,
+            sa,
+            za,
+            so,
+            zo,
+        )
         return
 
     if out_dtype != "float32":
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
+from .lut_common import emit_unary_quant
 from .registry import register_op
-from ....operators.utils import emit_op_sigmoid, emit_op_unary_quant, tensor_size
+from ....operators.utils import emit_op_sigmoid, tensor_size
 
 
 @register_op("Sigmoid")
@@ -26,12 +29,13 @@ def emit_sigmoid(ctx: EmitContext, node: NodeInfo) -> None:
             so, zo = sa, za
         else:
             so, zo = so_zo
-        emit_op_unary_quant(
-            ctx.lines,
+        emit_unary_quant(
+            ctx,
             out,
             a,
             size,
             "1.0f / (1.0f + expf(-r))",
+            lambda r: 1.0 / (1.0 + np.exp(-r)),
             out_dtype,
             sa,
             za,
@@ -16,5 +16,7 @@ def emit_squeeze(ctx: EmitContext, node: NodeInfo) -> None:
     out = ctx.map_ptr(out_tensor)
     a = ctx.map_ptr(node.inputs[0])
     size = tensor_size(ctx.shape(out_tensor))
+    if ctx.shares_storage(out_tensor, node.inputs[0]):
+        return
     emit_op_copy(ctx.lines, out, a, size)
 
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
+from .lut_common import emit_unary_quant
 from .registry import register_op
-from ....operators.utils import emit_op_tanh, emit_op_unary_quant, tensor_size
+from ....operators.utils import emit_op_tanh, tensor_size
 
 
 @register_op("Tanh")
@@ -26,7 +29,7 @@ def emit_tanh(ctx: EmitContext, node: NodeInfo) -> None:
             so, zo = sa, za
         else:
             so, zo = so_zo
-        emit_op_unary_quant(ctx.lines, out, a, size, "tanhf(r)", out_dtype, sa, za, so, zo)
+        emit_unary_quant(ctx, out, a, size, "tanhf(r)", np.tanh, out_dtype, sa, za, so, zo)
         return
     if out_dtype != "float32":
         raise ValueError("Tanh supports float32 or quantized int8/int16 only.")
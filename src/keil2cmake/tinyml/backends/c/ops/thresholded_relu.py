@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 from ....ir import NodeInfo
 from ....operators.context import EmitContext
-from ....operators.utils import emit_op_unary_quant, tensor_size
+from ....operators.utils import tensor_size
+from .lut_common import emit_unary_quant
 from .registry import register_op
 
 
@@ -34,12 +37,13 @@ def emit_thresholded_relu(ctx: EmitContext, node: NodeInfo) -> None:
     if out_dtype in ("int8", "int16"):
         sa, za = ctx.qparams(in_name)
         so, zo = ctx.qparams(out_name)
-        emit_op_unary_quant(
-            ctx.lines,
+        emit_unary_quant(
+            ctx,
             out,
             inp,
             size,
             f"(r > {alpha:.8f}f) ? r : 0.0f",
+            lambda r: np.where(r > alpha, r, 0.0),
             out_dtype,
             sa,
             za,
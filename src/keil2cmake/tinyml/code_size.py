@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from pathlib import Path
+
+from ..keil.config import get_armgcc_path
+from .codegen import generate_c_code
+from .ir import ModelIR
+from .runtime.c_runner import _find_host_compiler
+
+
+SIZE_FLAGS = ["-std=c99", "-O2"]
+_SHF_EXECINSTR = 0x4
+
+
+def _find_size_compiler() -> tuple[str, str] | None:
+    # Prefer the target toolchain; a host build still gives a useful delta.
+    name = "arm-none-eabi-gcc.exe" if os.name == "nt" else "arm-none-eabi-gcc"
+    armgcc_path = get_armgcc_path()
+    candidates = []
+    if armgcc_path:
+        p = Path(armgcc_path)
+        candidates.append(str(p.parent / name) if p.is_file() else str(p / name))
+    candidates.append(name)
+    for cand in candidates:
+        path = shutil.which(cand)
+        if path:
+            return path, "arm-none-eabi"
+    host = _find_host_compiler()
+    if host:
+        return host, "host"
+    return None
+
+
+def elf_text_bytes(data: bytes) -> int | None:
+    # Sum of executable section sizes in an ELF relocatable object.
+    if len(data) < 52 or data[:4] != b"\x7fELF":
+        return None
+    is64 = data[4] == 2
+    endian = "<" if data[5] == 1 else ">"
+    if is64:
+        shoff = struct.unpack_from(endian + "Q", data, 0x28)[0]
+        shentsize, shnum = struct.unpack_from(endian + "HH", data, 0x3A)
+        flags_fmt, flags_off, size_fmt, size_off = "Q", 8, "Q", 32
+    else:
+        shoff = struct.unpack_from(endian + "I", data, 0x20)[0]
+        shentsize, shnum = struct.unpack_from(endian + "HH", data, 0x2E)
+        flags_fmt, flags_off, size_fmt, size_off = "I", 8, "I", 20
+    if shoff == 0 or shoff + shentsize * shnum > len(data):
+        return None
+    total = 0
+    for idx in range(shnum):
+        base = shoff + idx * shentsize
+        flags = struct.unpack_from(endian + flags_fmt, data, base + flags_off)[0]
+        if flags & _SHF_EXECINSTR:
+            total += struct.unpack_from(endian + size_fmt, data, base + size_off)[0]
+    return int(total)
+
+
+def compile_text_bytes(compiler: str, source_path: str) -> int | None:
+    # Resolved because the compiler runs from the source directory (for `.incbin`).
+    source = Path(source_path).resolve()
+    if not source.is_file():
+        return None
+    with tempfile.TemporaryDirectory(prefix="k2c_size_") as td:
+        obj = Path(td) / "model.o"
+        cmd = [compiler, "-c", str(source), "-o", str(obj), *SIZE_FLAGS, "-I", str(source.parent)]
+        try:
+            completed = subprocess.run(cmd, capture_output=True, text=True, cwd=str(source.parent))
+        except OSError:
+            return None
+        if completed.returncode != 0 or not obj.is_file():
+            return None
+        return elf_text_bytes(obj.read_bytes())
+
+
+def measure_code_size(
+    model: ModelIR,
+    source_path: str,
+    model_name: str,
+    weights: str,
+    weight_format: str,
+    optimize: str,
+    schedule: str = "memory",
+    tiling: str = "off",
+) -> dict[str, object]:
+    # Compare the generated source against a fully inlined (kernels="reference")
+    # build of the same model with the same schedule/tiling, compiled with the
+    # same flags, so the delta is the kernel library alone.
+    report: dict[str, object] = {
+        "optimize": optimize,
+        "schedule": schedule,
+        "tiling": tiling,
+        "flags": " ".join(SIZE_FLAGS),
+    }
+    found = _find_size_compiler()
+    if found is None:
+        report.update(status="skipped", reason="no C compiler found")
+        return report
+    compiler, target = found
+    report.update(compiler=os.path.basename(compiler), target=target)
+    text_bytes = compile_text_bytes(compiler, source_path)
+    if text_bytes is None:
+        report.update(status="skipped", reason="generated source could not be compiled to an ELF object")
+        return report
+    with tempfile.TemporaryDirectory(prefix="k2c_inline_") as td:
+        inline = generate_c_code(
+            model,
+            td,
+            model_name,
+            weights,
+            kernels="reference",
+            weight_format=weight_format,
+            optimize=optimize,
+            schedule=schedule,
+            tiling=tiling,
+        )
+        inline_bytes = compile_text_bytes(compiler, str(inline["source"]))
+    if inline_bytes is None:
+        report.update(status="skipped", reason="inline reference build failed")
+        return report
+    report.update(
+        status="measured",
+        text_bytes=text_bytes,
+        inline_text_bytes=inline_bytes,
+        delta_bytes=text_bytes - inline_bytes,
+    )
+    return report
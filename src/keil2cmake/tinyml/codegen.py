@@ -5,16 +5,34 @@ from __future__ import annotations
 import json
 import os
 import re
+from dataclasses import replace
 
 from ..template_engine import write_template
 from .backends import get_backend
 from .ir import ModelIR
+from .memory_plan import ArenaPlan, plan_aliases, plan_arena, schedule_nodes
 from .operators import EmitContext
-from .operators.utils import get_shape, tensor_size
+from .operators.utils import emit_op_clip, emit_op_leaky_relu, emit_op_relu, get_shape, tensor_size
+from .tiling import PATCH_STAGE_OP, plan_patch_stage
+from .weight_blob import BLOB_ALIGN, WEIGHT_FORMATS, write_weight_blob
 
 
 _C_IDENTIFIER_RE = re.compile(r"[^0-9a-zA-Z_]")
 
+OPTIMIZE_MODES = ("speed", "size")
+SCHEDULE_MODES = ("memory", "file")
+TILING_MODES = ("off", "patch")
+
+_CONST_CTYPES = {
+    "float32": "float",
+    "bool": "uint8_t",
+    "uint8": "uint8_t",
+    "int8": "int8_t",
+    "int16": "int16_t",
+    "int32": "int32_t",
+    "int64": "int64_t",
+}
+
 
 def _sanitize(name: str) -> str:
     cleaned = _C_IDENTIFIER_RE.sub("_", name)
@@ -37,12 +55,84 @@ def _align_up(value: int, align: int) -> int:
     return (value + align - 1) // align * align
 
 
+def _plan_memory(
+    model: ModelIR,
+    buffer_names: list[str],
+    buffer_sizes: dict[str, int],
+    readonly: set[str],
+    schedule: str,
+) -> tuple[ModelIR, dict[str, str], ArenaPlan]:
+    aliases = plan_aliases(model, buffer_names, readonly)
+    arena_plan = plan_arena(model, buffer_names, buffer_sizes, align=4, aliases=aliases)
+    if schedule == "file":
+        return model, aliases, arena_plan
+    plan = schedule_nodes(model, buffer_sizes)
+    report = plan.to_manifest()
+    report["arena_bytes_before"] = arena_plan.planned_bytes
+    if report["reordered"]:
+        candidate = replace(model, nodes=[model.nodes[idx] for idx in plan.order])
+        cand_aliases = plan_aliases(candidate, buffer_names, readonly)
+        cand_plan = plan_arena(candidate, buffer_names, buffer_sizes, align=4, aliases=cand_aliases)
+        # Aliasing and placement can undo a lower peak; keep whichever arena is smaller.
+        if cand_plan.planned_bytes < arena_plan.planned_bytes:
+            model, aliases, arena_plan = candidate, cand_aliases, cand_plan
+            report["node_order"] = list(plan.order)
+        else:
+            report.update(reordered=False, peak_bytes_after=report["peak_bytes_before"])
+    report["arena_bytes_after"] = arena_plan.planned_bytes
+    arena_plan.extra["schedule"] = report
+    return model, aliases, arena_plan
+
+
+# Float Conv/Gemm/MatMul apply their fused activation as each output is
+# stored (kernel_lib / inline loops); the rest get a pass over the output.
+_STORE_FUSED_OPS = {"Conv", "Gemm", "MatMul"}
+
+
+def _emit_fused_activation(ctx: EmitContext, name: str, act: dict[str, object]) -> None:
+    # Epilogue recorded by passes.fuse_activations, applied in place.
+    out = ctx.map_ptr(name)
+    size = tensor_size(ctx.shape(name))
+    dtype = ctx.dtype(name)
+    op = act.get("op")
+    if dtype in ("int8", "int16"):
+        if op != "Relu":
+            raise ValueError(f"Fused {op} is not supported on quantized outputs.")
+        _, zo = ctx.qparams(name)
+        ctx.lines.append(f"  for (size_t i = 0; i < {size}; ++i) {{")
+        ctx.lines.append(f"    if ({out}[i] < {zo}) {out}[i] = {zo};")
+        ctx.lines.append("  }")
+    elif op == "Relu":
+        emit_op_relu(ctx.lines, out, out, size)
+    elif op == "LeakyRelu":
+        emit_op_leaky_relu(ctx.lines, out, out, size, float(act["alpha"]))
+    elif op == "Clip":
+        emit_op_clip(ctx.lines, out, out, size, float(act["min"]), float(act["max"]))
+    else:
+        raise ValueError(f"Unsupported fused activation: {op}")
+
+
 def generate_c_code(
     model: ModelIR,
     output_dir: str,
     model_name: str,
     weights: str,
+    kernels: str = "auto",
+    weight_format: str = "c",
+    optimize: str = "speed",
+    schedule: str = "memory",
+    tiling: str = "off",
 ) -> dict[str, str]:
+    if kernels not in ("auto", "reference"):
+        raise ValueError(f"Unsupported kernel mode: {kernels}")
+    if optimize not in OPTIMIZE_MODES:
+        raise ValueError(f"Unsupported optimize mode: {optimize}")
+    if schedule not in SCHEDULE_MODES:
+        raise ValueError(f"Unsupported schedule mode: {schedule}")
+    if tiling not in TILING_MODES:
+        raise ValueError(f"Unsupported tiling mode: {tiling}")
+    if weight_format not in WEIGHT_FORMATS:
+        raise ValueError(f"Unsupported weight format: {weight_format}")
     input_names, output_names = _validate_io(model)
 
     os.makedirs(output_dir, exist_ok=True)
@@ -59,6 +149,18 @@ def generate_c_code(
             weight_names.append(name)
             consts[name] = f"const_{_sanitize(name)}"
 
+    weight_blob = None
+    if weight_format == "incbin":
+        weight_blob = write_weight_blob(
+            model,
+            weight_names,
+            output_dir,
+            f"{model_name}_weights.bin",
+            f"k2c_weights_{_sanitize(model_name)}",
+        )
+        for name, blob_offset in weight_blob.offsets.items():
+            consts[name] = f"({weight_blob.symbol} + {blob_offset})"
+
     buffer_names: list[str] = []
     output_name_set = set(output_names)
     for node in model.nodes:
@@ -71,7 +173,6 @@ def generate_c_code(
     buffer_offsets: list[int] = []
     weight_offsets: list[int] = []
     weight_sizes: list[int] = []
-    offset = 0
     def _dtype_size(dtype: str) -> int:
         if dtype == "uint8":
             return 1
@@ -87,13 +188,23 @@ def generate_c_code(
             return 8
         return 4
 
+    buffer_sizes: dict[str, int] = {}
     for name in buffer_names:
         shape = get_shape(model, name)
         dtype = model.tensors[name].dtype
-        size_bytes = tensor_size(shape) * _dtype_size(dtype)
-        offset = _align_up(offset, 4)
-        buffer_offsets.append(offset)
-        offset += size_bytes
+        buffer_sizes[name] = tensor_size(shape) * _dtype_size(dtype)
+    tiling_report = None
+    if tiling == "patch":
+        model, buffer_names, buffer_sizes, tiling_report = plan_patch_stage(
+            model, buffer_names, buffer_sizes, set(consts)
+        )
+    model, aliases, arena_plan = _plan_memory(model, buffer_names, buffer_sizes, set(consts), schedule)
+    if tiling_report is not None:
+        arena_plan.extra["tiling"] = tiling_report
+    buffer_names = [name for name in buffer_names if name not in aliases]
+    for name in buffer_names:
+        buffer_offsets.append(arena_plan.offsets[name])
+    offset = arena_plan.planned_bytes
     if weights_ram:
         for name in weight_names:
             shape = get_shape(model, name)
@@ -104,6 +215,9 @@ def generate_c_code(
             weight_sizes.append(size_bytes)
             offset += size_bytes
     arena_bytes = _align_up(offset, 4)
+    memory_plan = arena_plan.to_manifest()
+    memory_plan["weight_bytes"] = sum(weight_sizes)
+    memory_plan["arena_bytes"] = arena_bytes
 
     for idx, name in enumerate(buffer_names):
         buffers[name] = f"ctx->buffers[{idx}]"
@@ -132,31 +246,21 @@ def generate_c_code(
     for name, tensor in model.tensors.items():
         if tensor.data is None:
             continue
+        if weight_blob is not None and name in weight_blob.offsets:
+            continue
         size = tensor_size(tensor.shape)
         dtype = tensor.dtype
+        ctype = _CONST_CTYPES.get(dtype)
+        if ctype is None:
+            raise ValueError(f"Unsupported const dtype: {dtype}")
+        values = tensor.data.tolist()
         if dtype == "float32":
-            data = ", ".join(f"{v:.8f}f" for v in tensor.data)
-            const_decls.append({"ctype": "float", "name": consts[name], "size": size, "values": data})
+            data = ", ".join(f"{v:.8f}f" for v in values)
         elif dtype == "bool":
-            data = ", ".join("1" if int(v) else "0" for v in tensor.data)
-            const_decls.append({"ctype": "uint8_t", "name": consts[name], "size": size, "values": data})
-        elif dtype == "uint8":
-            data = ", ".join(str(int(v)) for v in tensor.data)
-            const_decls.append({"ctype": "uint8_t", "name": consts[name], "size": size, "values": data})
-        elif dtype == "int8":
-            data = ", ".join(str(int(v)) for v in tensor.data)
-            const_decls.append({"ctype": "int8_t", "name": consts[name], "size": size, "values": data})
-        elif dtype == "int16":
-            data = ", ".join(str(int(v)) for v in tensor.data)
-            const_decls.append({"ctype": "int16_t", "name": consts[name], "size": size, "values": data})
-        elif dtype == "int32":
-            data = ", ".join(str(int(v)) for v in tensor.data)
-            const_decls.append({"ctype": "int32_t", "name": consts[name], "size": size, "values": data})
-        elif dtype == "int64":
-            data = ", ".join(str(int(v)) for v in tensor.data)
-            const_decls.append({"ctype": "int64_t", "name": consts[name], "size": size, "values": data})
+            data = ", ".join("1" if v else "0" for v in values)
         else:
-            raise ValueError(f"Unsupported const dtype: {dtype}")
+            data = ", ".join(map(str, values))
+        const_decls.append({"ctype": ctype, "name": consts[name], "size": size, "values": data})
 
     input_shape_decls: list[str] = []
     output_shape_decls: list[str] = []
@@ -264,6 +368,9 @@ def generate_c_code(
         buffers=buffers,
         consts=consts,
         weights=weights_map,
+        aliases=aliases,
+        kernel_mode=kernels,
+        optimize=optimize,
     )
     unsupported_ops: list[str] = []
     for node in model.nodes:
@@ -462,13 +569,22 @@ def generate_c_code(
             "If",
             "Loop",
             "Scan",
+            PATCH_STAGE_OP,
         }
         if len(node.outputs) != 1 and node.op_type not in multi_output_ops:
             raise ValueError(f"Operator {node.op_type} with multiple outputs is not supported.")
         handler(ctx, node)
-        op_entry: dict[str, str] = {"op": node.op_type, "backend": backend_impl.name}
-        op_backends.append(op_entry)
-        backend_stats[backend_impl.name] = backend_stats.get(backend_impl.name, 0) + 1
+        fused = node.attrs.get("fused_activation")
+        if fused and not (node.op_type in _STORE_FUSED_OPS and ctx.dtype(node.outputs[0]) == "float32"):
+            _emit_fused_activation(ctx, node.outputs[0], fused)
+        # A patch stage still reports the ops it runs, one entry each.
+        ran = [node.op_type]
+        if node.op_type == PATCH_STAGE_OP:
+            ran = [op for layer in node.attrs["stage"].layers for op in layer.ops]
+        for op_type in ran:
+            op_entry: dict[str, str] = {"op": op_type, "backend": backend_impl.name}
+            op_backends.append(op_entry)
+            backend_stats[backend_impl.name] = backend_stats.get(backend_impl.name, 0) + 1
         invoke_lines.append("")
     if not model.nodes:
         invoke_lines.append("  (void)input_ptrs;")
@@ -501,6 +617,8 @@ def generate_c_code(
         "header_name": header_name,
         "includes": includes,
         "const_decls": const_decls,
+        "weight_blob": weight_blob,
+        "weight_blob_align": BLOB_ALIGN,
         "buffer_offsets": [str(v) for v in buffer_offsets],
         "weight_offsets": [str(v) for v in weight_offsets] if weights_ram else [],
         "input_shape_decls": input_shape_decls,
@@ -509,6 +627,7 @@ def generate_c_code(
         "output_descs": output_descs,
         "weights_ram": weights_ram,
         "weight_copies": weight_copies,
+        "kernel_defs": list(ctx.kernels.values()),
         "invoke_body": "\n".join(invoke_lines),
         "num_inputs": len(input_names),
         "num_outputs": len(output_names),
@@ -527,6 +646,12 @@ def generate_c_code(
         "op_backends": op_backends,
         "backend_stats": backend_stats,
         "fallback_stats": fallback_stats,
+        "memory_plan": memory_plan,
+        "kernels": list(ctx.kernels),
+        "optimize": optimize,
+        "schedule": schedule,
+        "tiling": tiling,
+        "weight_blob": weight_blob.to_manifest() if weight_blob is not None else None,
     }
 
 
@@ -539,8 +664,17 @@ def generate_manifest(
     op_backends: list[dict[str, str]],
     backend_stats: dict[str, int],
     fallback_stats: dict[str, int],
+    memory_plan: dict[str, object] | None = None,
+    weight_blob: dict[str, object] | None = None,
+    code_size: dict[str, object] | None = None,
+    graph_passes: dict[str, object] | None = None,
+    source_ops: list[str] | None = None,
 ) -> str:
+    # "ops" lists the source model; after graph passes the generated graph
+    # goes to "optimized_ops".
     ops = [node.op_type for node in model.nodes]
+    if source_ops is not None:
+        ops, optimized_ops = list(source_ops), ops
     manifest = {
         "name": model.name,
         "opset": model.opset,
@@ -558,6 +692,16 @@ def generate_manifest(
         "backend_stats": backend_stats,
         "fallback_stats": fallback_stats,
     }
+    if memory_plan is not None:
+        manifest["memory_plan"] = memory_plan
+    if weight_blob is not None:
+        manifest["weight_blob"] = weight_blob
+    if code_size is not None:
+        manifest["code_size"] = code_size
+    if source_ops is not None:
+        manifest["optimized_ops"] = optimized_ops
+    if graph_passes is not None:
+        manifest["graph_passes"] = graph_passes
     path = os.path.join(output_dir, "model.manifest.json")
     with open(path, "w", encoding="utf-8") as f:
         json.dump(manifest, f, ensure_ascii=False, indent=2)
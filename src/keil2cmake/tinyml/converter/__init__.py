@@ -2,5 +2,14 @@
 
 from .ir import ModelIR, NodeInfo, TensorInfo
 from .onnx_loader import load_onnx_model
+from .onnx_loader_shape_infer import ShapeInferStats, get_shape_infer_stats, reset_shape_infer_stats
 
-__all__ = ["ModelIR", "NodeInfo", "TensorInfo", "load_onnx_model"]
+__all__ = [
+    "ModelIR",
+    "NodeInfo",
+    "ShapeInferStats",
+    "TensorInfo",
+    "get_shape_infer_stats",
+    "load_onnx_model",
+    "reset_shape_infer_stats",
+]
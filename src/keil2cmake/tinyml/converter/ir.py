@@ -2,19 +2,53 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
+import numpy as np
+
+
+_STORAGE_DTYPES = {
+    "float32": np.dtype(np.float32),
+    "bool": np.dtype(np.bool_),
+    "uint8": np.dtype(np.uint8),
+    "int8": np.dtype(np.int8),
+    "int16": np.dtype(np.int16),
+    "int32": np.dtype(np.int32),
+    "int64": np.dtype(np.int64),
+}
+
+
+def as_const_array(data: Any, dtype: str) -> np.ndarray:
+    # Constant payloads are flat, contiguous and read-only so they can be shared
+    # (or memory-mapped) across the loader, evaluator and codegen without copies.
+    target = _STORAGE_DTYPES.get(dtype)
+    if isinstance(data, np.ndarray):
+        arr = data.reshape(-1)
+        if target is not None and arr.dtype != target:
+            arr = arr.astype(target)
+    else:
+        arr = np.asarray(data, dtype=target).reshape(-1)
+    if not arr.flags.c_contiguous:
+        arr = np.ascontiguousarray(arr)
+    if arr.flags.writeable:
+        arr.flags.writeable = False
+    return arr
+
 
 @dataclass(frozen=True)
 class TensorInfo:
     name: str
     shape: list[int]
     dtype: str
-    data: list[float] | None = None
+    data: np.ndarray | None = field(default=None, compare=False)
     qscale: float | None = None
     qzero: int | None = None
 
+    def __post_init__(self) -> None:
+        if self.data is not None:
+            object.__setattr__(self, "data", as_const_array(self.data, self.dtype))
+
 
 @dataclass(frozen=True)
 class NodeInfo:
@@ -24,14 +24,7 @@ def _tensor_info_from_proto(name: str, tensor_proto: onnx.TensorProto) -> Tensor
         arr = numpy_helper.to_array(tensor_proto)
     except (TypeError, ValueError, RuntimeError):
         return None
-    shape = list(arr.shape)
-    if dtype == "float32":
-        data = arr.flatten().astype("float32").tolist()
-    elif dtype == "bool":
-        data = arr.flatten().astype("int64").tolist()
-    else:
-        data = arr.flatten().astype("int64").tolist()
-    return TensorInfo(name=name, shape=shape, dtype=dtype, data=data)
+    return TensorInfo(name=name, shape=list(arr.shape), dtype=dtype, data=arr)
 
 
 def constant_tensor_from_attrs(name: str, attrs: dict[str, object]) -> TensorInfo | None:
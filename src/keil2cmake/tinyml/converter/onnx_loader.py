@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import os
 import warnings
 
+import numpy as np
 import onnx
-from onnx import numpy_helper, shape_inference
+from onnx import helper, numpy_helper, shape_inference
 from onnx.onnx_cpp2py_export.shape_inference import InferenceError as OnnxShapeInferenceError
 
 from .ir import ModelIR, NodeInfo, TensorInfo
@@ -23,8 +25,55 @@ from .onnx_loader_helpers import (
 )
 
 
-def load_onnx_model(path: str) -> ModelIR:
-    model = onnx.load(path)
+def _external_data_path(name: str, base_dir: str, location: str) -> str:
+    # Like onnx's own loader, only files under the model directory may be read.
+    parts = location.replace("\\", "/").split("/")
+    if os.path.isabs(location) or os.path.splitdrive(location)[0] or ".." in parts:
+        raise ValueError(f"Initializer '{name}' external data location '{location}' is outside the model directory.")
+    path = os.path.join(base_dir, location)
+    root = os.path.realpath(base_dir)
+    if os.path.commonpath([root, os.path.realpath(path)]) != root:
+        raise ValueError(f"Initializer '{name}' external data location '{location}' is outside the model directory.")
+    return path
+
+
+def _external_data_array(init: onnx.TensorProto, base_dir: str, mmap: bool) -> np.ndarray:
+    info = {entry.key: entry.value for entry in init.external_data}
+    location = info.get("location")
+    if not location:
+        raise ValueError(f"Initializer '{init.name}' has no external data location.")
+    np_dtype = np.dtype(helper.tensor_dtype_to_np_dtype(int(init.data_type))).newbyteorder("<")
+    count = 1
+    for dim in init.dims:
+        count *= int(dim)
+    if count == 0:
+        return np.zeros((0,), dtype=np_dtype)
+    offset = int(info.get("offset", 0) or 0)
+    length = info.get("length")
+    if length is not None and int(length) < count * np_dtype.itemsize:
+        raise ValueError(f"Initializer '{init.name}' external data is truncated.")
+    path = _external_data_path(init.name, base_dir, location)
+    if mmap:
+        return np.memmap(path, dtype=np_dtype, mode="r", offset=offset, shape=(count,))
+    data = np.fromfile(path, dtype=np_dtype, count=count, offset=offset)
+    if data.size != count:
+        raise ValueError(f"Initializer '{init.name}' external data is truncated.")
+    return data
+
+
+def _initializer_array(init: onnx.TensorProto, base_dir: str, mmap: bool) -> np.ndarray:
+    if init.data_location == onnx.TensorProto.EXTERNAL:
+        return _external_data_array(init, base_dir, mmap)
+    return numpy_helper.to_array(init)
+
+
+def load_onnx_model(path: str, mmap_external: bool = False) -> ModelIR:
+    # External weights are read straight into arrays instead of through the
+    # protobuf. mmap_external=True maps them instead, which keeps the data file
+    # open for the lifetime of the ModelIR: on Windows that blocks deleting or
+    # overwriting the .onnx/.bin (and TemporaryDirectory cleanup) until the
+    # arrays are released.
+    model = onnx.load(path, load_external_data=False)
     try:
         model = shape_inference.infer_shapes(model)
     except (OnnxShapeInferenceError, RuntimeError, ValueError, TypeError) as exc:
@@ -39,35 +88,21 @@ def load_onnx_model(path: str) -> ModelIR:
     if model.opset_import:
         opset = int(model.opset_import[0].version)
 
+    base_dir = os.path.dirname(os.path.abspath(path))
     initializer_names = {init.name for init in graph.initializer}
     tensors: dict[str, TensorInfo] = {}
 
     for init in graph.initializer:
-        array = numpy_helper.to_array(init)
         dtype = _dtype_from_tensorproto(int(init.data_type))
-        if dtype == "float32":
-            tensors[init.name] = TensorInfo(
-                name=init.name,
-                shape=list(array.shape),
-                dtype=dtype,
-                data=array.flatten().astype("float32").tolist(),
-            )
-        elif dtype == "bool":
-            tensors[init.name] = TensorInfo(
-                name=init.name,
-                shape=list(array.shape),
-                dtype=dtype,
-                data=array.flatten().astype("int64").tolist(),
-            )
-        elif dtype in ("uint8", "int64", "int32", "int8", "int16"):
-            tensors[init.name] = TensorInfo(
-                name=init.name,
-                shape=list(array.shape),
-                dtype=dtype,
-                data=array.flatten().astype("int64").tolist(),
-            )
-        else:
+        if dtype not in ("float32", "bool", "uint8", "int64", "int32", "int8", "int16"):
             raise ValueError("Unsupported initializer tensor type.")
+        array = _initializer_array(init, base_dir, mmap_external)
+        tensors[init.name] = TensorInfo(
+            name=init.name,
+            shape=[int(dim) for dim in init.dims],
+            dtype=dtype,
+            data=array,
+        )
 
     inputs = []
     for inp in graph.input:
@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
+from collections import deque
+from dataclasses import dataclass
+import heapq
 import math
+import time
 from typing import Iterable
 
+import numpy as np
+
 from onnx import TensorProto, numpy_helper
 
 from .ir import NodeInfo, TensorInfo
@@ -58,14 +64,14 @@ def _get_const_ints(tensors: dict[str, TensorInfo], name: str) -> list[int] | No
     tensor = tensors.get(name)
     if tensor is None or tensor.data is None:
         return None
-    return [int(v) for v in tensor.data]
+    return tensor.data.astype(np.int64).tolist()
 
 
 def _get_const_floats(tensors: dict[str, TensorInfo], name: str) -> list[float] | None:
     tensor = tensors.get(name)
     if tensor is None or tensor.data is None:
         return None
-    return [float(v) for v in tensor.data]
+    return tensor.data.astype(np.float64).tolist()
 
 
 def _broadcast_shape(a: list[int] | None, b: list[int] | None) -> list[int] | None:
@@ -731,15 +737,7 @@ def _infer_nonzero_shape(tensors: dict[str, TensorInfo], input_name: str) -> lis
         return None
     if tensor.data is None:
         return None
-    nnz = 0
-    if tensor.dtype == "bool":
-        for v in tensor.data:
-            if int(v) != 0:
-                nnz += 1
-    else:
-        for v in tensor.data:
-            if float(v) != 0.0:
-                nnz += 1
+    nnz = np.count_nonzero(tensor.data)
     return [rank, int(nnz)]
 
 
@@ -1511,59 +1509,143 @@ def _infer_node_output_shape(
     return [None]
 
 
-def _infer_shapes(tensors: dict[str, TensorInfo], nodes: list[NodeInfo]) -> None:
-    changed = True
-    while changed:
-        changed = False
-        for node in nodes:
-            out_shapes = _infer_node_output_shape(node, tensors)
-            if not out_shapes:
+@dataclass
+class ShapeInferStats:
+    calls: int = 0
+    nodes: int = 0
+    visits: int = 0
+    updates: int = 0
+    elapsed_s: float = 0.0
+
+    def add(self, other: "ShapeInferStats") -> None:
+        self.calls += other.calls
+        self.nodes += other.nodes
+        self.visits += other.visits
+        self.updates += other.updates
+        self.elapsed_s += other.elapsed_s
+
+    def to_dict(self) -> dict[str, float | int]:
+        return {
+            "calls": self.calls,
+            "nodes": self.nodes,
+            "visits": self.visits,
+            "updates": self.updates,
+            "elapsed_s": self.elapsed_s,
+        }
+
+
+_SHAPE_INFER_TOTALS = ShapeInferStats()
+
+
+def get_shape_infer_stats() -> ShapeInferStats:
+    return _SHAPE_INFER_TOTALS
+
+
+def reset_shape_infer_stats() -> None:
+    global _SHAPE_INFER_TOTALS
+    _SHAPE_INFER_TOTALS = ShapeInferStats()
+
+
+def _topological_order(nodes: list[NodeInfo]) -> list[int]:
+    producer: dict[str, int] = {}
+    for idx, node in enumerate(nodes):
+        for out_name in node.outputs:
+            if out_name:
+                producer.setdefault(out_name, idx)
+    indegree = [0] * len(nodes)
+    users: list[list[int]] = [[] for _ in nodes]
+    for idx, node in enumerate(nodes):
+        for dep in {producer[name] for name in node.inputs if name in producer}:
+            if dep != idx:
+                indegree[idx] += 1
+                users[dep].append(idx)
+    # Kahn's algorithm, breaking ties by graph position so already-sorted
+    # graphs keep their order; nodes on a cycle are appended as listed.
+    ready = [idx for idx, deg in enumerate(indegree) if deg == 0]
+    heapq.heapify(ready)
+    order: list[int] = []
+    while ready:
+        idx = heapq.heappop(ready)
+        order.append(idx)
+        for user in users[idx]:
+            indegree[user] -= 1
+            if indegree[user] == 0:
+                heapq.heappush(ready, user)
+    if len(order) != len(nodes):
+        placed = set(order)
+        order.extend(idx for idx in range(len(nodes)) if idx not in placed)
+    return order
+
+
+def _default_output_dtype(node: NodeInfo, idx: int, tensors: dict[str, TensorInfo]) -> str:
+    if node.op_type in ("MatMulInteger", "ConvInteger"):
+        return "int32"
+    if node.op_type == "NonMaxSuppression":
+        return "int64"
+    if node.op_type == "DynamicQuantizeLinear":
+        return "float32" if idx == 1 else "uint8"
+    if node.op_type in ("QLinearConv", "QLinearMatMul"):
+        if len(node.inputs) >= 8 and node.inputs[7] in tensors:
+            return tensors[node.inputs[7]].dtype
+        if node.inputs and node.inputs[0] in tensors:
+            return tensors[node.inputs[0]].dtype
+    return "float32"
+
+
+def _apply_node_shapes(node: NodeInfo, tensors: dict[str, TensorInfo]) -> list[str]:
+    out_shapes = _infer_node_output_shape(node, tensors)
+    updated: list[str] = []
+    if not out_shapes:
+        return updated
+    for idx, out_name in enumerate(node.outputs):
+        if idx >= len(out_shapes):
+            continue
+        shape = out_shapes[idx]
+        if shape is None:
+            continue
+        existing = tensors.get(out_name)
+        if existing is not None:
+            if existing.data is not None:
                 continue
-            for idx, out_name in enumerate(node.outputs):
-                if idx >= len(out_shapes):
-                    continue
-                shape = out_shapes[idx]
-                if shape is None:
-                    continue
-                existing = tensors.get(out_name)
-                if existing is not None:
-                    if existing.data is not None:
-                        continue
-                    if _shape_known(list(existing.shape)):
-                        continue
-                    tensors[out_name] = TensorInfo(
-                        name=out_name,
-                        shape=shape,
-                        dtype=existing.dtype,
-                        data=existing.data,
-                    )
-                    changed = True
-                else:
-                    dtype = "float32"
-                    if node.op_type == "MatMulInteger":
-                        dtype = "int32"
-                    elif node.op_type == "ConvInteger":
-                        dtype = "int32"
-                    elif node.op_type == "NonMaxSuppression":
-                        dtype = "int64"
-                    elif node.op_type == "DynamicQuantizeLinear":
-                        if idx == 0:
-                            dtype = "uint8"
-                        elif idx == 1:
-                            dtype = "float32"
-                        else:
-                            dtype = "uint8"
-                    elif node.op_type == "QLinearConv":
-                        if len(node.inputs) >= 8 and node.inputs[7] in tensors:
-                            dtype = tensors[node.inputs[7]].dtype
-                        elif node.inputs and node.inputs[0] in tensors:
-                            dtype = tensors[node.inputs[0]].dtype
-                    elif node.op_type == "QLinearMatMul":
-                        if len(node.inputs) >= 8 and node.inputs[7] in tensors:
-                            dtype = tensors[node.inputs[7]].dtype
-                        elif node.inputs and node.inputs[0] in tensors:
-                            dtype = tensors[node.inputs[0]].dtype
-                    tensors[out_name] = TensorInfo(name=out_name, shape=shape, dtype=dtype)
-                    changed = True
-
-
+            if _shape_known(list(existing.shape)):
+                continue
+            tensors[out_name] = TensorInfo(
+                name=out_name,
+                shape=shape,
+                dtype=existing.dtype,
+                data=existing.data,
+            )
+        else:
+            dtype = _default_output_dtype(node, idx, tensors)
+            tensors[out_name] = TensorInfo(name=out_name, shape=shape, dtype=dtype)
+        updated.append(out_name)
+    return updated
+
+
+def _infer_shapes(tensors: dict[str, TensorInfo], nodes: list[NodeInfo]) -> ShapeInferStats:
+    # A tensor's shape only ever goes from unknown to known, so after one pass in
+    # topological order only consumers of newly resolved tensors need a revisit.
+    start = time.perf_counter()
+    stats = ShapeInferStats(calls=1, nodes=len(nodes))
+    consumers: dict[str, list[int]] = {}
+    for idx, node in enumerate(nodes):
+        for name in node.inputs:
+            if name:
+                consumers.setdefault(name, []).append(idx)
+
+    worklist = deque(_topological_order(nodes))
+    queued = set(worklist)
+    while worklist:
+        idx = worklist.popleft()
+        queued.discard(idx)
+        stats.visits += 1
+        for out_name in _apply_node_shapes(nodes[idx], tensors):
+            stats.updates += 1
+            for user in consumers.get(out_name, ()):
+                if user not in queued:
+                    queued.add(user)
+                    worklist.append(user)
+
+    stats.elapsed_s = time.perf_counter() - start
+    _SHAPE_INFER_TOTALS.add(stats)
+    return stats
@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from .ir import ModelIR, NodeInfo
+from .operators.utils import get_shape
+
+
+VIEW_OPS = {"Reshape", "Flatten", "Squeeze", "Unsqueeze", "Identity"}
+INPLACE_OPS = {
+    "Relu",
+    "LeakyRelu",
+    "Sigmoid",
+    "Tanh",
+    "Clip",
+    "Add",
+    "Sub",
+    "Mul",
+    "BatchNormalization",
+    "Dropout",
+}
+_INPLACE_ANY_INPUT_OPS = {"Add", "Sub", "Mul"}
+# Subgraph bodies read outer tensors that are not listed as node inputs.
+_SUBGRAPH_OPS = {"If", "Loop", "Scan"}
+# The exact search visits each set of already-executed nodes once; graphs whose
+# branches produce more such sets than this fall back to the greedy order.
+SCHEDULE_DP_MAX_STATES = 20000
+SCHEDULE_DP_MAX_NODES = 256
+
+
+@dataclass(frozen=True)
+class BufferLifetime:
+    name: str
+    size: int
+    first: int
+    last: int
+
+    def overlaps(self, other: "BufferLifetime") -> bool:
+        return self.first <= other.last and other.first <= self.last
+
+
+@dataclass
+class ArenaPlan:
+    offsets: dict[str, int]
+    lifetimes: dict[str, BufferLifetime]
+    planned_bytes: int
+    naive_bytes: int
+    strategy: str = "greedy_by_size"
+    aliases: dict[str, str] = field(default_factory=dict)
+    extra: dict[str, object] = field(default_factory=dict)
+
+    def to_manifest(self) -> dict[str, object]:
+        buffers = []
+        for name, life in self.lifetimes.items():
+            buffers.append(
+                {
+                    "name": name,
+                    "offset": self.offsets[name],
+                    "size": life.size,
+                    "first_node": life.first,
+                    "last_node": life.last,
+                }
+            )
+        saved = self.naive_bytes - self.planned_bytes
+        info: dict[str, object] = {
+            "strategy": self.strategy,
+            "planned_bytes": self.planned_bytes,
+            "naive_bytes": self.naive_bytes,
+            "saved_bytes": saved,
+            "buffers": buffers,
+            "aliases": dict(self.aliases),
+        }
+        info.update(self.extra)
+        return info
+
+
+def _align_up(value: int, align: int) -> int:
+    return (value + align - 1) // align * align
+
+
+def _last_uses(model: ModelIR) -> dict[str, int]:
+    last: dict[str, int] = {}
+    for idx, node in enumerate(model.nodes):
+        for name in node.outputs:
+            if name:
+                last.setdefault(name, idx)
+        for name in node.inputs:
+            if name:
+                last[name] = idx
+    return last
+
+
+def plan_aliases(
+    model: ModelIR,
+    buffer_names: list[str],
+    readonly_names: set[str],
+) -> dict[str, str]:
+    # Map a tensor onto the storage of another tensor when the emitted kernel can
+    # either skip the copy entirely (views) or safely overwrite its dying input.
+    buffer_set = set(buffer_names)
+    last_use = _last_uses(model)
+    aliases: dict[str, str] = {}
+    root_last: dict[str, int] = {}
+
+    def _root(name: str) -> str:
+        return aliases.get(name, name)
+
+    def _same_layout(a: str, b: str) -> bool:
+        ta = model.tensors.get(a)
+        tb = model.tensors.get(b)
+        if ta is None or tb is None or ta.dtype != tb.dtype:
+            return False
+        return get_shape(model, a) == get_shape(model, b)
+
+    def _attach(out_name: str, root: str) -> None:
+        aliases[out_name] = root
+        root_last[root] = max(
+            root_last.get(root, last_use.get(root, -1)),
+            last_use.get(out_name, -1),
+        )
+
+    for idx, node in enumerate(model.nodes):
+        if len(node.outputs) != 1:
+            continue
+        out_name = node.outputs[0]
+        if out_name not in buffer_set or out_name in readonly_names:
+            continue
+        if node.op_type in VIEW_OPS:
+            src = node.inputs[0] if node.inputs else ""
+            if not src:
+                continue
+            ta = model.tensors.get(src)
+            tb = model.tensors.get(out_name)
+            if ta is None or tb is None or ta.dtype != tb.dtype:
+                continue
+            try:
+                same_size = _numel(get_shape(model, src)) == _numel(get_shape(model, out_name))
+            except ValueError:
+                continue
+            if same_size:
+                _attach(out_name, _root(src))
+            continue
+        if node.op_type not in INPLACE_OPS:
+            continue
+        candidates = node.inputs if node.op_type in _INPLACE_ANY_INPUT_OPS else node.inputs[:1]
+        for src in candidates:
+            if not src:
+                continue
+            root = _root(src)
+            if root not in buffer_set or root in readonly_names:
+                continue
+            if root_last.get(root, last_use.get(root, -1)) > idx:
+                continue
+            if not _same_layout(src, out_name):
+                continue
+            # Other operands sharing this storage must be read at the same index.
+            shared = [n for n in node.inputs if n and n != src and _root(n) == root]
+            if any(not _same_layout(n, out_name) for n in shared):
+                continue
+            _attach(out_name, root)
+            break
+    return aliases
+
+
+def _numel(shape: list[int]) -> int:
+    size = 1
+    for dim in shape:
+        if dim <= 0:
+            raise ValueError("Tensor shape contains unknown or invalid dimension.")
+        size *= int(dim)
+    return size
+
+
+def compute_lifetimes(
+    model: ModelIR,
+    buffer_names: list[str],
+    sizes: dict[str, int],
+    aliases: dict[str, str] | None = None,
+) -> dict[str, BufferLifetime]:
+    aliases = aliases or {}
+    wanted = set(buffer_names)
+    first: dict[str, int] = {}
+    last: dict[str, int] = {}
+    for idx, node in enumerate(model.nodes):
+        for raw in node.inputs:
+            name = aliases.get(raw, raw)
+            if name in wanted:
+                last[name] = idx
+                first.setdefault(name, idx)
+        for raw in node.outputs:
+            name = aliases.get(raw, raw)
+            if name in wanted:
+                first.setdefault(name, idx)
+                last[name] = max(last.get(name, idx), idx)
+
+    lifetimes: dict[str, BufferLifetime] = {}
+    for name in buffer_names:
+        start = first.get(name, 0)
+        end = last.get(name, start)
+        lifetimes[name] = BufferLifetime(name=name, size=int(sizes[name]), first=start, last=end)
+    return lifetimes
+
+
+def naive_arena_bytes(buffer_names: list[str], sizes: dict[str, int], align: int = 4) -> int:
+    offset = 0
+    for name in buffer_names:
+        offset = _align_up(offset, align)
+        offset += int(sizes[name])
+    return _align_up(offset, align)
+
+
+def plan_arena(
+    model: ModelIR,
+    buffer_names: list[str],
+    sizes: dict[str, int],
+    align: int = 4,
+    aliases: dict[str, str] | None = None,
+) -> ArenaPlan:
+    aliases = dict(aliases or {})
+    naive_bytes = naive_arena_bytes(buffer_names, sizes, align)
+    buffer_names = [name for name in buffer_names if name not in aliases]
+    lifetimes = compute_lifetimes(model, buffer_names, sizes, aliases)
+    position = {name: idx for idx, name in enumerate(buffer_names)}
+    order = sorted(
+        buffer_names,
+        key=lambda n: (-lifetimes[n].size, lifetimes[n].first, position[n]),
+    )
+    placed: list[tuple[int, int, BufferLifetime]] = []
+    offsets: dict[str, int] = {}
+    for name in order:
+        life = lifetimes[name]
+        conflicts = sorted(
+            (start, end) for start, end, other in placed if other.overlaps(life)
+        )
+        offset = 0
+        for start, end in conflicts:
+            if offset + life.size <= start:
+                break
+            offset = max(offset, _align_up(end, align))
+        offsets[name] = offset
+        placed.append((offset, offset + life.size, life))
+
+    planned = 0
+    for start, end, _life in placed:
+        planned = max(planned, end)
+    return ArenaPlan(
+        offsets={name: offsets[name] for name in buffer_names},
+        lifetimes=lifetimes,
+        planned_bytes=_align_up(planned, align),
+        naive_bytes=naive_bytes,
+        aliases=aliases,
+    )
+
+
+@dataclass(frozen=True)
+class Schedule:
+    order: list[int]
+    strategy: str
+    peak_before: int
+    peak_after: int
+
+    def to_manifest(self) -> dict[str, object]:
+        return {
+            "strategy": self.strategy,
+            "peak_bytes_before": self.peak_before,
+            "peak_bytes_after": self.peak_after,
+            "reordered": self.order != sorted(self.order),
+        }
+
+
+class _LiveGraph:
+    # Bitmask view of the node DAG. A buffer is live from the node producing it
+    # until its last consumer has run; while a node runs, its inputs and its
+    # outputs are live together.
+    def __init__(self, nodes: list[NodeInfo], sizes: dict[str, int]):
+        producer: dict[str, int] = {}
+        for idx, node in enumerate(nodes):
+            for name in node.outputs:
+                if name:
+                    producer.setdefault(name, idx)
+        self.count = len(nodes)
+        self.preds = [0] * self.count
+        self.consumers: dict[str, int] = {}
+        for idx, node in enumerate(nodes):
+            for name in node.inputs:
+                if not name:
+                    continue
+                src = producer.get(name)
+                if src is not None and src != idx:
+                    self.preds[idx] |= 1 << src
+                if name in sizes:
+                    self.consumers[name] = self.consumers.get(name, 0) | (1 << idx)
+        self.outputs = [sorted({n for n in node.outputs if n in sizes}) for node in nodes]
+        self.inputs = [sorted({n for n in node.inputs if n in sizes and producer.get(n) is not None}) for node in nodes]
+        self.out_bytes = [sum(int(sizes[n]) for n in names) for names in self.outputs]
+        self.sizes = sizes
+
+    def delta(self, done: int, idx: int) -> int:
+        # Change of live bytes once node idx has run after the nodes in done.
+        after = done | (1 << idx)
+        change = 0
+        for name in self.outputs[idx]:
+            if self.consumers.get(name, 0) & ~after:
+                change += int(self.sizes[name])
+        for name in self.inputs[idx]:
+            if not self.consumers.get(name, 0) & ~after:
+                change -= int(self.sizes[name])
+        return change
+
+    def ready(self, done: int) -> list[int]:
+        return [
+            idx
+            for idx in range(self.count)
+            if not done >> idx & 1 and self.preds[idx] & ~done == 0
+        ]
+
+    def peak(self, order: list[int]) -> int:
+        done = 0
+        live = 0
+        peak = 0
+        for idx in order:
+            peak = max(peak, live + self.out_bytes[idx])
+            live += self.delta(done, idx)
+            done |= 1 << idx
+        return peak
+
+
+def _schedule_exact(graph: _LiveGraph, max_states: int) -> list[int] | None:
+    # Minimises the peak over all topological orders: best[done] is the lowest
+    # peak reachable from the state where exactly the nodes in done have run.
+    full = (1 << graph.count) - 1
+    best: dict[int, tuple[int, int]] = {full: (0, -1)}
+
+    def expand(done: int, live: int) -> list[tuple[int, int, int]]:
+        moves = []
+        for idx in graph.ready(done):
+            moves.append((idx, live + graph.out_bytes[idx], live + graph.delta(done, idx)))
+        return moves
+
+    # Post-order DFS over execution states; live bytes follow from done.
+    pending: list[tuple[int, int]] = [(0, 0)]
+    while pending:
+        done, live = pending[-1]
+        if done in best:
+            pending.pop()
+            continue
+        moves = expand(done, live)
+        missing = [(done | (1 << idx), after) for idx, _, after in moves if (done | (1 << idx)) not in best]
+        if missing:
+            if len(best) + len(missing) > max_states:
+                return None
+            pending.extend(missing)
+            continue
+        choice = (1 << 62, -1)
+        for idx, step, _ in moves:
+            cost = max(step, best[done | (1 << idx)][0])
+            if cost < choice[0]:
+                choice = (cost, idx)
+        best[done] = choice
+        pending.pop()
+    order = []
+    done = 0
+    while done != full:
+        idx = best[done][1]
+        order.append(idx)
+        done |= 1 << idx
+    return order
+
+
+def _schedule_greedy(graph: _LiveGraph) -> list[int]:
+    # Run whichever ready node leaves the fewest live bytes behind, preferring
+    # the file order on ties.
+    order = []
+    done = 0
+    live = 0
+    for _ in range(graph.count):
+        candidates = graph.ready(done)
+        idx = min(candidates, key=lambda i: (live + graph.delta(done, i), live + graph.out_bytes[i], i))
+        order.append(idx)
+        live += graph.delta(done, idx)
+        done |= 1 << idx
+    return order
+
+
+def schedule_nodes(
+    model: ModelIR,
+    sizes: dict[str, int],
+    max_states: int = SCHEDULE_DP_MAX_STATES,
+) -> Schedule:
+    # Topological order of model.nodes with the lowest peak of live buffer
+    # bytes; sizes covers the arena buffers (graph IO and constants excluded).
+    count = len(model.nodes)
+    file_order = list(range(count))
+    graph = _LiveGraph(model.nodes, sizes)
+    before = graph.peak(file_order)
+    if any(node.op_type in _SUBGRAPH_OPS for node in model.nodes):
+        return Schedule(file_order, "file", before, before)
+    order = None
+    strategy = "dp"
+    if count <= SCHEDULE_DP_MAX_NODES:
+        order = _schedule_exact(graph, max_states)
+    if order is None:
+        order = _schedule_greedy(graph)
+        strategy = "greedy"
+    after = graph.peak(order)
+    if after >= before:
+        return Schedule(file_order, strategy, before, before)
+    return Schedule(order, strategy, before, after)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from ..ir import ModelIR
 from .utils import get_shape
@@ -17,6 +17,10 @@ class EmitContext:
     buffers: dict[str, str]
     consts: dict[str, str]
     weights: dict[str, str]
+    aliases: dict[str, str] = field(default_factory=dict)
+    kernels: dict[str, str] = field(default_factory=dict)
+    kernel_mode: str = "auto"
+    optimize: str = "speed"
     symbol_index: int = 0
 
     def next_symbol(self, prefix: str) -> str:
@@ -39,6 +43,7 @@ class EmitContext:
             ctype = "int64_t"
         elif dtype == "bool":
             ctype = "uint8_t"
+        name = self.storage_root(name)
         if name in self.input_ptrs:
             return f"(({ctype}*){self.input_ptrs[name]})"
         if name in self.output_ptrs:
@@ -51,6 +56,12 @@ class EmitContext:
             return f"(({ctype}*){self.buffers[name]})"
         raise ValueError(f"Unknown tensor mapping for '{name}'.")
 
+    def storage_root(self, name: str) -> str:
+        return self.aliases.get(name, name)
+
+    def shares_storage(self, a: str, b: str) -> bool:
+        return self.storage_root(a) == self.storage_root(b)
+
     def shape(self, name: str) -> list[int]:
         return get_shape(self.model, name)
 
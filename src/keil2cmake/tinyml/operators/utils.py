@@ -5,6 +5,8 @@ from __future__ import annotations
 import math
 from typing import Iterable
 
+import numpy as np
+
 from ..ir import ModelIR
 
 
@@ -58,10 +60,8 @@ def get_const_ints(model: ModelIR, name: str) -> list[int]:
     tensor = model.tensors[name]
     if tensor.data is None:
         raise ValueError(f"Const tensor '{name}' has no data.")
-    if tensor.dtype == "float32":
-        return [int(v) for v in tensor.data]
-    if tensor.dtype in ("int64", "int32", "int16", "int8"):
-        return [int(v) for v in tensor.data]
+    if tensor.dtype in ("float32", "int64", "int32", "int16", "int8"):
+        return tensor.data.astype(np.int64).tolist()
     raise ValueError("Only float/int const tensors are supported.")
 
 
@@ -145,14 +145,39 @@ def emit_op_unary_quant(
     lines.append("  }")
 
 
-def emit_op_matmul(lines: list[str], out: str, a: str, b: str, m: int, k: int, n: int) -> None:
+def activation_expr(act: dict[str, object] | None, var: str) -> str:
+    # Fused activation (passes.fuse_activations) as an expression on the stored value.
+    if not act:
+        return var
+    op = act.get("op")
+    if op == "Relu":
+        return f"({var} > 0.0f ? {var} : 0.0f)"
+    if op == "LeakyRelu":
+        return f"({var} >= 0.0f ? {var} : ({float(act['alpha']):.8f}f * {var}))"
+    if op == "Clip":
+        lo = f"{float(act['min']):.8f}f"
+        hi = f"{float(act['max']):.8f}f"
+        return f"({var} < {lo} ? {lo} : ({var} > {hi} ? {hi} : {var}))"
+    raise ValueError(f"Unsupported fused activation: {op}")
+
+
+def emit_op_matmul(
+    lines: list[str],
+    out: str,
+    a: str,
+    b: str,
+    m: int,
+    k: int,
+    n: int,
+    act: dict[str, object] | None = None,
+) -> None:
     lines.append(f"  for (size_t i = 0; i < {m}; ++i) {{")
     lines.append(f"    for (size_t j = 0; j < {n}; ++j) {{")
     lines.append("      float sum = 0.0f;")
     lines.append(f"      for (size_t t = 0; t < {k}; ++t) {{")
     lines.append(f"        sum += {a}[i * {k} + t] * {b}[t * {n} + j];")
     lines.append("      }")
-    lines.append(f"      {out}[i * {n} + j] = sum;")
+    lines.append(f"      {out}[i * {n} + j] = {activation_expr(act, 'sum')};")
     lines.append("    }")
     lines.append("  }")
 
@@ -370,6 +395,7 @@ def emit_op_conv2d(
     pads: list[int],
     dilations: list[int],
     groups: int,
+    act: dict[str, object] | None = None,
 ) -> None:
     if len(x_shape) != 4 or len(w_shape) != 4 or len(out_shape) != 4:
         raise ValueError("Conv expects 4D tensors (NCHW).")
@@ -429,7 +455,7 @@ def emit_op_conv2d(
     lines.append("            }")
     lines.append("          }")
     lines.append(
-        f"          {out}[((ni * {c_out} + oc) * {out_h} + oh) * {out_w} + ow] = sum;"
+        f"          {out}[((ni * {c_out} + oc) * {out_h} + oh) * {out_w} + ow] = {activation_expr(act, 'sum')};"
     )
     lines.append("        }")
     lines.append("      }")
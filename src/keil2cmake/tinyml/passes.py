@@ -0,0 +1,528 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable
+
+import numpy as np
+
+from .converter.onnx_loader_shape_infer import _infer_node_output_shape
+from .ir import ModelIR, NodeInfo, TensorInfo
+from .runtime.local_evaluator import _eval_model
+
+
+GraphPass = Callable[[ModelIR], "tuple[ModelIR, int]"]
+
+_STORAGE_DTYPES = ("float32", "bool", "uint8", "int8", "int16", "int32", "int64")
+_NONDETERMINISTIC_OPS = {
+    "RandomUniform",
+    "RandomUniformLike",
+    "RandomNormal",
+    "RandomNormalLike",
+    "Multinomial",
+}
+_SHAPE_ONLY_OPS = {"Shape", "Size"}
+_NOOP_OPS = {"Identity", "Dropout"}
+_BN_PRODUCERS = {"Conv", "Gemm"}
+_FUSABLE_PRODUCERS = {"Conv", "ConvTranspose", "Gemm", "MatMul"}
+_FUSABLE_ACTIVATIONS = {"Relu", "LeakyRelu", "Clip"}
+
+# A folded constant may be larger than its inputs (ConstantOfShape, Expand,
+# DequantizeLinear of packed weights, ...) only up to this many bytes; beyond
+# that computing it at run time is cheaper than storing it in flash.
+FOLD_GROWTH_LIMIT = 4096
+
+
+@dataclass(frozen=True)
+class PassStats:
+    name: str
+    round: int
+    nodes_before: int
+    nodes_after: int
+    rewrites: int
+    elapsed_ms: float
+
+    def to_manifest(self) -> dict[str, object]:
+        return {
+            "pass": self.name,
+            "round": self.round,
+            "nodes_before": self.nodes_before,
+            "nodes_after": self.nodes_after,
+            "rewrites": self.rewrites,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+        }
+
+
+@dataclass
+class PassReport:
+    nodes_before: int
+    nodes_after: int
+    rounds: int = 0
+    stats: list[PassStats] = field(default_factory=list)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return sum(s.elapsed_ms for s in self.stats)
+
+    def to_manifest(self) -> dict[str, object]:
+        return {
+            "nodes_before": self.nodes_before,
+            "nodes_after": self.nodes_after,
+            "rounds": self.rounds,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+            "passes": [s.to_manifest() for s in self.stats],
+        }
+
+
+def _graph_io(model: ModelIR) -> tuple[set[str], set[str]]:
+    return {t.name for t in model.inputs}, {t.name for t in model.outputs}
+
+
+def _use_counts(model: ModelIR) -> dict[str, int]:
+    uses: dict[str, int] = {}
+    for node in model.nodes:
+        for name in node.inputs:
+            if name:
+                uses[name] = uses.get(name, 0) + 1
+    for out in model.outputs:
+        uses[out.name] = uses.get(out.name, 0) + 1
+    return uses
+
+
+def _resolve(alias: dict[str, str], name: str) -> str:
+    while name in alias:
+        name = alias[name]
+    return name
+
+
+def _rewire(nodes: list[NodeInfo], alias: dict[str, str], renamed_outputs: dict[str, str] | None = None) -> list[NodeInfo]:
+    renamed_outputs = renamed_outputs or {}
+    out: list[NodeInfo] = []
+    for node in nodes:
+        inputs = [_resolve(alias, n) if n else n for n in node.inputs]
+        outputs = [renamed_outputs.get(n, n) for n in node.outputs]
+        if inputs != node.inputs or outputs != node.outputs:
+            node = replace(node, inputs=inputs, outputs=outputs)
+        out.append(node)
+    return out
+
+
+def _const(tensors: dict[str, TensorInfo], name: str) -> np.ndarray | None:
+    tensor = tensors.get(name) if name else None
+    if tensor is None or tensor.data is None:
+        return None
+    return tensor.data.reshape(tensor.shape) if tensor.shape else tensor.data.reshape(())
+
+
+def _same_qparams(a: TensorInfo, b: TensorInfo) -> bool:
+    return a.dtype == b.dtype and a.qscale == b.qscale and a.qzero == b.qzero
+
+
+def _unique_name(tensors: dict[str, TensorInfo], base: str) -> str:
+    name = base
+    index = 0
+    while name in tensors:
+        index += 1
+        name = f"{base}_{index}"
+    return name
+
+
+def eliminate_noops(model: ModelIR) -> tuple[ModelIR, int]:
+    # Identity and inference-mode Dropout forward their input. Consumers are
+    # pointed at the source; when the result is a graph output, the producer
+    # of the source writes the graph output directly instead.
+    graph_inputs, graph_outputs = _graph_io(model)
+    uses = _use_counts(model)
+    producers = {out: node for node in model.nodes for out in node.outputs if out}
+    alias: dict[str, str] = {}
+    renamed: dict[str, str] = {}
+    kept: list[NodeInfo] = []
+    for node in model.nodes:
+        if node.op_type not in _NOOP_OPS or not node.inputs or not node.inputs[0]:
+            kept.append(node)
+            continue
+        if node.op_type == "Dropout":
+            mask_used = any(n and uses.get(n) for n in node.outputs[1:])
+            training_name = node.inputs[2] if len(node.inputs) > 2 else ""
+            training = _const(model.tensors, training_name) if training_name else None
+            if mask_used or (training_name and (training is None or bool(training.any()))):
+                kept.append(node)
+                continue
+        src, dst = _resolve(alias, node.inputs[0]), node.outputs[0]
+        src_info, dst_info = model.tensors.get(src), model.tensors.get(dst)
+        if src_info is None or dst_info is None or not _same_qparams(src_info, dst_info):
+            kept.append(node)
+            continue
+        if dst not in graph_outputs:
+            alias[dst] = src
+            continue
+        if (
+            src in graph_inputs
+            or src in graph_outputs
+            or src in renamed
+            or src not in producers
+            or uses.get(src, 0) != 1
+            or src_info.data is not None
+        ):
+            kept.append(node)
+            continue
+        renamed[src] = dst
+    if not alias and not renamed:
+        return model, 0
+    nodes = _rewire(kept, alias, renamed)
+    return replace(model, nodes=nodes), len(model.nodes) - len(nodes)
+
+
+def _fold_shape(tensor: TensorInfo | None) -> bool:
+    return tensor is not None and tensor.dtype in _STORAGE_DTYPES and all(int(d) > 0 for d in tensor.shape)
+
+
+def fold_constants(model: ModelIR) -> tuple[ModelIR, int]:
+    # Nodes whose inputs are all constants (or, for Shape/Size, have a static
+    # shape) are evaluated once here and their outputs become constants.
+    _, graph_outputs = _graph_io(model)
+    tensors = dict(model.tensors)
+    kept: list[NodeInfo] = []
+    folded = 0
+    for node in model.nodes:
+        outputs = [n for n in node.outputs if n]
+        if not outputs or any(n in graph_outputs for n in outputs):
+            kept.append(node)
+            continue
+        if node.op_type == "Constant":
+            if all(tensors.get(n) is not None and tensors[n].data is not None for n in outputs):
+                folded += 1
+            else:
+                kept.append(node)
+            continue
+        inputs = [n for n in node.inputs if n]
+        if node.op_type in _NONDETERMINISTIC_OPS or not inputs:
+            kept.append(node)
+            continue
+        feeds: dict[str, np.ndarray] = {}
+        foldable = True
+        for name in inputs:
+            tensor = tensors.get(name)
+            if tensor is not None and tensor.data is not None:
+                continue
+            if node.op_type in _SHAPE_ONLY_OPS and _fold_shape(tensor):
+                feeds[name] = np.zeros(tensor.shape, dtype=np.dtype(tensor.dtype))
+                continue
+            foldable = False
+            break
+        if not foldable or any(tensors.get(n) is None or tensors[n].dtype not in _STORAGE_DTYPES for n in outputs):
+            kept.append(node)
+            continue
+        local = {n: tensors[n] for n in inputs + outputs}
+        mini = replace(model, inputs=[], outputs=[], tensors=local, nodes=[node])
+        try:
+            values = _eval_model(mini, feeds)
+        except (ValueError, TypeError, KeyError, IndexError):
+            kept.append(node)
+            continue
+        in_bytes = sum(int(tensors[n].data.nbytes) for n in inputs if tensors[n].data is not None)
+        results = [values.get(n) for n in outputs]
+        if any(r is None for r in results) or sum(
+            np.asarray(r).size * np.dtype(tensors[n].dtype).itemsize for n, r in zip(outputs, results)
+        ) > max(in_bytes, FOLD_GROWTH_LIMIT):
+            kept.append(node)
+            continue
+        for name, value in zip(outputs, results):
+            arr = np.asarray(value)
+            info = tensors[name]
+            shape = list(info.shape)
+            if not all(int(d) > 0 for d in shape) or int(np.prod(shape, dtype=np.int64)) != arr.size:
+                shape = list(arr.shape)
+            tensors[name] = TensorInfo(
+                name=name,
+                shape=shape,
+                dtype=info.dtype,
+                data=arr,
+                qscale=info.qscale,
+                qzero=info.qzero,
+            )
+        folded += 1
+    if not folded:
+        return model, 0
+    _refresh_shapes(tensors, kept)
+    return replace(model, tensors=tensors, nodes=kept), folded
+
+
+def _refresh_shapes(tensors: dict[str, TensorInfo], nodes: list[NodeInfo]) -> None:
+    # Outputs whose shape depended on a value only known now (a Reshape target
+    # computed from Shape/Gather/Concat, ...) were left as [] by the loader.
+    for node in nodes:
+        pending = [
+            n for n in node.outputs if n and n in tensors and not tensors[n].shape and tensors[n].data is None
+        ]
+        if not pending:
+            continue
+        shapes = _infer_node_output_shape(node, tensors) or []
+        for name, shape in zip(node.outputs, shapes):
+            if name in pending and shape:
+                tensors[name] = replace(tensors[name], shape=list(shape))
+
+
+def _batchnorm_factors(tensors: dict[str, TensorInfo], bn: NodeInfo) -> tuple[np.ndarray, np.ndarray] | None:
+    if len(bn.inputs) != 5 or int(bn.attrs.get("training_mode", 0)) != 0:
+        return None
+    params = [_const(tensors, n) for n in bn.inputs[1:]]
+    if any(p is None or tensors[n].dtype != "float32" for p, n in zip(params, bn.inputs[1:])):
+        return None
+    scale, bias, mean, var = (np.asarray(p, dtype=np.float64).reshape(-1) for p in params)
+    eps = float(bn.attrs.get("epsilon", 1e-5))
+    factor = scale / np.sqrt(var + eps)
+    return factor, bias - mean * factor
+
+
+def fold_batchnorm(model: ModelIR) -> tuple[ModelIR, int]:
+    # BatchNormalization after a Conv/Gemm with constant weights is a
+    # per-output-channel scale and shift, folded into the weights and bias.
+    _, graph_outputs = _graph_io(model)
+    uses = _use_counts(model)
+    tensors = dict(model.tensors)
+    nodes = list(model.nodes)
+    index = {out: i for i, node in enumerate(nodes) for out in node.outputs if out}
+    removed: set[int] = set()
+    for bn_idx, bn in enumerate(nodes):
+        if bn.op_type != "BatchNormalization" or not bn.inputs or any(n for n in bn.outputs[1:]):
+            continue
+        src = bn.inputs[0]
+        prod_idx = index.get(src)
+        if prod_idx is None or prod_idx in removed or uses.get(src, 0) != 1 or src in graph_outputs:
+            continue
+        prod = nodes[prod_idx]
+        if prod.op_type not in _BN_PRODUCERS or "fused_activation" in prod.attrs or len(prod.inputs) < 2:
+            continue
+        if tensors[src].dtype != "float32" or tensors[bn.outputs[0]].dtype != "float32":
+            continue
+        factors = _batchnorm_factors(tensors, bn)
+        weight = _const(tensors, prod.inputs[1])
+        bias_name = prod.inputs[2] if len(prod.inputs) > 2 else ""
+        bias = _const(tensors, bias_name) if bias_name else None
+        if factors is None or weight is None or tensors[prod.inputs[1]].dtype != "float32":
+            continue
+        if bias_name and (bias is None or tensors[bias_name].dtype != "float32"):
+            continue
+        factor, shift = factors
+        attrs = dict(prod.attrs)
+        w = weight.astype(np.float64)
+        if prod.op_type == "Conv":
+            channels = w.shape[0] if w.ndim else 0
+            if factor.size != channels:
+                continue
+            new_w = w * factor.reshape([channels] + [1] * (w.ndim - 1))
+            b = np.zeros(channels) if bias is None else bias.astype(np.float64).reshape(-1)
+            new_b = b * factor + shift
+        else:
+            if w.ndim != 2 or len(tensors[src].shape) != 2:
+                continue
+            trans_b = int(attrs.get("transB", 0))
+            channels = w.shape[0] if trans_b else w.shape[1]
+            if factor.size != channels:
+                continue
+            new_w = w * (factor.reshape(-1, 1) if trans_b else factor.reshape(1, -1))
+            if bias is None:
+                new_b = shift
+            else:
+                new_b = float(attrs.get("beta", 1.0)) * bias.astype(np.float64) * factor + shift
+            attrs["beta"] = 1.0
+        w_name = _unique_name(tensors, f"{prod.inputs[1]}_bn")
+        tensors[w_name] = TensorInfo(name=w_name, shape=list(new_w.shape), dtype="float32", data=new_w.astype(np.float32))
+        b_name = _unique_name(tensors, f"{bn.outputs[0]}_bias")
+        tensors[b_name] = TensorInfo(name=b_name, shape=list(new_b.shape), dtype="float32", data=new_b.astype(np.float32))
+        inputs = [prod.inputs[0], w_name, b_name]
+        nodes[prod_idx] = replace(prod, inputs=inputs, outputs=[bn.outputs[0]], attrs=attrs)
+        removed.add(bn_idx)
+    if not removed:
+        return model, 0
+    kept = [node for i, node in enumerate(nodes) if i not in removed]
+    return replace(model, tensors=tensors, nodes=kept), len(removed)
+
+
+def _clip_bound(tensors: dict[str, TensorInfo], node: NodeInfo, index: int, key: str, default: float) -> float | None:
+    # Clip bounds are attributes before opset 11 and optional inputs after.
+    if key in node.attrs:
+        return float(node.attrs[key])
+    name = node.inputs[index] if len(node.inputs) > index else ""
+    if not name:
+        return default
+    value = _const(tensors, name)
+    if value is None or value.size != 1:
+        return None
+    return float(value.reshape(-1)[0])
+
+
+def _activation_spec(tensors: dict[str, TensorInfo], node: NodeInfo) -> dict[str, Any] | None:
+    if node.op_type == "Relu":
+        return {"op": "Relu"}
+    if node.op_type == "LeakyRelu":
+        return {"op": "LeakyRelu", "alpha": float(node.attrs.get("alpha", 0.01))}
+    if node.op_type == "Clip":
+        limit = float(np.finfo(np.float32).max)
+        lo = _clip_bound(tensors, node, 1, "min", -limit)
+        hi = _clip_bound(tensors, node, 2, "max", limit)
+        if lo is None or hi is None:
+            return None
+        return {"op": "Clip", "min": lo, "max": hi}
+    return None
+
+
+def fuse_activations(model: ModelIR) -> tuple[ModelIR, int]:
+    # Relu/LeakyRelu/Clip on a single-use Conv/Gemm/MatMul result becomes an
+    # epilogue of that node (attrs["fused_activation"]); float outputs take it
+    # as they are stored. Quantized outputs only take Relu with unchanged qparams.
+    _, graph_outputs = _graph_io(model)
+    uses = _use_counts(model)
+    nodes = list(model.nodes)
+    index = {out: i for i, node in enumerate(nodes) for out in node.outputs if out}
+    removed: set[int] = set()
+    for act_idx, act in enumerate(nodes):
+        if act.op_type not in _FUSABLE_ACTIVATIONS or len(act.outputs) != 1 or not act.inputs:
+            continue
+        spec = _activation_spec(model.tensors, act)
+        src = act.inputs[0]
+        prod_idx = index.get(src)
+        if spec is None or prod_idx is None or prod_idx in removed:
+            continue
+        prod = nodes[prod_idx]
+        if prod.op_type not in _FUSABLE_PRODUCERS or "fused_activation" in prod.attrs or len(prod.outputs) != 1:
+            continue
+        if uses.get(src, 0) != 1 or src in graph_outputs:
+            continue
+        src_info, out_info = model.tensors.get(src), model.tensors.get(act.outputs[0])
+        if src_info is None or out_info is None or src_info.dtype != out_info.dtype:
+            continue
+        if src_info.dtype in ("int8", "int16"):
+            if spec["op"] != "Relu" or not _same_qparams(src_info, out_info):
+                continue
+        elif src_info.dtype != "float32":
+            continue
+        attrs = dict(prod.attrs)
+        attrs["fused_activation"] = spec
+        nodes[prod_idx] = replace(prod, outputs=[act.outputs[0]], attrs=attrs)
+        removed.add(act_idx)
+    if not removed:
+        return model, 0
+    kept = [node for i, node in enumerate(nodes) if i not in removed]
+    return replace(model, nodes=kept), len(removed)
+
+
+def _attr_key(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        return tuple(_attr_key(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _attr_key(v)) for k, v in value.items()))
+    if hasattr(value, "SerializeToString"):
+        return ("proto", value.SerializeToString())
+    if isinstance(value, (bool, int, float, str, bytes)) or value is None:
+        return value
+    return repr(value)
+
+
+def eliminate_common_subexpressions(model: ModelIR) -> tuple[ModelIR, int]:
+    # Identical constants share one tensor; nodes with the same op, inputs,
+    # attributes and output qparams are computed once.
+    graph_inputs, graph_outputs = _graph_io(model)
+    alias: dict[str, str] = {}
+    seen_consts: dict[tuple[Any, ...], str] = {}
+    for name, tensor in model.tensors.items():
+        if tensor.data is None or name in graph_inputs or name in graph_outputs:
+            continue
+        key = (tensor.dtype, tuple(tensor.shape), tensor.qscale, tensor.qzero, tensor.data.tobytes())
+        first = seen_consts.setdefault(key, name)
+        if first != name:
+            alias[name] = first
+    seen_nodes: dict[tuple[Any, ...], NodeInfo] = {}
+    kept: list[NodeInfo] = []
+    merged = 0
+    for node in model.nodes:
+        inputs = tuple(_resolve(alias, n) if n else n for n in node.inputs)
+        outputs = [n for n in node.outputs if n]
+        if node.op_type in _NONDETERMINISTIC_OPS or not outputs or len(outputs) != len(node.outputs):
+            kept.append(node)
+            continue
+        out_infos = tuple(
+            (t.dtype, tuple(t.shape), t.qscale, t.qzero) if t is not None else None
+            for t in (model.tensors.get(n) for n in outputs)
+        )
+        key = (node.op_type, inputs, _attr_key(node.attrs), out_infos)
+        first = seen_nodes.get(key)
+        if first is None or any(n in graph_outputs for n in outputs):
+            seen_nodes.setdefault(key, node)
+            kept.append(node)
+            continue
+        for dup, orig in zip(outputs, first.outputs):
+            alias[dup] = orig
+        merged += 1
+    nodes = _rewire(kept, alias)
+    rewired = sum(1 for old, new in zip(kept, nodes) if old.inputs != new.inputs)
+    if not merged and not rewired:
+        return model, 0
+    return replace(model, nodes=nodes), merged + rewired
+
+
+def eliminate_dead_nodes(model: ModelIR) -> tuple[ModelIR, int]:
+    # Drops nodes whose outputs never reach a graph output, then constants
+    # nothing reads any more (each one would otherwise be emitted to flash).
+    graph_inputs, graph_outputs = _graph_io(model)
+    live = set(graph_outputs)
+    kept: list[NodeInfo] = []
+    for node in reversed(model.nodes):
+        if not any(n in live for n in node.outputs if n):
+            continue
+        kept.append(node)
+        live.update(n for n in node.inputs if n)
+    kept.reverse()
+    tensors = {
+        name: tensor
+        for name, tensor in model.tensors.items()
+        if tensor.data is None or name in live or name in graph_inputs
+    }
+    removed = len(model.nodes) - len(kept) + len(model.tensors) - len(tensors)
+    if not removed:
+        return model, 0
+    return replace(model, tensors=tensors, nodes=kept), removed
+
+
+DEFAULT_PASSES: tuple[tuple[str, GraphPass], ...] = (
+    ("eliminate_noops", eliminate_noops),
+    ("fold_constants", fold_constants),
+    ("eliminate_common_subexpressions", eliminate_common_subexpressions),
+    ("fold_batchnorm", fold_batchnorm),
+    ("fuse_activations", fuse_activations),
+    ("eliminate_dead_nodes", eliminate_dead_nodes),
+)
+
+
+class PassManager:
+    def __init__(self, passes: tuple[tuple[str, GraphPass], ...] | None = None, max_rounds: int = 3):
+        self.passes = tuple(passes) if passes is not None else DEFAULT_PASSES
+        self.max_rounds = max(1, int(max_rounds))
+
+    def run(self, model: ModelIR) -> tuple[ModelIR, PassReport]:
+        # Passes enable each other (folding exposes duplicates and dead
+        # constants), so the pipeline repeats until a round changes nothing.
+        report = PassReport(nodes_before=len(model.nodes), nodes_after=len(model.nodes))
+        for round_idx in range(1, self.max_rounds + 1):
+            report.rounds = round_idx
+            changed = 0
+            for name, graph_pass in self.passes:
+                before = len(model.nodes)
+                start = time.perf_counter()
+                model, rewrites = graph_pass(model)
+                elapsed = (time.perf_counter() - start) * 1000.0
+                report.stats.append(PassStats(name, round_idx, before, len(model.nodes), rewrites, elapsed))
+                changed += rewrites
+            if not changed:
+                break
+        report.nodes_after = len(model.nodes)
+        return model, report
+
+
+def optimize_model(model: ModelIR) -> tuple[ModelIR, PassReport]:
+    return PassManager().run(model)
@@ -2,19 +2,22 @@
 
 from __future__ import annotations
 
+import json
 import os
 import subprocess
 from pathlib import Path
 
 from ..keil.config import get_armgcc_path
+from .code_size import measure_code_size
 from .codegen import generate_c_code, generate_manifest
 from .converter import load_onnx_model
-from .runtime import validate_model_consistency
+from .passes import optimize_model
+from .runtime import validate_model_consistency, validate_model_statistics
 
 
-def _run_command(cmd: list[str], error_msg: str) -> None:
+def _run_command(cmd: list[str], error_msg: str, cwd: str | None = None) -> None:
     try:
-        completed = subprocess.run(cmd, capture_output=True, text=True)
+        completed = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd)
     except OSError as exc:
         raise RuntimeError(f"{error_msg}: {exc}") from exc
     if completed.returncode != 0:
@@ -40,16 +43,51 @@ def generate_tinyml_project(
     weights: str,
     emit: str,
     strict_validation: bool = True,
+    weight_format: str = "c",
+    validation_samples: int = 1,
+    validation_dataset: str = "",
+    validation_workers: int | None = None,
+    optimize: str = "speed",
+    code_size: bool = False,
+    graph_opt: bool = True,
+    schedule: str = "memory",
+    tiling: str = "off",
 ) -> dict[str, object]:
     backend = "c"
     model = load_onnx_model(model_path)
+    pass_report = None
+    source_ops = None
+    if graph_opt:
+        source_ops = [node.op_type for node in model.nodes]
+        model, pass_report = optimize_model(model)
     model_name = Path(model_path).stem
 
     root = Path(output_root)
     project_dir = root / model_name
     project_dir.mkdir(parents=True, exist_ok=True)
 
-    codegen_result = generate_c_code(model, str(project_dir), model_name, weights)
+    codegen_result = generate_c_code(
+        model,
+        str(project_dir),
+        model_name,
+        weights,
+        weight_format=weight_format,
+        optimize=optimize,
+        schedule=schedule,
+        tiling=tiling,
+    )
+    code_size_report = None
+    if code_size:
+        code_size_report = measure_code_size(
+            model,
+            str(codegen_result["source"]),
+            model_name,
+            weights,
+            weight_format,
+            optimize,
+            schedule=schedule,
+            tiling=tiling,
+        )
     manifest_path = generate_manifest(
         model,
         str(project_dir),
@@ -59,13 +97,33 @@ def generate_tinyml_project(
         codegen_result.get("op_backends", []),
         codegen_result.get("backend_stats", {}),
         codegen_result.get("fallback_stats", {}),
+        codegen_result.get("memory_plan"),
+        codegen_result.get("weight_blob"),
+        code_size_report,
+        pass_report.to_manifest() if pass_report is not None else None,
+        source_ops,
     )
-    validation = validate_model_consistency(
-        model,
-        model_path,
-        source_path=str(codegen_result["source"]),
-        header_path=str(codegen_result["header"]),
-    )
+    validation_report = ""
+    if validation_dataset or validation_samples > 1:
+        validation = validate_model_statistics(
+            model,
+            model_path,
+            source_path=str(codegen_result["source"]),
+            header_path=str(codegen_result["header"]),
+            dataset_path=validation_dataset,
+            num_samples=validation_samples,
+            workers=validation_workers,
+        )
+        validation_report = str(project_dir / f"{model_name}.validation.json")
+        with open(validation_report, "w", encoding="utf-8") as f:
+            json.dump(validation.to_dict(), f, indent=2)
+    else:
+        validation = validate_model_consistency(
+            model,
+            model_path,
+            source_path=str(codegen_result["source"]),
+            header_path=str(codegen_result["header"]),
+        )
     strict_mode = bool(strict_validation)
     if validation.status == "failed":
         detail = validation.reason or "consistency check failed"
@@ -79,12 +137,18 @@ def generate_tinyml_project(
         armgcc_path = get_armgcc_path()
         gcc = _infer_tool(armgcc_path, "arm-none-eabi-gcc.exe" if os.name == "nt" else "arm-none-eabi-gcc")
         ar = _infer_tool(armgcc_path, "arm-none-eabi-ar.exe" if os.name == "nt" else "arm-none-eabi-ar")
-        src = codegen_result["source"]
-        obj = str(project_dir / f"{model_name}.o")
+        # The compiler runs from project_dir (for `.incbin`), so pass absolute paths.
+        lib_dir = project_dir.resolve()
+        src = Path(codegen_result["source"]).resolve()
+        obj = str(lib_dir / f"{model_name}.o")
         lib_path = str(project_dir / f"lib{model_name}.a")
         cmd_compile = [gcc, "-c", str(src), "-o", obj, "-std=c99", "-O2"]
-        cmd_ar = [ar, "rcs", lib_path, obj]
-        _run_command(cmd_compile, "Failed to compile model source with arm-none-eabi-gcc")
+        cmd_ar = [ar, "rcs", str(lib_dir / f"lib{model_name}.a"), obj]
+        _run_command(
+            cmd_compile,
+            "Failed to compile model source with arm-none-eabi-gcc",
+            cwd=str(project_dir),
+        )
         _run_command(cmd_ar, "Failed to archive model library with arm-none-eabi-ar")
 
     return {
@@ -96,6 +160,14 @@ def generate_tinyml_project(
         "library": lib_path,
         "backend": backend,
         "weights": weights,
+        "weight_format": weight_format,
+        "weight_blob": codegen_result.get("weight_blob"),
+        "optimize": optimize,
+        "code_size": code_size_report,
+        "graph_passes": pass_report.to_manifest() if pass_report is not None else None,
+        "schedule": (codegen_result.get("memory_plan") or {}).get("schedule"),
+        "tiling": (codegen_result.get("memory_plan") or {}).get("tiling"),
         "validation": validation,
+        "validation_report": validation_report,
         "strict_validation": strict_mode,
     }
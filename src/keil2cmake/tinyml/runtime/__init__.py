@@ -1,5 +1,11 @@
 # -*- coding: utf-8 -*-
 
+from .statistical_validation import StatisticalValidationResult, validate_model_statistics
 from .validator import ValidationResult, validate_model_consistency
 
-__all__ = ["ValidationResult", "validate_model_consistency"]
+__all__ = [
+    "StatisticalValidationResult",
+    "ValidationResult",
+    "validate_model_consistency",
+    "validate_model_statistics",
+]
@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import hashlib
 import os
 from pathlib import Path
+import re
 import shutil
+import stat
 import subprocess
 import tempfile
+from typing import Sequence
 
 import numpy as np
 
@@ -20,6 +24,24 @@ class CRunResult:
     reason: str = ""
     output: np.ndarray | None = None
     outputs: dict[str, np.ndarray] | None = None
+    elapsed_us: float | None = None
+    cached: bool = False
+
+
+@dataclass
+class CRunBatchResult:
+    ok: bool
+    reason: str = ""
+    outputs: list[dict[str, np.ndarray]] | None = None
+    elapsed_us: float | None = None
+    cached: bool = False
+
+
+RUNNER_CACHE_ENV = "K2C_RUNNER_CACHE_DIR"
+RUNNER_CACHE_MAX_ENTRIES = 64
+_RUNNER_CACHE_VERSION = "1"
+_COMPILE_FLAGS = ("-O2", "-std=c99")
+_BLOB_DEFINE_RE = re.compile(r'^#define K2C_WEIGHTS_\w+_BIN "([^"]+)"', re.MULTILINE)
 
 
 def _dtype_to_numpy(dtype: str):
@@ -72,27 +94,41 @@ def _find_host_compiler() -> str | None:
 
 
 def _runner_source(header_basename: str) -> str:
+    # The runner streams samples back to back: each sample is all inputs in
+    # descriptor order, and each sample's outputs are appended the same way.
     return (
         "#include <stdint.h>\n"
         "#include <stdio.h>\n"
         "#include <stdlib.h>\n"
+        "#include <time.h>\n"
         f"#include \"{header_basename}\"\n\n"
+        "static size_t k2c_io_bytes(const k2c_io_desc_t* desc) {\n"
+        "  size_t bytes = desc->elem_size * desc->size;\n"
+        "  return bytes == 0 ? 1 : bytes;\n"
+        "}\n\n"
+        "static int k2c_read_sample(FILE* fi, void** bufs, const k2c_io_desc_t* desc, size_t n) {\n"
+        "  for (size_t i = 0; i < n; ++i) {\n"
+        "    size_t bytes = k2c_io_bytes(&desc[i]);\n"
+        "    size_t n_read = fread(bufs[i], 1, bytes, fi);\n"
+        "    if (n_read != bytes) {\n"
+        "      return (i == 0 && n_read == 0 && feof(fi)) ? 0 : -1;\n"
+        "    }\n"
+        "  }\n"
+        "  return 1;\n"
+        "}\n\n"
         "int main(int argc, char** argv) {\n"
-        "  if (argc != 3) {\n"
+        "  if (argc != 3 && argc != 4) {\n"
         "    return 2;\n"
         "  }\n"
-        "  const char* in_path = argv[1];\n"
-        "  const char* out_path = argv[2];\n"
-        "  FILE* fi = fopen(in_path, \"rb\");\n"
-        "  if (!fi) {\n"
-        "    return 3;\n"
-        "  }\n"
+        "  int rc = 0;\n"
+        "  long samples = 0;\n"
+        "  FILE* fi = NULL;\n"
+        "  FILE* fo = NULL;\n"
         "  size_t n_in = 0;\n"
         "  size_t n_out = 0;\n"
         "  const k2c_io_desc_t* in_desc = k2c_get_input_desc(&n_in);\n"
         "  const k2c_io_desc_t* out_desc = k2c_get_output_desc(&n_out);\n"
         "  if (!in_desc || !out_desc || n_in == 0 || n_out == 0) {\n"
-        "    fclose(fi);\n"
         "    return 4;\n"
         "  }\n"
         "  const void** input_ptrs = (const void**)calloc(n_in, sizeof(void*));\n"
@@ -100,130 +136,256 @@ def _runner_source(header_basename: str) -> str:
         "  void** input_bufs = (void**)calloc(n_in, sizeof(void*));\n"
         "  void** output_bufs = (void**)calloc(n_out, sizeof(void*));\n"
         "  if (!input_ptrs || !output_ptrs || !input_bufs || !output_bufs) {\n"
-        "    fclose(fi);\n"
-        "    free((void*)input_ptrs);\n"
-        "    free(output_ptrs);\n"
-        "    free(input_bufs);\n"
-        "    free(output_bufs);\n"
-        "    return 5;\n"
+        "    rc = 5;\n"
+        "    goto done;\n"
         "  }\n"
         "  for (size_t i = 0; i < n_in; ++i) {\n"
-        "    size_t bytes = in_desc[i].elem_size * in_desc[i].size;\n"
-        "    if (bytes == 0) {\n"
-        "      bytes = 1;\n"
-        "    }\n"
-        "    input_bufs[i] = malloc(bytes);\n"
+        "    input_bufs[i] = malloc(k2c_io_bytes(&in_desc[i]));\n"
         "    if (!input_bufs[i]) {\n"
-        "      fclose(fi);\n"
-        "      for (size_t j = 0; j < i; ++j) free(input_bufs[j]);\n"
-        "      free((void*)input_ptrs);\n"
-        "      free(output_ptrs);\n"
-        "      free(input_bufs);\n"
-        "      free(output_bufs);\n"
-        "      return 6;\n"
-        "    }\n"
-        "    size_t n_read = fread(input_bufs[i], 1, bytes, fi);\n"
-        "    if (n_read != bytes) {\n"
-        "      fclose(fi);\n"
-        "      for (size_t j = 0; j <= i; ++j) free(input_bufs[j]);\n"
-        "      free((void*)input_ptrs);\n"
-        "      free(output_ptrs);\n"
-        "      free(input_bufs);\n"
-        "      free(output_bufs);\n"
-        "      return 7;\n"
+        "      rc = 6;\n"
+        "      goto done;\n"
         "    }\n"
         "    input_ptrs[i] = input_bufs[i];\n"
         "  }\n"
-        "  fclose(fi);\n"
         "  for (size_t i = 0; i < n_out; ++i) {\n"
-        "    size_t bytes = out_desc[i].elem_size * out_desc[i].size;\n"
-        "    if (bytes == 0) {\n"
-        "      bytes = 1;\n"
-        "    }\n"
-        "    output_bufs[i] = malloc(bytes);\n"
+        "    output_bufs[i] = malloc(k2c_io_bytes(&out_desc[i]));\n"
         "    if (!output_bufs[i]) {\n"
-        "      for (size_t j = 0; j < n_in; ++j) free(input_bufs[j]);\n"
-        "      for (size_t j = 0; j < i; ++j) free(output_bufs[j]);\n"
-        "      free((void*)input_ptrs);\n"
-        "      free(output_ptrs);\n"
-        "      free(input_bufs);\n"
-        "      free(output_bufs);\n"
-        "      return 8;\n"
+        "      rc = 8;\n"
+        "      goto done;\n"
         "    }\n"
         "    output_ptrs[i] = output_bufs[i];\n"
         "  }\n"
-        "  k2c_forward(input_ptrs, output_ptrs);\n"
-        "  FILE* fo = fopen(out_path, \"wb\");\n"
+        "  fi = fopen(argv[1], \"rb\");\n"
+        "  if (!fi) {\n"
+        "    rc = 3;\n"
+        "    goto done;\n"
+        "  }\n"
+        "  fo = fopen(argv[2], \"wb\");\n"
         "  if (!fo) {\n"
-        "    for (size_t i = 0; i < n_in; ++i) free(input_bufs[i]);\n"
-        "    for (size_t i = 0; i < n_out; ++i) free(output_bufs[i]);\n"
-        "    free((void*)input_ptrs);\n"
-        "    free(output_ptrs);\n"
-        "    free(input_bufs);\n"
-        "    free(output_bufs);\n"
-        "    return 9;\n"
+        "    rc = 9;\n"
+        "    goto done;\n"
         "  }\n"
-        "  for (size_t i = 0; i < n_out; ++i) {\n"
-        "    size_t bytes = out_desc[i].elem_size * out_desc[i].size;\n"
-        "    if (bytes == 0) {\n"
-        "      bytes = 1;\n"
+        "  for (;;) {\n"
+        "    int got = k2c_read_sample(fi, input_bufs, in_desc, n_in);\n"
+        "    if (got == 0) {\n"
+        "      break;\n"
+        "    }\n"
+        "    if (got < 0) {\n"
+        "      rc = 7;\n"
+        "      goto done;\n"
         "    }\n"
-        "    size_t n_written = fwrite(output_bufs[i], 1, bytes, fo);\n"
-        "    if (n_written != bytes) {\n"
-        "      fclose(fo);\n"
-        "      for (size_t j = 0; j < n_in; ++j) free(input_bufs[j]);\n"
-        "      for (size_t j = 0; j < n_out; ++j) free(output_bufs[j]);\n"
-        "      free((void*)input_ptrs);\n"
-        "      free(output_ptrs);\n"
-        "      free(input_bufs);\n"
-        "      free(output_bufs);\n"
-        "      return 10;\n"
+        "    k2c_forward(input_ptrs, output_ptrs);\n"
+        "    if (argc == 4 && samples == 0) {\n"
+        "      long iters = strtol(argv[3], NULL, 10);\n"
+        "      if (iters < 1) iters = 1;\n"
+        "      clock_t start = clock();\n"
+        "      for (long it = 0; it < iters; ++it) {\n"
+        "        k2c_forward(input_ptrs, output_ptrs);\n"
+        "      }\n"
+        "      clock_t stop = clock();\n"
+        "      double us = (double)(stop - start) * 1e6 / (double)CLOCKS_PER_SEC / (double)iters;\n"
+        "      printf(\"%.6f\\n\", us);\n"
         "    }\n"
+        "    for (size_t i = 0; i < n_out; ++i) {\n"
+        "      size_t bytes = k2c_io_bytes(&out_desc[i]);\n"
+        "      if (fwrite(output_bufs[i], 1, bytes, fo) != bytes) {\n"
+        "        rc = 10;\n"
+        "        goto done;\n"
+        "      }\n"
+        "    }\n"
+        "    ++samples;\n"
+        "  }\n"
+        "  if (samples == 0) {\n"
+        "    rc = 7;\n"
         "  }\n"
-        "  fclose(fo);\n"
-        "  for (size_t i = 0; i < n_in; ++i) free(input_bufs[i]);\n"
-        "  for (size_t i = 0; i < n_out; ++i) free(output_bufs[i]);\n"
+        "done:\n"
+        "  if (fi) fclose(fi);\n"
+        "  if (fo && fclose(fo) != 0 && rc == 0) rc = 10;\n"
+        "  for (size_t i = 0; input_bufs && i < n_in; ++i) free(input_bufs[i]);\n"
+        "  for (size_t i = 0; output_bufs && i < n_out; ++i) free(output_bufs[i]);\n"
         "  free((void*)input_ptrs);\n"
         "  free(output_ptrs);\n"
         "  free(input_bufs);\n"
         "  free(output_bufs);\n"
-        "  return 0;\n"
+        "  return rc;\n"
         "}\n"
     )
 
 
-def run_generated_c_model(
-    model: ModelIR,
-    source_path: str,
-    header_path: str,
-    input_data: np.ndarray | dict[str, np.ndarray],
+def _default_cache_dir() -> Path:
+    # Per-user location: a shared temp dir would let other local users plant
+    # an executable under a predictable cache key.
+    override = os.environ.get(RUNNER_CACHE_ENV, "").strip()
+    if override:
+        return Path(override).expanduser()
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", "").strip()
+        root = Path(base) if base else Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", "").strip()
+        root = Path(base) if base else Path.home() / ".cache"
+    return root / "keil2cmake" / "runner_cache"
+
+
+def _owned_private(st: os.stat_result) -> bool:
+    # POSIX only: owned by us and not writable by group or others.
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _prepare_cache_dir(cache_root: Path) -> bool:
+    cache_root.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if os.name == "nt":
+        return cache_root.is_dir()
+    st = os.stat(cache_root)
+    return stat.S_ISDIR(st.st_mode) and _owned_private(st)
+
+
+def _trusted_entry(path: Path) -> bool:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISREG(st.st_mode):
+        return False
+    return os.name == "nt" or _owned_private(st)
+
+
+def _compile_command(compiler: str, header: Path, runner_c: Path, source: Path, exe: Path) -> list[str]:
+    # The compiler runs from the model directory, so every path must be absolute.
+    header, runner_c, source, exe = (p.resolve() for p in (header, runner_c, source, exe))
+    cmd = [compiler, *_COMPILE_FLAGS, "-I", str(header.parent), str(runner_c), str(source), "-o", str(exe)]
+    if os.name != "nt":
+        cmd.append("-lm")
+    return cmd
+
+
+def runner_cache_key(compiler: str, source: Path, header: Path) -> str:
+    digest = hashlib.sha256()
+
+    def _feed(tag: str, payload: bytes) -> None:
+        digest.update(tag.encode("utf-8"))
+        digest.update(len(payload).to_bytes(8, "little"))
+        digest.update(payload)
+
+    _feed("version", _RUNNER_CACHE_VERSION.encode("utf-8"))
+    _feed("compiler", compiler.encode("utf-8"))
+    try:
+        st = os.stat(compiler)
+        _feed("compiler-stat", f"{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+    except OSError:
+        pass
+    _feed("flags", " ".join(_COMPILE_FLAGS).encode("utf-8"))
+    _feed("runner", _runner_source(header.name).encode("utf-8"))
+    source_bytes = source.read_bytes()
+    _feed("source", source_bytes)
+    _feed("header", header.read_bytes())
+    # `.incbin` pulls the weight blob in at assembly time, so its bytes are part
+    # of the executable even though the source text does not change with them.
+    for match in _BLOB_DEFINE_RE.finditer(source_bytes.decode("utf-8", errors="replace")):
+        blob = header.parent / match.group(1)
+        _feed("blob", blob.read_bytes() if blob.exists() else b"")
+    return digest.hexdigest()
+
+
+def _prune_cache(cache_dir: Path, keep: int) -> None:
+    try:
+        entries = [p for p in cache_dir.iterdir() if p.is_file() and p.name.startswith("k2c_runner_")]
+    except OSError:
+        return
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in entries[keep:]:
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+
+def _compile_runner(
+    source: Path,
+    header: Path,
+    work_dir: Path,
     *,
-    timeout_sec: float = 30.0,
-) -> CRunResult:
-    source = Path(source_path)
-    header = Path(header_path)
-    if not source.exists() or not header.exists():
-        return CRunResult(ok=False, reason="generated source/header not found")
+    timeout_sec: float,
+    cache_dir: str | None,
+    use_cache: bool,
+) -> tuple[Path | None, str, bool]:
+    compiler = _find_host_compiler()
+    if not compiler:
+        return None, "host compiler not found", False
+
+    suffix = ".exe" if os.name == "nt" else ""
+    cached_exe: Path | None = None
+    if use_cache:
+        cache_root = Path(cache_dir) if cache_dir else _default_cache_dir()
+        try:
+            key = runner_cache_key(compiler, source, header)
+            if not _prepare_cache_dir(cache_root):
+                key = ""
+        except OSError:
+            key = ""
+        if key:
+            cached_exe = cache_root / f"k2c_runner_{key}{suffix}"
+            if _trusted_entry(cached_exe):
+                try:
+                    os.utime(cached_exe)
+                except OSError:
+                    pass
+                return cached_exe, "", True
+
+    runner_c = work_dir / "k2c_runner.c"
+    exe = work_dir / f"k2c_runner{suffix}"
+    runner_c.write_text(_runner_source(header.name), encoding="utf-8")
+    cmd = _compile_command(compiler, header, runner_c, source, exe)
+    try:
+        # Run from the model directory so `.incbin` weight blobs resolve.
+        comp = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=timeout_sec,
+            cwd=str(header.resolve().parent),
+        )
+    except (OSError, ValueError, subprocess.SubprocessError) as exc:
+        return None, f"compile error: {exc}", False
+    if comp.returncode != 0:
+        detail = (comp.stderr or comp.stdout or "").strip().splitlines()
+        short = detail[0] if detail else "unknown compiler error"
+        return None, f"compile failed: {short}", False
+
+    if cached_exe is not None:
+        # Publish atomically: concurrent validators may race on the same key.
+        staging = cached_exe.with_name(f".{cached_exe.name}.{os.getpid()}.tmp")
+        try:
+            shutil.copy2(exe, staging)
+            os.chmod(staging, 0o700)
+            os.replace(staging, cached_exe)
+        except OSError:
+            try:
+                staging.unlink()
+            except OSError:
+                pass
+        else:
+            _prune_cache(cached_exe.parent, RUNNER_CACHE_MAX_ENTRIES)
+    return exe, "", False
 
+
+def _prepare_sample(
+    model: ModelIR,
+    input_data: np.ndarray | dict[str, np.ndarray],
+) -> tuple[dict[str, np.ndarray] | None, str]:
     if isinstance(input_data, dict):
         feed_map = dict(input_data)
     else:
         if len(model.inputs) != 1:
-            return CRunResult(ok=False, reason="multi-input model requires dict input")
+            return None, "multi-input model requires dict input"
         feed_map = {model.inputs[0].name: input_data}
 
-    for tensor in model.inputs + model.outputs:
-        if _dtype_to_numpy(tensor.dtype) is None or _dtype_to_c(tensor.dtype) is None:
-            return CRunResult(ok=False, reason=f"unsupported validation dtype: {tensor.dtype}")
-
-    compiler = _find_host_compiler()
-    if not compiler:
-        return CRunResult(ok=False, reason="host compiler not found")
-
-    prepared_inputs: dict[str, np.ndarray] = {}
+    prepared: dict[str, np.ndarray] = {}
     for tensor in model.inputs:
         if tensor.name not in feed_map:
-            return CRunResult(ok=False, reason=f"missing input data: {tensor.name}")
+            return None, f"missing input data: {tensor.name}"
         np_dtype = _dtype_to_numpy(tensor.dtype)
         assert np_dtype is not None
         shape = list(tensor.shape)
@@ -231,8 +393,34 @@ def run_generated_c_model(
             arr = np.asarray(feed_map[tensor.name], dtype=np_dtype)
             arr = arr.reshape(shape if shape else ())
         except (TypeError, ValueError) as exc:
-            return CRunResult(ok=False, reason=f"input reshape failed for {tensor.name}: {exc}")
-        prepared_inputs[tensor.name] = arr
+            return None, f"input reshape failed for {tensor.name}: {exc}"
+        prepared[tensor.name] = arr
+    return prepared, ""
+
+
+def run_generated_c_model_batch(
+    model: ModelIR,
+    source_path: str,
+    header_path: str,
+    samples: Sequence[np.ndarray | dict[str, np.ndarray]],
+    *,
+    timeout_sec: float = 30.0,
+    bench_iterations: int = 0,
+    cache_dir: str | None = None,
+    use_cache: bool = True,
+) -> CRunBatchResult:
+    if not samples:
+        return CRunBatchResult(ok=False, reason="no input samples")
+    for tensor in model.inputs + model.outputs:
+        if _dtype_to_numpy(tensor.dtype) is None or _dtype_to_c(tensor.dtype) is None:
+            return CRunBatchResult(ok=False, reason=f"unsupported validation dtype: {tensor.dtype}")
+
+    prepared_samples: list[dict[str, np.ndarray]] = []
+    for sample in samples:
+        prepared, reason = _prepare_sample(model, sample)
+        if prepared is None:
+            return CRunBatchResult(ok=False, reason=reason)
+        prepared_samples.append(prepared)
 
     output_specs: list[tuple[str, object, list[int], int]] = []
     for tensor in model.outputs:
@@ -242,70 +430,107 @@ def run_generated_c_model(
         count = int(np.prod(shape)) if shape else 1
         output_specs.append((tensor.name, np_dtype, shape, count))
 
+    source = Path(source_path)
+    header = Path(header_path)
+    if not source.exists() or not header.exists():
+        return CRunBatchResult(ok=False, reason="generated source/header not found")
+
     with tempfile.TemporaryDirectory() as td:
         td_path = Path(td)
+        exe, reason, cached = _compile_runner(
+            source,
+            header,
+            td_path,
+            timeout_sec=timeout_sec,
+            cache_dir=cache_dir,
+            use_cache=use_cache,
+        )
+        if exe is None:
+            return CRunBatchResult(ok=False, reason=reason)
+
         input_bin = td_path / "k2c_in.bin"
         output_bin = td_path / "k2c_out.bin"
-        runner_c = td_path / "k2c_runner.c"
-        exe = td_path / ("k2c_runner.exe" if os.name == "nt" else "k2c_runner")
-
-        runner_c.write_text(
-            _runner_source(header.name),
-            encoding="utf-8",
-        )
         with input_bin.open("wb") as fi:
-            for tensor in model.inputs:
-                prepared_inputs[tensor.name].reshape(-1).tofile(fi)
-
-        cmd = [
-            compiler,
-            "-O2",
-            "-std=c99",
-            "-I",
-            str(header.parent),
-            str(runner_c),
-            str(source),
-            "-o",
-            str(exe),
-        ]
-        if os.name != "nt":
-            cmd.append("-lm")
-
-        try:
-            comp = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_sec)
-        except (OSError, ValueError, subprocess.SubprocessError) as exc:
-            return CRunResult(ok=False, reason=f"compile error: {exc}")
-        if comp.returncode != 0:
-            detail = (comp.stderr or comp.stdout or "").strip().splitlines()
-            short = detail[0] if detail else "unknown compiler error"
-            return CRunResult(ok=False, reason=f"compile failed: {short}")
+            for prepared in prepared_samples:
+                for tensor in model.inputs:
+                    prepared[tensor.name].reshape(-1).tofile(fi)
 
         try:
+            run_cmd = [str(exe), str(input_bin), str(output_bin)]
+            if bench_iterations > 0:
+                run_cmd.append(str(int(bench_iterations)))
             run = subprocess.run(
-                [str(exe), str(input_bin), str(output_bin)],
+                run_cmd,
                 capture_output=True,
                 text=True,
                 timeout=timeout_sec,
             )
         except (OSError, ValueError, subprocess.SubprocessError) as exc:
-            return CRunResult(ok=False, reason=f"run error: {exc}")
+            return CRunBatchResult(ok=False, reason=f"run error: {exc}", cached=cached)
         if run.returncode != 0:
             detail = (run.stderr or run.stdout or "").strip().splitlines()
             short = detail[0] if detail else f"exit code {run.returncode}"
-            return CRunResult(ok=False, reason=f"runner failed: {short}")
+            return CRunBatchResult(ok=False, reason=f"runner failed: {short}", cached=cached)
         if not output_bin.exists():
-            return CRunResult(ok=False, reason="runner output file missing")
+            return CRunBatchResult(ok=False, reason="runner output file missing", cached=cached)
 
-        outputs: dict[str, np.ndarray] = {}
+        batch_outputs: list[dict[str, np.ndarray]] = []
         with output_bin.open("rb") as fo:
-            for name, np_dtype, shape, count in output_specs:
-                out = np.fromfile(fo, dtype=np_dtype, count=count)
-                if out.size != count:
-                    return CRunResult(ok=False, reason=f"runner output size mismatch: {name}")
-                outputs[name] = out.reshape(shape if shape else ())
+            for _ in prepared_samples:
+                outputs: dict[str, np.ndarray] = {}
+                for name, np_dtype, shape, count in output_specs:
+                    out = np.fromfile(fo, dtype=np_dtype, count=count)
+                    if out.size != count:
+                        return CRunBatchResult(
+                            ok=False,
+                            reason=f"runner output size mismatch: {name}",
+                            cached=cached,
+                        )
+                    outputs[name] = out.reshape(shape if shape else ())
+                batch_outputs.append(outputs)
             extra = fo.read(1)
             if extra:
-                return CRunResult(ok=False, reason="runner output has trailing bytes")
+                return CRunBatchResult(ok=False, reason="runner output has trailing bytes", cached=cached)
+
+    elapsed_us = None
+    if bench_iterations > 0:
+        try:
+            elapsed_us = float((run.stdout or "").strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            return CRunBatchResult(ok=False, reason="runner timing output missing", cached=cached)
 
-        first_output = outputs[model.outputs[0].name] if model.outputs else None
-        return CRunResult(ok=True, output=first_output, outputs=outputs)
+    return CRunBatchResult(ok=True, outputs=batch_outputs, elapsed_us=elapsed_us, cached=cached)
+
+
+def run_generated_c_model(
+    model: ModelIR,
+    source_path: str,
+    header_path: str,
+    input_data: np.ndarray | dict[str, np.ndarray],
+    *,
+    timeout_sec: float = 30.0,
+    bench_iterations: int = 0,
+    cache_dir: str | None = None,
+    use_cache: bool = True,
+) -> CRunResult:
+    batch = run_generated_c_model_batch(
+        model,
+        source_path,
+        header_path,
+        [input_data],
+        timeout_sec=timeout_sec,
+        bench_iterations=bench_iterations,
+        cache_dir=cache_dir,
+        use_cache=use_cache,
+    )
+    if not batch.ok or not batch.outputs:
+        return CRunResult(ok=False, reason=batch.reason, cached=batch.cached)
+    outputs = batch.outputs[0]
+    first_output = outputs[model.outputs[0].name] if model.outputs else None
+    return CRunResult(
+        ok=True,
+        output=first_output,
+        outputs=outputs,
+        elapsed_us=batch.elapsed_us,
+        cached=batch.cached,
+    )
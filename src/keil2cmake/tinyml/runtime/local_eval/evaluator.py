@@ -16,28 +16,30 @@ from .families import (
 )
 
 
+def _apply_fused_activation(model: ModelIR, name: str, arr: np.ndarray, act: dict[str, object]) -> np.ndarray:
+    op = act.get("op")
+    if arr.dtype in (np.int8, np.int16):
+        if op != "Relu":
+            raise ValueError(f"Fused {op} is not supported on quantized outputs.")
+        zero = int(model.tensors[name].qzero or 0)
+        return np.maximum(arr.astype(np.int32), zero).astype(arr.dtype)
+    if op == "Relu":
+        return np.maximum(arr, 0.0).astype(arr.dtype)
+    if op == "LeakyRelu":
+        return np.where(arr >= 0.0, arr, float(act["alpha"]) * arr).astype(arr.dtype)
+    if op == "Clip":
+        return np.clip(arr, float(act["min"]), float(act["max"])).astype(arr.dtype)
+    raise ValueError(f"Unsupported fused activation: {op}")
+
+
 def _eval_model(model: ModelIR, inputs: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
     tensors: dict[str, np.ndarray] = {}
     for name, tensor in model.tensors.items():
         if tensor.data is None:
             continue
-        dtype = tensor.dtype
-        if dtype == "float32":
-            arr = np.array(tensor.data, dtype=np.float32)
-        elif dtype == "bool":
-            arr = np.array(tensor.data, dtype=np.bool_)
-        elif dtype == "uint8":
-            arr = np.array(tensor.data, dtype=np.uint8)
-        elif dtype == "int8":
-            arr = np.array(tensor.data, dtype=np.int8)
-        elif dtype == "int16":
-            arr = np.array(tensor.data, dtype=np.int16)
-        elif dtype == "int32":
-            arr = np.array(tensor.data, dtype=np.int32)
-        elif dtype == "int64":
-            arr = np.array(tensor.data, dtype=np.int64)
-        else:
+        if tensor.dtype not in ("float32", "bool", "uint8", "int8", "int16", "int32", "int64"):
             raise ValueError("Unsupported const dtype.")
+        arr = tensor.data
         shape = list(tensor.shape)
         if len(shape) == 0:
             arr = arr.reshape(())
@@ -69,5 +71,8 @@ def _eval_model(model: ModelIR, inputs: dict[str, np.ndarray]) -> dict[str, np.n
                 break
         if not handled:
             raise ValueError(f"Validation: unsupported op {node.op_type}.")
+        fused = node.attrs.get("fused_activation")
+        if fused:
+            tensors[out_name] = _apply_fused_activation(model, out_name, tensors[out_name], fused)
 
     return tensors
@@ -22,6 +22,162 @@ from ..utils import (
     _tensor_dtype,
 )
 
+
+# Smallest float32 used as the MaxPool identity by the generated C kernels; an
+# all-padding window keeps this value instead of -inf.
+_POOL_MAX_INIT = -3.402823466e38
+
+
+def _window_view(
+    xp: np.ndarray,
+    spatial_out: list[int],
+    kernel: list[int],
+    strides: list[int],
+    dilations: list[int],
+) -> np.ndarray:
+    # Read-only (N, C, *out, *kernel) view of a padded NC... tensor.
+    lead = xp.strides[:2]
+    spatial_strides = xp.strides[2:]
+    shape = (*xp.shape[:2], *spatial_out, *kernel)
+    view_strides = (
+        *lead,
+        *(st * s for st, s in zip(spatial_strides, strides)),
+        *(st * d for st, d in zip(spatial_strides, dilations)),
+    )
+    return np.lib.stride_tricks.as_strided(xp, shape=shape, strides=view_strides, writeable=False)
+
+
+def _pad_spatial(
+    x: np.ndarray,
+    pads: list[int],
+    spatial_out: list[int],
+    kernel: list[int],
+    strides: list[int],
+    dilations: list[int],
+    fill: float,
+) -> np.ndarray:
+    spatial = x.ndim - 2
+    widths = [(0, 0), (0, 0)]
+    for i in range(spatial):
+        need = (spatial_out[i] - 1) * strides[i] + dilations[i] * (kernel[i] - 1) + 1
+        end = max(int(pads[i + spatial]), need - int(pads[i]) - int(x.shape[2 + i]))
+        widths.append((int(pads[i]), end))
+    if all(lo == 0 and hi == 0 for lo, hi in widths):
+        return x
+    return np.pad(x, widths, mode="constant", constant_values=fill)
+
+
+def _conv2d_nchw(
+    x: np.ndarray,
+    w: np.ndarray,
+    b: np.ndarray | None,
+    strides: list[int],
+    pads: list[int],
+    dilations: list[int],
+    groups: int,
+) -> np.ndarray:
+    n, c_in = int(x.shape[0]), int(x.shape[1])
+    m, c_per_g, k_h, k_w = (int(v) for v in w.shape)
+    strides = [int(v) for v in strides]
+    dilations = [int(v) for v in dilations]
+    pads = [int(v) for v in pads]
+    out_h = _conv_out_dim(int(x.shape[2]), k_h, strides[0], pads[0], pads[2], dilations[0])
+    out_w = _conv_out_dim(int(x.shape[3]), k_w, strides[1], pads[1], pads[3], dilations[1])
+    # Accumulate in double like the scalar reference did, whatever the order.
+    xp = _pad_spatial(
+        x.astype(np.float64, copy=False),
+        pads,
+        [out_h, out_w],
+        [k_h, k_w],
+        strides,
+        dilations,
+        0.0,
+    )
+    cols = _window_view(xp, [out_h, out_w], [k_h, k_w], strides, dilations)
+    cols = cols.reshape(n, groups, c_per_g, out_h, out_w, k_h, k_w)
+    wg = w.astype(np.float64, copy=False).reshape(groups, m // groups, c_per_g, k_h, k_w)
+    out = np.einsum("ngchwij,gocij->ngohw", cols, wg, optimize=True).reshape(n, m, out_h, out_w)
+    if b is not None:
+        out = out + np.asarray(b, dtype=np.float64).reshape(1, m, 1, 1)
+    return out
+
+
+def _conv_transpose2d_nchw(
+    x: np.ndarray,
+    w: np.ndarray,
+    strides: list[int],
+    pads: list[int],
+    dilations: list[int],
+    output_padding: list[int],
+    groups: int,
+) -> np.ndarray:
+    n, c_in, h, w_in = (int(v) for v in x.shape)
+    _, c_out_per_group, k_h, k_w = (int(v) for v in w.shape)
+    stride_h, stride_w = strides
+    dil_h, dil_w = dilations
+    pad_h0, pad_w0, pad_h1, pad_w1 = pads
+    out_h = (h - 1) * stride_h - pad_h0 - pad_h1 + dil_h * (k_h - 1) + output_padding[0] + 1
+    out_w = (w_in - 1) * stride_w - pad_w0 - pad_w1 + dil_w * (k_w - 1) + output_padding[1] + 1
+    ic_per_group = c_in // groups
+    # Every input pixel scatters a k_h x k_w patch; compute all taps at once and
+    # add each tap as a strided slice of the un-cropped output.
+    xg = x.astype(np.float64, copy=False).reshape(n, groups, ic_per_group, h, w_in)
+    wg = w.astype(np.float64, copy=False).reshape(groups, ic_per_group, c_out_per_group, k_h, k_w)
+    taps = np.einsum("ngchw,gcoij->ngoijhw", xg, wg, optimize=True)
+    taps = taps.reshape(n, groups * c_out_per_group, k_h, k_w, h, w_in)
+    full_h = max(pad_h0 + out_h, (h - 1) * stride_h + dil_h * (k_h - 1) + 1)
+    full_w = max(pad_w0 + out_w, (w_in - 1) * stride_w + dil_w * (k_w - 1) + 1)
+    full = np.zeros((n, groups * c_out_per_group, full_h, full_w), dtype=np.float64)
+    for kh in range(k_h):
+        h0 = kh * dil_h
+        for kw in range(k_w):
+            w0 = kw * dil_w
+            full[
+                :,
+                :,
+                h0 : h0 + (h - 1) * stride_h + 1 : stride_h,
+                w0 : w0 + (w_in - 1) * stride_w + 1 : stride_w,
+            ] += taps[:, :, kh, kw]
+    h_lo = max(pad_h0, 0)
+    w_lo = max(pad_w0, 0)
+    return np.ascontiguousarray(full[:, :, h_lo : h_lo + out_h, w_lo : w_lo + out_w])
+
+
+def _pool_nd(
+    op: str,
+    x: np.ndarray,
+    kernel: list[int],
+    strides: list[int],
+    pads: list[int],
+    dilations: list[int],
+    spatial_out: list[int],
+    p: int,
+    count_include_pad: int,
+) -> np.ndarray:
+    spatial = len(kernel)
+    k_axes = tuple(range(2 + spatial, 2 + 2 * spatial))
+    x_d = x.astype(np.float64, copy=False)
+    if op == "MaxPool":
+        xp = _pad_spatial(x_d, pads, spatial_out, kernel, strides, dilations, -np.inf)
+        win = _window_view(xp, spatial_out, kernel, strides, dilations)
+        out = np.maximum(np.max(win, axis=k_axes), _POOL_MAX_INIT)
+        return out.astype(np.float32)
+
+    src = np.abs(x_d) ** p if op == "LpPool" else x_d
+    xp = _pad_spatial(src, pads, spatial_out, kernel, strides, dilations, 0.0)
+    acc = np.sum(_window_view(xp, spatial_out, kernel, strides, dilations), axis=k_axes)
+    if op == "LpPool":
+        return (acc ** (1.0 / float(p))).astype(np.float32)
+    if count_include_pad == 1:
+        denom = np.full(spatial_out, float(np.prod(kernel)))
+    else:
+        ones = np.ones((1, 1, *x.shape[2:]), dtype=np.float64)
+        mask = _pad_spatial(ones, pads, spatial_out, kernel, strides, dilations, 0.0)
+        denom = np.sum(_window_view(mask, spatial_out, kernel, strides, dilations), axis=k_axes)[0, 0]
+    out = np.divide(acc, denom, out=np.zeros_like(acc), where=denom > 0)
+    return out.astype(np.float32)
+
+
 def handle_nn_family(
     model: ModelIR,
     node,
@@ -356,67 +512,34 @@ def handle_nn_family(
             raise ValueError("Conv channel mismatch.")
         if m % groups != 0:
             raise ValueError("Conv output channels must be divisible by groups.")
-        oc_per_group = m // groups
         if len(pads) == 2:
             pads = [pads[0], pads[1], pads[0], pads[1]]
-        stride_h, stride_w = strides
-        pad_h0, pad_w0, pad_h1, pad_w1 = pads
-        dil_h, dil_w = dilations
-        out_h = (h + pad_h0 + pad_h1 - dil_h * (k_h - 1) - 1) // stride_h + 1
-        out_w = (w_in + pad_w0 + pad_w1 - dil_w * (k_w - 1) - 1) // stride_w + 1
-        out = np.zeros((n, m, out_h, out_w), dtype=np.float32)
         if out_dtype in ("int8", "int16"):
             sx, zx = _qparams(model, node.inputs[0])
             sw, zw = _qparams(model, node.inputs[1])
             so, zo = _qparams(model, out_name)
-            for ni in range(n):
-                for oc in range(m):
-                    for oh in range(out_h):
-                        for ow in range(out_w):
-                            acc = 0.0
-                            if b is not None:
-                                b_dtype = _tensor_dtype(model.tensors[node.inputs[2]])
-                                if b_dtype == "float32":
-                                    acc = float(b[oc])
-                                elif b_dtype in ("int32", "int64"):
-                                    acc = float(b[oc]) * (sx * sw)
-                                else:
-                                    sb, zb = _qparams(model, node.inputs[2])
-                                    acc = float(b[oc] - zb) * sb
-                            g = oc // oc_per_group
-                            ic_begin = g * c_per_g
-                            for ic_local in range(c_per_g):
-                                ic = ic_begin + ic_local
-                                for kh in range(k_h):
-                                    for kw in range(k_w):
-                                        in_h = oh * stride_h + kh * dil_h - pad_h0
-                                        in_w = ow * stride_w + kw * dil_w - pad_w0
-                                        if 0 <= in_h < h and 0 <= in_w < w_in:
-                                            rx = (float(x[ni, ic, in_h, in_w]) - zx) * sx
-                                            rw = (float(w[oc, ic_local, kh, kw]) - zw) * sw
-                                            acc += rx * rw
-                            out[ni, oc, oh, ow] = acc
+            # Dequantize in double before padding: out-of-bounds taps contribute
+            # nothing rather than a dequantized zero point.
+            x_f = (x.astype(np.float64) - float(zx)) * float(sx)
+            w_f = (w.astype(np.float64) - float(zw)) * float(sw)
+            b_f = None
+            if b is not None:
+                b_dtype = _tensor_dtype(model.tensors[node.inputs[2]])
+                if b_dtype == "float32":
+                    b_f = b.astype(np.float64)
+                elif b_dtype in ("int32", "int64"):
+                    b_f = b.astype(np.float64) * (sx * sw)
+                else:
+                    sb, zb = _qparams(model, node.inputs[2])
+                    b_f = (b.astype(np.float64) - float(zb)) * float(sb)
+            out = _conv2d_nchw(x_f, w_f, b_f, strides, pads, dilations, groups).astype(np.float32)
             tensors[out_name] = _quantize_float(out, so, zo, out_dtype)
         else:
-            for ni in range(n):
-                for oc in range(m):
-                    for oh in range(out_h):
-                        for ow in range(out_w):
-                            acc = float(b[oc]) if b is not None else 0.0
-                            g = oc // oc_per_group
-                            ic_begin = g * c_per_g
-                            for ic_local in range(c_per_g):
-                                ic = ic_begin + ic_local
-                                for kh in range(k_h):
-                                    for kw in range(k_w):
-                                        in_h = oh * stride_h + kh * dil_h - pad_h0
-                                        in_w = ow * stride_w + kw * dil_w - pad_w0
-                                        if 0 <= in_h < h and 0 <= in_w < w_in:
-                                            acc += x[ni, ic, in_h, in_w] * w[oc, ic_local, kh, kw]
-                            out[ni, oc, oh, ow] = acc
-            tensors[out_name] = out
+            b_f = b.astype(np.float64) if b is not None else None
+            out = _conv2d_nchw(x, w, b_f, strides, pads, dilations, groups)
+            tensors[out_name] = out.astype(np.float32)
         return True
-    
+
 
     if op == "ConvTranspose":
         x = ins[0]
@@ -441,15 +564,7 @@ def handle_nn_family(
             pads = [pads[0], pads[1], pads[0], pads[1]]
         if len(strides) != 2 or len(dilations) != 2 or len(pads) != 4 or len(output_padding) != 2:
             raise ValueError("ConvTranspose attributes shape mismatch.")
-        stride_h, stride_w = [int(v) for v in strides]
-        dil_h, dil_w = [int(v) for v in dilations]
-        pad_h0, pad_w0, pad_h1, pad_w1 = [int(v) for v in pads]
-        out_pad_h, out_pad_w = [int(v) for v in output_padding]
-        out_h = (h - 1) * stride_h - pad_h0 - pad_h1 + dil_h * (k_h - 1) + out_pad_h + 1
-        out_w = (w_in - 1) * stride_w - pad_w0 - pad_w1 + dil_w * (k_w - 1) + out_pad_w + 1
         c_out = c_out_per_group * groups
-        ic_per_group = c_in // groups
-        out = np.zeros((n, c_out, out_h, out_w), dtype=np.float32)
         quant_mode = out_dtype in ("int8", "int16")
         if quant_mode:
             if _tensor_dtype(model.tensors[node.inputs[0]]) != out_dtype:
@@ -464,7 +579,16 @@ def handle_nn_family(
         else:
             x_f = x.astype(np.float32, copy=False)
             w_f = w.astype(np.float32, copy=False)
-    
+
+        out = _conv_transpose2d_nchw(
+            x_f,
+            w_f,
+            [int(v) for v in strides],
+            [int(v) for v in pads],
+            [int(v) for v in dilations],
+            [int(v) for v in output_padding],
+            groups,
+        )
         if b is not None:
             b_dtype = _tensor_dtype(model.tensors[node.inputs[2]])
             if quant_mode:
@@ -480,26 +604,12 @@ def handle_nn_family(
             else:
                 b_f = b.astype(np.float32)
             out += b_f.reshape(1, c_out, 1, 1)
-        for ni in range(n):
-            for ic in range(c_in):
-                g = ic // ic_per_group
-                oc0 = g * c_out_per_group
-                oc1 = oc0 + c_out_per_group
-                for ih in range(h):
-                    for iw in range(w_in):
-                        xv = float(x_f[ni, ic, ih, iw])
-                        for kh in range(k_h):
-                            for kw in range(k_w):
-                                oh = ih * stride_h + kh * dil_h - pad_h0
-                                ow = iw * stride_w + kw * dil_w - pad_w0
-                                if 0 <= oh < out_h and 0 <= ow < out_w:
-                                    out[ni, oc0:oc1, oh, ow] += xv * w_f[ic, :, kh, kw]
         if quant_mode:
-            tensors[out_name] = _quantize_float(out, so, zo, out_dtype)
+            tensors[out_name] = _quantize_float(out.astype(np.float32), so, zo, out_dtype)
         else:
             tensors[out_name] = out.astype(np.float32)
         return True
-    
+
 
     if op in ("MaxPool", "AveragePool", "LpPool"):
         x = ins[0]
@@ -527,8 +637,7 @@ def handle_nn_family(
         count_include_pad = int(node.attrs.get("count_include_pad", 0))
         if op == "AveragePool" and count_include_pad not in (0, 1):
             raise ValueError("AveragePool count_include_pad must be 0 or 1.")
-    
-        n, c = x.shape[0], x.shape[1]
+
         spatial_in = [int(v) for v in x.shape[2:]]
         spatial_out: list[int] = []
         for i in range(spatial):
@@ -543,88 +652,17 @@ def handle_nn_family(
             if out_dim <= 0:
                 raise ValueError("Pool output shape mismatch.")
             spatial_out.append(out_dim)
-        out_shape = (int(n), int(c), *spatial_out)
         out_dtype = model.tensors[out_name].dtype
-        kernel_size = int(np.prod(kernel)) if kernel else 1
         if out_dtype in ("int8", "int16"):
             sa, za = _qparams(model, node.inputs[0])
             so, zo = _qparams(model, out_name)
             x_f = _dequantize_int(x, sa, za)
-            out_f = np.zeros(out_shape, dtype=np.float32)
-            for ni in range(n):
-                for ch in range(c):
-                    for out_coord in np.ndindex(*spatial_out):
-                            if op == "MaxPool":
-                                acc = -3.402823466e38
-                            else:
-                                acc = 0.0
-                            count = 0
-                            for k_coord in np.ndindex(*kernel):
-                                in_coord = [
-                                    int(out_coord[s]) * int(strides[s])
-                                    + int(k_coord[s]) * int(dilations[s])
-                                    - int(pads[s])
-                                    for s in range(spatial)
-                                ]
-                                if not all(0 <= in_coord[s] < spatial_in[s] for s in range(spatial)):
-                                    continue
-                                idx = (ni, ch, *in_coord)
-                                v = float(x_f[idx])
-                                if op == "MaxPool":
-                                    if v > acc:
-                                        acc = v
-                                elif op == "AveragePool":
-                                    acc += v
-                                    count += 1
-                                else:
-                                    acc += abs(v) ** p
-                                    count += 1
-                            if op == "AveragePool":
-                                denom = float(kernel_size if count_include_pad == 1 else count)
-                                acc = acc / denom if denom > 0 else 0.0
-                            elif op == "LpPool":
-                                acc = acc ** (1.0 / float(p))
-                            out_f[(ni, ch, *out_coord)] = acc
+            out_f = _pool_nd(op, x_f, kernel, strides, pads, dilations, spatial_out, p, count_include_pad)
             tensors[out_name] = _quantize_float(out_f, so, zo, out_dtype)
             return True
-        out = np.zeros(out_shape, dtype=np.float32)
-        for ni in range(n):
-            for ch in range(c):
-                for out_coord in np.ndindex(*spatial_out):
-                        if op == "MaxPool":
-                            acc = -3.402823466e38
-                        else:
-                            acc = 0.0
-                        count = 0
-                        for k_coord in np.ndindex(*kernel):
-                            in_coord = [
-                                int(out_coord[s]) * int(strides[s])
-                                + int(k_coord[s]) * int(dilations[s])
-                                - int(pads[s])
-                                for s in range(spatial)
-                            ]
-                            if not all(0 <= in_coord[s] < spatial_in[s] for s in range(spatial)):
-                                continue
-                            idx = (ni, ch, *in_coord)
-                            v = float(x[idx])
-                            if op == "MaxPool":
-                                if v > acc:
-                                    acc = v
-                            elif op == "AveragePool":
-                                acc += v
-                                count += 1
-                            else:
-                                acc += abs(v) ** p
-                                count += 1
-                        if op == "AveragePool":
-                            denom = float(kernel_size if count_include_pad == 1 else count)
-                            acc = acc / denom if denom > 0 else 0.0
-                        elif op == "LpPool":
-                            acc = acc ** (1.0 / float(p))
-                        out[(ni, ch, *out_coord)] = acc
-        tensors[out_name] = out
+        tensors[out_name] = _pool_nd(op, x, kernel, strides, pads, dilations, spatial_out, p, count_include_pad)
         return True
-    
+
 
     if op == "GlobalAveragePool":
         x = ins[0]
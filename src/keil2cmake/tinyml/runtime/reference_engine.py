@@ -48,88 +48,133 @@ def has_reference_backend() -> bool:
     return ort is not None or ReferenceEvaluator is not None
 
 
-def run_reference_output(
-    model_path: str,
-    input_data: dict[str, np.ndarray],
-    output_names: list[str],
-    *,
-    allow_reference_fallback: bool = True,
-) -> tuple[dict[str, np.ndarray] | None, str, str]:
-    def _map_outputs(
-        outputs: list[np.ndarray] | tuple[np.ndarray, ...],
-        names: list[str],
-    ) -> tuple[dict[str, np.ndarray] | None, str]:
-        if not outputs:
-            return None, "reference output missing"
-        if len(outputs) != len(names):
-            return None, "reference output count mismatch"
-        return {name: np.array(val) for name, val in zip(names, outputs)}, ""
-
-    def _run_ort_with_ir_compat() -> tuple[dict[str, np.ndarray] | None, str]:
+def _map_outputs(
+    outputs: list[np.ndarray] | tuple[np.ndarray, ...],
+    names: list[str],
+) -> tuple[dict[str, np.ndarray] | None, str]:
+    if not outputs:
+        return None, "reference output missing"
+    if len(outputs) != len(names):
+        return None, "reference output count mismatch"
+    return {name: np.array(val) for name, val in zip(names, outputs)}, ""
+
+
+def _is_ir_version_error(exc: BaseException) -> bool:
+    msg = str(exc).lower()
+    return "unsupported model ir version" in msg or "max supported ir version" in msg
+
+
+class ReferenceSession:
+    # Holds one onnxruntime session (or ReferenceEvaluator) per model so that
+    # repeated runs only pay graph construction and optimization once.
+    def __init__(
+        self,
+        model_path: str,
+        output_names: list[str],
+        *,
+        allow_reference_fallback: bool = True,
+        intra_op_threads: int = 0,
+    ) -> None:
+        self.model_path = model_path
+        self.output_names = list(output_names)
+        self.allow_reference_fallback = allow_reference_fallback
+        self._intra_op_threads = int(intra_op_threads)
+        self._ort_sess = None
+        self._ort_engine = "onnxruntime"
+        self._ort_reason = ""
+        self._ref_eval = None
+        self._ref_names: list[str] = []
+        self._open_ort()
+
+    def _session_options(self):
+        opts = ort.SessionOptions()  # type: ignore[union-attr]
+        if self._intra_op_threads > 0:
+            opts.intra_op_num_threads = self._intra_op_threads
+        return opts
+
+    def _open_ort(self) -> None:
+        if ort is None:
+            self._ort_reason = "onnxruntime unavailable"
+            return
+        try:
+            self._ort_sess = ort.InferenceSession(
+                self.model_path,
+                sess_options=self._session_options(),
+                providers=["CPUExecutionProvider"],
+            )
+        except _REFERENCE_EXEC_ERRORS as exc:
+            self._ort_reason = f"onnxruntime error: {exc}"
+            if _is_ir_version_error(exc):
+                compat_reason = self._open_ort_ir_compat()
+                if self._ort_sess is not None:
+                    self._ort_reason = ""
+                elif compat_reason:
+                    self._ort_reason = f"{self._ort_reason}; {compat_reason}"
+
+    def _open_ort_ir_compat(self) -> str:
         # Some environments ship older onnxruntime builds that reject newer IR.
         try:
-            compat_model = onnx.load(model_path)
+            compat_model = onnx.load(self.model_path)
             ir_version = int(getattr(compat_model, "ir_version", 0) or 0)
             if ir_version <= 9:
-                return None, "ir-compat retry skipped"
+                return "ir-compat retry skipped"
             compat_model.ir_version = 9
-            sess = ort.InferenceSession(  # type: ignore[union-attr]
+            self._ort_sess = ort.InferenceSession(  # type: ignore[union-attr]
                 compat_model.SerializeToString(),
+                sess_options=self._session_options(),
                 providers=["CPUExecutionProvider"],
             )
-            outputs = sess.run(output_names or None, input_data)
-            names = output_names or [o.name for o in sess.get_outputs()]
-            mapped, reason = _map_outputs(outputs, names)
-            if mapped is None:
-                return None, reason
-            return mapped, ""
         except _REFERENCE_EXEC_ERRORS as compat_exc:
-            return None, f"ir-compat retry failed: {compat_exc}"
+            return f"ir-compat retry failed: {compat_exc}"
+        self._ort_engine = "onnxruntime(ir-compat)"
+        return ""
 
-    ort_reason = ""
-    if ort is not None:
-        try:
-            sess = ort.InferenceSession(
-                model_path,
-                providers=["CPUExecutionProvider"],
-            )
-            outputs = sess.run(output_names or None, input_data)
-            names = output_names or [o.name for o in sess.get_outputs()]
-            mapped, reason = _map_outputs(outputs, names)
-            if mapped is None:
-                return None, "onnxruntime", reason
-            return mapped, "onnxruntime", ""
-        except _REFERENCE_EXEC_ERRORS as exc:
-            ort_reason = f"onnxruntime error: {exc}"
-            msg = str(exc).lower()
-            if "unsupported model ir version" in msg or "max supported ir version" in msg:
-                compat_outputs, compat_reason = _run_ort_with_ir_compat()
-                if compat_outputs is not None:
-                    return compat_outputs, "onnxruntime(ir-compat)", ""
-                if compat_reason:
-                    ort_reason = f"{ort_reason}; {compat_reason}"
-    else:
-        ort_reason = "onnxruntime unavailable"
-
-    if not allow_reference_fallback:
-        return None, "onnxruntime", ort_reason or "onnxruntime output missing"
-
-    if ReferenceEvaluator is not None:
-        try:
-            onnx_model = onnx.load(model_path)
-            ref_eval = ReferenceEvaluator(onnx_model)
-            outputs = ref_eval.run(output_names or None, input_data)
-            if outputs:
-                names = output_names
-                if not names:
-                    names = [v.name for v in onnx_model.graph.output]
-                if len(outputs) != len(names):
-                    return None, "onnx.reference", "reference output count mismatch"
-                mapped = {name: np.array(val) for name, val in zip(names, outputs)}
-                return mapped, "onnx.reference", ""
-            return None, "onnx.reference", "reference output missing"
-        except _REFERENCE_EXEC_ERRORS as exc:
-            if ort_reason:
-                return None, "onnx.reference", f"{ort_reason}; reference eval error: {exc}"
-            return None, "onnx.reference", f"reference eval error: {exc}"
-    return None, "", ort_reason
+    def run(self, input_data: dict[str, np.ndarray]) -> tuple[dict[str, np.ndarray] | None, str, str]:
+        ort_reason = self._ort_reason
+        if self._ort_sess is not None:
+            try:
+                outputs = self._ort_sess.run(self.output_names or None, input_data)
+                names = self.output_names or [o.name for o in self._ort_sess.get_outputs()]
+                mapped, reason = _map_outputs(outputs, names)
+                if mapped is None:
+                    return None, self._ort_engine, reason
+                return mapped, self._ort_engine, ""
+            except _REFERENCE_EXEC_ERRORS as exc:
+                ort_reason = f"onnxruntime error: {exc}"
+
+        if not self.allow_reference_fallback:
+            return None, "onnxruntime", ort_reason or "onnxruntime output missing"
+
+        if ReferenceEvaluator is not None:
+            try:
+                if self._ref_eval is None:
+                    onnx_model = onnx.load(self.model_path)
+                    self._ref_eval = ReferenceEvaluator(onnx_model)
+                    self._ref_names = self.output_names or [v.name for v in onnx_model.graph.output]
+                outputs = self._ref_eval.run(self.output_names or None, input_data)
+                if outputs:
+                    if len(outputs) != len(self._ref_names):
+                        return None, "onnx.reference", "reference output count mismatch"
+                    mapped = {name: np.array(val) for name, val in zip(self._ref_names, outputs)}
+                    return mapped, "onnx.reference", ""
+                return None, "onnx.reference", "reference output missing"
+            except _REFERENCE_EXEC_ERRORS as exc:
+                if ort_reason:
+                    return None, "onnx.reference", f"{ort_reason}; reference eval error: {exc}"
+                return None, "onnx.reference", f"reference eval error: {exc}"
+        return None, "", ort_reason
+
+
+def run_reference_output(
+    model_path: str,
+    input_data: dict[str, np.ndarray],
+    output_names: list[str],
+    *,
+    allow_reference_fallback: bool = True,
+) -> tuple[dict[str, np.ndarray] | None, str, str]:
+    session = ReferenceSession(
+        model_path,
+        output_names,
+        allow_reference_fallback=allow_reference_fallback,
+    )
+    return session.run(input_data)
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+import math
+import multiprocessing
+import os
+
+import numpy as np
+
+from ..converter.ir import ModelIR
+from .c_runner import _dtype_to_numpy, run_generated_c_model_batch
+from .local_evaluator import _eval_model
+from .reference_engine import ReferenceSession, has_reference_backend
+from .validation_pipeline import build_validation_inputs, compare_outputs
+
+
+DEFAULT_VALIDATION_SAMPLES = 32
+# Spawning a worker costs an interpreter plus an onnxruntime import, so only
+# fan out once each worker has a reasonable share of samples.
+SAMPLES_PER_WORKER = 32
+PERCENTILES = (50.0, 90.0, 99.0)
+FLOAT_ERROR_BINS = (0.0, 1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, math.inf)
+INT_ERROR_BINS = (0.0, 1.0, 2.0, 3.0, 4.0, 8.0, 16.0, math.inf)
+_INT_DTYPES = ("uint8", "int8", "int16", "int32", "int64", "bool")
+
+
+@dataclass
+class OutputErrorStats:
+    name: str
+    max_abs: float = 0.0
+    mean_abs: float = 0.0
+    percentiles: dict[str, float] = field(default_factory=dict)
+    histogram: list[tuple[float, float, int]] = field(default_factory=list)
+    top1_agreement: float | None = None
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "name": self.name,
+            "max_abs": self.max_abs,
+            "mean_abs": self.mean_abs,
+            "percentiles": dict(self.percentiles),
+            "histogram": [
+                {"lo": lo, "hi": hi if math.isfinite(hi) else None, "count": count}
+                for lo, hi, count in self.histogram
+            ],
+            "top1_agreement": self.top1_agreement,
+        }
+
+
+@dataclass
+class StatisticalValidationResult:
+    status: str
+    reason: str = ""
+    max_abs: float = 0.0
+    max_rel: float = 0.0
+    engine: str = ""
+    samples: int = 0
+    failed_samples: int = 0
+    outputs: dict[str, OutputErrorStats] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "status": self.status,
+            "reason": self.reason,
+            "engine": self.engine,
+            "samples": self.samples,
+            "failed_samples": self.failed_samples,
+            "max_abs": self.max_abs,
+            "max_rel": self.max_rel,
+            "outputs": [stats.to_dict() for stats in self.outputs.values()],
+        }
+
+
+def load_validation_dataset(model: ModelIR, path: str) -> tuple[list[dict[str, np.ndarray]] | None, str]:
+    try:
+        with np.load(path, allow_pickle=False) as archive:
+            arrays = {key: np.asarray(archive[key]) for key in archive.files}
+    except (OSError, ValueError) as exc:
+        return None, f"dataset load failed: {exc}"
+    if len(model.inputs) == 1 and len(arrays) == 1 and model.inputs[0].name not in arrays:
+        arrays = {model.inputs[0].name: next(iter(arrays.values()))}
+
+    stacked: dict[str, np.ndarray] = {}
+    count: int | None = None
+    for tensor in model.inputs:
+        if tensor.name not in arrays:
+            return None, f"dataset missing input: {tensor.name}"
+        np_dtype = _dtype_to_numpy(tensor.dtype)
+        if np_dtype is None:
+            return None, f"input dtype unsupported: {tensor.dtype}"
+        arr = arrays[tensor.name]
+        shape = tuple(int(d) for d in tensor.shape)
+        if arr.shape == shape:
+            arr = arr.reshape((1,) + shape)
+        elif arr.shape[1:] == shape:
+            pass
+        elif shape and shape[0] == 1 and arr.shape[1:] == shape[1:]:
+            # Samples stacked along the model's unit batch dimension.
+            arr = arr.reshape((arr.shape[0],) + shape)
+        else:
+            return None, f"dataset shape mismatch for {tensor.name}: {list(arr.shape)} vs {list(shape)}"
+        if count is not None and arr.shape[0] != count:
+            return None, "dataset inputs have different sample counts"
+        count = int(arr.shape[0])
+        stacked[tensor.name] = arr.astype(np_dtype, copy=False)
+
+    if not count:
+        return None, "dataset is empty"
+    return [{name: arr[i] for name, arr in stacked.items()} for i in range(count)], ""
+
+
+def build_validation_samples(
+    model: ModelIR,
+    *,
+    num_samples: int,
+    seed: int,
+    max_input_elems: int,
+) -> tuple[list[dict[str, np.ndarray]] | None, str]:
+    samples: list[dict[str, np.ndarray]] = []
+    for idx in range(max(1, int(num_samples))):
+        sample, reason = build_validation_inputs(model, seed=seed + idx, max_input_elems=max_input_elems)
+        if sample is None:
+            return None, reason
+        samples.append(sample)
+    return samples, ""
+
+
+_WORKER_SESSION: ReferenceSession | None = None
+
+
+def _init_reference_worker(model_path: str, output_names: list[str], allow_reference_fallback: bool) -> None:
+    global _WORKER_SESSION
+    _WORKER_SESSION = ReferenceSession(
+        model_path,
+        output_names,
+        allow_reference_fallback=allow_reference_fallback,
+        intra_op_threads=1,
+    )
+
+
+def _run_reference_chunk(
+    samples: list[dict[str, np.ndarray]],
+) -> list[tuple[dict[str, np.ndarray] | None, str, str]]:
+    assert _WORKER_SESSION is not None
+    return [_WORKER_SESSION.run(sample) for sample in samples]
+
+
+def _resolve_workers(workers: int | None, num_samples: int) -> int:
+    if workers is not None and workers > 0:
+        return min(int(workers), num_samples)
+    cpus = os.cpu_count() or 1
+    return max(1, min(cpus, num_samples // SAMPLES_PER_WORKER))
+
+
+def _chunk(samples: list[dict[str, np.ndarray]], parts: int) -> list[list[dict[str, np.ndarray]]]:
+    size = max(1, math.ceil(len(samples) / parts))
+    return [samples[i : i + size] for i in range(0, len(samples), size)]
+
+
+def _error_stats(
+    name: str,
+    dtype: str,
+    preds: list[np.ndarray],
+    refs: list[np.ndarray],
+) -> OutputErrorStats:
+    if dtype in _INT_DTYPES:
+        pred_all = np.concatenate([np.asarray(p).astype(np.int64).reshape(-1) for p in preds])
+        ref_all = np.concatenate([np.asarray(r).astype(np.int64).reshape(-1) for r in refs])
+        err = np.abs(pred_all - ref_all).astype(np.float64)
+        edges = np.asarray(INT_ERROR_BINS)
+    else:
+        pred_all = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1) for p in preds])
+        ref_all = np.concatenate([np.asarray(r, dtype=np.float64).reshape(-1) for r in refs])
+        err = np.abs(pred_all - ref_all)
+        edges = np.asarray(FLOAT_ERROR_BINS)
+
+    stats = OutputErrorStats(name=name)
+    if err.size:
+        stats.max_abs = float(np.max(err))
+        stats.mean_abs = float(np.mean(err))
+        values = np.percentile(err, PERCENTILES)
+        stats.percentiles = {f"p{int(q)}": float(v) for q, v in zip(PERCENTILES, values)}
+    bucket = np.searchsorted(edges, err, side="right") - 1
+    counts = np.bincount(np.clip(bucket, 0, len(edges) - 2), minlength=len(edges) - 1)
+    stats.histogram = [
+        (float(edges[i]), float(edges[i + 1]), int(counts[i])) for i in range(len(edges) - 1)
+    ]
+
+    shape = np.asarray(refs[0]).shape
+    if dtype != "bool" and len(shape) >= 1 and shape[-1] > 1:
+        classes = shape[-1]
+        pred_top = np.concatenate([np.argmax(np.asarray(p).reshape(-1, classes), axis=-1) for p in preds])
+        ref_top = np.concatenate([np.argmax(np.asarray(r).reshape(-1, classes), axis=-1) for r in refs])
+        stats.top1_agreement = float(np.mean(pred_top == ref_top)) if ref_top.size else None
+    return stats
+
+
+def _run_reference_outputs(
+    model_path: str,
+    samples: list[dict[str, np.ndarray]],
+    output_names: list[str],
+    *,
+    workers: int,
+    allow_reference_fallback: bool,
+    on_submitted=None,
+) -> list[tuple[dict[str, np.ndarray] | None, str, str]]:
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_reference_worker,
+                initargs=(model_path, output_names, allow_reference_fallback),
+            ) as pool:
+                futures = [pool.submit(_run_reference_chunk, chunk) for chunk in _chunk(samples, workers)]
+                if on_submitted is not None:
+                    on_submitted()
+                    on_submitted = None
+                results: list[tuple[dict[str, np.ndarray] | None, str, str]] = []
+                for future in futures:
+                    results.extend(future.result())
+                return results
+        except (OSError, BrokenProcessPool):
+            pass
+
+    if on_submitted is not None:
+        on_submitted()
+    session = ReferenceSession(
+        model_path,
+        output_names,
+        allow_reference_fallback=allow_reference_fallback,
+    )
+    return [session.run(sample) for sample in samples]
+
+
+def validate_model_statistics(
+    model: ModelIR,
+    model_path: str,
+    *,
+    source_path: str = "",
+    header_path: str = "",
+    samples: list[dict[str, np.ndarray]] | None = None,
+    dataset_path: str = "",
+    num_samples: int = DEFAULT_VALIDATION_SAMPLES,
+    seed: int = 0,
+    workers: int | None = None,
+    max_input_elems: int = 200000,
+    rtol: float = 1e-3,
+    atol: float = 1e-4,
+    int8_atol: float = 1.0,
+    int16_atol: float = 1.0,
+    max_failure_rate: float = 0.0,
+    allow_reference_fallback: bool = True,
+) -> StatisticalValidationResult:
+    if not has_reference_backend():
+        return StatisticalValidationResult(status="skipped", reason="onnxruntime/reference evaluator unavailable")
+    if not model.inputs or not model.outputs:
+        return StatisticalValidationResult(status="skipped", reason="model has no inputs or outputs")
+
+    reason = ""
+    if samples is None and dataset_path:
+        samples, reason = load_validation_dataset(model, dataset_path)
+    elif samples is None:
+        samples, reason = build_validation_samples(
+            model,
+            num_samples=num_samples,
+            seed=seed,
+            max_input_elems=max_input_elems,
+        )
+    if not samples:
+        return StatisticalValidationResult(status="skipped", reason=reason or "no validation samples")
+
+    output_names = [t.name for t in model.outputs]
+    pred_engine = "generated-c" if source_path and header_path else "python-eval"
+    pred_batch: list[dict[str, np.ndarray]] | None = None
+    pred_reason = ""
+
+    def _predict() -> None:
+        # Runs while reference workers are busy: one compile (or cache hit) and
+        # one runner exec cover every sample.
+        nonlocal pred_batch, pred_reason
+        if pred_engine == "generated-c":
+            c_run = run_generated_c_model_batch(
+                model,
+                source_path,
+                header_path,
+                samples,
+                timeout_sec=max(30.0, 0.5 * len(samples)),
+            )
+            if not c_run.ok or c_run.outputs is None:
+                pred_reason = f"generated-c run skipped: {c_run.reason}"
+                return
+            pred_batch = c_run.outputs
+            return
+        outputs: list[dict[str, np.ndarray]] = []
+        for sample in samples:
+            try:
+                tensors = _eval_model(model, sample)
+            except (RuntimeError, ValueError, TypeError, KeyError, IndexError) as exc:
+                pred_reason = f"predict eval error: {exc}"
+                return
+            outputs.append({name: tensors[name] for name in output_names if name in tensors})
+        pred_batch = outputs
+
+    ref_results = _run_reference_outputs(
+        model_path,
+        samples,
+        output_names,
+        workers=_resolve_workers(workers, len(samples)),
+        allow_reference_fallback=allow_reference_fallback,
+        on_submitted=_predict,
+    )
+    ref_engine = ""
+    ref_batch: list[dict[str, np.ndarray]] = []
+    for ref_outputs, engine, ref_reason in ref_results:
+        if ref_outputs is None:
+            return StatisticalValidationResult(status="skipped", reason=ref_reason, samples=len(samples))
+        ref_engine = ref_engine or engine
+        ref_batch.append(ref_outputs)
+    if pred_batch is None:
+        return StatisticalValidationResult(status="skipped", reason=pred_reason, samples=len(samples))
+
+    result = StatisticalValidationResult(
+        status="passed",
+        engine=f"{pred_engine} vs {ref_engine}",
+        samples=len(samples),
+    )
+    first_failure = ""
+    for pred_outputs, ref_outputs in zip(pred_batch, ref_batch):
+        ok, compare_reason, max_abs, max_rel = compare_outputs(
+            model,
+            ref_outputs=ref_outputs,
+            pred_outputs=pred_outputs,
+            rtol=rtol,
+            atol=atol,
+            int8_atol=int8_atol,
+            int16_atol=int16_atol,
+        )
+        result.max_abs = max(result.max_abs, max_abs)
+        result.max_rel = max(result.max_rel, max_rel)
+        if not ok:
+            result.failed_samples += 1
+            first_failure = first_failure or compare_reason
+            if compare_reason.startswith(("reference output missing", "predict output missing", "output shape")):
+                result.status = "failed"
+                result.reason = compare_reason
+                return result
+
+    for tensor in model.outputs:
+        result.outputs[tensor.name] = _error_stats(
+            tensor.name,
+            tensor.dtype,
+            [outputs[tensor.name] for outputs in pred_batch],
+            [outputs[tensor.name] for outputs in ref_batch],
+        )
+
+    if result.failed_samples > max_failure_rate * result.samples:
+        result.status = "failed"
+        result.reason = f"{result.failed_samples}/{result.samples} samples mismatched ({first_failure})"
+    return result
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from .ir import ModelIR, NodeInfo, TensorInfo
+from .memory_plan import plan_aliases, plan_arena
+
+
+# Synthetic node that replaces a tiled chain in the codegen model; the C
+# backend registers a handler for it (backends/c/ops/patch_stage.py).
+PATCH_STAGE_OP = "K2CPatchStage"
+PATCH_SPATIAL_OPS = {"Conv", "MaxPool", "AveragePool"}
+PATCH_POINTWISE_OPS = {"Relu", "LeakyRelu", "Clip", "Sigmoid", "Tanh"}
+# Patch grids up to PATCH_MAX_TILES x PATCH_MAX_TILES are tried for every
+# prefix of the chain; grids whose halos recompute more than
+# PATCH_MAX_RECOMPUTE extra MACs (as a fraction of the untiled chain) are skipped.
+PATCH_MAX_TILES = 8
+PATCH_MAX_RECOMPUTE = 0.5
+
+
+@dataclass(frozen=True)
+class PatchLayer:
+    node: NodeInfo
+    output: str
+    in_shape: tuple[int, int, int]
+    out_shape: tuple[int, int, int]
+    kernel: tuple[int, int]
+    stride: tuple[int, int]
+    dilation: tuple[int, int]
+    pad: tuple[int, int]
+    epilogue: tuple[dict[str, Any], ...] = ()
+    ops: tuple[str, ...] = ()
+
+    @property
+    def cost(self) -> int:
+        # Multiply-accumulates (or window reads) per output element.
+        k = self.kernel[0] * self.kernel[1]
+        if self.node.op_type == "Conv":
+            groups = int(self.node.attrs.get("group", 1))
+            return k * (self.in_shape[0] // groups)
+        return k
+
+    def input_span(self, axis: int, lo: int, hi: int) -> tuple[int, int]:
+        # Rows (axis 0) or columns (axis 1) of the input needed for output [lo, hi).
+        s, d, p, k = self.stride[axis], self.dilation[axis], self.pad[axis], self.kernel[axis]
+        extent = self.in_shape[axis + 1]
+        return max(0, lo * s - p), min(extent, (hi - 1) * s - p + (k - 1) * d + 1)
+
+
+@dataclass(frozen=True)
+class PatchStage:
+    layers: list[PatchLayer]
+    node_indices: list[int]
+    input: str
+    tiles: tuple[int, int]
+    buffers: list[str] = field(default_factory=list)
+    buffer_bytes: list[int] = field(default_factory=list)
+    macs_before: int = 0
+    macs_after: int = 0
+
+    @property
+    def output(self) -> str:
+        return self.layers[-1].output
+
+    def receptive_field(self) -> list[int]:
+        field_hw = [1, 1]
+        for layer in reversed(self.layers):
+            for axis in (0, 1):
+                k, s, d = layer.kernel[axis], layer.stride[axis], layer.dilation[axis]
+                field_hw[axis] = (field_hw[axis] - 1) * s + (k - 1) * d + 1
+        return field_hw
+
+    def to_manifest(self) -> dict[str, object]:
+        overhead = self.macs_after / self.macs_before - 1.0 if self.macs_before else 0.0
+        return {
+            "applied": True,
+            "ops": [op for layer in self.layers for op in layer.ops],
+            "node_indices": list(self.node_indices),
+            "input": self.input,
+            "output": self.output,
+            "tiles": list(self.tiles),
+            "receptive_field": self.receptive_field(),
+            "patch_buffers": [
+                {"name": name, "tensor": layer.output, "bytes": size}
+                for name, layer, size in zip(self.buffers, self.layers, self.buffer_bytes)
+            ],
+            "macs_before": self.macs_before,
+            "macs_after": self.macs_after,
+            "recompute_overhead": round(overhead, 4),
+        }
+
+
+def tile_span(extent: int, tiles: int, index: int) -> tuple[int, int]:
+    return index * extent // tiles, (index + 1) * extent // tiles
+
+
+def patch_regions(layers: list[PatchLayer], tiles: tuple[int, int], ph: int, pw: int) -> list[tuple[int, int, int, int]]:
+    # Output region (row0, row1, col0, col1) of every layer for one patch of the
+    # last layer, walking the receptive field backwards. Must match the C emitted
+    # by the patch stage handler.
+    last = layers[-1].out_shape
+    r0, r1 = tile_span(last[1], tiles[0], ph)
+    c0, c1 = tile_span(last[2], tiles[1], pw)
+    regions = [(r0, r1, c0, c1)]
+    for layer in reversed(layers[1:]):
+        r0, r1 = layer.input_span(0, r0, r1)
+        c0, c1 = layer.input_span(1, c0, c1)
+        regions.append((r0, r1, c0, c1))
+    regions.reverse()
+    return regions
+
+
+def _pads(attrs: dict[str, Any]) -> list[int] | None:
+    if str(attrs.get("auto_pad", "NOTSET")) not in ("NOTSET", ""):
+        return None
+    pads = [int(v) for v in attrs.get("pads", [0, 0, 0, 0])]
+    if len(pads) == 2:
+        pads = pads + pads
+    return pads if len(pads) == 4 else None
+
+
+def _chw(model: ModelIR, name: str) -> tuple[int, int, int] | None:
+    tensor = model.tensors.get(name)
+    if tensor is None or tensor.dtype != "float32" or tensor.data is not None:
+        return None
+    shape = [int(v) for v in tensor.shape]
+    if len(shape) != 4 or shape[0] != 1 or min(shape) <= 0:
+        return None
+    return shape[1], shape[2], shape[3]
+
+
+def _spatial_layer(model: ModelIR, node: NodeInfo) -> PatchLayer | None:
+    if len(node.outputs) != 1 or not node.inputs:
+        return None
+    in_shape = _chw(model, node.inputs[0])
+    out_shape = _chw(model, node.outputs[0])
+    pads = _pads(node.attrs)
+    if in_shape is None or out_shape is None or pads is None:
+        return None
+    if node.op_type == "Conv":
+        weight = model.tensors.get(node.inputs[1]) if len(node.inputs) > 1 else None
+        bias = node.inputs[2] if len(node.inputs) > 2 else ""
+        if weight is None or weight.data is None or weight.dtype != "float32" or len(weight.shape) != 4:
+            return None
+        if bias and (model.tensors.get(bias) is None or model.tensors[bias].data is None):
+            return None
+        groups = int(node.attrs.get("group", 1))
+        if groups <= 0 or out_shape[0] % groups or in_shape[0] != int(weight.shape[1]) * groups:
+            return None
+        if out_shape[0] != int(weight.shape[0]):
+            return None
+        kernel = (int(weight.shape[2]), int(weight.shape[3]))
+    elif len(node.inputs) == 1:
+        kernel_attr = [int(v) for v in node.attrs.get("kernel_shape", [])]
+        if len(kernel_attr) != 2:
+            return None
+        kernel = (kernel_attr[0], kernel_attr[1])
+    else:
+        return None
+    strides = [int(v) for v in node.attrs.get("strides", [1, 1])]
+    dilations = [int(v) for v in node.attrs.get("dilations", [1, 1])]
+    if len(strides) != 2 or len(dilations) != 2:
+        return None
+    epilogue: tuple[dict[str, Any], ...] = ()
+    fused = node.attrs.get("fused_activation")
+    if fused:
+        epilogue = (dict(fused),)
+    return PatchLayer(
+        node=node,
+        output=node.outputs[0],
+        in_shape=in_shape,
+        out_shape=out_shape,
+        kernel=kernel,
+        stride=(strides[0], strides[1]),
+        dilation=(dilations[0], dilations[1]),
+        pad=(pads[0], pads[1]),
+        epilogue=epilogue,
+        ops=(node.op_type,),
+    )
+
+
+def _pointwise_spec(node: NodeInfo) -> dict[str, Any] | None:
+    if len(node.inputs) != 1 or len(node.outputs) != 1:
+        return None
+    if node.op_type == "LeakyRelu":
+        return {"op": "LeakyRelu", "alpha": float(node.attrs.get("alpha", 0.01))}
+    if node.op_type == "Clip":
+        # Same contract as the Clip handler: bounds as attributes only.
+        if "min" not in node.attrs or "max" not in node.attrs:
+            return None
+        return {"op": "Clip", "min": float(node.attrs["min"]), "max": float(node.attrs["max"])}
+    return {"op": node.op_type}
+
+
+def find_patch_chain(model: ModelIR) -> tuple[list[int], list[PatchLayer]]:
+    # Longest single-consumer chain of spatially local float ops that starts at
+    # a graph input. Pointwise ops become epilogues of the preceding layer.
+    graph_outputs = {t.name for t in model.outputs}
+    consumers: dict[str, list[int]] = {}
+    for idx, node in enumerate(model.nodes):
+        for name in node.inputs:
+            if name:
+                consumers.setdefault(name, []).append(idx)
+    best: tuple[list[int], list[PatchLayer]] = ([], [])
+    for graph_input in model.inputs:
+        if _chw(model, graph_input.name) is None:
+            continue
+        indices: list[int] = []
+        layers: list[PatchLayer] = []
+        current = graph_input.name
+        while current not in graph_outputs:
+            users = consumers.get(current, [])
+            if len(users) != 1:
+                break
+            node = model.nodes[users[0]]
+            if node.inputs[0] != current or current in node.inputs[1:]:
+                break
+            if node.op_type in PATCH_SPATIAL_OPS:
+                layer = _spatial_layer(model, node)
+                if layer is None:
+                    break
+                layers.append(layer)
+            elif node.op_type in PATCH_POINTWISE_OPS and layers:
+                spec = _pointwise_spec(node)
+                if spec is None or _chw(model, node.outputs[0]) is None:
+                    break
+                prev = layers[-1]
+                layers[-1] = replace(
+                    prev,
+                    output=node.outputs[0],
+                    epilogue=prev.epilogue + (spec,),
+                    ops=prev.ops + (node.op_type,),
+                )
+            else:
+                break
+            indices.append(users[0])
+            current = node.outputs[0]
+        if len(layers) > len(best[1]):
+            best = (indices, layers)
+    return best
+
+
+def _layer_node_count(layers: list[PatchLayer]) -> int:
+    return sum(len(layer.ops) for layer in layers)
+
+
+def _measure(layers: list[PatchLayer], tiles: tuple[int, int]) -> tuple[list[int], int]:
+    # Largest patch (elements) of every intermediate, and MACs over all patches.
+    largest = [0] * (len(layers) - 1)
+    macs = 0
+    for ph in range(tiles[0]):
+        for pw in range(tiles[1]):
+            regions = patch_regions(layers, tiles, ph, pw)
+            for idx, (layer, (r0, r1, c0, c1)) in enumerate(zip(layers, regions)):
+                area = max(0, r1 - r0) * max(0, c1 - c0)
+                macs += area * layer.out_shape[0] * layer.cost
+                if idx < len(largest):
+                    largest[idx] = max(largest[idx], area * layer.out_shape[0])
+    return largest, macs
+
+
+def _unique_name(model: ModelIR, base: str) -> str:
+    name = base
+    idx = 0
+    while name in model.tensors:
+        idx += 1
+        name = f"{base}_{idx}"
+    return name
+
+
+def _stage_model(
+    model: ModelIR,
+    stage: PatchStage,
+    buffer_names: list[str],
+    buffer_sizes: dict[str, int],
+) -> tuple[ModelIR, list[str], dict[str, int]]:
+    # Replace the chain by one stage node placed where its last node was; the
+    # patch buffers are stage outputs, so they only live while it runs.
+    tensors = dict(model.tensors)
+    for name, size in zip(stage.buffers, stage.buffer_bytes):
+        tensors[name] = TensorInfo(name=name, shape=[size // 4], dtype="float32")
+    weights = [name for layer in stage.layers for name in layer.node.inputs[1:] if name]
+    node = NodeInfo(
+        op_type=PATCH_STAGE_OP,
+        inputs=[stage.input] + weights,
+        outputs=[stage.output] + list(stage.buffers),
+        attrs={"stage": stage},
+    )
+    chain = set(stage.node_indices)
+    last = max(chain)
+    nodes: list[NodeInfo] = []
+    for idx, old in enumerate(model.nodes):
+        if idx == last:
+            nodes.append(node)
+        elif idx not in chain:
+            nodes.append(old)
+    dropped = {out for idx in chain for out in model.nodes[idx].outputs} - {stage.output}
+    names = [name for name in buffer_names if name not in dropped]
+    names.extend(stage.buffers)
+    sizes = {name: size for name, size in buffer_sizes.items() if name not in dropped}
+    sizes.update(zip(stage.buffers, stage.buffer_bytes))
+    return replace(model, tensors=tensors, nodes=nodes), names, sizes
+
+
+def plan_patch_stage(
+    model: ModelIR,
+    buffer_names: list[str],
+    buffer_sizes: dict[str, int],
+    readonly: set[str],
+    max_recompute: float = PATCH_MAX_RECOMPUTE,
+) -> tuple[ModelIR, list[str], dict[str, int], dict[str, object]]:
+    # Try every prefix of the leading chain with every patch grid and keep the
+    # one with the smallest planned arena (then the least recompute).
+    base_aliases = plan_aliases(model, buffer_names, readonly)
+    base_bytes = plan_arena(model, buffer_names, buffer_sizes, align=4, aliases=base_aliases).planned_bytes
+    indices, layers = find_patch_chain(model)
+    if len(layers) < 2:
+        return model, buffer_names, buffer_sizes, {"applied": False, "reason": "no eligible chain"}
+    best = None
+    for depth in range(2, len(layers) + 1):
+        prefix = layers[:depth]
+        names = [_unique_name(model, f"k2c_patch_{idx}") for idx in range(depth - 1)]
+        _, out_h, out_w = prefix[-1].out_shape
+        _, macs_before = _measure(prefix, (1, 1))
+        for tiles_h in range(1, min(PATCH_MAX_TILES, out_h) + 1):
+            for tiles_w in range(1, min(PATCH_MAX_TILES, out_w) + 1):
+                if tiles_h * tiles_w == 1:
+                    continue
+                largest, macs_after = _measure(prefix, (tiles_h, tiles_w))
+                if macs_after > macs_before * (1.0 + max_recompute):
+                    continue
+                stage = PatchStage(
+                    layers=prefix,
+                    node_indices=indices[:_layer_node_count(prefix)],
+                    input=prefix[0].node.inputs[0],
+                    tiles=(tiles_h, tiles_w),
+                    buffers=names,
+                    buffer_bytes=[n * 4 for n in largest],
+                    macs_before=macs_before,
+                    macs_after=macs_after,
+                )
+                cand_model, cand_names, cand_sizes = _stage_model(model, stage, buffer_names, buffer_sizes)
+                aliases = plan_aliases(cand_model, cand_names, readonly)
+                planned = plan_arena(cand_model, cand_names, cand_sizes, align=4, aliases=aliases).planned_bytes
+                key = (planned, macs_after, tiles_h * tiles_w)
+                if best is None or key < best[0]:
+                    best = (key, stage, cand_model, cand_names, cand_sizes)
+    if best is None or best[0][0] >= base_bytes:
+        return model, buffer_names, buffer_sizes, {"applied": False, "reason": "no arena reduction"}
+    key, stage, cand_model, cand_names, cand_sizes = best
+    report = stage.to_manifest()
+    report.update(arena_bytes_before=base_bytes, arena_bytes_after=key[0], saved_bytes=base_bytes - key[0])
+    return cand_model, cand_names, cand_sizes, report
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import os
+
+import numpy as np
+
+from .ir import ModelIR
+from .operators.utils import tensor_size
+
+
+WEIGHT_FORMATS = ("c", "incbin")
+
+# Tensors up to this size stay as C initializers: scalars and shape vectors are
+# cheap to format and keep the generated source readable.
+INLINE_MAX_BYTES = 64
+BLOB_ALIGN = 16
+
+_NP_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "bool": np.dtype("u1"),
+    "uint8": np.dtype("u1"),
+    "int8": np.dtype("i1"),
+    "int16": np.dtype("<i2"),
+    "int32": np.dtype("<i4"),
+    "int64": np.dtype("<i8"),
+}
+
+
+@dataclass
+class WeightBlob:
+    file_name: str
+    symbol: str
+    offsets: dict[str, int] = field(default_factory=dict)
+    sizes: dict[str, int] = field(default_factory=dict)
+    total_bytes: int = 0
+
+    def to_manifest(self) -> dict[str, object]:
+        return {
+            "file": self.file_name,
+            "symbol": self.symbol,
+            "align": BLOB_ALIGN,
+            "bytes": self.total_bytes,
+            "tensors": [
+                {"name": name, "offset": self.offsets[name], "size": self.sizes[name]}
+                for name in self.offsets
+            ],
+        }
+
+
+def tensor_bytes(model: ModelIR, name: str) -> int:
+    tensor = model.tensors[name]
+    dtype = _NP_DTYPES.get(tensor.dtype)
+    if dtype is None:
+        raise ValueError(f"Unsupported const dtype: {tensor.dtype}")
+    return tensor_size(tensor.shape) * dtype.itemsize
+
+
+def write_weight_blob(
+    model: ModelIR,
+    weight_names: list[str],
+    output_dir: str,
+    file_name: str,
+    symbol: str,
+    inline_max_bytes: int = INLINE_MAX_BYTES,
+) -> WeightBlob:
+    blob = WeightBlob(file_name=file_name, symbol=symbol)
+    path = os.path.join(output_dir, file_name)
+    offset = 0
+    with open(path, "wb") as f:
+        for name in weight_names:
+            size = tensor_bytes(model, name)
+            if size <= inline_max_bytes:
+                continue
+            tensor = model.tensors[name]
+            dtype = _NP_DTYPES[tensor.dtype]
+            pad = (-offset) % BLOB_ALIGN
+            if pad:
+                f.write(b"\0" * pad)
+                offset += pad
+            raw = np.asarray(tensor.data).astype(dtype, copy=False).tobytes()
+            if len(raw) != size:
+                raise ValueError(f"Const tensor '{name}' data does not match its shape.")
+            f.write(raw)
+            blob.offsets[name] = offset
+            blob.sizes[name] = size
+            offset += size
+    blob.total_bytes = offset
+    return blob
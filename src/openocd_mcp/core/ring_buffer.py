@@ -1,82 +1,330 @@
-"""Simple thread-safe line ring buffer."""
+"""Thread-safe line and record ring buffers bounded by byte size."""
 
 from __future__ import annotations
 
 from collections import deque
-from copy import deepcopy
+from collections.abc import Mapping
+from itertools import islice
 import json
+import os
 from threading import RLock
-from typing import Any
+from typing import Any, Iterator
+
+
+def _line_size(line: str) -> int:
+    return (len(line) if line.isascii() else len(line.encode("utf-8", errors="replace"))) + 1
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
 
 
 class LineRingBuffer:
-    def __init__(self, capacity_bytes: int = 100 * 1024) -> None:
+    # Lines live in a list with a moving head (compacted once half of it is
+    # dead) so tail() slices only the lines it returns and an index hit can be
+    # resolved by sequence number in O(1). Each line's byte size is computed
+    # once on append and kept for eviction.
+    def __init__(
+        self,
+        capacity_bytes: int = 100 * 1024,
+        *,
+        index_keywords: bool = False,
+        spill_dir: str | None = None,
+        spill_segment_bytes: int = 4 * 1024 * 1024,
+        spill_max_segments: int = 16,
+    ) -> None:
         self.capacity_bytes = capacity_bytes
-        self._lines: deque[str] = deque()
+        self._lines: list[str] = []
+        self._sizes: list[int] = []
+        self._head = 0
+        self._first_seq = 0
         self._size_bytes = 0
         self._lock = RLock()
+        self._index: dict[str, deque[int]] | None = {} if index_keywords else None
+        self._index_evictions = 0
+        self._spill = _SpillWriter(spill_dir, spill_segment_bytes, spill_max_segments) if spill_dir else None
 
     def append(self, line: str) -> None:
-        encoded_size = len(line.encode("utf-8", errors="replace")) + 1
+        size = _line_size(line)
         with self._lock:
+            if self._index is not None:
+                self._index_line(line, self._first_seq + len(self._lines) - self._head)
             self._lines.append(line)
-            self._size_bytes += encoded_size
-            while self._size_bytes > self.capacity_bytes and self._lines:
-                removed = self._lines.popleft()
-                self._size_bytes -= len(removed.encode("utf-8", errors="replace")) + 1
+            self._sizes.append(size)
+            self._size_bytes += size
+            if self._size_bytes > self.capacity_bytes:
+                self._evict()
+
+    def _index_line(self, line: str, seq: int) -> None:
+        index = self._index
+        assert index is not None
+        for gram in _trigrams(line):
+            postings = index.get(gram)
+            if postings is None:
+                index[gram] = deque((seq,))
+            else:
+                postings.append(seq)
+
+    def _evict(self) -> None:
+        lines = self._lines
+        sizes = self._sizes
+        head = self._head
+        start = head
+        while self._size_bytes > self.capacity_bytes and head < len(lines):
+            if self._spill is not None:
+                self._spill.write(lines[head])
+            self._size_bytes -= sizes[head]
+            lines[head] = ""
+            head += 1
+        evicted = head - start
+        self._first_seq += evicted
+        if head > 1024 and head * 2 > len(lines):
+            del lines[:head]
+            del sizes[:head]
+            head = 0
+        self._head = head
+        if self._index is not None:
+            self._index_evictions += evicted
+            if self._index_evictions >= max(1024, len(lines) - head):
+                self._prune_index()
+
+    def _prune_index(self) -> None:
+        # Postings are sorted by sequence number, so stale entries sit at the
+        # left; dropping them in bulk keeps eviction itself index-free.
+        first = self._first_seq
+        index = self._index
+        assert index is not None
+        for gram in list(index):
+            postings = index[gram]
+            while postings and postings[0] < first:
+                postings.popleft()
+            if not postings:
+                del index[gram]
+        self._index_evictions = 0
 
     def tail(self, lines: int = 50, keyword: str | None = None) -> list[str]:
+        count = max(lines, 0)
         with self._lock:
-            selected = list(self._lines)[-max(lines, 0) :]
+            live = len(self._lines) - self._head
+            count = min(count, live)
+            if not count:
+                return []
+            if keyword and self._index is not None and len(keyword) >= 3:
+                return self._indexed_tail(count, keyword)
+            selected = self._lines[len(self._lines) - count:]
         if keyword:
             return [line for line in selected if keyword in line]
         return selected
 
+    def _indexed_tail(self, count: int, keyword: str) -> list[str]:
+        index = self._index
+        assert index is not None
+        window_start = self._first_seq + (len(self._lines) - self._head) - count
+        smallest: deque[int] | None = None
+        for gram in _trigrams(keyword):
+            postings = index.get(gram)
+            if postings is None:
+                return []
+            if smallest is None or len(postings) < len(smallest):
+                smallest = postings
+        assert smallest is not None
+        out: list[str] = []
+        base = self._head - self._first_seq
+        for seq in reversed(smallest):
+            if seq < window_start:
+                break
+            line = self._lines[base + seq]
+            if keyword in line:
+                out.append(line)
+        out.reverse()
+        return out
+
+    def iter_spilled(self) -> Iterator[str]:
+        if self._spill is None:
+            return iter(())
+        with self._lock:
+            self._spill.flush()
+            paths = list(self._spill.segments)
+        return _read_segments(paths)
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._size_bytes
+
     def clear(self) -> None:
         with self._lock:
+            self._first_seq += len(self._lines) - self._head
             self._lines.clear()
+            self._sizes.clear()
+            self._head = 0
             self._size_bytes = 0
+            if self._index is not None:
+                self._index.clear()
+
+    def close(self) -> None:
+        if self._spill is not None:
+            with self._lock:
+                self._spill.close()
 
     def __len__(self) -> int:
         with self._lock:
-            return len(self._lines)
+            return len(self._lines) - self._head
+
+
+class _SpillWriter:
+    # Evicted lines are appended to rolling segment files so a capture can
+    # outlive the RAM cap; the oldest segment is deleted past max_segments.
+    def __init__(self, directory: str, segment_bytes: int, max_segments: int) -> None:
+        self.directory = directory
+        self.segment_bytes = max(1, segment_bytes)
+        self.max_segments = max(1, max_segments)
+        self.segments: deque[str] = deque()
+        self._handle: Any | None = None
+        self._written = 0
+        self._counter = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _roll(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+        self._counter += 1
+        path = os.path.join(self.directory, f"segment-{os.getpid()}-{id(self):x}-{self._counter:06d}.log")
+        self._handle = open(path, "w", encoding="utf-8", errors="replace", newline="\n")  # noqa: SIM115
+        self._written = 0
+        self.segments.append(path)
+        while len(self.segments) > self.max_segments:
+            try:
+                os.remove(self.segments.popleft())
+            except OSError:
+                pass
+
+    def write(self, line: str) -> None:
+        if self._handle is None or self._written >= self.segment_bytes:
+            self._roll()
+        assert self._handle is not None
+        self._handle.write(line)
+        self._handle.write("\n")
+        self._written += _line_size(line)
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def _read_segments(paths: list[str]) -> Iterator[str]:
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace", newline="\n") as f:
+                for raw in f:
+                    yield raw[:-1] if raw.endswith("\n") else raw
+        except OSError:
+            continue
+
+
+class RecordView(Mapping[str, Any]):
+    # Read-only view over one encoded record. The JSON is decoded on first
+    # access and cached; callers that need a mutable copy use to_dict().
+    __slots__ = ("seq", "raw", "_decoded")
+
+    def __init__(self, seq: int, raw: bytes) -> None:
+        self.seq = seq
+        self.raw = raw
+        self._decoded: dict[str, Any] | None = None
+
+    def _data(self) -> dict[str, Any]:
+        if self._decoded is None:
+            self._decoded = json.loads(self.raw)
+        return self._decoded
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data())
+
+    def __len__(self) -> int:
+        return len(self._data())
+
+    def to_dict(self) -> dict[str, Any]:
+        return json.loads(self.raw)
+
+    def __repr__(self) -> str:
+        return f"RecordView(seq={self.seq}, {self.raw.decode('utf-8', errors='replace')})"
 
 
 class RecordRingBuffer:
     """Thread-safe ring buffer for structured records, bounded by byte size."""
 
+    # Each record is encoded to compact JSON exactly once on append and the
+    # encoded length is its size. Readers decode fresh dicts (snapshot/since)
+    # or take immutable views, so stored records can never be mutated.
+
     def __init__(self, capacity_bytes: int = 256 * 1024) -> None:
         self.capacity_bytes = capacity_bytes
-        self._records: deque[dict[str, Any]] = deque()
-        self._sizes: deque[int] = deque()
+        self._records: deque[bytes] = deque()
         self._size_bytes = 0
+        self._next_seq = 0
         self._lock = RLock()
 
     @staticmethod
-    def _estimate_size(record: dict[str, Any]) -> int:
-        encoded = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-        return len(encoded.encode("utf-8", errors="replace")) + 1
+    def _encode(record: dict[str, Any]) -> bytes:
+        encoded = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        return encoded.encode("utf-8", errors="replace")
 
-    def append(self, record: dict[str, Any]) -> None:
-        stored = deepcopy(record)
-        size = self._estimate_size(stored)
+    @property
+    def first_seq(self) -> int:
         with self._lock:
-            self._records.append(stored)
-            self._sizes.append(size)
-            self._size_bytes += size
+            return self._next_seq - len(self._records)
+
+    @property
+    def next_seq(self) -> int:
+        with self._lock:
+            return self._next_seq
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._size_bytes
+
+    def append(self, record: dict[str, Any]) -> int:
+        raw = self._encode(record)
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._records.append(raw)
+            self._size_bytes += len(raw) + 1
             while self._size_bytes > self.capacity_bytes and self._records:
-                self._records.popleft()
-                removed_size = self._sizes.popleft()
-                self._size_bytes -= removed_size
+                self._size_bytes -= len(self._records.popleft()) + 1
+            return seq
 
-    def snapshot(self) -> list[dict[str, Any]]:
+    def _raw_since(self, seq: int) -> tuple[int, list[bytes]]:
         with self._lock:
-            return [deepcopy(item) for item in self._records]
+            first = self._next_seq - len(self._records)
+            start = max(seq, first)
+            return start, list(islice(self._records, start - first, None))
+
+    def views(self, since: int = 0) -> tuple[RecordView, ...]:
+        start, raws = self._raw_since(since)
+        return tuple(RecordView(start + i, raw) for i, raw in enumerate(raws))
+
+    def since(self, seq: int) -> tuple[list[dict[str, Any]], int]:
+        # Records appended at or after seq (older ones may have been evicted)
+        # plus the seq to pass on the next call.
+        start, raws = self._raw_since(seq)
+        return [json.loads(raw) for raw in raws], start + len(raws)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return self.since(0)[0]
 
     def clear(self) -> None:
         with self._lock:
             self._records.clear()
-            self._sizes.clear()
             self._size_bytes = 0
 
     def __len__(self) -> int:
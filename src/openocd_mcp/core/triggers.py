@@ -0,0 +1,160 @@
+"""Compiled multi-pattern index for line triggers."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+from threading import RLock
+from typing import Any, Hashable
+
+try:
+    import re._parser as _sre_parse  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+_LITERAL = _sre_parse.LITERAL
+_BRANCH = _sre_parse.BRANCH
+_SUBPATTERN = _sre_parse.SUBPATTERN
+
+
+@dataclass(slots=True)
+class TriggerPattern:
+    key: Hashable
+    regex: re.Pattern[str]
+
+
+def _leading_literals(items: Any) -> list[str] | None:
+    # Literals one of which must occur in any line the pattern matches: the
+    # leading literal run, or one such run per alternative of a leading branch.
+    items = list(items)
+    if not items:
+        return None
+    op, arg = items[0]
+    if op == _BRANCH:
+        out: list[str] = []
+        for branch in arg[1]:
+            found = _leading_literals(branch)
+            if not found:
+                return None
+            out.extend(found)
+        return out
+    if op == _SUBPATTERN:
+        _group, add_flags, del_flags, sub = arg
+        if add_flags or del_flags:
+            return None
+        return _leading_literals(sub)
+    chars: list[str] = []
+    for op, arg in items:
+        if op != _LITERAL:
+            break
+        chars.append(chr(arg))
+    return ["".join(chars)] if chars else None
+
+
+def required_literals(source: str, flags: int = 0) -> tuple[list[str], bool] | None:
+    try:
+        parsed = _sre_parse.parse(source, flags)
+    except Exception:  # noqa: BLE001
+        return None
+    literals = _leading_literals(parsed)
+    if not literals:
+        return None
+    return literals, bool(parsed.state.flags & re.IGNORECASE)
+
+
+class TriggerIndex:
+    # Every pattern is reduced to the literals it cannot match without; those
+    # are folded into one plain alternation (fast in sre because it carries no
+    # groups) that is searched once per line. Only lines that hit the prefilter
+    # are checked against the individual regexes, and patterns with no usable
+    # literal are always checked. The index is rebuilt lazily after add/remove.
+    def __init__(self) -> None:
+        self._patterns: dict[Hashable, tuple[str, int]] = {}
+        self._prefixed: list[TriggerPattern] = []
+        self._always: list[TriggerPattern] = []
+        self._prefilters: list[tuple[re.Pattern[str], bool]] = []
+        self._dirty = False
+        self._lock = RLock()
+        self.lines_scanned = 0
+        self.lines_matched = 0
+        self.match_counts: dict[Hashable, int] = {}
+
+    def add(self, key: Hashable, pattern: str, *, literal: bool = False, ignore_case: bool = False) -> None:
+        source = re.escape(pattern) if literal else pattern
+        flags = re.IGNORECASE if ignore_case else 0
+        re.compile(source, flags)
+        with self._lock:
+            self._patterns[key] = (source, flags)
+            self.match_counts.setdefault(key, 0)
+            self._dirty = True
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            if self._patterns.pop(key, None) is not None:
+                self.match_counts.pop(key, None)
+                self._dirty = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._patterns.clear()
+            self.match_counts.clear()
+            self._dirty = True
+
+    def _rebuild(self) -> None:
+        prefixed: list[TriggerPattern] = []
+        always: list[TriggerPattern] = []
+        literals: dict[bool, set[str]] = {False: set(), True: set()}
+        for key, (source, flags) in self._patterns.items():
+            item = TriggerPattern(key=key, regex=re.compile(source, flags))
+            found = required_literals(source, flags)
+            if found is None:
+                always.append(item)
+                continue
+            words, ignore_case = found
+            literals[ignore_case].update(words)
+            prefixed.append(item)
+        # Case-insensitive literals are matched against the lowercased line with
+        # a case-sensitive alternation; sre's IGNORECASE scan is far slower.
+        prefilters: list[tuple[re.Pattern[str], bool]] = []
+        for ignore_case, words in literals.items():
+            if words:
+                if ignore_case:
+                    words = {word.lower() for word in words}
+                alternation = "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+                prefilters.append((re.compile(alternation), ignore_case))
+        self._prefixed = prefixed
+        self._always = always
+        self._prefilters = prefilters
+        self._dirty = False
+
+    def match(self, line: str) -> list[Hashable]:
+        with self._lock:
+            if self._dirty:
+                self._rebuild()
+            prefixed = self._prefixed
+            always = self._always
+            prefilters = self._prefilters
+            self.lines_scanned += 1
+        candidates = always
+        for prefilter, lowered in prefilters:
+            if prefilter.search(line.lower() if lowered else line) is not None:
+                candidates = prefixed + always
+                break
+        keys = [item.key for item in candidates if item.regex.search(line) is not None]
+        if not keys:
+            return keys
+        with self._lock:
+            self.lines_matched += 1
+            for key in keys:
+                if key in self.match_counts:
+                    self.match_counts[key] += 1
+        return keys
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "patterns": len(self._patterns),
+                "lines_scanned": self.lines_scanned,
+                "lines_matched": self.lines_matched,
+                "matches": {str(key): count for key, count in self.match_counts.items()},
+            }
@@ -1,6 +1,7 @@
 """Parsers and symbol resolvers."""
 
-from .elf_resolver import ELFResolver
+from .elf_resolver import ELFResolver, SymbolInfo
+from .parse_cache import ParseCache
 from .svd_resolver import RegisterInfo, SVDResolver
 
-__all__ = ["ELFResolver", "SVDResolver", "RegisterInfo"]
+__all__ = ["ELFResolver", "SVDResolver", "RegisterInfo", "SymbolInfo", "ParseCache"]
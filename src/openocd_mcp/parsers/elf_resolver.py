@@ -1,32 +1,99 @@
-"""ELF symbol resolver."""
+"""ELF symbol resolver with address-to-symbol and address-to-line lookup."""
 
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
 from pathlib import Path
+import posixpath
+from threading import Lock, Thread
 from typing import Any
 
 from ..core.errors import MCPServiceError
+from .parse_cache import ParseCache, default_parse_cache
 
 try:
     from elftools.elf.elffile import ELFFile  # type: ignore[import-untyped]
 except ImportError:  # pragma: no cover - dependency optional in tests
     ELFFile = None
 
+_SYMBOL_TYPES = {"STT_FUNC": "func", "STT_OBJECT": "object", "STT_NOTYPE": "notype"}
+_LINE_END = -1
+
+
+@dataclass(slots=True)
+class SymbolInfo:
+    name: str
+    address: int
+    size: int
+    kind: str
+
+
+# Symbol ranges are kept (and cached) as (name, start, size, kind) tuples.
+RawSymbol = tuple[str, int, int, str]
+
+
+def _symbol_rank(item: RawSymbol) -> tuple[bool, bool]:
+    return item[2] > 0, item[3] != "notype"
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8", errors="replace") if isinstance(value, bytes) else str(value)
+
 
 class ELFResolver:
-    def __init__(self) -> None:
+    def __init__(self, cache: ParseCache | None = None) -> None:
+        self._cache = cache if cache is not None else default_parse_cache()
         self._symbols: dict[str, int] = {}
+        # Range index: start addresses sorted for bisect, one RawSymbol each.
+        self._starts: list[int] = []
+        self._ranges: list[RawSymbol] = []
+        # Line index, built in the background after load (or on first use): row
+        # addresses sorted for bisect with file index and line per row; file index
+        # _LINE_END marks a sequence end.
+        self._line_addrs: array[int] | None = None
+        self._line_files: array[int] = array("i")
+        self._line_numbers: array[int] = array("I")
+        self._files: list[str] = []
+        self._line_lock = Lock()
         self.path: str | None = None
+        self.cache_hit = False
 
     def load(self, path: str) -> None:
         elf_file = Path(path)
         if not elf_file.exists():
             raise MCPServiceError("DBG_ELF_NOT_FOUND", f"ELF file not found: {path}")
-        if ELFFile is None:
-            raise MCPServiceError("DBG_ELF_DEPENDENCY_MISSING", "pyelftools is not installed.")
+        cached = self._cache.load("elf", elf_file) if self._cache is not None else None
+        self.cache_hit = cached is not None
+        if cached is None:
+            if ELFFile is None:
+                raise MCPServiceError("DBG_ELF_DEPENDENCY_MISSING", "pyelftools is not installed.")
+            cached = self._scan_symbols(elf_file)
+            if self._cache is not None:
+                self._cache.store("elf", elf_file, cached)
+        symbols, ranges = cached
+        self._symbols = symbols
+        self._ranges = ranges
+        self._starts = [item[1] for item in ranges]
+        with self._line_lock:
+            self._line_addrs = None
+            self._line_files = array("i")
+            self._line_numbers = array("I")
+            self._files = []
+            self.path = str(elf_file)
+        # The DWARF scan can take seconds; start it now so a halt event on the
+        # telnet log thread doesn't pay for it.
+        Thread(target=self._warm_line_index, name="elf-line-index", daemon=True).start()
+
+    @staticmethod
+    def _scan_symbols(elf_file: Path) -> tuple[dict[str, int], list[RawSymbol]]:
         symbols: dict[str, int] = {}
+        by_start: dict[int, RawSymbol] = {}
         with elf_file.open("rb") as f:
             parsed: Any = ELFFile(f)
+            # Thumb function symbols carry the low bit; code addresses do not.
+            thumb = parsed.header.e_machine == "EM_ARM"
             for section in parsed.iter_sections():
                 if section.header.sh_type != "SHT_SYMTAB":
                     continue
@@ -36,8 +103,17 @@ class ELFResolver:
                     if sym.entry.st_value == 0:
                         continue
                     symbols[sym.name] = int(sym.entry.st_value)
-        self._symbols = symbols
-        self.path = str(elf_file)
+                    kind = _SYMBOL_TYPES.get(sym.entry.st_info.type)
+                    if kind is None or sym.name.startswith("$"):
+                        continue
+                    start = int(sym.entry.st_value)
+                    if thumb and kind == "func":
+                        start &= ~1
+                    item = (sym.name, start, int(sym.entry.st_size), kind)
+                    current = by_start.get(start)
+                    if current is None or _symbol_rank(item) > _symbol_rank(current):
+                        by_start[start] = item
+        return symbols, [by_start[start] for start in sorted(by_start)]
 
     def resolve(self, token: str | int) -> int:
         if isinstance(token, int):
@@ -50,3 +126,137 @@ class ELFResolver:
         if value in self._symbols:
             return self._symbols[value]
         raise MCPServiceError("DBG_SYMBOL_NOT_FOUND", f"Unknown symbol or address: {token}")
+
+    def lookup(self, address: int) -> tuple[SymbolInfo, int] | None:
+        index = bisect_right(self._starts, address) - 1
+        if index < 0:
+            return None
+        name, start, size, kind = self._ranges[index]
+        offset = address - start
+        # Unsized labels (typically assembly) extend up to the next symbol.
+        if size and offset >= size:
+            return None
+        return SymbolInfo(name=name, address=start, size=size, kind=kind), offset
+
+    def _build_line_index(self) -> None:
+        cached = self._cache.load("elf-lines", self.path) if self._cache is not None and self.path else None
+        if cached is None:
+            cached = self._scan_lines()
+            if self._cache is not None and self.path:
+                self._cache.store("elf-lines", self.path, cached)
+        files, addrs, file_indexes, lines = cached
+        self._files = list(files)
+        self._line_addrs = array("Q", addrs)
+        self._line_files = array("i", file_indexes)
+        self._line_numbers = array("I", lines)
+
+    def _scan_lines(self) -> tuple[list[str], bytes, bytes, bytes]:
+        rows: list[tuple[int, int, int]] = []
+        files: dict[str, int] = {}
+        if self.path is not None and ELFFile is not None:
+            with open(self.path, "rb") as f:
+                parsed: Any = ELFFile(f)
+                if parsed.has_dwarf_info():
+                    dwarf = parsed.get_dwarf_info()
+                    for cu in dwarf.iter_CUs():
+                        program = dwarf.line_program_for_CU(cu)
+                        if program is not None:
+                            self._collect_rows(cu, program, files, rows)
+        # End-of-sequence rows sort before a sequence starting at the same address.
+        rows.sort(key=lambda row: (row[0], row[1] != _LINE_END))
+        return (
+            list(files),
+            array("Q", [row[0] for row in rows]).tobytes(),
+            array("i", [row[1] for row in rows]).tobytes(),
+            array("I", [row[2] for row in rows]).tobytes(),
+        )
+
+    @staticmethod
+    def _collect_rows(cu: Any, program: Any, files: dict[str, int], rows: list[tuple[int, int, int]]) -> None:
+        header = program.header
+        version = int(header["version"])
+        comp_dir = ""
+        top = cu.get_top_DIE()
+        if "DW_AT_comp_dir" in top.attributes:
+            comp_dir = _decode(top.attributes["DW_AT_comp_dir"].value)
+        dirs = [_decode(item) for item in header["include_directory"]]
+        entries = header["file_entry"]
+        # DWARF 5 indexes files and directories from 0; earlier versions from 1
+        # with directory 0 meaning the compilation directory.
+        base = 0 if version >= 5 else 1
+        names: dict[int, int] = {}
+
+        def file_index(index: int) -> int:
+            cached = names.get(index)
+            if cached is not None:
+                return cached
+            position = index - base
+            if not 0 <= position < len(entries):
+                path = "??"
+            else:
+                entry = entries[position]
+                path = _decode(entry.name)
+                dir_position = int(entry.dir_index) - base
+                directory = dirs[dir_position] if 0 <= dir_position < len(dirs) else comp_dir
+                if not posixpath.isabs(path) and directory:
+                    path = posixpath.join(directory, path)
+            resolved = files.setdefault(path, len(files))
+            names[index] = resolved
+            return resolved
+
+        for entry in program.get_entries():
+            state = entry.state
+            if state is None:
+                continue
+            if state.end_sequence:
+                rows.append((int(state.address), _LINE_END, 0))
+            else:
+                rows.append((int(state.address), file_index(int(state.file)), int(state.line)))
+
+    def _warm_line_index(self) -> None:
+        try:
+            with self._line_lock:
+                if self._line_addrs is None:
+                    self._build_line_index()
+        except Exception:  # noqa: BLE001
+            # line_for() retries the build and reports the error to its caller.
+            pass
+
+    def line_for(self, address: int, *, wait: bool = True) -> tuple[str, int] | None:
+        # wait=False never blocks: it returns None while the index is being built.
+        if not self._line_lock.acquire(blocking=wait):
+            return None
+        try:
+            if self._line_addrs is None:
+                if not wait:
+                    return None
+                self._build_line_index()
+            addrs = self._line_addrs
+            file_indexes = self._line_files
+            lines = self._line_numbers
+            files = self._files
+        finally:
+            self._line_lock.release()
+        assert addrs is not None
+        index = bisect_right(addrs, address) - 1
+        if index < 0 or file_indexes[index] == _LINE_END:
+            return None
+        return files[file_indexes[index]], lines[index]
+
+    def describe(self, address: int, *, wait: bool = True) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "address": f"0x{address:x}",
+            "symbol": None,
+            "offset": None,
+            "kind": None,
+            "file": None,
+            "line": None,
+        }
+        found = self.lookup(address)
+        if found is not None:
+            info, offset = found
+            out.update(symbol=info.name, offset=offset, kind=info.kind)
+        source = self.line_for(address, wait=wait)
+        if source is not None:
+            out.update(file=source[0], line=source[1])
+        return out
@@ -0,0 +1,86 @@
+"""On-disk cache for parsed SVD/ELF data."""
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+from pathlib import Path
+import sys
+from typing import Any
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "keil2cmake" / "openocd_mcp"
+ENV_CACHE_DIR = "OPENOCD_MCP_PARSE_CACHE"
+FORMAT_VERSION = 1
+_DISABLED = {"", "0", "off", "none"}
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    # One marshal file per (kind, source path). An entry is reused when the
+    # source size and mtime still match; if only the stat changed, the content
+    # hash decides and a matching entry is re-stamped instead of reparsed.
+    # Every failure is a miss: the cache never makes a load fail.
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, kind: str, source: Path) -> Path:
+        name = hashlib.sha1(f"{kind}\0{source}".encode("utf-8", errors="replace")).hexdigest()
+        return self.directory / f"{kind}-{name}.bin"
+
+    @staticmethod
+    def _header(kind: str, source: Path) -> tuple[Any, ...]:
+        stat = source.stat()
+        return (FORMAT_VERSION, sys.version_info[:2], kind, str(source), stat.st_size, stat.st_mtime_ns)
+
+    def load(self, kind: str, path: str | Path) -> Any | None:
+        source = Path(path).resolve()
+        try:
+            header = self._header(kind, source)
+            entry = self._entry_path(kind, source)
+            stored_header, digest, payload = marshal.loads(entry.read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            self.misses += 1
+            return None
+        if stored_header != header:
+            if stored_header[:4] != header[:4] or digest != file_digest(source):
+                self.misses += 1
+                return None
+            self._write(entry, header, digest, payload)
+        self.hits += 1
+        return payload
+
+    def store(self, kind: str, path: str | Path, payload: Any) -> None:
+        source = Path(path).resolve()
+        try:
+            header = self._header(kind, source)
+            self._write(self._entry_path(kind, source), header, file_digest(source), payload)
+        except (OSError, ValueError):
+            pass
+
+    def _write(self, entry: Path, header: tuple[Any, ...], digest: str, payload: Any) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(marshal.dumps((header, digest, payload)))
+            os.replace(tmp, entry)
+        except OSError:
+            pass
+
+
+def default_parse_cache() -> ParseCache | None:
+    configured = os.getenv(ENV_CACHE_DIR)
+    if configured is None:
+        return ParseCache(DEFAULT_CACHE_DIR)
+    if configured.strip().lower() in _DISABLED:
+        return None
+    return ParseCache(configured)
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import xml.etree.ElementTree as ET
 
 from ..core.errors import MCPServiceError
+from .parse_cache import ParseCache, default_parse_cache
 
 try:
     from cmsis_svd.parser import SVDParser  # type: ignore[import-untyped]
@@ -20,12 +21,32 @@ class RegisterInfo:
     register: str
     address: int
     fields: dict[str, dict[str, int | str]]
+    # (name, bit_offset, mask, description) per field, built on first decode.
+    decoder: tuple[tuple[str, int, int, str], ...] | None = field(default=None, repr=False, compare=False)
+
+
+# Parsed form kept per peripheral (and in the parse cache) until a register of
+# that peripheral is first resolved:
+#   {PERIPH: (name, [(register, address, ((field, bit_offset, bit_width, description), ...)), ...])}
+RawField = tuple[str, int, int, str]
+RawRegister = tuple[str, int, tuple[RawField, ...]]
+RawPeripherals = dict[str, tuple[str, list[RawRegister]]]
+
+
+def _add_register(output: RawPeripherals, peripheral: str, register: RawRegister) -> None:
+    entry = output.get(peripheral.upper())
+    if entry is None:
+        entry = output[peripheral.upper()] = (peripheral, [])
+    entry[1].append(register)
 
 
 class SVDResolver:
-    def __init__(self) -> None:
+    def __init__(self, cache: ParseCache | None = None) -> None:
         self.path: str | None = None
+        self._cache = cache if cache is not None else default_parse_cache()
+        self._peripherals: RawPeripherals = {}
         self._registers: dict[str, RegisterInfo] = {}
+        self.cache_hit = False
 
     def load(self, path: str) -> None:
         file_path = Path(path)
@@ -33,44 +54,39 @@ class SVDResolver:
             raise MCPServiceError("DBG_SVD_NOT_FOUND", f"SVD file not found: {path}")
         self.path = str(file_path)
         self._registers = {}
-        loaded = False
-        if SVDParser is not None:
-            try:
-                self._load_with_cmsis(file_path)
-                loaded = True
-            except Exception:
-                loaded = False
-        if not loaded:
-            self._load_with_xml(file_path)
-
-    def _load_with_cmsis(self, path: Path) -> None:
+        raw = self._cache.load("svd", file_path) if self._cache is not None else None
+        self.cache_hit = raw is not None
+        if raw is None:
+            if SVDParser is not None:
+                try:
+                    raw = self._load_with_cmsis(file_path)
+                except Exception:
+                    raw = None
+            if raw is None:
+                raw = self._load_with_xml(file_path)
+            if self._cache is not None:
+                self._cache.store("svd", file_path, raw)
+        self._peripherals = raw
+
+    def _load_with_cmsis(self, path: Path) -> RawPeripherals:
         parser = SVDParser.for_xml_file(str(path))
         device = parser.get_device()
-        output: dict[str, RegisterInfo] = {}
+        output: RawPeripherals = {}
         for peripheral in device.peripherals:
             base = int(peripheral.base_address)
             for register in peripheral.registers or []:
                 address = base + int(register.address_offset)
-                fields: dict[str, dict[str, int | str]] = {}
-                for field in register.fields or []:
-                    fields[field.name] = {
-                        "bit_offset": int(field.bit_offset),
-                        "bit_width": int(field.bit_width),
-                        "description": field.description or "",
-                    }
-                key = self._make_key(peripheral.name, register.name)
-                output[key] = RegisterInfo(
-                    peripheral=peripheral.name,
-                    register=register.name,
-                    address=address,
-                    fields=fields,
+                fields = tuple(
+                    (item.name, int(item.bit_offset), int(item.bit_width), item.description or "")
+                    for item in register.fields or []
                 )
-        self._registers = output
+                _add_register(output, peripheral.name, (register.name, address, fields))
+        return output
 
-    def _load_with_xml(self, path: Path) -> None:
+    def _load_with_xml(self, path: Path) -> RawPeripherals:
         tree = ET.parse(path)
         root = tree.getroot()
-        output: dict[str, RegisterInfo] = {}
+        output: RawPeripherals = {}
         for p in root.findall(".//peripheral"):
             periph_name = (p.findtext("name") or "").strip()
             base_text = (p.findtext("baseAddress") or "").strip()
@@ -83,24 +99,31 @@ class SVDResolver:
                 if not reg_name or not offset_text:
                     continue
                 address = base + int(offset_text, 0)
-                fields: dict[str, dict[str, int | str]] = {}
+                fields: list[RawField] = []
                 for f in r.findall(".//field"):
                     field_name = (f.findtext("name") or "").strip()
                     bit_offset = int((f.findtext("bitOffset") or "0").strip(), 0)
                     bit_width = int((f.findtext("bitWidth") or "1").strip(), 0)
-                    fields[field_name] = {
-                        "bit_offset": bit_offset,
-                        "bit_width": bit_width,
-                        "description": (f.findtext("description") or "").strip(),
-                    }
-                key = self._make_key(periph_name, reg_name)
-                output[key] = RegisterInfo(
-                    peripheral=periph_name,
-                    register=reg_name,
-                    address=address,
-                    fields=fields,
-                )
-        self._registers = output
+                    fields.append((field_name, bit_offset, bit_width, (f.findtext("description") or "").strip()))
+                _add_register(output, periph_name, (reg_name, address, tuple(fields)))
+        return output
+
+    def _materialize(self, peripheral: str) -> None:
+        raw = self._peripherals.pop(peripheral, None)
+        if raw is None:
+            return
+        name, registers = raw
+        for reg_name, address, raw_fields in registers:
+            fields: dict[str, dict[str, int | str]] = {
+                field_name: {"bit_offset": bit_offset, "bit_width": bit_width, "description": description}
+                for field_name, bit_offset, bit_width, description in raw_fields
+            }
+            self._registers[self._make_key(name, reg_name)] = RegisterInfo(
+                peripheral=name,
+                register=reg_name,
+                address=address,
+                fields=fields,
+            )
 
     @staticmethod
     def _make_key(peripheral: str, register: str) -> str:
@@ -116,21 +139,30 @@ class SVDResolver:
     def resolve(self, name: str) -> RegisterInfo:
         key = self._normalize_name(name).upper()
         info = self._registers.get(key)
+        if info is None:
+            self._materialize(key.split("->", 1)[0])
+            info = self._registers.get(key)
         if info is None:
             raise MCPServiceError("DBG_REGISTER_NOT_FOUND", f"Register not found in SVD: {name}")
         return info
 
     def decode_fields(self, info: RegisterInfo, value: int) -> dict[str, dict[str, int | str]]:
-        output: dict[str, dict[str, int | str]] = {}
-        for field_name, spec in info.fields.items():
-            bit_offset = int(spec["bit_offset"])
-            bit_width = int(spec["bit_width"])
-            mask = (1 << bit_width) - 1
-            output[field_name] = {
-                "val": (value >> bit_offset) & mask,
-                "description": str(spec.get("description", "")),
-            }
-        return output
+        decoder = info.decoder
+        if decoder is None:
+            decoder = tuple(
+                (
+                    field_name,
+                    int(spec["bit_offset"]),
+                    (1 << int(spec["bit_width"])) - 1,
+                    str(spec.get("description", "")),
+                )
+                for field_name, spec in info.fields.items()
+            )
+            info.decoder = decoder
+        return {
+            field_name: {"val": (value >> bit_offset) & mask, "description": description}
+            for field_name, bit_offset, mask, description in decoder
+        }
 
     def raw_xml_snippet(self, name: str, max_chars: int = 500) -> str | None:
         if not self.path:
@@ -1,6 +1,6 @@
 """Task runtime and event bus."""
 
-from .events import EventBus
+from .events import DispatchStats, EventBus
 from .task_runtime import TaskRuntime
 
-__all__ = ["EventBus", "TaskRuntime"]
+__all__ = ["DispatchStats", "EventBus", "TaskRuntime"]
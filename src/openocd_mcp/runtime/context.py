@@ -15,12 +15,18 @@ class DebuggerProxy:
     def read32(self, addr: int) -> int:
         return self._ctx.read32(addr)
 
+    def read_many(self, addrs: list[int]) -> list[int]:
+        return self._ctx.read_many(addrs)
+
     def write32(self, addr: int, value: int) -> None:
         self._ctx.write32(addr, value)
 
     def halt(self) -> None:
         self._ctx.halt()
 
+    def symbolize(self, addr: int) -> dict[str, Any] | None:
+        return self._ctx.symbolize(addr)
+
     def resume(self) -> None:
         self._ctx.resume()
 
@@ -43,10 +49,14 @@ class DebugContext:
         resume: Callable[[], None],
         serial_write: Callable[[str], None],
         cancel_event: Event,
+        read_many: Callable[[list[int]], list[int]] | None = None,
+        symbolize: Callable[[int], dict[str, Any] | None] | None = None,
         record_capacity_bytes: int = 256 * 1024,
         log_capacity_bytes: int = 64 * 1024,
     ) -> None:
         self._read32 = read32
+        self._read_many = read_many
+        self._symbolize = symbolize
         self._write32 = write32
         self._halt = halt
         self._resume = resume
@@ -62,6 +72,21 @@ class DebugContext:
         self.raise_if_cancelled()
         return self._read32(addr)
 
+    def read_many(self, addrs: list[int]) -> list[int]:
+        self.raise_if_cancelled()
+        addresses = [int(addr) for addr in addrs]
+        if not addresses:
+            return []
+        if self._read_many is None:
+            return [self._read32(addr) for addr in addresses]
+        return self._read_many(addresses)
+
+    def symbolize(self, addr: int) -> dict[str, Any] | None:
+        self.raise_if_cancelled()
+        if self._symbolize is None:
+            return None
+        return self._symbolize(int(addr))
+
     def write32(self, addr: int, value: int) -> None:
         self.raise_if_cancelled()
         self._write32(addr, value)
@@ -93,6 +118,11 @@ class DebugContext:
         if self._cancel_event.is_set():
             raise RuntimeError("task_cancelled")
 
-    def snapshot(self) -> dict[str, Any]:
+    def snapshot(self, since_seq: int | None = None) -> dict[str, Any]:
         with self._lock:
-            return {"records": self._records.snapshot(), "logs": self._logs.tail(lines=len(self._logs))}
+            records, next_seq = self._records.since(since_seq or 0)
+            data: dict[str, Any] = {"records": records, "logs": self._logs.tail(lines=len(self._logs))}
+            data["next_seq"] = next_seq
+            if since_seq is not None:
+                data["records_dropped"] = max(0, next_seq - len(records) - since_seq)
+            return data
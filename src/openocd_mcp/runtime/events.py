@@ -1,26 +1,141 @@
-"""Simple event bus for in-process callbacks."""
+"""Event bus that dispatches callbacks on a bounded worker pool."""
 
 from __future__ import annotations
 
-from collections import defaultdict
-from threading import RLock
-from typing import Any, Callable
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+from threading import Condition, Thread
+import time
+from typing import Any, Callable, Hashable
 
 EventCallback = Callable[[dict[str, Any]], None]
 
 
-class EventBus:
+@dataclass(slots=True)
+class DispatchStats:
+    emitted: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    errors: int = 0
+    slow: int = 0
+    backlog: int = 0
+    max_backlog: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class _Mailbox:
+    # Deliveries for one listener group run in order and never concurrently;
+    # different groups are spread over the worker pool.
+    __slots__ = ("items", "scheduled")
+
     def __init__(self) -> None:
-        self._listeners: dict[str, list[EventCallback]] = defaultdict(list)
-        self._lock = RLock()
+        self.items: deque[tuple[EventCallback, dict[str, Any]]] = deque()
+        self.scheduled = False
+
 
-    def on(self, event_name: str, callback: EventCallback) -> None:
-        with self._lock:
-            self._listeners[event_name].append(callback)
+class EventBus:
+    def __init__(self, *, workers: int = 4, mailbox_size: int = 256, slow_callback_s: float = 0.2) -> None:
+        self._listeners: dict[str, list[tuple[EventCallback, _Mailbox]]] = defaultdict(list)
+        self._mailboxes: dict[Hashable, _Mailbox] = {}
+        self._ready: deque[_Mailbox] = deque()
+        self._cond = Condition()
+        self._workers = max(1, workers)
+        self._mailbox_size = max(1, mailbox_size)
+        self._slow_callback_s = slow_callback_s
+        self._threads: list[Thread] = []
+        self._busy = 0
+        self._closed = False
+        self._stats = DispatchStats()
+
+    def on(self, event_name: str, callback: EventCallback, *, group: Hashable | None = None) -> None:
+        key = callback if group is None else group
+        with self._cond:
+            box = self._mailboxes.setdefault(key, _Mailbox())
+            self._listeners[event_name].append((callback, box))
 
     def emit(self, event_name: str, payload: dict[str, Any] | None = None) -> None:
+        # Never blocks on listeners: a full mailbox drops its oldest pending
+        # event so the emitting thread (e.g. the telnet log reader) keeps going.
         data = payload or {}
-        with self._lock:
-            listeners = list(self._listeners[event_name])
-        for callback in listeners:
-            callback(data)
+        with self._cond:
+            if self._closed:
+                return
+            self._stats.emitted += 1
+            listeners = self._listeners.get(event_name)
+            if not listeners:
+                return
+            for callback, box in listeners:
+                if len(box.items) >= self._mailbox_size:
+                    box.items.popleft()
+                    self._stats.dropped += 1
+                    self._stats.backlog -= 1
+                box.items.append((callback, data))
+                self._stats.backlog += 1
+                if not box.scheduled:
+                    box.scheduled = True
+                    self._ready.append(box)
+            self._stats.max_backlog = max(self._stats.max_backlog, self._stats.backlog)
+            self._ensure_workers()
+            self._cond.notify(len(listeners))
+
+    def _ensure_workers(self) -> None:
+        while len(self._threads) < self._workers:
+            thread = Thread(target=self._worker_loop, name=f"event-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready and not self._closed:
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                box = self._ready.popleft()
+                batch = list(box.items)
+                box.items.clear()
+                self._stats.backlog -= len(batch)
+                self._busy += 1
+            delivered = errors = slow = 0
+            for callback, data in batch:
+                started = time.monotonic()
+                try:
+                    callback(data)
+                    delivered += 1
+                except Exception:  # noqa: BLE001
+                    errors += 1
+                if time.monotonic() - started > self._slow_callback_s:
+                    slow += 1
+            with self._cond:
+                self._busy -= 1
+                self._stats.delivered += delivered
+                self._stats.errors += errors
+                self._stats.slow += slow
+                if box.items:
+                    self._ready.append(box)
+                else:
+                    box.scheduled = False
+                self._cond.notify_all()
+
+    def flush(self, timeout_s: float = 2.0) -> bool:
+        deadline = time.monotonic() + timeout_s
+        with self._cond:
+            while self._ready or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return self._stats.to_dict()
+
+    def close(self, timeout_s: float = 1.0) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout_s)
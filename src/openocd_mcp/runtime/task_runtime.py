@@ -9,9 +9,8 @@ from datetime import datetime, timezone
 import inspect
 from threading import Event, RLock, Thread
 import time
-from types import FrameType
+from types import CodeType
 from typing import Any, Callable
-import sys
 
 from ..core.errors import MCPServiceError
 from .context import DebugContext
@@ -19,13 +18,87 @@ from .events import EventBus
 
 ContextFactory = Callable[[Event], DebugContext]
 
+# Scripts are instrumented with a call to this name at every loop back-edge,
+# comprehension element and function/lambda entry; the cancel/deadline check itself only runs every
+# TICK_INTERVAL calls so tight loops stay close to plain interpreter speed.
+TICK_NAME = "__task_tick__"
+TICK_INTERVAL = 64
+
 
 class TaskCancelled(RuntimeError):
     """Raised inside task thread to force cancellation."""
 
 
 class CallbackTimeout(RuntimeError):
-    """Raised inside callback thread to force timeout exit."""
+    """Raised from a callback's ticks once it overruns the callback timeout."""
+
+
+class _TaskClock:
+    __slots__ = ("cancel_event", "deadline", "armed", "budget", "timeout_exc", "timeout_msg")
+
+    def __init__(self, cancel_event: Event, deadline: float) -> None:
+        self.cancel_event = cancel_event
+        self.deadline = deadline
+        self.armed = True
+        self.budget = TICK_INTERVAL
+        self.timeout_exc: type[BaseException] = TimeoutError
+        self.timeout_msg = "task_timeout"
+
+    def arm(self, deadline: float, timeout_exc: type[BaseException], timeout_msg: str) -> None:
+        self.deadline = deadline
+        self.timeout_exc = timeout_exc
+        self.timeout_msg = timeout_msg
+        self.budget = TICK_INTERVAL
+        self.armed = True
+
+    def tick(self) -> None:
+        self.budget -= 1
+        if self.budget > 0:
+            return
+        self.budget = TICK_INTERVAL
+        if not self.armed:
+            return
+        if self.cancel_event.is_set():
+            raise TaskCancelled("task_cancelled")
+        if time.monotonic() >= self.deadline:
+            raise self.timeout_exc(self.timeout_msg)
+
+
+def _tick_call() -> ast.Call:
+    return ast.Call(func=ast.Name(id=TICK_NAME, ctx=ast.Load()), args=[], keywords=[])
+
+
+class _TickInserter(ast.NodeTransformer):
+    def _instrument(self, node: ast.AST) -> ast.AST:
+        self.generic_visit(node)
+        body = node.body  # type: ignore[attr-defined]
+        body.insert(0, ast.copy_location(ast.Expr(_tick_call()), body[0]))
+        return node
+
+    def _instrument_comprehension(self, node: ast.AST) -> ast.AST:
+        # Every element of every generator ticks, including filtered-out ones:
+        # the tick returns None, so "tick() is None" is an always-true first if.
+        self.generic_visit(node)
+        for comp in node.generators:  # type: ignore[attr-defined]
+            check = ast.Compare(left=_tick_call(), ops=[ast.Is()], comparators=[ast.Constant(value=None)])
+            comp.ifs.insert(0, ast.copy_location(check, comp.iter))
+        return node
+
+    def visit_Lambda(self, node: ast.Lambda) -> ast.AST:
+        # "tick() or body": the tick returns None, so the body's value is kept.
+        self.generic_visit(node)
+        node.body = ast.copy_location(ast.BoolOp(op=ast.Or(), values=[_tick_call(), node.body]), node.body)
+        return node
+
+    visit_For = _instrument
+    visit_AsyncFor = _instrument
+    visit_While = _instrument
+    visit_FunctionDef = _instrument
+    visit_AsyncFunctionDef = _instrument
+    visit_ListComp = _instrument_comprehension
+    visit_SetComp = _instrument_comprehension
+    visit_DictComp = _instrument_comprehension
+    visit_GeneratorExp = _instrument_comprehension
 
 
 @dataclass(slots=True)
@@ -38,6 +111,7 @@ class TaskInfo:
     thread: Thread | None = None
     cancel_event: Event = field(default_factory=Event)
     context: DebugContext | None = None
+    clock: _TaskClock | None = None
     callbacks: dict[str, list[Callable[..., Any]]] = field(default_factory=dict)
     callback_failures: list[str] = field(default_factory=list)
     disabled_callbacks: set[str] = field(default_factory=set)
@@ -48,11 +122,11 @@ class TaskRuntime:
     def __init__(self, event_bus: EventBus | None = None, callback_timeout_ms: int = 200) -> None:
         self._tasks: dict[str, TaskInfo] = {}
         self._lock = RLock()
-        self._event_bus = event_bus or EventBus()
+        self._event_bus = event_bus or EventBus(slow_callback_s=callback_timeout_ms / 1000.0)
         self._callback_timeout_ms = callback_timeout_ms
 
     @staticmethod
-    def _validate_script(code: str) -> None:
+    def _validate_script(code: str) -> ast.Module:
         try:
             tree = ast.parse(code, mode="exec")
         except SyntaxError as exc:
@@ -65,11 +139,21 @@ class TaskRuntime:
                 raise MCPServiceError("SCR_SECURITY_VIOLATION", f"Disallowed symbol: {node.id}")
             if isinstance(node, ast.Attribute) and node.attr.startswith("__"):
                 raise MCPServiceError("SCR_SECURITY_VIOLATION", "Dunder attribute access is blocked.")
+            names = {getattr(node, "id", None), getattr(node, "arg", None), getattr(node, "name", None)}
+            names.update(getattr(node, "names", None) or [])
+            if TICK_NAME in names:
+                raise MCPServiceError("SCR_SECURITY_VIOLATION", f"Reserved symbol: {TICK_NAME}")
+        return tree
+
+    @staticmethod
+    def _compile_script(tree: ast.Module, name: str) -> CodeType:
+        instrumented = ast.fix_missing_locations(_TickInserter().visit(tree))
+        return compile(instrumented, f"<task:{name}>", "exec")
 
     def submit(self, name: str, code: str, context_factory: ContextFactory, timeout_ms: int = 30_000) -> str:
         if not name.strip():
             raise MCPServiceError("SCR_INVALID_NAME", "Task name cannot be empty.")
-        self._validate_script(code)
+        program = self._compile_script(self._validate_script(code), name)
         with self._lock:
             existing = self._tasks.get(name)
             if existing and existing.status in {"pending", "running"}:
@@ -78,7 +162,7 @@ class TaskRuntime:
             self._tasks[name] = task
         thread = Thread(
             target=self._run_task,
-            args=(task, code, context_factory, timeout_ms),
+            args=(task, program, context_factory, timeout_ms),
             name=f"task-{name}",
             daemon=True,
         )
@@ -86,9 +170,9 @@ class TaskRuntime:
         thread.start()
         return name
 
-    def _run_task(self, task: TaskInfo, code: str, context_factory: ContextFactory, timeout_ms: int) -> None:
-        start = time.monotonic()
-        deadline = start + timeout_ms / 1000.0
+    def _run_task(self, task: TaskInfo, program: CodeType, context_factory: ContextFactory, timeout_ms: int) -> None:
+        clock = _TaskClock(task.cancel_event, time.monotonic() + timeout_ms / 1000.0)
+        task.clock = clock
         task.context = context_factory(task.cancel_event)
         callbacks: dict[str, list[Callable[..., Any]]] = {}
 
@@ -97,14 +181,6 @@ class TaskRuntime:
                 raise TypeError("Callback must be callable.")
             callbacks.setdefault(event_name, []).append(fn)
 
-        def trace(frame: FrameType, event: str, arg: object) -> Callable[[FrameType, str, object], Any]:
-            _ = (frame, event, arg)
-            if task.cancel_event.is_set():
-                raise TaskCancelled("task_cancelled")
-            if time.monotonic() >= deadline:
-                raise TimeoutError("task_timeout")
-            return trace
-
         allowed_builtins: dict[str, Any] = {
             "Exception": Exception,
             "TypeError": TypeError,
@@ -132,7 +208,7 @@ class TaskRuntime:
             "tuple": tuple,
             "zip": zip,
         }
-        globals_dict = {"__builtins__": allowed_builtins}
+        globals_dict = {"__builtins__": allowed_builtins, TICK_NAME: clock.tick}
         locals_dict: dict[str, Any] = {
             "ctx": task.context,
             "debugger": task.context.debugger,
@@ -140,8 +216,7 @@ class TaskRuntime:
             "on": on,
         }
         try:
-            sys.settrace(trace)
-            exec(code, globals_dict, locals_dict)
+            exec(program, globals_dict, locals_dict)
             task.status = "completed"
         except TimeoutError:
             task.status = "timeout"
@@ -150,16 +225,27 @@ class TaskRuntime:
             task.status = "cancelled"
             task.error = "task_cancelled"
         except RuntimeError as exc:
-            task.status = "failed"
+            if task.cancel_event.is_set() and str(exc) == "task_cancelled":
+                task.status = "cancelled"
+            else:
+                task.status = "failed"
             task.error = str(exc)
         except Exception as exc:  # noqa: BLE001
             task.status = "failed"
             task.error = f"{exc.__class__.__name__}: {exc}"
         finally:
-            sys.settrace(None)
+            clock.armed = False
             task.finished_at = datetime.now(timezone.utc)
 
         if task.status in {"completed", "cancelled", "timeout"}:
+            # Callbacks defined by the script keep their ticks but get a clock of
+            # their own: they still run after the task is cancelled, so they must
+            # not inherit its cancel event. The dispatcher arms it with the
+            # callback timeout for each delivery.
+            callback_clock = _TaskClock(Event(), 0.0)
+            callback_clock.armed = False
+            globals_dict[TICK_NAME] = callback_clock.tick
+            task.clock = callback_clock
             task.callbacks = callbacks
             self._bind_callbacks(task)
 
@@ -167,7 +253,7 @@ class TaskRuntime:
         for event_name, fns in task.callbacks.items():
             for fn in fns:
                 key = f"{event_name}:{getattr(fn, '__name__', 'lambda')}"
-                self._event_bus.on(event_name, self._make_callback(task, fn, key))
+                self._event_bus.on(event_name, self._make_callback(task, fn, key), group=task.name)
 
     def _make_callback(
         self,
@@ -175,52 +261,57 @@ class TaskRuntime:
         fn: Callable[..., Any],
         callback_key: str,
     ) -> Callable[[dict[str, Any]], None]:
+        try:
+            param_count = len(inspect.signature(fn).parameters)
+        except (TypeError, ValueError):
+            param_count = 0
+        timeout_s = self._callback_timeout_ms / 1000.0
+
+        # Runs on an event-bus worker. Callbacks of one task share one clock and
+        # are serialized by the bus (one mailbox per task), so arming it here is
+        # safe; pure-Python overruns stop at the next tick, anything else is
+        # caught by the elapsed-time check afterwards.
         def wrapper(payload: dict[str, Any]) -> None:
             if callback_key in task.disabled_callbacks:
                 return
             ctx = task.context
-            if ctx is None:
+            clock = task.clock
+            if ctx is None or clock is None:
                 return
-
-            error_holder: list[str] = []
-
-            def run_callback() -> None:
-                try:
-                    param_count = len(inspect.signature(fn).parameters)
-                except (TypeError, ValueError):
-                    param_count = 0
-                try:
-                    if param_count >= 2:
-                        fn(ctx, payload)
-                    elif param_count == 1:
-                        fn(payload)
-                    else:
-                        fn()
-                except Exception as exc:  # noqa: BLE001
-                    error_holder.append(f"{callback_key}: {exc.__class__.__name__}: {exc}")
-
-            thread = Thread(target=run_callback, name=f"cb-{callback_key}", daemon=True)
-            thread.start()
-            thread.join(timeout=self._callback_timeout_ms / 1000.0)
-            if thread.is_alive():
-                self._async_raise(thread, CallbackTimeout)
-                thread.join(timeout=0.05)
-                task.disabled_callbacks.add(callback_key)
-                if thread.is_alive():
-                    task.callback_failures.append(f"{callback_key}: timeout(force_stop_failed)")
+            failure: str | None = None
+            started = time.monotonic()
+            clock.arm(started + timeout_s, CallbackTimeout, "callback_timeout")
+            try:
+                if param_count >= 2:
+                    fn(ctx, payload)
+                elif param_count == 1:
+                    fn(payload)
                 else:
-                    task.callback_failures.append(f"{callback_key}: timeout")
-                return
-            if error_holder:
+                    fn()
+            except CallbackTimeout:
+                failure = f"{callback_key}: timeout"
+            except Exception as exc:  # noqa: BLE001
+                failure = f"{callback_key}: {exc.__class__.__name__}: {exc}"
+            finally:
+                clock.armed = False
+            if failure is None and time.monotonic() - started > timeout_s:
+                failure = f"{callback_key}: timeout"
+            if failure is not None:
                 task.disabled_callbacks.add(callback_key)
-                task.callback_failures.extend(error_holder)
+                task.callback_failures.append(failure)
 
         return wrapper
 
     def emit(self, event_name: str, payload: dict[str, Any] | None = None) -> None:
         self._event_bus.emit(event_name, payload or {})
 
-    def get(self, name: str) -> dict[str, Any]:
+    def flush_events(self, timeout_s: float = 2.0) -> bool:
+        return self._event_bus.flush(timeout_s)
+
+    def event_stats(self) -> dict[str, int]:
+        return self._event_bus.stats()
+
+    def get(self, name: str, *, since_seq: int | None = None) -> dict[str, Any]:
         task = self._tasks.get(name)
         if task is None:
             raise MCPServiceError("SCR_TASK_NOT_FOUND", f"Task does not exist: {name}")
@@ -234,9 +325,10 @@ class TaskRuntime:
             "disabled_callbacks": sorted(task.disabled_callbacks),
             "callback_failures": list(task.callback_failures),
             "force_stop_failed": task.force_stop_failed,
+            "event_dispatch": self._event_bus.stats(),
         }
         if task.context is not None:
-            data["result"] = task.context.snapshot()
+            data["result"] = task.context.snapshot(since_seq)
         return data
 
     @staticmethod
@@ -49,8 +49,8 @@ def create_server(service: OpenOCDMCPService | None = None) -> Any:
         return svc.reset_target(reset_type)
 
     @mcp.tool()
-    def read_memory(address: str, count: int, width: int = 32) -> dict[str, Any]:
-        return svc.read_memory(address, count, width)
+    def read_memory(address: str, count: int, width: int = 32, output_path: str | None = None) -> dict[str, Any]:
+        return svc.read_memory(address, count, width, output_path=output_path)
 
     @mcp.tool()
     def write_memory(
@@ -101,8 +101,8 @@ def create_server(service: OpenOCDMCPService | None = None) -> Any:
         return svc.submit_task(code, timeout_ms=timeout_ms)
 
     @mcp.tool()
-    def get_task_result(id: str) -> dict[str, Any]:
-        return svc.get_task_result(task_id=id)
+    def get_task_result(id: str, since_seq: int | None = None) -> dict[str, Any]:
+        return svc.get_task_result(task_id=id, since_seq=since_seq)
 
     @mcp.tool()
     def cancel_task(id: str, force: bool = False) -> dict[str, Any]:
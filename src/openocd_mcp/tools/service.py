@@ -36,6 +36,27 @@ def _parse_dump_values(raw: str) -> list[int]:
     return values
 
 
+# Upper bound on the words merged into one ranged read, which keeps a single
+# reply (and its timeout) bounded.
+_COALESCE_MAX_WORDS = 1024
+
+
+def _coalesce_word_ranges(addresses: list[int]) -> list[tuple[int, int]]:
+    # Only words that are adjacent in memory *and* consecutive in call order are
+    # merged. Gap words are never read and duplicates or out-of-order reads stay
+    # separate, because reads of memory-mapped registers can have side effects
+    # (popping a FIFO, clearing a status flag).
+    ranges: list[tuple[int, int]] = []
+    for addr in addresses:
+        if ranges and addr % 4 == 0:
+            start, count = ranges[-1]
+            if start % 4 == 0 and addr == start + 4 * count and count < _COALESCE_MAX_WORDS:
+                ranges[-1] = (start, count + 1)
+                continue
+        ranges.append((addr, 1))
+    return ranges
+
+
 def _extract_hex_tokens(raw: str) -> list[str]:
     tokens = re.findall(r"0x[0-9a-fA-F]+", raw)
     return [t.lower() for t in tokens]
@@ -148,11 +169,32 @@ class OpenOCDMCPService:
         event_name = str(event.get("event", ""))
         if event_name == "TARGET_HALTED":
             self.session.update(target_state="halted")
+            pc = event.get("pc")
+            if pc:
+                # This runs on the telnet log thread: don't wait for the line index.
+                event["location"] = self._symbolize(pc, wait=False)
+                event["breakpoint"] = self._breakpoint_at(int(pc, 16))
             self.tasks.emit("TARGET_HALTED", event)
         elif event_name == "WATCHPOINT_HIT":
             self.tasks.emit("WATCHPOINT_HIT", event)
         self.tasks.emit("OPENOCD_LOG", {"line": line, "event": event})
 
+    def _symbolize(self, address: str | int | None, *, wait: bool = True) -> dict[str, Any] | None:
+        if address is None or self.elf.path is None:
+            return None
+        try:
+            value = int(address, 16) if isinstance(address, str) else int(address)
+            return self.elf.describe(value, wait=wait)
+        except Exception:  # noqa: BLE001
+            # Symbolization is best effort; a bad PC or DWARF must not fail the caller.
+            return None
+
+    def _breakpoint_at(self, address: int) -> int | None:
+        for bp_id, info in list(self._breakpoints.items()):
+            if info["type"] == "bp" and info["address"] == address:
+                return bp_id
+        return None
+
     def list_debug_probes(self) -> dict[str, Any]:
         def action() -> ToolResult:
             serial_ports = SerialManager.list_ports()
@@ -231,6 +273,8 @@ class OpenOCDMCPService:
                 parity=str(cfg.get("parity", "N")),
                 stopbits=int(cfg.get("stopbits", 1)),
                 timeout=float(cfg.get("timeout", 0.1)),
+                framing=str(cfg.get("framing", "line")),
+                read_chunk_bytes=int(cfg.get("read_chunk_bytes", 4096)),
             )
             self.serial_mgr.connect(serial_cfg)
             self.session.update(serial_connected=True)
@@ -261,16 +305,24 @@ class OpenOCDMCPService:
         def run() -> ToolResult:
             current_state = self.session.snapshot().get("target_state")
             if action == "halt" and current_state == "halted":
-                return ok(data={"state": "halted", "pc": self.openocd.get_pc()}, message="Target already halted.")
+                pc = self.openocd.get_pc()
+                return ok(
+                    data={"state": "halted", "pc": pc, "location": self._symbolize(pc)},
+                    message="Target already halted.",
+                )
             if action == "resume" and current_state == "running":
                 return ok(data={"state": "running", "pc": self.openocd.get_pc()}, message="Target already running.")
             raw = self.openocd.control_target(action)
             target_state = "halted" if action in {"halt", "step"} else "running"
             pc = self.openocd.get_pc()
+            location = self._symbolize(pc) if target_state == "halted" else None
             self.session.update(target_state=target_state)
             if action == "halt":
-                self.tasks.emit("TARGET_HALTED", {"state": target_state, "pc": pc, "time": self._utc_now()})
-            return ok(data={"state": target_state, "pc": pc}, raw_output=raw)
+                self.tasks.emit(
+                    "TARGET_HALTED",
+                    {"state": target_state, "pc": pc, "location": location, "time": self._utc_now()},
+                )
+            return ok(data={"state": target_state, "pc": pc, "location": location}, raw_output=raw)
 
         return self._guard(run)
 
@@ -283,24 +335,44 @@ class OpenOCDMCPService:
             return info.address
         return self.elf.resolve(token)
 
-    def read_memory(self, address: str | int, count: int, width: int = 32) -> dict[str, Any]:
+    def read_memory(
+        self,
+        address: str | int,
+        count: int,
+        width: int = 32,
+        *,
+        output_path: str | None = None,
+    ) -> dict[str, Any]:
         def run() -> ToolResult:
             if width not in {8, 16, 32}:
                 raise MCPServiceError("DBG_INVALID_WIDTH", "Width must be 8, 16, or 32.")
             if count <= 0:
                 raise MCPServiceError("DBG_INVALID_COUNT", "Count must be > 0.")
             addr = self._resolve_address(address)
+            base = {"base": f"0x{addr:x}", "width": width, "count": count}
+            if output_path:
+                if not hasattr(self.openocd, "read_memory_to_file"):
+                    raise MCPServiceError("DBG_BULK_UNSUPPORTED", "Debugger client cannot stream memory to a file.")
+                stored = self.openocd.read_memory_to_file(addr, count * (width // 8), output_path)
+                return ok(data={**base, **stored})
+            if hasattr(self.openocd, "read_memory_block"):
+                try:
+                    values = self.openocd.read_memory_block(addr, count, width)
+                    return ok(data={**base, "data": values.tolist()})
+                except MCPServiceError as exc:
+                    if exc.error_code != "DBG_BULK_UNSUPPORTED":
+                        raise
             cmd = {8: "mdb", 16: "mdh", 32: "mdw"}[width]
             raw = self.openocd.execute(f"{cmd} 0x{addr:x} {count}")
             parsed = _parse_dump_values(raw)[:count]
             if not parsed:
                 return partial(
-                    data={"base": f"0x{addr:x}", "width": width, "count": count},
+                    data=base,
                     message="Memory read returned no parsable values.",
                     raw_output=raw,
                 )
             return ok(
-                data={"base": f"0x{addr:x}", "width": width, "count": count, "data": parsed},
+                data={**base, "data": parsed},
                 raw_output=raw,
             )
 
@@ -450,7 +522,15 @@ class OpenOCDMCPService:
                     "length": length,
                     "access": access,
                 }
-                return ok(data={"id": bp_id, "type": point_type, "address": f"0x{address:x}"}, raw_output=raw)
+                return ok(
+                    data={
+                        "id": bp_id,
+                        "type": point_type,
+                        "address": f"0x{address:x}",
+                        "location": self._symbolize(address),
+                    },
+                    raw_output=raw,
+                )
             removed_id = None
             for key, value in list(self._breakpoints.items()):
                 if value["type"] == point_type and value["address"] == address:
@@ -556,7 +636,10 @@ class OpenOCDMCPService:
 
         def run() -> ToolResult:
             self.serial_mgr.set_trigger(regex=keyword, action=action, callback=on_trigger)
-            return ok(data={"keyword": keyword, "action": action})
+            data: dict[str, Any] = {"keyword": keyword, "action": action}
+            if hasattr(self.serial_mgr, "trigger_stats"):
+                data["triggers"] = self.serial_mgr.trigger_stats()
+            return ok(data=data)
 
         return self._guard(run)
 
@@ -567,6 +650,30 @@ class OpenOCDMCPService:
             raise MCPServiceError("DBG_READ_FAILED", f"Cannot parse value from: {raw}", raw_output=raw)
         return parsed[0]
 
+    def _read_many_internal(self, addresses: list[int]) -> list[int]:
+        ranges = _coalesce_word_ranges(addresses)
+        blocks: list[list[int]] | None = None
+        if hasattr(self.openocd, "read_ranges"):
+            try:
+                blocks = [block.tolist() for block in self.openocd.read_ranges(ranges)]
+            except MCPServiceError as exc:
+                if exc.error_code != "DBG_BULK_UNSUPPORTED":
+                    raise
+        if blocks is None:
+            commands = [f"mdw 0x{start:x} {count}" for start, count in ranges]
+            if hasattr(self.openocd, "execute_many"):
+                replies = self.openocd.execute_many(commands)
+            else:
+                replies = [self.openocd.execute(cmd) for cmd in commands]
+            blocks = []
+            for raw, (_, count) in zip(replies, ranges):
+                parsed = _parse_dump_values(raw)[:count]
+                if len(parsed) != count:
+                    raise MCPServiceError("DBG_READ_FAILED", f"Cannot parse values from: {raw}", raw_output=raw)
+                blocks.append(parsed)
+        # Ranges follow the call order, so the blocks concatenate to the result.
+        return [value for (_, count), block in zip(ranges, blocks) for value in block[:count]]
+
     def _write32_internal(self, address: int, value: int) -> None:
         self.openocd.execute(f"mww 0x{address:x} 0x{value:x}")
 
@@ -574,6 +681,8 @@ class OpenOCDMCPService:
         def context_factory(cancel_event: Any) -> DebugContext:
             return DebugContext(
                 read32=self._read32_internal,
+                read_many=self._read_many_internal,
+                symbolize=self._symbolize,
                 write32=self._write32_internal,
                 halt=lambda: self.openocd.control_target("halt"),
                 resume=lambda: self.openocd.control_target("resume"),
@@ -588,8 +697,8 @@ class OpenOCDMCPService:
 
         return self._guard(run)
 
-    def get_task_result(self, task_id: str) -> dict[str, Any]:
-        return self._guard(lambda: ok(data=self.tasks.get(task_id)))
+    def get_task_result(self, task_id: str, *, since_seq: int | None = None) -> dict[str, Any]:
+        return self._guard(lambda: ok(data=self.tasks.get(task_id, since_seq=since_seq)))
 
     def cancel_task(self, task_id: str, *, force: bool = False) -> dict[str, Any]:
         return self._guard(
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 import os
 import re
 import socket
 import subprocess
+import sys
 import tempfile
 from threading import Event, RLock, Thread
 import time
@@ -18,6 +20,36 @@ from ...core.errors import MCPServiceError
 EOM = b"\x1a"
 LogCallback = Callable[[str, dict[str, Any] | None], None]
 
+# Bulk transfers are split so that one TCL reply stays a few hundred KB of text
+# at most and a slow adapter cannot trip the per-command socket timeout.
+MEMORY_CHUNK_BYTES = 16 * 1024
+# Commands kept in flight by execute_many. OpenOCD answers strictly in order, so
+# a bounded window only keeps both socket buffers from filling up at once.
+PIPELINE_DEPTH = 32
+MEMORY_CHUNK_TIMEOUT_S = 10.0
+_ARRAY_TYPECODES = {8: "B", 16: "H", 32: "I" if array("I").itemsize == 4 else "L"}
+_LOOPBACK_HOSTS = {"127.0.0.1", "localhost", "::1"}
+_DUMP_ERROR_RE = re.compile(r"\berror\b|failed|invalid command name|couldn't|cannot", re.IGNORECASE)
+
+
+def _memory_chunks(address: int, count: int, width: int, chunk_bytes: int) -> list[tuple[int, int, int]]:
+    step = width // 8
+    per_chunk = max(1, chunk_bytes // step)
+    chunks: list[tuple[int, int, int]] = []
+    offset = 0
+    while offset < count:
+        n = min(per_chunk, count - offset)
+        chunks.append((address + offset * step, offset, n))
+        offset += n
+    return chunks
+
+
+def _array_typecode(width: int) -> str:
+    typecode = _ARRAY_TYPECODES.get(width)
+    if typecode is None:
+        raise MCPServiceError("DBG_INVALID_WIDTH", "Width must be 8, 16, or 32.")
+    return typecode
+
 
 @dataclass(slots=True)
 class OpenOCDConfig:
@@ -41,7 +73,9 @@ class OpenOCDClient:
         self._telnet_thread: Thread | None = None
         self._stop_event = Event()
         self._lock = RLock()
+        self._rx = bytearray()
         self._log_callbacks: list[LogCallback] = []
+        self.tcl_host = "127.0.0.1"
         self.tcl_port = 6666
         self.telnet_port = 4444
 
@@ -223,30 +257,201 @@ class OpenOCDClient:
             except OSError as exc:
                 sock.close()
                 raise MCPServiceError("SYS_TCL_CONNECT_FAILED", f"Failed to connect TCL socket: {exc}") from exc
+            # Commands and replies are small; without TCP_NODELAY, Nagle plus
+            # delayed ACKs stall pipelined batches by tens of milliseconds.
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self._socket = sock
+            self.tcl_host = host
             self.tcl_port = port
 
+    def _recv_reply(self, sock: socket.socket) -> bytes:
+        while True:
+            end = self._rx.find(EOM)
+            if end >= 0:
+                reply = bytes(self._rx[:end])
+                del self._rx[:end + 1]
+                return reply
+            piece = sock.recv(65536)
+            if not piece:
+                reply = bytes(self._rx)
+                self._rx.clear()
+                return reply
+            self._rx.extend(piece)
+
     def execute(self, command: str, timeout_s: float = 2.0) -> str:
+        return self.execute_many([command], timeout_s=timeout_s)[0]
+
+    def execute_many(self, commands: list[str], timeout_s: float = 2.0) -> list[str]:
+        # Commands are written back to back and the EOM-delimited replies are read
+        # afterwards, so a batch costs one round trip per PIPELINE_DEPTH commands.
+        replies: list[str] = []
         with self._lock:
             if self._socket is None:
                 raise MCPServiceError("SYS_NOT_CONNECTED", "TCL socket is not connected.")
-            payload = f"{command}\x1a".encode("utf-8")
-            self._socket.settimeout(timeout_s)
+            sock = self._socket
+            sock.settimeout(timeout_s)
             try:
-                self._socket.sendall(payload)
-                chunks: list[bytes] = []
-                while True:
-                    piece = self._socket.recv(4096)
-                    if not piece:
-                        break
-                    if EOM in piece:
-                        before, _, _ = piece.partition(EOM)
-                        chunks.append(before)
-                        break
-                    chunks.append(piece)
+                for start in range(0, len(commands), PIPELINE_DEPTH):
+                    window = commands[start:start + PIPELINE_DEPTH]
+                    sock.sendall(b"".join(f"{cmd}\x1a".encode("utf-8") for cmd in window))
+                    for _ in window:
+                        raw = self._recv_reply(sock)
+                        replies.append(raw.decode("utf-8", errors="replace").strip())
             except OSError as exc:
+                # Replies to the rest of the window may still arrive and would be
+                # taken as answers to later commands; drop the connection instead.
+                self._socket = None
+                self._rx.clear()
+                try:
+                    sock.close()
+                except OSError:
+                    pass
                 raise MCPServiceError("DBG_TCL_IO_ERROR", f"TCL RPC failed: {exc}") from exc
-        return b"".join(chunks).decode("utf-8", errors="replace").strip()
+        return replies
+
+    def read_ranges(self, ranges: list[tuple[int, int]], width: int = 32) -> list[array]:
+        typecode = _array_typecode(width)
+        commands = [f"read_memory 0x{address:x} {width} {count}" for address, count in ranges]
+        replies = self.execute_many(commands, timeout_s=MEMORY_CHUNK_TIMEOUT_S)
+        return [
+            array(typecode, self._parse_memory_reply(raw, count, "read_memory"))
+            for raw, (_, count) in zip(replies, ranges)
+        ]
+
+    @staticmethod
+    def _parse_memory_reply(raw: str, expected: int, command: str) -> list[int]:
+        tokens = raw.split()
+        try:
+            values = [int(token, 0) for token in tokens]
+        except ValueError:
+            values = []
+        if len(values) != expected:
+            if "invalid command name" in raw.lower():
+                raise MCPServiceError(
+                    "DBG_BULK_UNSUPPORTED",
+                    f"OpenOCD does not provide '{command}'; bulk memory access needs OpenOCD 0.12+.",
+                    raw_output=raw,
+                )
+            raise MCPServiceError(
+                "DBG_READ_FAILED",
+                f"{command} returned {len(values)} of {expected} values.",
+                raw_output=raw[-4000:],
+            )
+        return values
+
+    def read_memory_block(
+        self,
+        address: int,
+        count: int,
+        width: int = 32,
+        *,
+        chunk_bytes: int = MEMORY_CHUNK_BYTES,
+    ) -> array:
+        typecode = _array_typecode(width)
+        if count <= 0:
+            raise MCPServiceError("DBG_INVALID_COUNT", "Count must be > 0.")
+        out = array(typecode)
+        for chunk_addr, _, n in _memory_chunks(address, count, width, chunk_bytes):
+            raw = self.execute(f"read_memory 0x{chunk_addr:x} {width} {n}", timeout_s=MEMORY_CHUNK_TIMEOUT_S)
+            out.extend(self._parse_memory_reply(raw, n, "read_memory"))
+        return out
+
+    def read_memory_bytes(self, address: int, size: int, *, chunk_bytes: int = MEMORY_CHUNK_BYTES) -> bytes:
+        # Word-aligned ranges travel as 32-bit values (a quarter of the tokens);
+        # targets are assumed little-endian, as every supported Cortex-M part is.
+        if address % 4 == 0 and size % 4 == 0:
+            words = self.read_memory_block(address, size // 4, 32, chunk_bytes=chunk_bytes)
+            if sys.byteorder != "little":
+                words.byteswap()
+            return words.tobytes()
+        return self.read_memory_block(address, size, 8, chunk_bytes=chunk_bytes).tobytes()
+
+    def write_memory_block(
+        self,
+        address: int,
+        values: Any,
+        width: int = 32,
+        *,
+        chunk_bytes: int = MEMORY_CHUNK_BYTES,
+    ) -> int:
+        _array_typecode(width)
+        if isinstance(values, (bytes, bytearray, memoryview)) and width != 8:
+            block = array(_ARRAY_TYPECODES[width], bytes(values))
+            if sys.byteorder != "little":
+                block.byteswap()
+            values = block
+        items = list(values)
+        limit = (1 << width) - 1
+        for chunk_addr, offset, n in _memory_chunks(address, len(items), width, chunk_bytes):
+            chunk = items[offset:offset + n]
+            if any(v < 0 or v > limit for v in chunk):
+                raise MCPServiceError("DBG_INVALID_VALUE", f"Value does not fit in {width} bits.")
+            body = " ".join(f"0x{v:x}" for v in chunk)
+            raw = self.execute(f"write_memory 0x{chunk_addr:x} {width} {{{body}}}", timeout_s=MEMORY_CHUNK_TIMEOUT_S)
+            if raw:
+                code = "DBG_BULK_UNSUPPORTED" if "invalid command name" in raw.lower() else "DBG_WRITE_FAILED"
+                raise MCPServiceError(code, f"write_memory failed at 0x{chunk_addr:x}.", raw_output=raw)
+        return len(items)
+
+    def _dump_image(self, address: int, size: int, path: str) -> None:
+        # Dump to a fresh .part file so a failed dump can't pass the size check
+        # with a stale file left by an earlier read.
+        tmp_path = f"{path}.part"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            raw = self.execute(
+                f"dump_image {{{tmp_path}}} 0x{address:x} {size}",
+                timeout_s=max(MEMORY_CHUNK_TIMEOUT_S, size / MEMORY_CHUNK_BYTES),
+            )
+            if _DUMP_ERROR_RE.search(raw):
+                raise MCPServiceError("DBG_READ_FAILED", "dump_image failed.", raw_output=raw)
+            try:
+                written = os.path.getsize(tmp_path)
+            except OSError:
+                written = -1
+            if written != size:
+                raise MCPServiceError("DBG_READ_FAILED", f"dump_image wrote {written} of {size} bytes.", raw_output=raw)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def read_memory_to_file(
+        self,
+        address: int,
+        size: int,
+        path: str,
+        *,
+        method: str = "auto",
+        chunk_bytes: int = MEMORY_CHUNK_BYTES,
+    ) -> dict[str, Any]:
+        # dump_image lets OpenOCD write the file itself, which only works when it
+        # shares our filesystem: "auto" tries it on loopback connections and falls
+        # back to chunked read_memory streaming.
+        if method not in {"auto", "dump_image", "chunked"}:
+            raise MCPServiceError("DBG_INVALID_MODE", "method must be auto, dump_image or chunked.")
+        if size <= 0:
+            raise MCPServiceError("DBG_INVALID_COUNT", "Size must be > 0.")
+        target = os.path.abspath(path)
+        use_dump = method == "dump_image" or (method == "auto" and self.tcl_host in _LOOPBACK_HOSTS)
+        if use_dump:
+            try:
+                self._dump_image(address, size, target)
+                return {"path": target, "bytes": size, "method": "dump_image"}
+            except MCPServiceError:
+                if method == "dump_image":
+                    raise
+        tmp_path = f"{target}.part"
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk_addr, _, n in _memory_chunks(address, size, 8, chunk_bytes):
+                    f.write(self.read_memory_bytes(chunk_addr, n, chunk_bytes=chunk_bytes))
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return {"path": target, "bytes": size, "method": "chunked"}
 
     def control_target(self, action: str) -> str:
         allowed = {"halt", "resume", "step", "reset", "init", "run"}
@@ -370,6 +575,7 @@ class OpenOCDClient:
                     self._socket.close()
                 finally:
                     self._socket = None
+                    self._rx.clear()
             if self._process is not None:
                 if self._process.poll() is None:
                     self._process.terminate()
@@ -0,0 +1,123 @@
+"""Incremental framers that split a serial byte stream into frames."""
+
+from __future__ import annotations
+
+from typing import Protocol
+
+FRAMING_MODES = ("line", "cobs")
+
+
+class Framer(Protocol):
+    def feed(self, data: bytes) -> list[bytes]: ...
+
+    def flush(self) -> list[bytes]: ...
+
+
+class LineFramer:
+    # Keeps the unterminated tail between reads; a line longer than max_line
+    # bytes is emitted as-is so a missing newline cannot grow the buffer forever.
+    def __init__(self, max_line: int = 64 * 1024) -> None:
+        self.max_line = max_line
+        self._pending = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        buf = self._pending
+        buf += data
+        end = buf.rfind(b"\n")
+        if end < 0:
+            if len(buf) < self.max_line:
+                return []
+            frame = bytes(buf)
+            buf.clear()
+            return [frame]
+        frames = bytes(buf[:end]).split(b"\n")
+        del buf[:end + 1]
+        return [frame[:-1] if frame.endswith(b"\r") else frame for frame in frames]
+
+    def flush(self) -> list[bytes]:
+        if not self._pending:
+            return []
+        frame = bytes(self._pending)
+        self._pending.clear()
+        return [frame]
+
+
+def cobs_encode(data: bytes) -> bytes:
+    out = bytearray([0])
+    code_index = 0
+    code = 1
+    for byte in data:
+        if byte == 0:
+            out[code_index] = code
+            code_index = len(out)
+            out.append(0)
+            code = 1
+            continue
+        out.append(byte)
+        code += 1
+        if code == 0xFF:
+            out[code_index] = code
+            code_index = len(out)
+            out.append(0)
+            code = 1
+    out[code_index] = code
+    return bytes(out)
+
+
+def cobs_decode(data: bytes) -> bytes:
+    out = bytearray()
+    index = 0
+    size = len(data)
+    while index < size:
+        code = data[index]
+        if code == 0:
+            raise ValueError("Unexpected zero byte in COBS frame.")
+        end = index + code
+        if end > size:
+            raise ValueError("Truncated COBS frame.")
+        out += data[index + 1:end]
+        index = end
+        if code != 0xFF and index < size:
+            out.append(0)
+    return bytes(out)
+
+
+class CobsFramer:
+    # Frames are COBS-encoded and terminated by a zero byte; undecodable frames
+    # are counted and skipped so one corrupted packet does not desync the stream.
+    def __init__(self, max_frame: int = 64 * 1024) -> None:
+        self.max_frame = max_frame
+        self.errors = 0
+        self._pending = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        buf = self._pending
+        buf += data
+        end = buf.rfind(b"\0")
+        if end < 0:
+            if len(buf) > self.max_frame:
+                buf.clear()
+                self.errors += 1
+            return []
+        frames: list[bytes] = []
+        for raw in bytes(buf[:end]).split(b"\0"):
+            if not raw:
+                continue
+            try:
+                frames.append(cobs_decode(raw))
+            except ValueError:
+                self.errors += 1
+        del buf[:end + 1]
+        return frames
+
+    def flush(self) -> list[bytes]:
+        self._pending.clear()
+        return []
+
+
+def make_framer(mode: str) -> Framer:
+    if mode == "line":
+        return LineFramer()
+    if mode == "cobs":
+        return CobsFramer()
+    raise ValueError(f"Unsupported framing mode: {mode}")
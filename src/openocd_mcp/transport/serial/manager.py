@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
-from threading import Event, RLock, Thread
+from threading import Event, Lock, RLock, Thread
 import re
 import time
 from typing import Callable
 
 from ...core.errors import MCPServiceError
 from ...core.ring_buffer import LineRingBuffer
+from ...core.triggers import TriggerIndex
+from .framing import FRAMING_MODES, make_framer
 
 try:
     import serial  # type: ignore[import-untyped]
@@ -27,6 +30,22 @@ class SerialConfig:
     parity: str = "N"
     stopbits: int = 1
     timeout: float = 0.1
+    framing: str = "line"
+    read_chunk_bytes: int = 4096
+
+
+_TRIGGER_EXECUTOR: ThreadPoolExecutor | None = None
+_TRIGGER_EXECUTOR_LOCK = Lock()
+
+
+def shared_trigger_executor() -> Executor:
+    # One small pool serves trigger callbacks of every SerialManager instead
+    # of a fresh thread per match.
+    global _TRIGGER_EXECUTOR
+    with _TRIGGER_EXECUTOR_LOCK:
+        if _TRIGGER_EXECUTOR is None:
+            _TRIGGER_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="serial-trigger")
+        return _TRIGGER_EXECUTOR
 
 
 @dataclass(slots=True)
@@ -40,6 +59,9 @@ class TriggerRule:
     def should_fire(self, line: str, now_ms: int) -> bool:
         if not self.regex.search(line):
             return False
+        return self.take_cooldown(now_ms)
+
+    def take_cooldown(self, now_ms: int) -> bool:
         if now_ms - self.last_fired_ms < self.cooldown_ms:
             return False
         self.last_fired_ms = now_ms
@@ -47,13 +69,30 @@ class TriggerRule:
 
 
 class SerialManager:
-    def __init__(self, buffer_capacity_bytes: int = 100 * 1024) -> None:
-        self.buffer = LineRingBuffer(capacity_bytes=buffer_capacity_bytes)
+    def __init__(
+        self,
+        buffer_capacity_bytes: int = 100 * 1024,
+        *,
+        trigger_executor: Executor | None = None,
+        buffer_index: bool = False,
+        buffer_spill_dir: str | None = None,
+    ) -> None:
+        self.buffer = LineRingBuffer(
+            capacity_bytes=buffer_capacity_bytes,
+            index_keywords=buffer_index,
+            spill_dir=buffer_spill_dir,
+        )
+        self._trigger_executor = trigger_executor
+        self._framing = "line"
+        self._read_chunk_bytes = 4096
+        self.stats = {"bytes": 0, "frames": 0, "frame_errors": 0}
         self._serial: object | None = None
         self._stop_event = Event()
         self._thread: Thread | None = None
         self._lock = RLock()
-        self._triggers: list[TriggerRule] = []
+        self._triggers: dict[int, TriggerRule] = {}
+        self._trigger_seq = 0
+        self._trigger_index = TriggerIndex()
 
     @staticmethod
     def list_ports() -> list[dict[str, str]]:
@@ -67,6 +106,8 @@ class SerialManager:
     def connect(self, config: SerialConfig) -> None:
         if serial is None:
             raise MCPServiceError("UART_DEPENDENCY_MISSING", "pyserial is not installed.")
+        if config.framing not in FRAMING_MODES:
+            raise MCPServiceError("UART_INVALID_MODE", f"Unsupported serial framing: {config.framing}")
         with self._lock:
             if self._serial is not None:
                 raise MCPServiceError("UART_ALREADY_CONNECTED", "Serial is already connected.")
@@ -81,31 +122,40 @@ class SerialManager:
                 )
             except Exception as exc:  # pragma: no cover - hardware dependent
                 raise MCPServiceError("UART_CONNECT_FAILED", f"Failed to open serial port: {exc}") from exc
+            self._framing = config.framing
+            self._read_chunk_bytes = max(1, config.read_chunk_bytes)
             self._stop_event.clear()
             self._thread = Thread(target=self._read_loop, name="serial-reader", daemon=True)
             self._thread.start()
 
     def _read_loop(self) -> None:
+        # read() blocks until data arrives (bounded by the port timeout, which
+        # keeps close() responsive), then drains whatever the driver has queued
+        # in one call; the framer reassembles lines/frames across chunks.
+        framer = make_framer(self._framing)
+        binary = self._framing != "line"
         while not self._stop_event.is_set():
             serial_obj = self._serial
             if serial_obj is None:
-                return
+                break
             try:
-                waiting = getattr(serial_obj, "in_waiting", 0)
-                if waiting:
-                    raw = serial_obj.readline()
-                else:
-                    time.sleep(0.01)
-                    continue
+                size = min(getattr(serial_obj, "in_waiting", 0) or 1, self._read_chunk_bytes)
+                chunk = serial_obj.read(size)
             except Exception:  # pragma: no cover - hardware dependent
-                time.sleep(0.05)
+                if self._stop_event.wait(0.05):
+                    break
                 continue
-            if not raw:
+            if not chunk:
                 continue
-            if isinstance(raw, str):
-                line = raw.strip()
-            else:
-                line = self._decode_line(raw)
+            self.stats["bytes"] += len(chunk)
+            self._consume_frames(framer.feed(chunk), binary)
+            self.stats["frame_errors"] = getattr(framer, "errors", 0)
+        self._consume_frames(framer.flush(), binary)
+
+    def _consume_frames(self, frames: list[bytes], binary: bool) -> None:
+        for frame in frames:
+            self.stats["frames"] += 1
+            line = frame.hex(" ") if binary else self._decode_line(frame)
             if line:
                 self._consume_line(line)
 
@@ -121,17 +171,16 @@ class SerialManager:
 
     def _consume_line(self, line: str) -> None:
         self.buffer.append(line)
+        keys = self._trigger_index.match(line)
+        if not keys:
+            return
         now_ms = int(time.monotonic() * 1000)
         with self._lock:
-            triggers = list(self._triggers)
+            triggers = [self._triggers[key] for key in keys if key in self._triggers]
         for trigger in triggers:
-            if trigger.should_fire(line, now_ms):
-                Thread(
-                    target=trigger.callback,
-                    args=(trigger.action, line),
-                    name="serial-trigger",
-                    daemon=True,
-                ).start()
+            if trigger.take_cooldown(now_ms):
+                executor = self._trigger_executor or shared_trigger_executor()
+                executor.submit(trigger.callback, trigger.action, line)
 
     def feed_line_for_test(self, line: str) -> None:
         self._consume_line(line)
@@ -164,13 +213,27 @@ class SerialManager:
         except re.error as exc:
             raise MCPServiceError("UART_REGEX_INVALID", f"Invalid regex: {exc}") from exc
         with self._lock:
-            self._triggers.append(
-                TriggerRule(regex=compiled, action=action, callback=callback, cooldown_ms=cooldown_ms)
+            self._trigger_seq += 1
+            key = self._trigger_seq
+            self._triggers[key] = TriggerRule(
+                regex=compiled, action=action, callback=callback, cooldown_ms=cooldown_ms
             )
+            self._trigger_index.add(key, regex)
 
     def clear_triggers(self) -> None:
         with self._lock:
             self._triggers.clear()
+            self._trigger_index.clear()
+
+    def trigger_stats(self) -> dict[str, object]:
+        stats = self._trigger_index.stats()
+        with self._lock:
+            counts = self._trigger_index.match_counts
+            stats["matches"] = [
+                {"pattern": rule.regex.pattern, "action": rule.action, "count": counts.get(key, 0)}
+                for key, rule in self._triggers.items()
+            ]
+        return stats
 
     def close(self) -> None:
         self._stop_event.set()
@@ -183,6 +246,7 @@ class SerialManager:
                 serial_obj.close()
             except Exception:  # pragma: no cover - hardware dependent
                 pass
+        self.buffer.close()
 
     def is_connected(self) -> bool:
         return self._serial is not None
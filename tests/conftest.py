@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_runner_cache(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("K2C_RUNNER_CACHE_DIR", str(tmp_path / "runner-cache"))
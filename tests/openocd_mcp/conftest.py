@@ -3,9 +3,16 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 
 ROOT = Path(__file__).resolve().parents[2]
 SRC = ROOT / 'src'
 
 if str(SRC) not in sys.path:
-    sys.path.insert(0, str(SRC))
\ No newline at end of file
+    sys.path.insert(0, str(SRC))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_parse_cache(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("OPENOCD_MCP_PARSE_CACHE", str(tmp_path / "parse-cache"))
@@ -0,0 +1,253 @@
+import socket
+from pathlib import Path
+from threading import Thread
+
+import pytest
+
+from openocd_mcp.core.errors import MCPServiceError
+from openocd_mcp.tools.service import OpenOCDMCPService, _coalesce_word_ranges
+from openocd_mcp.transport.openocd_tcl.client import OpenOCDClient
+from openocd_mcp.transport.serial.manager import SerialManager
+
+SRAM_BASE = 0x20000000
+SRAM_SIZE = 64 * 1024
+
+
+class FakeMemoryTarget:
+    def __init__(self, *, legacy: bool = False) -> None:
+        self.legacy = legacy
+        self.fail_dump = False
+        self.memory = bytearray((i * 7 + 3) & 0xFF for i in range(SRAM_SIZE))
+        self.commands: list[str] = []
+
+    def _span(self, address: int, size: int) -> slice:
+        start = address - SRAM_BASE
+        return slice(start, start + size)
+
+    def handle(self, cmd: str) -> str:
+        self.commands.append(cmd)
+        name = cmd.split(maxsplit=1)[0]
+        if self.legacy and name in {"read_memory", "write_memory"}:
+            return f'invalid command name "{name}"'
+        if name == "read_memory":
+            _, addr, width, count = cmd.split()
+            step = int(width) // 8
+            data = self.memory[self._span(int(addr, 16), step * int(count))]
+            values = [int.from_bytes(data[i:i + step], "little") for i in range(0, len(data), step)]
+            return " ".join(f"0x{v:x}" for v in values)
+        if name == "write_memory":
+            _, addr, width, body = cmd.split(maxsplit=3)
+            step = int(width) // 8
+            values = [int(tok, 16) for tok in body.strip("{}").split()]
+            payload = b"".join(v.to_bytes(step, "little") for v in values)
+            self.memory[self._span(int(addr, 16), len(payload))] = payload
+            return ""
+        if name == "dump_image" and self.fail_dump:
+            return "Error: failed to write image"
+        if name == "dump_image":
+            path, _, rest = cmd[len("dump_image {"):].partition("} ")
+            addr, size = rest.split()
+            Path(path).write_bytes(self.memory[self._span(int(addr, 16), int(size))])
+            return "dumped 0 bytes"
+        if name == "mdw":
+            _, addr, count = cmd.split()
+            base = int(addr, 16)
+            data = self.memory[self._span(base, 4 * int(count))]
+            words = [int.from_bytes(data[i:i + 4], "little") for i in range(0, len(data), 4)]
+            return f"0x{base:08x}: " + " ".join(f"{w:08x}" for w in words)
+        return f"ok:{cmd}"
+
+
+def _serve(server: socket.socket, target: FakeMemoryTarget) -> None:
+    conn, _addr = server.accept()
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    with conn:
+        buf = bytearray()
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                return
+            buf.extend(chunk)
+            while b"\x1a" in buf:
+                raw, _sep, rest = bytes(buf).partition(b"\x1a")
+                buf = bytearray(rest)
+                reply = target.handle(raw.decode("utf-8").strip())
+                conn.sendall(reply.encode("utf-8") + b"\x1a")
+
+
+@pytest.fixture()
+def bulk_client(request):
+    target = FakeMemoryTarget(legacy=getattr(request, "param", False))
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    thread = Thread(target=_serve, args=(server, target), daemon=True)
+    thread.start()
+    client = OpenOCDClient()
+    client.connect(host="127.0.0.1", port=server.getsockname()[1])
+    yield client, target
+    client.close()
+    server.close()
+    thread.join(timeout=1.0)
+
+
+def test_read_memory_block_chunks_and_returns_array(bulk_client) -> None:
+    client, target = bulk_client
+    words = client.read_memory_block(SRAM_BASE + 0x100, 300, 32, chunk_bytes=256)
+    expected = target.memory[0x100:0x100 + 1200]
+    assert words.itemsize == 4
+    assert words.tobytes() == bytes(expected)
+    reads = [c for c in target.commands if c.startswith("read_memory")]
+    assert len(reads) == 5
+    assert reads[1] == f"read_memory 0x{SRAM_BASE + 0x200:x} 32 64"
+
+
+def test_read_memory_bytes_uses_words_when_aligned(bulk_client) -> None:
+    client, target = bulk_client
+    assert client.read_memory_bytes(SRAM_BASE, 4096) == bytes(target.memory[:4096])
+    assert target.commands[-1].endswith(" 32 1024")
+    assert client.read_memory_bytes(SRAM_BASE + 3, 10) == bytes(target.memory[3:13])
+    assert target.commands[-1].endswith(" 8 10")
+
+
+def test_write_memory_block_round_trips(bulk_client) -> None:
+    client, target = bulk_client
+    payload = bytes(range(256)) * 4
+    assert client.write_memory_block(SRAM_BASE + 0x40, payload, 32, chunk_bytes=128) == 256
+    assert bytes(target.memory[0x40:0x40 + len(payload)]) == payload
+    assert len([c for c in target.commands if c.startswith("write_memory")]) == 8
+    with pytest.raises(MCPServiceError) as exc:
+        client.write_memory_block(SRAM_BASE, [0x1FF], 8)
+    assert exc.value.error_code == "DBG_INVALID_VALUE"
+
+
+def test_read_memory_to_file_chunked_and_dump_image(bulk_client, tmp_path: Path) -> None:
+    client, target = bulk_client
+    out = client.read_memory_to_file(SRAM_BASE, SRAM_SIZE, str(tmp_path / "sram.bin"), method="chunked")
+    assert out["method"] == "chunked"
+    assert (tmp_path / "sram.bin").read_bytes() == bytes(target.memory)
+    out = client.read_memory_to_file(SRAM_BASE + 16, 100, str(tmp_path / "dump.bin"))
+    assert out["method"] == "dump_image"
+    assert (tmp_path / "dump.bin").read_bytes() == bytes(target.memory[16:116])
+
+
+def test_failed_dump_image_does_not_return_stale_file(bulk_client, tmp_path: Path) -> None:
+    client, target = bulk_client
+    dest = tmp_path / "dump.bin"
+    dest.write_bytes(b"\x00" * 100)
+    target.fail_dump = True
+    with pytest.raises(MCPServiceError) as exc:
+        client.read_memory_to_file(SRAM_BASE + 16, 100, str(dest), method="dump_image")
+    assert exc.value.error_code == "DBG_READ_FAILED"
+    assert not (tmp_path / "dump.bin.part").exists()
+    out = client.read_memory_to_file(SRAM_BASE + 16, 100, str(dest))
+    assert out["method"] == "chunked"
+    assert dest.read_bytes() == bytes(target.memory[16:116])
+
+
+def test_service_read_memory_uses_bulk_path(bulk_client, tmp_path: Path) -> None:
+    client, target = bulk_client
+    service = OpenOCDMCPService(openocd=client, serial_mgr=SerialManager())
+    out = service.read_memory(f"0x{SRAM_BASE:x}", 2, 16)
+    assert out["success"] is True
+    assert out["data"]["data"] == [0x0A03, 0x1811]
+    assert target.commands[-1] == f"read_memory 0x{SRAM_BASE:x} 16 2"
+    dest = tmp_path / "region.bin"
+    out = service.read_memory(f"0x{SRAM_BASE:x}", 1024, 32, output_path=str(dest))
+    assert out["success"] is True
+    assert out["data"]["bytes"] == 4096
+    assert "data" not in out["data"]
+    assert dest.read_bytes() == bytes(target.memory[:4096])
+
+
+@pytest.mark.parametrize("bulk_client", [True], indirect=True)
+def test_service_read_memory_falls_back_on_old_openocd(bulk_client) -> None:
+    client, target = bulk_client
+    with pytest.raises(MCPServiceError) as exc:
+        client.read_memory_block(SRAM_BASE, 4)
+    assert exc.value.error_code == "DBG_BULK_UNSUPPORTED"
+    service = OpenOCDMCPService(openocd=client, serial_mgr=SerialManager())
+    out = service.read_memory(f"0x{SRAM_BASE:x}", 2, 32)
+    assert out["success"] is True
+    assert out["data"]["data"] == [0x18110A03, 0x342D261F]
+    assert target.commands[-1] == f"mdw 0x{SRAM_BASE:x} 2"
+
+
+def test_execute_many_demultiplexes_replies_in_order(bulk_client) -> None:
+    client, target = bulk_client
+    commands = [f"echo {i}" for i in range(100)]
+    assert client.execute_many(commands) == [f"ok:echo {i}" for i in range(100)]
+    assert target.commands == commands
+    assert client.execute("halt") == "ok:halt"
+
+
+def test_execute_many_drops_connection_on_timeout() -> None:
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def _answer_first_only() -> None:
+        conn, _addr = server.accept()
+        with conn:
+            conn.recv(65536)
+            conn.sendall(b"first\x1a")
+            conn.recv(65536)
+
+    thread = Thread(target=_answer_first_only, daemon=True)
+    thread.start()
+    client = OpenOCDClient()
+    client.connect(host="127.0.0.1", port=server.getsockname()[1])
+    try:
+        with pytest.raises(MCPServiceError) as exc:
+            client.execute_many(["a", "b", "c"], timeout_s=0.2)
+        assert exc.value.error_code == "DBG_TCL_IO_ERROR"
+        # The late replies to "b" and "c" must never be handed to a later call.
+        with pytest.raises(MCPServiceError) as exc:
+            client.execute("halt")
+        assert exc.value.error_code == "SYS_NOT_CONNECTED"
+    finally:
+        client.close()
+        server.close()
+        thread.join(timeout=1.0)
+
+
+def test_coalesce_word_ranges_merges_only_adjacent_words() -> None:
+    addrs = [0x1008, 0x1000, 0x1004, 0x1000, 0x1020, 0x1024, 0x2000, 0x2002]
+    assert _coalesce_word_ranges(addrs) == [
+        (0x1008, 1),
+        (0x1000, 2),
+        (0x1000, 1),
+        (0x1020, 2),
+        (0x2000, 1),
+        (0x2002, 1),
+    ]
+    # Repeated and out-of-order register reads keep their count and order (FIFO pops).
+    assert _coalesce_word_ranges([0x40013804, 0x40013804]) == [(0x40013804, 1), (0x40013804, 1)]
+    assert _coalesce_word_ranges([0x8, 0x4]) == [(0x8, 1), (0x4, 1)]
+    # Words in between were not requested and must not be read (MMIO side effects).
+    assert _coalesce_word_ranges([0x0, 0x14]) == [(0x0, 1), (0x14, 1)]
+    assert _coalesce_word_ranges([0x4000C000, 0x4000C008]) == [(0x4000C000, 1), (0x4000C008, 1)]
+
+
+def test_service_read_many_coalesces_into_one_batch(bulk_client) -> None:
+    client, target = bulk_client
+    service = OpenOCDMCPService(openocd=client, serial_mgr=SerialManager())
+    addrs = [SRAM_BASE + 0x10, SRAM_BASE, SRAM_BASE + 4, SRAM_BASE + 0x800, SRAM_BASE + 0x10]
+    values = service._read_many_internal(addrs)  # noqa: SLF001
+    expected = [int.from_bytes(target.memory[a - SRAM_BASE:a - SRAM_BASE + 4], "little") for a in addrs]
+    assert values == expected
+    assert target.commands == [
+        f"read_memory 0x{SRAM_BASE + 0x10:x} 32 1",
+        f"read_memory 0x{SRAM_BASE:x} 32 2",
+        f"read_memory 0x{SRAM_BASE + 0x800:x} 32 1",
+        f"read_memory 0x{SRAM_BASE + 0x10:x} 32 1",
+    ]
+
+
+@pytest.mark.parametrize("bulk_client", [True], indirect=True)
+def test_service_read_many_falls_back_to_mdw(bulk_client) -> None:
+    client, target = bulk_client
+    service = OpenOCDMCPService(openocd=client, serial_mgr=SerialManager())
+    values = service._read_many_internal([SRAM_BASE + 4, SRAM_BASE + 0x100])  # noqa: SLF001
+    assert values == [0x342D261F, 0x18110A03]
+    assert target.commands[-2:] == [f"mdw 0x{SRAM_BASE + 4:x} 1", f"mdw 0x{SRAM_BASE + 0x100:x} 1"]
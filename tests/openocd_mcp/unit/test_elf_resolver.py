@@ -0,0 +1,106 @@
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from openocd_mcp.parsers.elf_resolver import ELFResolver
+from openocd_mcp.parsers.parse_cache import ParseCache
+from openocd_mcp.tools.service import OpenOCDMCPService
+from openocd_mcp.transport.serial.manager import SerialManager
+
+pytest.importorskip("elftools")
+
+SOURCE = """int counter = 3;
+static int helper(int x) {
+    return x * 2 + counter;
+}
+int main(void) {
+    int v = helper(4);
+    return v;
+}
+"""
+
+
+@pytest.fixture(scope="module")
+def elf_path(tmp_path_factory) -> Path:
+    if shutil.which("gcc") is None:
+        pytest.skip("gcc is required to build the test ELF")
+    root = tmp_path_factory.mktemp("elf")
+    (root / "prog.c").write_text(SOURCE)
+    subprocess.run(["gcc", "-g", "-O0", "-o", "prog", "prog.c"], cwd=root, check=True)
+    return root / "prog"
+
+
+def test_elf_resolver_maps_addresses_to_symbols_and_lines(elf_path: Path) -> None:
+    resolver = ELFResolver()
+    resolver.load(str(elf_path))
+    main = resolver.resolve("main")
+    info, offset = resolver.lookup(main + 4)
+    assert (info.name, info.kind, offset) == ("main", "func", 4)
+    assert info.size > 4
+    after = resolver.lookup(main + info.size)
+    assert after is None or after[0].name != "main"
+    assert resolver.lookup(0) is None
+    counter = resolver.describe(resolver.resolve("counter") + 1)
+    assert (counter["symbol"], counter["offset"], counter["kind"]) == ("counter", 1, "object")
+    assert counter["line"] is None
+    helper = resolver.describe(resolver.resolve("helper"))
+    assert helper["file"].endswith("prog.c")
+    assert helper["line"] == 2
+    assert resolver.line_for(main) == (helper["file"], 5)
+
+
+def test_service_attaches_pc_location_when_halted(elf_path: Path) -> None:
+    resolver = ELFResolver()
+    resolver.load(str(elf_path))
+    pc = f"0x{resolver.resolve('main'):x}"
+
+    class Client:
+        def control_target(self, action: str) -> str:
+            return "ok"
+
+        def get_pc(self) -> str:
+            return pc
+
+    service = OpenOCDMCPService(openocd=Client(), serial_mgr=SerialManager(), elf=resolver)
+    out = service.control_target("halt")
+    assert out["success"] is True
+    assert out["data"]["location"]["symbol"] == "main"
+    assert out["data"]["location"]["line"] == 5
+    assert service.control_target("resume")["data"]["location"] is None
+
+
+def test_halt_log_event_does_not_wait_for_line_index(elf_path: Path) -> None:
+    resolver = ELFResolver()
+    resolver.load(str(elf_path))
+    deadline = time.monotonic() + 10.0
+    while resolver._line_addrs is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The index is built in the background after load, without a lookup.
+    assert resolver._line_addrs is not None
+    service = OpenOCDMCPService(openocd=object(), serial_mgr=SerialManager(), elf=resolver)
+    pc = f"0x{resolver.resolve('main'):x}"
+    event = {"event": "TARGET_HALTED", "pc": pc}
+    # Simulate a rebuild in progress: the log thread must not block on it.
+    with resolver._line_lock:
+        started = time.monotonic()
+        service._on_openocd_log("target halted", event)
+        assert time.monotonic() - started < 1.0
+    assert event["location"]["symbol"] == "main"
+    assert event["location"]["line"] is None
+    assert service._symbolize(pc)["line"] == 5
+
+
+def test_elf_resolver_reuses_symbol_and_line_cache(elf_path: Path, tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache")
+    first = ELFResolver(cache=cache)
+    first.load(str(elf_path))
+    main = first.resolve("main")
+    expected = first.describe(main + 4)
+    second = ELFResolver(cache=cache)
+    second.load(str(elf_path))
+    assert second.cache_hit is True
+    assert second.describe(main + 4) == expected
+    assert cache.hits == 2
@@ -0,0 +1,56 @@
+from threading import Event
+import time
+
+from openocd_mcp.runtime.events import EventBus
+
+
+def test_emit_does_not_wait_for_slow_listeners() -> None:
+    bus = EventBus(workers=2, slow_callback_s=0.01)
+    release = Event()
+    seen: list[int] = []
+    bus.on("LOG", lambda payload: release.wait(1.0))
+    bus.on("LOG", lambda payload: seen.append(payload["n"]))
+    start = time.monotonic()
+    for n in range(50):
+        bus.emit("LOG", {"n": n})
+    assert time.monotonic() - start < 0.1
+    time.sleep(0.05)
+    release.set()
+    assert bus.flush(timeout_s=2.0) is True
+    assert seen == list(range(50))
+    stats = bus.stats()
+    assert stats["emitted"] == 50
+    assert stats["delivered"] == 100
+    assert stats["slow"] >= 1
+    assert stats["backlog"] == 0
+    bus.close()
+
+
+def test_group_is_serialized_and_full_mailbox_drops_oldest() -> None:
+    bus = EventBus(workers=4, mailbox_size=3)
+    gate = Event()
+    order: list[tuple[str, int]] = []
+    bus.on("E", lambda payload: gate.wait(1.0) and order.append(("a", payload["n"])), group="task")
+    bus.on("E", lambda payload: order.append(("b", payload["n"])), group="task")
+    bus.emit("E", {"n": 0})
+    time.sleep(0.05)
+    for n in range(1, 5):
+        bus.emit("E", {"n": n})
+    gate.set()
+    assert bus.flush(timeout_s=2.0) is True
+    assert order[:2] == [("a", 0), ("b", 0)]
+    assert order[2:] == [("b", 3), ("a", 4), ("b", 4)]
+    stats = bus.stats()
+    assert stats["dropped"] == 5
+    assert stats["max_backlog"] == 3
+    bus.close()
+
+
+def test_listener_errors_are_counted_not_raised() -> None:
+    bus = EventBus()
+    bus.on("E", lambda payload: 1 / 0)
+    bus.emit("E", {})
+    bus.emit("OTHER", {})
+    assert bus.flush(timeout_s=1.0) is True
+    assert bus.stats()["errors"] == 1
+    bus.close()
@@ -28,3 +28,69 @@ def test_record_ring_buffer_overwrites_old_entries() -> None:
     snapshot = buf.snapshot()
     assert snapshot
     assert snapshot[-1] == {"c": 3}
+
+
+def test_line_ring_buffer_tail_and_eviction_use_stored_sizes() -> None:
+    buf = LineRingBuffer(capacity_bytes=5000)
+    for i in range(5000):
+        buf.append(f"l{i:04d}é")
+    assert buf.size_bytes <= 5000
+    assert len(buf) == 5000 // len("l0000é\n".encode("utf-8"))
+    assert buf.tail(lines=2) == ["l4998é", "l4999é"]
+    assert buf.tail(lines=0) == []
+    assert buf.tail(lines=10**6)[0] == f"l{5000 - len(buf):04d}é"
+
+
+def test_line_ring_buffer_trigram_index_matches_linear_scan() -> None:
+    plain = LineRingBuffer(capacity_bytes=20_000)
+    indexed = LineRingBuffer(capacity_bytes=20_000, index_keywords=True)
+    for i in range(20_000):
+        line = f"{i:05d} status={'FAULT' if i % 97 == 0 else 'ok'}"
+        plain.append(line)
+        indexed.append(line)
+    for keyword in ["FAULT", "status=ok", "199", "ok", "missing"]:
+        for lines in [10, 500, 10**6]:
+            assert indexed.tail(lines=lines, keyword=keyword) == plain.tail(lines=lines, keyword=keyword)
+    indexed.clear()
+    indexed.append("after clear FAULT")
+    assert indexed.tail(lines=10, keyword="FAULT") == ["after clear FAULT"]
+
+
+def test_line_ring_buffer_spills_evicted_lines_to_segments(tmp_path) -> None:
+    buf = LineRingBuffer(capacity_bytes=100, spill_dir=str(tmp_path), spill_segment_bytes=64, spill_max_segments=3)
+    for i in range(60):
+        buf.append(f"line-{i:03d}")
+    spilled = list(buf.iter_spilled())
+    kept = buf.tail(lines=100)
+    assert spilled[-1] == f"line-{59 - len(kept):03d}"
+    assert spilled + kept == [f"line-{i:03d}" for i in range(60 - len(spilled) - len(kept), 60)]
+    assert len(list(tmp_path.iterdir())) == 3
+    buf.close()
+
+
+def test_record_ring_buffer_encodes_once_and_reads_incrementally() -> None:
+    buf = RecordRingBuffer(capacity_bytes=60)
+    source = {"pc": 1, "regs": [1, 2]}
+    assert buf.append(source) == 0
+    source["regs"].append(3)
+    assert buf.snapshot() == [{"pc": 1, "regs": [1, 2]}]
+    assert buf.size_bytes == len('{"pc":1,"regs":[1,2]}') + 1
+    for i in range(1, 6):
+        buf.append({"i": i})
+    records, next_seq = buf.since(0)
+    assert next_seq == 6
+    assert records[-1] == {"i": 5}
+    assert buf.first_seq == 6 - len(records)
+    assert buf.since(next_seq) == ([], 6)
+    buf.append({"i": 6})
+    assert buf.since(next_seq) == ([{"i": 6}], 7)
+    views = buf.views(since=5)
+    assert [view.seq for view in views] == [5, 6]
+    assert views[1] == {"i": 6}
+    assert views[1].to_dict() == {"i": 6}
+    try:
+        views[1]["i"] = 0  # type: ignore[index]
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("RecordView must be read-only")
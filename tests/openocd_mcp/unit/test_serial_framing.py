@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+import pytest
+
+from openocd_mcp.transport.serial import SerialConfig, SerialManager
+from openocd_mcp.transport.serial.framing import CobsFramer, LineFramer, cobs_decode, cobs_encode
+
+
+def test_line_framer_reassembles_across_chunks() -> None:
+    framer = LineFramer(max_line=8)
+    assert framer.feed(b"ab\r\ncd") == [b"ab"]
+    assert framer.feed(b"e\n\nx") == [b"cde", b""]
+    assert framer.feed(b"yyyyyyyy") == [b"xyyyyyyyy"]
+    assert framer.feed(b"tail") == []
+    assert framer.flush() == [b"tail"]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [b"", b"\0", b"\0\0", b"abc", b"a\0b", bytes(range(1, 255)), bytes(range(256)) * 3, b"\xff" * 600],
+)
+def test_cobs_round_trip(payload: bytes) -> None:
+    encoded = cobs_encode(payload)
+    assert b"\0" not in encoded
+    assert cobs_decode(encoded) == payload
+
+
+def test_cobs_framer_skips_corrupt_frames() -> None:
+    framer = CobsFramer()
+    stream = cobs_encode(b"one\0") + b"\0" + b"\x05ab\0" + cobs_encode(b"two")
+    assert framer.feed(stream) == [b"one\0"]
+    assert framer.errors == 1
+    assert framer.feed(b"\0") == [b"two"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="pty loopback needs a POSIX host")
+def test_serial_manager_reads_pty_stream_and_dispatches_triggers() -> None:
+    pytest.importorskip("serial")
+    master, slave = os.openpty()
+    mgr = SerialManager()
+    fired: list[tuple[str, str]] = []
+    mgr.set_trigger("boot ok", "notify", lambda action, line: fired.append((action, line)), cooldown_ms=0)
+    try:
+        mgr.connect(SerialConfig(port=os.ttyname(slave), timeout=0.05))
+        os.write(master, b"".join(f"line {i}\r\n".encode() for i in range(500)) + b"boot ok\r\npartial")
+        deadline = time.monotonic() + 5.0
+        while mgr.stats["frames"] < 501 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        mgr.close()
+        os.close(master)
+        os.close(slave)
+    assert mgr.read_buffer(lines=3) == ["line 499", "boot ok", "partial"]
+    assert len(mgr.buffer) == 502
+    deadline = time.monotonic() + 1.0
+    while not fired and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fired == [("notify", "boot ok")]
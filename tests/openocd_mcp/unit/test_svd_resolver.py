@@ -1,5 +1,7 @@
+import os
 from pathlib import Path
 
+from openocd_mcp.parsers.parse_cache import ParseCache
 from openocd_mcp.parsers.svd_resolver import SVDResolver
 
 
@@ -48,3 +50,38 @@ def test_svd_resolver_load_and_decode(tmp_path: Path) -> None:
     fallback = resolver.resolve_best_effort("TIM1->CR1")
     assert fallback["address"] == 0x40010000
     assert fallback["raw_xml_snippet"] is not None
+
+
+def test_svd_resolver_reuses_parse_cache_and_materializes_lazily(tmp_path: Path) -> None:
+    svd = tmp_path / "cached.svd"
+    registers = "".join(
+        f"<register><name>R{i}</name><addressOffset>0x{4 * i:x}</addressOffset><fields>"
+        f"<field><name>EN</name><bitOffset>{i % 8}</bitOffset><bitWidth>1</bitWidth></field></fields></register>"
+        for i in range(8)
+    )
+    peripherals = "".join(
+        f"<peripheral><name>P{n}</name><baseAddress>0x{0x40000000 + n * 0x400:x}</baseAddress>"
+        f"<registers>{registers}</registers></peripheral>"
+        for n in range(4)
+    )
+    svd.write_text(f"<device><peripherals>{peripherals}</peripherals></device>", encoding="utf-8")
+    cache = ParseCache(tmp_path / "cache")
+    first = SVDResolver(cache=cache)
+    first.load(str(svd))
+    assert first.cache_hit is False
+    second = SVDResolver(cache=cache)
+    second.load(str(svd))
+    assert second.cache_hit is True
+    info = second.resolve("p2->r3")
+    assert info.address == 0x40000800 + 12
+    assert second.decode_fields(info, 0x8)["EN"]["val"] == 1
+    assert {reg.peripheral for reg in second._registers.values()} == {"P2"}  # noqa: SLF001
+    os.utime(svd, ns=(0, 10**9))
+    touched = SVDResolver(cache=cache)
+    touched.load(str(svd))
+    assert touched.cache_hit is True
+    svd.write_text(svd.read_text(encoding="utf-8").replace("0x40000800", "0x40000900"), encoding="utf-8")
+    edited = SVDResolver(cache=cache)
+    edited.load(str(svd))
+    assert edited.cache_hit is False
+    assert edited.resolve("P2->R3").address == 0x40000900 + 12
@@ -1,8 +1,9 @@
 from openocd_mcp.runtime.context import DebugContext
-from openocd_mcp.runtime.task_runtime import TaskRuntime
+from openocd_mcp.runtime.task_runtime import TICK_INTERVAL, TaskRuntime
 from openocd_mcp.core.errors import MCPServiceError
 
 from threading import Event
+import time
 
 import pytest
 
@@ -27,6 +28,10 @@ def test_task_runtime_completes_and_records() -> None:
     assert result["status"] == "completed"
     assert result["result"]["records"] == [{"k": 1}, {"x": 2}]
     assert result["result"]["logs"] == ["done"]
+    assert result["result"]["next_seq"] == 2
+    tail = runtime.get(task_id, since_seq=1)["result"]
+    assert tail["records"] == [{"x": 2}]
+    assert tail["records_dropped"] == 0
 
 
 def test_task_runtime_timeout() -> None:
@@ -37,6 +42,24 @@ def test_task_runtime_timeout() -> None:
     assert result["status"] == "timeout"
 
 
+@pytest.mark.parametrize(
+    "code",
+    [
+        "x = sum([i for i in range(30000000)])",
+        "x = sum(i for i in range(30000000) if i < 0)",
+        "x = {i: i for i in range(30000000)}",
+        "x = max(range(30000000), key=lambda i: -i)",
+    ],
+)
+def test_task_runtime_timeout_inside_comprehensions_and_lambdas(code: str) -> None:
+    runtime = TaskRuntime()
+    started = time.monotonic()
+    task_id = runtime.submit("comp-timeout", code, _ctx_factory, timeout_ms=100)
+    result = runtime.wait(task_id, timeout_s=5.0)
+    assert result["status"] == "timeout"
+    assert time.monotonic() - started < 2.0
+
+
 def test_task_runtime_event_callback() -> None:
     runtime = TaskRuntime()
     code = (
@@ -48,6 +71,7 @@ def test_task_runtime_event_callback() -> None:
     result = runtime.wait(task_id, timeout_s=1.0)
     assert result["status"] == "completed"
     runtime.emit("TARGET_HALTED", {"pc": 0x1234})
+    assert runtime.flush_events(timeout_s=1.0) is True
     result2 = runtime.get(task_id)
     assert result2["result"]["records"] == [{"pc": 0x1234}]
 
@@ -82,6 +106,88 @@ def test_callback_timeout_disables_callback() -> None:
     task_id = runtime.submit("slow-cb", code, _ctx_factory, timeout_ms=1000)
     runtime.wait(task_id, timeout_s=1.0)
     runtime.emit("TARGET_HALTED", {"pc": 0x10})
+    assert runtime.flush_events(timeout_s=1.0) is True
     result = runtime.get(task_id)
     assert result["disabled_callbacks"]
-    assert result["callback_failures"]
+    assert result["callback_failures"] == ["TARGET_HALTED:on_halt: timeout"]
+    assert result["event_dispatch"]["delivered"] == 1
+
+
+def test_debugger_read_many_uses_batch_reader_or_falls_back() -> None:
+    cancel = Event()
+    ctx = _ctx_factory(cancel)
+    ctx.write32(0x10, 7)
+    assert ctx.debugger.read_many([0x10, 0x14]) == [7, 0]
+    batches: list[list[int]] = []
+    batched = DebugContext(
+        read32=lambda addr: 0,
+        read_many=lambda addrs: batches.append(addrs) or [a + 1 for a in addrs],
+        write32=lambda addr, value: None,
+        halt=lambda: None,
+        resume=lambda: None,
+        serial_write=lambda data: None,
+        cancel_event=cancel,
+    )
+    assert batched.debugger.read_many([4, 8]) == [5, 9]
+    assert batches == [[4, 8]]
+    cancel.set()
+    with pytest.raises(RuntimeError):
+        batched.debugger.read_many([4])
+
+
+def test_task_runtime_cooperative_cancel_and_nested_timeout() -> None:
+    runtime = TaskRuntime()
+    task_id = runtime.submit("spin", "while True:\n    pass", _ctx_factory, timeout_ms=10_000)
+    assert runtime.cancel(task_id) is True
+    assert runtime.wait(task_id, timeout_s=1.0)["status"] == "cancelled"
+    code = "def spin(n):\n    while n >= 0:\n        n = n\nspin(1)"
+    task_id = runtime.submit("nested", code, _ctx_factory, timeout_ms=50)
+    assert runtime.wait(task_id, timeout_s=1.0)["status"] == "timeout"
+
+
+def test_task_runtime_rejects_reserved_tick_name() -> None:
+    runtime = TaskRuntime()
+    with pytest.raises(MCPServiceError) as exc:
+        runtime.submit("shadow", "__task_tick__ = len", _ctx_factory, timeout_ms=1000)
+    assert exc.value.error_code == "SCR_SECURITY_VIOLATION"
+
+
+def test_task_deadline_does_not_apply_to_later_callbacks() -> None:
+    runtime = TaskRuntime(callback_timeout_ms=1000)
+    code = (
+        "def on_halt(ctx, payload):\n"
+        "    for i in range(1000):\n"
+        "        pass\n"
+        "    ctx.record({'done': i})\n"
+        "on('TARGET_HALTED', on_halt)\n"
+    )
+    task_id = runtime.submit("late-cb", code, _ctx_factory, timeout_ms=20)
+    assert runtime.wait(task_id, timeout_s=1.0)["status"] == "completed"
+    time.sleep(0.05)
+    runtime.emit("TARGET_HALTED", {})
+    assert runtime.flush_events(timeout_s=1.0) is True
+    result = runtime.get(task_id)
+    assert result["callback_failures"] == []
+    assert result["result"]["records"] == [{"done": 999}]
+
+
+def test_cancelled_task_callbacks_keep_running_past_tick_interval() -> None:
+    runtime = TaskRuntime(callback_timeout_ms=1000)
+    code = (
+        "def on_halt(ctx, payload):\n"
+        f"    for i in range({TICK_INTERVAL * 4}):\n"
+        "        pass\n"
+        "on('TARGET_HALTED', on_halt)\n"
+        "while True:\n"
+        "    pass\n"
+    )
+    task_id = runtime.submit("cancel-cb", code, _ctx_factory, timeout_ms=10_000)
+    assert runtime.cancel(task_id) is True
+    assert runtime.wait(task_id, timeout_s=1.0)["status"] == "cancelled"
+    runtime.emit("TARGET_HALTED", {})
+    assert runtime.flush_events(timeout_s=1.0) is True
+    result = runtime.get(task_id)
+    # The callback's ticks must not pick up the task's cancellation.
+    assert result["callback_failures"] == []
+    assert result["disabled_callbacks"] == []
+    assert result["event_dispatch"]["delivered"] == 1
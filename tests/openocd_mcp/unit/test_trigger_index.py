@@ -0,0 +1,63 @@
+from concurrent.futures import Executor, Future
+
+from openocd_mcp.core.triggers import TriggerIndex
+from openocd_mcp.transport.serial import SerialManager
+
+
+class InlineExecutor(Executor):
+    def submit(self, fn, /, *args, **kwargs):  # type: ignore[override]
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def test_trigger_index_reports_every_matching_pattern() -> None:
+    index = TriggerIndex()
+    index.add("fault", "Fault")
+    index.add("hard", r"Hard\w+")
+    index.add("err", "error", ignore_case=True)
+    index.add("dup", r"(ab)\1")
+    index.add("dot", "a.b", literal=True)
+    assert index.match("all quiet") == []
+    assert sorted(index.match("HardFault ERROR")) == ["err", "fault", "hard"]
+    assert index.match("xabab") == ["dup"]
+    assert index.match("axb") == []
+    assert index.match("a.b") == ["dot"]
+    stats = index.stats()
+    assert stats["lines_scanned"] == 5
+    assert stats["lines_matched"] == 3
+    assert stats["matches"]["fault"] == 1
+
+
+def test_trigger_index_rebuilds_only_after_changes(monkeypatch) -> None:
+    index = TriggerIndex()
+    rebuilds: list[int] = []
+    original = index._rebuild  # noqa: SLF001
+    monkeypatch.setattr(index, "_rebuild", lambda: rebuilds.append(1) or original())
+    index.add("a", "alpha")
+    for _ in range(10):
+        index.match("alpha")
+    index.add("b", "beta")
+    index.match("beta")
+    index.remove("a")
+    index.match("alpha")
+    assert len(rebuilds) == 3
+    index.clear()
+    assert index.match("beta") == []
+
+
+def test_serial_manager_triggers_use_index_and_cooldown() -> None:
+    mgr = SerialManager(trigger_executor=InlineExecutor())
+    fired: list[tuple[str, str]] = []
+    mgr.set_trigger("boot", "a", lambda action, line: fired.append((action, line)), cooldown_ms=0)
+    mgr.set_trigger("panic|assert", "b", lambda action, line: fired.append((action, line)), cooldown_ms=60_000)
+    for line in ["noise", "boot ok", "assert failed", "panic again"]:
+        mgr.feed_line_for_test(line)
+    assert fired == [("a", "boot ok"), ("b", "assert failed")]
+    stats = mgr.trigger_stats()
+    assert stats["lines_scanned"] == 4
+    assert [item["count"] for item in stats["matches"]] == [1, 2]
+    mgr.clear_triggers()
+    mgr.feed_line_for_test("boot again")
+    assert len(fired) == 2
+
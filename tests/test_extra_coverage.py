@@ -625,7 +625,20 @@ class TestUvprojxAndCli(unittest.TestCase):
         args = parser.parse_args(['--model', 'model.onnx'])
         self.assertEqual(args.weights, 'flash')
         self.assertEqual(args.emit, 'c')
+        self.assertEqual(args.weight_format, 'c')
         self.assertTrue(args.strict_validation)
+        args_blob = parser.parse_args(['--model', 'model.onnx', '--weight-format', 'incbin'])
+        self.assertEqual(args_blob.weight_format, 'incbin')
+        self.assertEqual(args.validation_samples, 1)
+        self.assertEqual(args.validation_dataset, '')
+        self.assertIsNone(args.validation_workers)
+        self.assertFalse(args.code_size)
+        self.assertTrue(parser.parse_args(['--model', 'model.onnx', '--code-size']).code_size)
+        args_stats = parser.parse_args(
+            ['--model', 'model.onnx', '--validation-samples', '64', '--validation-workers', '2']
+        )
+        self.assertEqual(args_stats.validation_samples, 64)
+        self.assertEqual(args_stats.validation_workers, 2)
         with self.assertRaises(SystemExit):
             parser.parse_args(['--model', 'model.onnx', '--strict-validation'])
         args_non_strict = parser.parse_args(['--model', 'model.onnx', '--no-strict-validation'])
@@ -674,7 +687,7 @@ class TestTinyMlStrictValidation(unittest.TestCase):
                 ),
             ):
                 with self.assertRaises(ValueError):
-                    generate_tinyml_project(model_path, td, 'flash', 'c')
+                    generate_tinyml_project(model_path, td, 'flash', 'c', graph_opt=False)
 
     def test_non_strict_validation_allows_skipped(self) -> None:
         self._require_tinyml_deps()
@@ -701,6 +714,7 @@ class TestTinyMlStrictValidation(unittest.TestCase):
                     'flash',
                     'c',
                     strict_validation=False,
+                    graph_opt=False,
                 )
                 self.assertEqual(result['validation'].status, 'skipped')
                 self.assertFalse(result['strict_validation'])
@@ -33,6 +33,38 @@ def generate_tinyml_project(*args, **kwargs):
     return _generate_tinyml_project(*args, **kwargs)
 
 
+def _build_wide_gemm_model(path: str) -> None:
+    rng = np.random.default_rng(4)
+    x = helper.make_tensor_value_info('input', TensorProto.FLOAT, [1, 32])
+    y = helper.make_tensor_value_info('output', TensorProto.FLOAT, [1, 8])
+    init_w = numpy_helper.from_array(rng.uniform(-1, 1, (32, 24)).astype(np.float32), name='W')
+    init_b = numpy_helper.from_array(rng.uniform(-1, 1, (24,)).astype(np.float32), name='B')
+    init_w2 = numpy_helper.from_array(rng.uniform(-1, 1, (24, 8)).astype(np.float32), name='W2')
+    init_b2 = numpy_helper.from_array(np.array([0.5] * 8, dtype=np.float32), name='B2')
+    nodes = [
+        helper.make_node('Gemm', inputs=['input', 'W', 'B'], outputs=['z']),
+        helper.make_node('Relu', inputs=['z'], outputs=['r']),
+        helper.make_node('Gemm', inputs=['r', 'W2', 'B2'], outputs=['output']),
+    ]
+    graph = helper.make_graph(nodes, 'tinyml_blob', [x], [y], [init_w, init_b, init_w2, init_b2])
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid('', 13)])
+    onnx.save(model, path)
+
+
+def _build_constant_output_model(path: str) -> None:
+    x = helper.make_tensor_value_info('x', TensorProto.FLOAT, [1, 4])
+    y = helper.make_tensor_value_info('y', TensorProto.FLOAT, [1, 4])
+    c = helper.make_tensor_value_info('c', TensorProto.FLOAT, [1, 4])
+    cval = numpy_helper.from_array(np.array([[0.5, -1.0, 2.0, 3.5]], dtype=np.float32), name='cval')
+    nodes = [
+        helper.make_node('Constant', inputs=[], outputs=['c'], value=cval),
+        helper.make_node('Add', inputs=['x', 'c'], outputs=['y']),
+    ]
+    graph = helper.make_graph(nodes, 'tinyml_const_out', [x], [y, c])
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid('', 13)])
+    onnx.save(model, path)
+
+
 def _build_simple_gemm_model(path: str) -> None:
     x = helper.make_tensor_value_info('input', TensorProto.FLOAT, [1, 4])
     y = helper.make_tensor_value_info('output', TensorProto.FLOAT, [1, 3])
@@ -3510,6 +3542,30 @@ class TestTinyMlProject(unittest.TestCase):
             self.assertIn('k2c_forward', header)
             self.assertIn('k2c_prepare', header)
 
+    def test_relative_output_root(self) -> None:
+        # The CLI default output is the relative ./onnx-for-mcu; the compilers run
+        # from the project directory and must still find the generated files.
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, 'wide.onnx')
+            _build_wide_gemm_model(model_path)
+            try:
+                os.chdir(td)
+                result = generate_tinyml_project(
+                    'wide.onnx',
+                    'onnx-for-mcu',
+                    weights='flash',
+                    emit='c',
+                    weight_format='incbin',
+                )
+            finally:
+                os.chdir(cwd)
+            validation = result['validation']
+            # A compile failure is reported as "skipped" too; only a missing tool may skip.
+            if validation.status == 'skipped' and 'compile failed' not in validation.reason:
+                self.skipTest(validation.reason)
+            self.assertEqual(validation.status, 'passed', msg=validation.reason)
+
     def test_weights_ram_codegen(self) -> None:
         with tempfile.TemporaryDirectory() as td:
             model_path = os.path.join(td, 'model.onnx')
@@ -3527,6 +3583,57 @@ class TestTinyMlProject(unittest.TestCase):
             self.assertIn('k2c_prepare', source)
             self.assertIn('memcpy', source)
 
+    def test_incbin_weight_blob_codegen(self) -> None:
+        for weights in ('flash', 'ram'):
+            with self.subTest(weights=weights), tempfile.TemporaryDirectory() as td:
+                model_path = os.path.join(td, 'wide.onnx')
+                _build_wide_gemm_model(model_path)
+                out_root = os.path.join(td, 'onnx-for-mcu')
+
+                result = generate_tinyml_project(
+                    model_path,
+                    out_root,
+                    weights=weights,
+                    emit='c',
+                    weight_format='incbin',
+                )
+
+                blob = result['weight_blob']
+                blob_path = Path(result['project_dir']) / blob['file']
+                self.assertEqual(blob_path.stat().st_size, blob['bytes'])
+                self.assertEqual([t['name'] for t in blob['tensors']], ['W', 'B', 'W2'])
+                self.assertTrue(all(t['offset'] % 16 == 0 for t in blob['tensors']))
+                source = Path(result['source']).read_text(encoding='utf-8')
+                self.assertIn('.incbin', source)
+                self.assertIn('k2c_weights_wide + ', source)
+                self.assertNotIn('const_W[', source)
+                self.assertIn('static const float const_B2[8]', source)
+                manifest = json.loads(Path(result['manifest']).read_text(encoding='utf-8'))
+                self.assertEqual(manifest['weight_blob']['bytes'], blob['bytes'])
+                if result['validation'].status == 'skipped':
+                    self.skipTest(result['validation'].reason)
+                self.assertEqual(result['validation'].status, 'passed', msg=result['validation'].reason)
+
+    def test_constant_graph_output(self) -> None:
+        # A folded Constant that is also a graph output must still be copied out.
+        for weight_format in ('c', 'incbin'):
+            with self.subTest(weight_format=weight_format), tempfile.TemporaryDirectory() as td:
+                model_path = os.path.join(td, 'const_out.onnx')
+                _build_constant_output_model(model_path)
+                out_root = os.path.join(td, 'onnx-for-mcu')
+
+                result = generate_tinyml_project(
+                    model_path,
+                    out_root,
+                    weights='flash',
+                    emit='c',
+                    weight_format=weight_format,
+                )
+
+                if result['validation'].status == 'skipped':
+                    self.skipTest(result['validation'].reason)
+                self.assertEqual(result['validation'].status, 'passed', msg=result['validation'].reason)
+
     def test_int8_quant_codegen(self) -> None:
         with tempfile.TemporaryDirectory() as td:
             model_path = os.path.join(td, 'model.onnx')
@@ -3630,8 +3737,8 @@ class TestTinyMlProject(unittest.TestCase):
             )
 
             source = Path(result['source']).read_text(encoding='utf-8')
-            self.assertIn('size_t g = oc / 3;', source)
-            self.assertIn('size_t ic_begin = g * 2;', source)
+            self.assertIn('k2c_conv2d_s8(&', source)
+            self.assertIn('{ 1, 4, 4, 4, 6, 2, 3, 3, 2, 2, 1, 1, 0, 0, 1, 1, 2 }', source)
 
     def test_consistency_regression_group_conv_c(self) -> None:
         with tempfile.TemporaryDirectory() as td:
@@ -3979,8 +4086,9 @@ class TestTinyMlProject(unittest.TestCase):
                 emit='c',
             )
             source = Path(result['source']).read_text(encoding='utf-8')
-            self.assertIn('size_t g = oc / 3;', source)
-            self.assertIn('size_t ic_begin = g * 2;', source)
+            self.assertIn('k2c_conv2d_f32_direct(&k2c_conv_geom_', source)
+            self.assertIn('const int ic_begin = (oc / oc_per_g) * g->c_per_g;', source)
+            self.assertIn('= { 1, 4, 4, 4, 6, 2, 3, 3, 2, 2, 1, 1, 0, 0, 1, 1, 2 };', source)
 
     def test_batchnorm_model(self) -> None:
         with tempfile.TemporaryDirectory() as td:
@@ -4209,6 +4317,33 @@ class TestTinyMlProject(unittest.TestCase):
             )
             self.assertTrue(os.path.exists(result['source']))
 
+    def test_coverage_models_validate_with_graph_passes(self) -> None:
+        # The shipped default runs the graph passes; the rewritten graph must
+        # still match the source model, and the manifest keeps both op lists.
+        builders = (
+            ('wide_gemm', _build_wide_gemm_model),
+            ('conv_pool', _build_conv_pool_model),
+            ('batchnorm', _build_batchnorm_model),
+            ('resnet_like', _build_resnet_like_model),
+            ('mobilenetv2_like', _build_mobilenetv2_like_model),
+            ('constant', _build_constant_model),
+            ('shape_size', _build_shape_size_model),
+        )
+        for name, build in builders:
+            with self.subTest(model=name), tempfile.TemporaryDirectory() as td:
+                model_path = os.path.join(td, f'{name}.onnx')
+                build(model_path)
+                result = generate_tinyml_project(model_path, os.path.join(td, 'out'), weights='flash', emit='c')
+                validation = result['validation']
+                if validation.status == 'skipped':
+                    self.skipTest(validation.reason)
+                self.assertEqual(validation.status, 'passed', msg=validation.reason)
+                manifest = json.loads(Path(result['manifest']).read_text(encoding='utf-8'))
+                source_ops = [node.op_type for node in onnx.load(model_path).graph.node]
+                self.assertEqual(manifest['ops'], source_ops)
+                self.assertEqual(manifest['optimized_ops'], [e['op'] for e in manifest['op_backends']])
+                self.assertLessEqual(len(manifest['optimized_ops']), len(source_ops))
+
     def test_resnet_like_model(self) -> None:
         with tempfile.TemporaryDirectory() as td:
             model_path = os.path.join(td, 'resnet_like.onnx')
@@ -4991,7 +5126,8 @@ class TestTinyMlProject(unittest.TestCase):
             source = Path(result['source']).read_text(encoding='utf-8')
             manifest = Path(result['manifest']).read_text(encoding='utf-8')
             self.assertIn('QLinearMatMul', manifest)
-            self.assertIn('real_v', source)
+            self.assertIn('rq_prod', source)
+            self.assertNotIn('roundf', source)
 
     def test_matmul_integer_batched_model(self) -> None:
         with tempfile.TemporaryDirectory() as td:
@@ -5264,7 +5400,8 @@ class TestTinyMlProject(unittest.TestCase):
             source = Path(result['source']).read_text(encoding='utf-8')
             manifest = Path(result['manifest']).read_text(encoding='utf-8')
             self.assertIn('QLinearConv', manifest)
-            self.assertIn('k2c_qconv_w_scale', source)
+            self.assertIn('rq_prod', source)
+            self.assertNotIn('roundf', source)
 
     def test_reduce_mean_model(self) -> None:
         with tempfile.TemporaryDirectory() as td:
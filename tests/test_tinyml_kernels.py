@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+if importlib.util.find_spec('numpy') is None or importlib.util.find_spec('onnx') is None:
+    raise unittest.SkipTest('tinyml optional dependencies numpy/onnx are missing')
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+import sys
+
+sys.path.insert(0, str(SRC))
+
+from keil2cmake.tinyml import code_size
+from keil2cmake.tinyml.codegen import generate_c_code
+from keil2cmake.tinyml.project import generate_tinyml_project
+from keil2cmake.tinyml.converter import load_onnx_model
+from keil2cmake.tinyml.runtime import validate_model_consistency
+from keil2cmake.tinyml.runtime.c_runner import run_generated_c_model
+
+
+def _save_model(
+    path: str,
+    nodes: list[onnx.NodeProto],
+    inputs: list[onnx.ValueInfoProto],
+    outputs: list[onnx.ValueInfoProto],
+    initializers: list[onnx.TensorProto] | None = None,
+) -> None:
+    graph = helper.make_graph(
+        nodes,
+        "tinyml_kernels",
+        inputs,
+        outputs,
+        list(initializers or []),
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)])
+    onnx.save(model, path)
+
+
+def _build_conv_model(
+    path: str,
+    x_shape: list[int],
+    w_shape: list[int],
+    out_shape: list[int],
+    **attrs,
+) -> None:
+    rng = np.random.default_rng(21)
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, x_shape)
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, out_shape)
+    w = numpy_helper.from_array(rng.uniform(-1, 1, w_shape).astype(np.float32), name="w")
+    b = numpy_helper.from_array(rng.uniform(-1, 1, (w_shape[0],)).astype(np.float32), name="b")
+    node = helper.make_node("Conv", ["x", "w", "b"], ["y"], **attrs)
+    _save_model(path, [node], [x], [y], [w, b])
+
+
+def _build_gemm_model(path: str) -> None:
+    rng = np.random.default_rng(22)
+    a = helper.make_tensor_value_info("a", TensorProto.FLOAT, [6, 9])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [6, 7])
+    b = numpy_helper.from_array(rng.uniform(-1, 1, (7, 9)).astype(np.float32), name="b")
+    c = numpy_helper.from_array(rng.uniform(-1, 1, (7,)).astype(np.float32), name="c")
+    node = helper.make_node("Gemm", ["a", "b", "c"], ["y"], transB=1, alpha=0.5, beta=2.0)
+    _save_model(path, [node], [a], [y], [b, c])
+
+
+def _build_matmul_model(path: str) -> None:
+    rng = np.random.default_rng(23)
+    a = helper.make_tensor_value_info("a", TensorProto.FLOAT, [5, 11])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [5, 9])
+    b = numpy_helper.from_array(rng.uniform(-1, 1, (11, 9)).astype(np.float32), name="b")
+    node = helper.make_node("MatMul", ["a", "b"], ["y"])
+    _save_model(path, [node], [a], [y], [b])
+
+
+def _build_qdq_unary_model(
+    path: str,
+    ops: list[str],
+    qdtype: int,
+    in_scale: float,
+    out_scale: float,
+) -> None:
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [4, 64])
+    outputs = []
+    nodes = [helper.make_node("QuantizeLinear", ["x", "sx", "zero"], ["qx"])]
+    value_info = [helper.make_tensor_value_info("qx", qdtype, [4, 64])]
+    for idx, op in enumerate(ops):
+        nodes.append(helper.make_node(op, ["qx"], [f"q{idx}"]))
+        nodes.append(helper.make_node("DequantizeLinear", [f"q{idx}", "sy", "zero"], [f"y{idx}"]))
+        value_info.append(helper.make_tensor_value_info(f"q{idx}", qdtype, [4, 64]))
+        outputs.append(helper.make_tensor_value_info(f"y{idx}", TensorProto.FLOAT, [4, 64]))
+    np_dtype = np.int8 if qdtype == TensorProto.INT8 else np.int16
+    initializers = [
+        numpy_helper.from_array(np.array(in_scale, dtype=np.float32), name="sx"),
+        numpy_helper.from_array(np.array(out_scale, dtype=np.float32), name="sy"),
+        numpy_helper.from_array(np.array(0, dtype=np_dtype), name="zero"),
+    ]
+    graph = helper.make_graph(nodes, "tinyml_lut", [x], outputs, initializers, value_info=value_info)
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)])
+    onnx.save(model, path)
+
+
+def _build_qdq_conv_gemm_model(path: str, qdtype: int) -> None:
+    rng = np.random.default_rng(24)
+    np_dtype = np.int8 if qdtype == TensorProto.INT8 else np.int16
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 4, 7, 6])
+    a = helper.make_tensor_value_info("a", TensorProto.FLOAT, [3, 10])
+    outputs = [
+        helper.make_tensor_value_info("y0", TensorProto.FLOAT, [1, 5, 7, 6]),
+        helper.make_tensor_value_info("y1", TensorProto.FLOAT, [1, 4, 4, 3]),
+        helper.make_tensor_value_info("y2", TensorProto.FLOAT, [3, 6]),
+    ]
+    initializers = [
+        numpy_helper.from_array(rng.uniform(-1, 1, (5, 4, 3, 3)).astype(np.float32), name="w0"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (4, 2, 3, 2)).astype(np.float32), name="w1"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (6, 10)).astype(np.float32), name="w2"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (5,)).astype(np.float32), name="b0"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (6,)).astype(np.float32), name="b2"),
+        numpy_helper.from_array(np.array(0.02, dtype=np.float32), name="sx"),
+        numpy_helper.from_array(np.array(0.01, dtype=np.float32), name="sw"),
+        numpy_helper.from_array(np.array(0.05, dtype=np.float32), name="sy"),
+        numpy_helper.from_array(np.array(3, dtype=np_dtype), name="zx"),
+        numpy_helper.from_array(np.array(0, dtype=np_dtype), name="zero"),
+    ]
+    nodes = [
+        helper.make_node("QuantizeLinear", ["x", "sx", "zx"], ["qx"]),
+        helper.make_node("QuantizeLinear", ["a", "sx", "zx"], ["qa"]),
+    ]
+    for idx in range(3):
+        nodes.append(helper.make_node("QuantizeLinear", [f"w{idx}", "sw", "zero"], [f"qw{idx}"]))
+    nodes += [
+        helper.make_node("Conv", ["qx", "qw0", "b0"], ["q0"], pads=[1, 1, 1, 1]),
+        helper.make_node("Conv", ["qx", "qw1"], ["q1"], group=2, strides=[2, 2], pads=[1, 0, 0, 0]),
+        helper.make_node("Gemm", ["qa", "qw2", "b2"], ["q2"], transB=1),
+    ]
+    shapes = {"qx": [1, 4, 7, 6], "qa": [3, 10], "qw0": [5, 4, 3, 3], "qw1": [4, 2, 3, 2], "qw2": [6, 10]}
+    shapes.update({"q0": [1, 5, 7, 6], "q1": [1, 4, 4, 3], "q2": [3, 6]})
+    for idx in range(3):
+        nodes.append(helper.make_node("DequantizeLinear", [f"q{idx}", "sy", "zero"], [f"y{idx}"]))
+    value_info = [helper.make_tensor_value_info(name, qdtype, shape) for name, shape in shapes.items()]
+    graph = helper.make_graph(nodes, "tinyml_qlib", [x, a], outputs, initializers, value_info=value_info)
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)])
+    onnx.save(model, path)
+
+
+class TestTinyMlKernelLibrary(unittest.TestCase):
+    def _assert_kernel(self, builder, kernel: str) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "model.onnx")
+            out_dir = os.path.join(td, "out")
+            builder(model_path)
+            model = load_onnx_model(model_path)
+            result = generate_c_code(model, out_dir, "model", "flash")
+            self.assertIn(kernel, result["kernels"])
+            source = Path(result["source"]).read_text(encoding="utf-8")
+            self.assertIn(f"k2c_{kernel}(", source)
+            self.assertNotIn("if (in_h >= 0", source)
+
+            validation = validate_model_consistency(
+                model,
+                model_path,
+                source_path=str(result["source"]),
+                header_path=str(result["header"]),
+            )
+            if validation.status == "skipped":
+                self.skipTest(validation.reason)
+            self.assertEqual(validation.status, "passed", msg=validation.reason)
+
+    def test_pointwise_conv_uses_1x1_kernel(self) -> None:
+        self._assert_kernel(
+            lambda p: _build_conv_model(p, [1, 8, 5, 5], [6, 8, 1, 1], [1, 6, 5, 5]),
+            "conv2d_f32_1x1",
+        )
+
+    def test_depthwise_conv_uses_border_split_kernel(self) -> None:
+        self._assert_kernel(
+            lambda p: _build_conv_model(
+                p,
+                [1, 4, 9, 7],
+                [4, 1, 3, 3],
+                [1, 4, 5, 4],
+                group=4,
+                pads=[1, 1, 1, 1],
+                strides=[2, 2],
+            ),
+            "conv2d_f32_depthwise",
+        )
+
+    def test_dilated_depthwise_conv(self) -> None:
+        self._assert_kernel(
+            lambda p: _build_conv_model(
+                p,
+                [1, 3, 8, 8],
+                [3, 1, 3, 3],
+                [1, 3, 8, 8],
+                group=3,
+                pads=[2, 2, 2, 2],
+                dilations=[2, 2],
+            ),
+            "conv2d_f32_depthwise",
+        )
+
+    def test_general_conv_uses_direct_kernel(self) -> None:
+        self._assert_kernel(
+            lambda p: _build_conv_model(
+                p,
+                [1, 3, 7, 6],
+                [5, 3, 3, 2],
+                [1, 5, 4, 3],
+                pads=[1, 0, 1, 1],
+                strides=[2, 2],
+            ),
+            "conv2d_f32_direct",
+        )
+
+    def test_gemm_uses_blocked_kernel(self) -> None:
+        self._assert_kernel(_build_gemm_model, "gemm_f32")
+
+    def test_matmul_uses_blocked_kernel(self) -> None:
+        self._assert_kernel(_build_matmul_model, "gemm_f32")
+
+    def test_reference_mode_and_host_timing(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "conv.onnx")
+            _build_conv_model(model_path, [1, 4, 8, 8], [4, 4, 3, 3], [1, 4, 8, 8], pads=[1, 1, 1, 1])
+            model = load_onnx_model(model_path)
+            x = np.random.default_rng(0).uniform(-1, 1, (1, 4, 8, 8)).astype(np.float32)
+            outputs = {}
+            for mode in ("auto", "reference"):
+                out_dir = os.path.join(td, mode)
+                result = generate_c_code(model, out_dir, "conv", "flash", kernels=mode)
+                run = run_generated_c_model(
+                    model,
+                    str(result["source"]),
+                    str(result["header"]),
+                    x,
+                    bench_iterations=3,
+                )
+                if not run.ok and "compiler" in run.reason:
+                    self.skipTest(run.reason)
+                self.assertTrue(run.ok, msg=run.reason)
+                self.assertIsNotNone(run.elapsed_us)
+                outputs[mode] = run.output
+                if mode == "reference":
+                    self.assertEqual(result["kernels"], [])
+            np.testing.assert_allclose(outputs["auto"], outputs["reference"], rtol=1e-5, atol=1e-5)
+
+
+    def test_size_mode_calls_shared_integer_kernels(self) -> None:
+        for qdtype, tag in ((TensorProto.INT8, "s8"), (TensorProto.INT16, "s16")):
+            with self.subTest(tag=tag), tempfile.TemporaryDirectory() as td:
+                model_path = os.path.join(td, "qlib.onnx")
+                _build_qdq_conv_gemm_model(model_path, qdtype)
+                model = load_onnx_model(model_path)
+                rng = np.random.default_rng(5)
+                feeds = {
+                    "x": rng.uniform(-2, 2, (1, 4, 7, 6)).astype(np.float32),
+                    "a": rng.uniform(-2, 2, (3, 10)).astype(np.float32),
+                }
+                outputs = {}
+                for mode, kernels, optimize in (
+                    ("reference", "reference", "speed"),
+                    ("speed", "auto", "speed"),
+                    ("size", "auto", "size"),
+                ):
+                    result = generate_c_code(
+                        model, os.path.join(td, mode), "qlib", "flash", kernels=kernels, optimize=optimize
+                    )
+                    source = Path(result["source"]).read_text(encoding="utf-8")
+                    if mode == "reference":
+                        self.assertEqual(result["kernels"], [])
+                    else:
+                        # Both convolutions share one kernel definition.
+                        self.assertEqual(source.count(f"static void k2c_conv2d_{tag}("), 1)
+                        self.assertEqual(source.count(f"k2c_conv2d_{tag}(&"), 2)
+                        self.assertNotIn("if (in_h >= 0", source)
+                    # The Gemm is below MIN_KERNEL_MACS: inline for speed, shared for size.
+                    self.assertEqual(f"gemm_{tag}" in result["kernels"], mode == "size")
+                    run = run_generated_c_model(model, str(result["source"]), str(result["header"]), feeds)
+                    if not run.ok and "compiler" in run.reason:
+                        self.skipTest(run.reason)
+                    self.assertTrue(run.ok, msg=run.reason)
+                    outputs[mode] = run.outputs
+                for name, value in outputs["reference"].items():
+                    np.testing.assert_array_equal(outputs["speed"][name], value)
+                    np.testing.assert_array_equal(outputs["size"][name], value)
+
+    def test_size_mode_routes_small_float_ops_through_library(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "conv.onnx")
+            _build_conv_model(model_path, [1, 2, 3, 3], [2, 2, 1, 1], [1, 2, 3, 3])
+            model = load_onnx_model(model_path)
+            speed = generate_c_code(model, os.path.join(td, "speed"), "conv", "flash")
+            size = generate_c_code(model, os.path.join(td, "size"), "conv", "flash", optimize="size")
+            self.assertEqual(speed["kernels"], [])
+            self.assertIn("conv2d_f32_1x1", size["kernels"])
+            with self.assertRaises(ValueError):
+                generate_c_code(model, os.path.join(td, "bad"), "conv", "flash", optimize="fast")
+
+    def test_manifest_reports_text_size_delta(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "qlib.onnx")
+            _build_qdq_conv_gemm_model(model_path, TensorProto.INT8)
+            result = generate_tinyml_project(
+                model_path,
+                os.path.join(td, "out"),
+                "flash",
+                "c",
+                strict_validation=False,
+                optimize="size",
+                code_size=True,
+            )
+            manifest = json.loads(Path(result["manifest"]).read_text(encoding="utf-8"))
+            report = manifest["code_size"]
+            self.assertEqual(report, result["code_size"])
+            self.assertEqual(report["optimize"], "size")
+            if report["status"] == "skipped":
+                self.skipTest(report["reason"])
+            self.assertEqual(report["status"], "measured")
+            self.assertGreater(report["text_bytes"], 0)
+            self.assertGreater(report["inline_text_bytes"], 0)
+            self.assertEqual(report["delta_bytes"], report["text_bytes"] - report["inline_text_bytes"])
+
+    def test_text_size_of_relative_source(self) -> None:
+        # The CLI default --output is relative; the size compile runs from the
+        # source directory and must still find the file.
+        found = code_size._find_size_compiler()
+        if found is None:
+            self.skipTest("no C compiler for the size measurement")
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "conv.onnx")
+            _build_conv_model(model_path, [1, 2, 3, 3], [2, 2, 1, 1], [1, 2, 3, 3])
+            result = generate_c_code(load_onnx_model(model_path), os.path.join(td, "out"), "conv", "flash")
+            try:
+                os.chdir(td)
+                text_bytes = code_size.compile_text_bytes(
+                    found[0], os.path.relpath(str(result["source"]), td)
+                )
+            finally:
+                os.chdir(cwd)
+            self.assertIsNotNone(text_bytes)
+            self.assertGreater(text_bytes, 0)
+
+    def test_inline_size_baseline_uses_same_schedule_and_tiling(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "conv.onnx")
+            _build_conv_model(model_path, [1, 2, 3, 3], [2, 2, 1, 1], [1, 2, 3, 3])
+            model = load_onnx_model(model_path)
+            result = generate_c_code(model, os.path.join(td, "out"), "conv", "flash")
+            with (
+                mock.patch.object(code_size, "_find_size_compiler", return_value=("cc", "host")),
+                mock.patch.object(code_size, "compile_text_bytes", return_value=128),
+                mock.patch.object(code_size, "generate_c_code", wraps=generate_c_code) as inline,
+            ):
+                report = code_size.measure_code_size(
+                    model, str(result["source"]), "conv", "flash", "c", "size", schedule="file", tiling="patch"
+                )
+            kwargs = inline.call_args.kwargs
+            self.assertEqual(kwargs["kernels"], "reference")
+            self.assertEqual((kwargs["optimize"], kwargs["schedule"], kwargs["tiling"]), ("size", "file", "patch"))
+            self.assertEqual((report["schedule"], report["tiling"]), ("file", "patch"))
+            self.assertEqual(report["status"], "measured")
+
+
+class TestTinyMlQuantLut(unittest.TestCase):
+    def _run_modes(self, ops: list[str], qdtype: int, in_scale: float, out_scale: float, span: float):
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "model.onnx")
+            _build_qdq_unary_model(model_path, ops, qdtype, in_scale, out_scale)
+            model = load_onnx_model(model_path)
+            x = np.linspace(-span, span, 256, dtype=np.float32).reshape(4, 64)
+            results = {}
+            for mode in ("auto", "reference"):
+                result = generate_c_code(model, os.path.join(td, mode), "lut", "flash", kernels=mode)
+                run = run_generated_c_model(model, str(result["source"]), str(result["header"]), x)
+                if not run.ok and "compiler" in run.reason:
+                    self.skipTest(run.reason)
+                self.assertTrue(run.ok, msg=run.reason)
+                source = Path(result["source"]).read_text(encoding="utf-8")
+                results[mode] = (result["kernels"], source, run.output)
+            return results
+
+    def test_int8_unary_ops_use_shared_tables(self) -> None:
+        results = self._run_modes(["Sigmoid", "Sigmoid", "Tanh"], TensorProto.INT8, 0.05, 1.0 / 128, 6.0)
+        kernels, source, out = results["auto"]
+        luts = [name for name in kernels if name.startswith("lut_s8_")]
+        self.assertEqual(len(luts), 2)
+        self.assertNotIn("expf(", source)
+        self.assertNotIn("tanhf(", source)
+        _, _, ref_out = results["reference"]
+        np.testing.assert_allclose(out, ref_out, atol=1.0 / 128 + 1e-6)
+
+    def test_int16_interpolated_table_and_step_fallback(self) -> None:
+        results = self._run_modes(["Tanh", "Floor"], TensorProto.INT16, 1.0 / 4096, 1.0 / 16384, 7.0)
+        kernels, source, out = results["auto"]
+        self.assertTrue(any(name.startswith("lut_s16_") for name in kernels))
+        self.assertNotIn("tanhf(", source)
+        self.assertIn("floorf(", source)
+        _, _, ref_out = results["reference"]
+        # Interpolation stays within one LSB of the exact mapping; the float
+        # loop may itself be one LSB off after float32 rounding.
+        np.testing.assert_allclose(out, ref_out, atol=2.0 / 16384 + 1e-6)
+
+
+class TestTinyMlLocalEvalKernels(unittest.TestCase):
+    def _assert_python_eval(self, builder) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "model.onnx")
+            builder(model_path)
+            model = load_onnx_model(model_path)
+            validation = validate_model_consistency(model, model_path)
+            if validation.status == "skipped":
+                self.skipTest(validation.reason)
+            self.assertEqual(validation.status, "passed", msg=validation.reason)
+            self.assertTrue(validation.engine.startswith("python-eval"), msg=validation.engine)
+
+    def test_grouped_dilated_conv(self) -> None:
+        self._assert_python_eval(
+            lambda p: _build_conv_model(
+                p,
+                [2, 4, 9, 8],
+                [6, 2, 3, 2],
+                [2, 6, 4, 4],
+                group=2,
+                pads=[1, 0, 2, 1],
+                strides=[2, 2],
+                dilations=[2, 1],
+            )
+        )
+
+    def test_conv_transpose(self) -> None:
+        def build(path: str) -> None:
+            rng = np.random.default_rng(24)
+            x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 4, 5, 4])
+            y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 6, 10, 8])
+            w = numpy_helper.from_array(rng.uniform(-1, 1, (4, 3, 3, 3)).astype(np.float32), name="w")
+            b = numpy_helper.from_array(rng.uniform(-1, 1, (6,)).astype(np.float32), name="b")
+            node = helper.make_node(
+                "ConvTranspose",
+                ["x", "w", "b"],
+                ["y"],
+                group=2,
+                strides=[2, 2],
+                pads=[1, 1, 1, 1],
+                output_padding=[1, 1],
+            )
+            _save_model(path, [node], [x], [y], [w, b])
+
+        self._assert_python_eval(build)
+
+    def test_pools_with_padding(self) -> None:
+        for op, attrs in (
+            ("MaxPool", {"pads": [1, 1, 1, 1], "strides": [2, 2]}),
+            ("AveragePool", {"pads": [1, 0, 1, 0], "count_include_pad": 0}),
+            ("AveragePool", {"pads": [1, 1, 1, 1], "count_include_pad": 1}),
+            ("LpPool", {"pads": [1, 1, 0, 0], "p": 3}),
+        ):
+            with self.subTest(op=op, attrs=attrs):
+                def build(path: str, op=op, attrs=attrs) -> None:
+                    pads = attrs["pads"]
+                    strides = attrs.get("strides", [1, 1])
+                    out_h = (7 + pads[0] + pads[2] - 3) // strides[0] + 1
+                    out_w = (6 + pads[1] + pads[3] - 3) // strides[1] + 1
+                    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 3, 7, 6])
+                    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 3, out_h, out_w])
+                    node = helper.make_node(op, ["x"], ["y"], kernel_shape=[3, 3], **attrs)
+                    _save_model(path, [node], [x], [y])
+
+                self._assert_python_eval(build)
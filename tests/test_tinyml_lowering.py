@@ -25,7 +25,14 @@ import sys
 sys.path.insert(0, str(SRC))
 
 from keil2cmake.tinyml.codegen import generate_c_code
-from keil2cmake.tinyml.converter import load_onnx_model
+from keil2cmake.tinyml.converter import (
+    NodeInfo,
+    TensorInfo,
+    get_shape_infer_stats,
+    load_onnx_model,
+    reset_shape_infer_stats,
+)
+from keil2cmake.tinyml.converter.onnx_loader_shape_infer import _infer_shapes
 from keil2cmake.tinyml.runtime.local_evaluator import _eval_model
 
 
@@ -193,3 +200,46 @@ class TestTinyMlLowering(unittest.TestCase):
             result = generate_c_code(model, out_dir, "seq_split_lowered", "flash")
             self.assertTrue(os.path.exists(result["source"]))
             self.assertTrue(os.path.exists(result["header"]))
+
+
+class TestTinyMlShapeInference(unittest.TestCase):
+    def test_worklist_visits_each_node_once_in_any_listing_order(self) -> None:
+        depth = 400
+        nodes = [
+            NodeInfo(op_type="Relu", inputs=[f"t{i}"], outputs=[f"t{i + 1}"], attrs={})
+            for i in range(depth)
+        ]
+        nodes.reverse()
+        tensors = {"t0": TensorInfo(name="t0", shape=[1, 8], dtype="float32")}
+        stats = _infer_shapes(tensors, nodes)
+        self.assertEqual(tensors[f"t{depth}"].shape, [1, 8])
+        self.assertEqual(stats.nodes, depth)
+        self.assertEqual(stats.visits, depth)
+        self.assertEqual(stats.updates, depth)
+
+        again = _infer_shapes(tensors, nodes)
+        self.assertEqual(again.visits, depth)
+        self.assertEqual(again.updates, 0)
+
+    def test_loader_accumulates_timing_counters(self) -> None:
+        x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 4])
+        y = helper.make_tensor_value_info("y", TensorProto.FLOAT, None)
+        nodes = []
+        prev = "x"
+        for idx in range(32):
+            out = "y" if idx == 31 else f"h{idx}"
+            nodes.append(helper.make_node("Sigmoid" if idx % 2 else "Relu", [prev], [out]))
+            prev = out
+        graph = helper.make_graph(nodes, "deep_chain", [x], [y])
+        model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)])
+        with _workspace_temp_dir() as td:
+            model_path = os.path.join(td, "deep.onnx")
+            onnx.save(model, model_path)
+            reset_shape_infer_stats()
+            loaded = load_onnx_model(model_path)
+        self.assertEqual(loaded.outputs[0].shape, [1, 4])
+        stats = get_shape_infer_stats()
+        self.assertGreaterEqual(stats.calls, 1)
+        self.assertGreaterEqual(stats.visits, 32)
+        self.assertLessEqual(stats.visits, stats.calls * 2 * 32)
+        self.assertGreaterEqual(stats.elapsed_s, 0.0)
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+if importlib.util.find_spec('numpy') is None or importlib.util.find_spec('onnx') is None:
+    raise unittest.SkipTest('tinyml optional dependencies numpy/onnx are missing')
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+import sys
+
+sys.path.insert(0, str(SRC))
+
+from keil2cmake.tinyml.codegen import generate_c_code, generate_manifest
+from keil2cmake.tinyml.converter import load_onnx_model
+from keil2cmake.tinyml.memory_plan import plan_arena, schedule_nodes
+from keil2cmake.tinyml.runtime import validate_model_consistency
+from keil2cmake.tinyml.tiling import find_patch_chain, patch_regions
+
+
+def _save_model(
+    path: str,
+    nodes: list[onnx.NodeProto],
+    inputs: list[onnx.ValueInfoProto],
+    outputs: list[onnx.ValueInfoProto],
+    initializers: list[onnx.TensorProto] | None = None,
+) -> None:
+    graph = helper.make_graph(
+        nodes,
+        "tinyml_memory",
+        inputs,
+        outputs,
+        list(initializers or []),
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)])
+    onnx.save(model, path)
+
+
+def _build_gemm_chain_model(path: str, depth: int = 4) -> None:
+    rng = np.random.default_rng(3)
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 16])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 16])
+    nodes = []
+    inits = []
+    prev = "x"
+    for idx in range(depth):
+        w_name = f"w{idx}"
+        inits.append(numpy_helper.from_array(rng.uniform(-0.5, 0.5, (16, 16)).astype(np.float32), name=w_name))
+        gemm_out = f"g{idx}"
+        nodes.append(helper.make_node("Gemm", inputs=[prev, w_name], outputs=[gemm_out]))
+        relu_out = "y" if idx == depth - 1 else f"r{idx}"
+        nodes.append(helper.make_node("Relu", inputs=[gemm_out], outputs=[relu_out]))
+        prev = relu_out
+    _save_model(path, nodes, [x], [y], inits)
+
+
+def _build_inplace_view_model(path: str) -> None:
+    rng = np.random.default_rng(5)
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 2, 4, 4])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 3])
+    w = numpy_helper.from_array(rng.uniform(-1, 1, (2, 2, 3, 3)).astype(np.float32), name="w")
+    fc = numpy_helper.from_array(rng.uniform(-1, 1, (32, 3)).astype(np.float32), name="fc")
+    shape = numpy_helper.from_array(np.array([1, 32], dtype=np.int64), name="shape")
+    nodes = [
+        helper.make_node("Conv", ["x", "w"], ["c"], pads=[1, 1, 1, 1]),
+        helper.make_node("Relu", ["c"], ["r"]),
+        helper.make_node("Sigmoid", ["r"], ["s"]),
+        helper.make_node("Add", ["r", "s"], ["a"]),
+        helper.make_node("Reshape", ["a", "shape"], ["flat"]),
+        helper.make_node("MatMul", ["flat", "fc"], ["y"]),
+    ]
+    _save_model(path, nodes, [x], [y], [w, fc, shape])
+
+
+def _build_branch_model(path: str, branches: int = 4) -> None:
+    # Every branch expands to 16 channels and projects back to 2; the file lists
+    # all expansions before any projection, so all wide tensors are live at once.
+    rng = np.random.default_rng(7)
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 4, 8, 8])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 2 * branches, 8, 8])
+    inits = []
+    expand = []
+    project = []
+    for idx in range(branches):
+        inits.append(numpy_helper.from_array(rng.uniform(-1, 1, (16, 4, 1, 1)).astype(np.float32), name=f"we{idx}"))
+        inits.append(numpy_helper.from_array(rng.uniform(-1, 1, (2, 16, 3, 3)).astype(np.float32), name=f"wp{idx}"))
+        expand.append(helper.make_node("Conv", ["x", f"we{idx}"], [f"e{idx}"]))
+        project.append(helper.make_node("Conv", [f"e{idx}", f"wp{idx}"], [f"p{idx}"], pads=[1, 1, 1, 1]))
+    concat = helper.make_node("Concat", [f"p{idx}" for idx in range(branches)], ["y"], axis=1)
+    _save_model(path, expand + project + [concat], [x], [y], inits)
+
+
+def _build_patch_model(path: str) -> None:
+    # High-resolution stem (conv, depthwise conv, pool) followed by a small head.
+    rng = np.random.default_rng(11)
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 3, 40, 40])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 4])
+    inits = [
+        numpy_helper.from_array(rng.uniform(-1, 1, (8, 3, 3, 3)).astype(np.float32), name="w0"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (8,)).astype(np.float32), name="b0"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (8, 1, 3, 3)).astype(np.float32), name="w1"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (4, 8, 1, 1)).astype(np.float32), name="w2"),
+    ]
+    nodes = [
+        helper.make_node("Conv", ["x", "w0", "b0"], ["c0"], pads=[1, 1, 1, 1]),
+        helper.make_node("Relu", ["c0"], ["r0"]),
+        helper.make_node("Conv", ["r0", "w1"], ["c1"], pads=[1, 1, 1, 1], group=8),
+        helper.make_node("LeakyRelu", ["c1"], ["r1"], alpha=0.1),
+        helper.make_node("MaxPool", ["r1"], ["p1"], kernel_shape=[2, 2], strides=[2, 2]),
+        helper.make_node("Conv", ["p1", "w2"], ["c2"]),
+        helper.make_node("GlobalAveragePool", ["c2"], ["g"]),
+        helper.make_node("Flatten", ["g"], ["y"]),
+    ]
+    _save_model(path, nodes, [x], [y], inits)
+
+
+class _GeneratedModelTestCase(unittest.TestCase):
+    def _assert_validates(self, model, model_path: str, result: dict) -> None:
+        validation = validate_model_consistency(
+            model,
+            model_path,
+            source_path=str(result["source"]),
+            header_path=str(result["header"]),
+        )
+        if validation.status == "skipped":
+            self.skipTest(validation.reason)
+        self.assertEqual(validation.status, "passed", msg=validation.reason)
+
+
+class TestTinyMlArenaPlanner(_GeneratedModelTestCase):
+    def test_plan_reuses_dead_buffers(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "chain.onnx")
+            _build_gemm_chain_model(model_path)
+            model = load_onnx_model(model_path)
+            names = [out for node in model.nodes for out in node.outputs if out != "y"]
+            sizes = {name: 64 for name in names}
+            plan = plan_arena(model, names, sizes)
+            self.assertEqual(plan.naive_bytes, 64 * len(names))
+            self.assertEqual(plan.planned_bytes, 128)
+            for a in names:
+                for b in names:
+                    if a == b or not plan.lifetimes[a].overlaps(plan.lifetimes[b]):
+                        continue
+                    a_end = plan.offsets[a] + sizes[a]
+                    b_end = plan.offsets[b] + sizes[b]
+                    self.assertTrue(a_end <= plan.offsets[b] or b_end <= plan.offsets[a])
+
+    def test_manifest_reports_planned_and_naive_arena(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "chain.onnx")
+            out_dir = os.path.join(td, "out")
+            _build_gemm_chain_model(model_path)
+            model = load_onnx_model(model_path)
+            result = generate_c_code(model, out_dir, "chain", "flash")
+            manifest_path = generate_manifest(
+                model,
+                out_dir,
+                "c",
+                "flash",
+                int(result["arena_bytes"]),
+                result["op_backends"],
+                result["backend_stats"],
+                result["fallback_stats"],
+                result["memory_plan"],
+            )
+            manifest = json.loads(Path(manifest_path).read_text(encoding="utf-8"))
+            plan = manifest["memory_plan"]
+            self.assertLess(plan["planned_bytes"], plan["naive_bytes"])
+            self.assertEqual(manifest["arena_bytes"], plan["arena_bytes"])
+
+            self._assert_validates(model, model_path, result)
+
+    def test_inplace_and_view_aliases(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "alias.onnx")
+            out_dir = os.path.join(td, "out")
+            _build_inplace_view_model(model_path)
+            model = load_onnx_model(model_path)
+            result = generate_c_code(model, out_dir, "alias", "flash")
+            aliases = result["memory_plan"]["aliases"]
+            # Relu overwrites the dying conv output, Sigmoid must not clobber r (still read by Add).
+            self.assertEqual(aliases.get("r"), "c")
+            self.assertNotIn("s", aliases)
+            self.assertEqual(aliases.get("a"), "c")
+            self.assertEqual(aliases.get("flat"), "c")
+            self.assertEqual(len(result["memory_plan"]["buffers"]), 2)
+
+            self._assert_validates(model, model_path, result)
+
+    def test_schedule_lowers_peak_for_parallel_branches(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "branches.onnx")
+            _build_branch_model(model_path)
+            model = load_onnx_model(model_path)
+            wide, narrow = 16 * 64 * 4, 2 * 64 * 4
+            file_order = generate_c_code(model, os.path.join(td, "file"), "branches", "flash", schedule="file")
+            self.assertNotIn("schedule", file_order["memory_plan"])
+            self.assertEqual(file_order["memory_plan"]["planned_bytes"], 4 * wide + narrow)
+
+            result = generate_c_code(model, os.path.join(td, "memory"), "branches", "flash")
+            schedule = result["memory_plan"]["schedule"]
+            self.assertEqual(schedule["strategy"], "dp")
+            self.assertTrue(schedule["reordered"])
+            self.assertEqual(schedule["peak_bytes_before"], 4 * wide + narrow)
+            self.assertEqual(schedule["peak_bytes_after"], wide + 4 * narrow)
+            self.assertEqual(schedule["arena_bytes_after"], result["memory_plan"]["planned_bytes"])
+            self.assertLess(int(result["arena_bytes"]), int(file_order["arena_bytes"]))
+            # Expansion and projection of a branch now run back to back.
+            order = schedule["node_order"]
+            for idx in range(4):
+                self.assertEqual(order.index(idx + 4), order.index(idx) + 1)
+
+            self._assert_validates(model, model_path, result)
+
+    def test_schedule_falls_back_to_greedy_on_wide_graphs(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "branches.onnx")
+            _build_branch_model(model_path, branches=12)
+            model = load_onnx_model(model_path)
+            sizes = {out: 64 * 4 * (16 if out.startswith("e") else 2) for node in model.nodes for out in node.outputs}
+            del sizes["y"]
+            plan = schedule_nodes(model, sizes, max_states=100)
+            self.assertEqual(plan.strategy, "greedy")
+            self.assertEqual(plan.peak_after, 16 * 256 + 12 * 512)
+            produced = {"x"} | {name for name, t in model.tensors.items() if t.data is not None}
+            for idx in plan.order:
+                node = model.nodes[idx]
+                self.assertLessEqual(set(node.inputs), produced)
+                produced.update(node.outputs)
+
+    def test_patch_chain_regions_follow_receptive_field(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "patch.onnx")
+            _build_patch_model(model_path)
+            model = load_onnx_model(model_path)
+            indices, layers = find_patch_chain(model)
+            self.assertEqual(indices, [0, 1, 2, 3, 4, 5])
+            self.assertEqual([layer.ops for layer in layers], [("Conv", "Relu"), ("Conv", "LeakyRelu"), ("MaxPool",), ("Conv",)])
+            # Top-left patch of a 2x2 grid over the 20x20 output, walked back to layer 0.
+            regions = patch_regions(layers, (2, 2), 0, 0)
+            self.assertEqual(regions, [(0, 21, 0, 21), (0, 20, 0, 20), (0, 10, 0, 10), (0, 10, 0, 10)])
+            covered = set()
+            for ph in range(3):
+                for pw in range(3):
+                    r0, r1, c0, c1 = patch_regions(layers, (3, 3), ph, pw)[-1]
+                    covered.update((r, c) for r in range(r0, r1) for c in range(c0, c1))
+            self.assertEqual(len(covered), 20 * 20)
+
+    def test_patch_tiling_shrinks_arena(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "patch.onnx")
+            _build_patch_model(model_path)
+            model = load_onnx_model(model_path)
+            plain = generate_c_code(model, os.path.join(td, "plain"), "patch", "flash")
+            self.assertNotIn("tiling", plain["memory_plan"])
+
+            result = generate_c_code(model, os.path.join(td, "tiled"), "patch", "flash", tiling="patch")
+            tiling = result["memory_plan"]["tiling"]
+            self.assertTrue(tiling["applied"])
+            self.assertEqual(tiling["input"], "x")
+            self.assertEqual(tiling["arena_bytes_before"], int(plain["memory_plan"]["planned_bytes"]))
+            self.assertLess(int(result["arena_bytes"]), int(plain["arena_bytes"]))
+            self.assertGreater(tiling["saved_bytes"], 0)
+            self.assertGreater(tiling["macs_after"], tiling["macs_before"])
+            self.assertLessEqual(tiling["recompute_overhead"], 0.5)
+            for entry in tiling["patch_buffers"]:
+                self.assertLess(entry["bytes"], 8 * 40 * 40 * 4)
+            self.assertEqual([e["op"] for e in result["op_backends"]], [e["op"] for e in plain["op_backends"]])
+
+            self._assert_validates(model, model_path, result)
+
+
+class TestTinyMlConstData(_GeneratedModelTestCase):
+    def test_initializers_are_read_only_arrays(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "chain.onnx")
+            _build_gemm_chain_model(model_path, depth=2)
+            model = load_onnx_model(model_path)
+            w0 = model.tensors["w0"].data
+            self.assertIsInstance(w0, np.ndarray)
+            self.assertEqual(w0.dtype, np.float32)
+            self.assertEqual(w0.shape, (256,))
+            self.assertFalse(w0.flags.writeable)
+            with self.assertRaises(ValueError):
+                w0[0] = 1.0
+
+    def test_external_data_is_read_without_holding_the_file(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            src_path = os.path.join(td, "inline.onnx")
+            model_path = os.path.join(td, "external.onnx")
+            out_dir = os.path.join(td, "out")
+            _build_gemm_chain_model(src_path, depth=3)
+            onnx.save(
+                onnx.load(src_path),
+                model_path,
+                save_as_external_data=True,
+                all_tensors_to_one_file=True,
+                location="external.bin",
+                size_threshold=0,
+            )
+            reference = numpy_helper.to_array(onnx.load(src_path).graph.initializer[1]).reshape(-1)
+            mapped = load_onnx_model(model_path, mmap_external=True).tensors["w1"].data
+            self.assertIsInstance(mapped, np.memmap)
+            np.testing.assert_array_equal(mapped, reference)
+            del mapped
+
+            model = load_onnx_model(model_path)
+            w1 = model.tensors["w1"].data
+            self.assertNotIsInstance(w1, np.memmap)
+            self.assertFalse(w1.flags.writeable)
+            np.testing.assert_array_equal(w1, reference)
+            # The default load does not keep external.bin open.
+            os.replace(os.path.join(td, "external.bin"), os.path.join(td, "moved.bin"))
+            os.replace(os.path.join(td, "moved.bin"), os.path.join(td, "external.bin"))
+
+            result = generate_c_code(model, out_dir, "external", "flash")
+            self._assert_validates(model, model_path, result)
+
+    def test_external_data_outside_model_dir_is_rejected(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_dir = os.path.join(td, "model")
+            os.makedirs(model_dir)
+            src_path = os.path.join(model_dir, "inline.onnx")
+            model_path = os.path.join(model_dir, "external.onnx")
+            _build_gemm_chain_model(src_path, depth=2)
+            onnx.save(
+                onnx.load(src_path),
+                model_path,
+                save_as_external_data=True,
+                all_tensors_to_one_file=True,
+                location="external.bin",
+                size_threshold=0,
+            )
+            secret = os.path.join(td, "secret.bin")
+            Path(secret).write_bytes(Path(model_dir, "external.bin").read_bytes())
+
+            for location in ("../secret.bin", "sub/../../secret.bin", secret):
+                with self.subTest(location=location):
+                    proto = onnx.load(model_path, load_external_data=False)
+                    for init in proto.graph.initializer:
+                        for entry in init.external_data:
+                            if entry.key == "location":
+                                entry.value = location
+                    bad_path = os.path.join(model_dir, "bad.onnx")
+                    onnx.save(proto, bad_path)
+                    with self.assertRaisesRegex(ValueError, "outside the model directory"):
+                        load_onnx_model(bad_path)
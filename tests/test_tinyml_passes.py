@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+if importlib.util.find_spec('numpy') is None or importlib.util.find_spec('onnx') is None:
+    raise unittest.SkipTest('tinyml optional dependencies numpy/onnx are missing')
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+import sys
+
+sys.path.insert(0, str(SRC))
+
+from keil2cmake.tinyml.codegen import generate_c_code
+from keil2cmake.tinyml.converter import load_onnx_model
+from keil2cmake.tinyml.passes import PassManager, eliminate_dead_nodes, optimize_model
+from keil2cmake.tinyml.project import generate_tinyml_project
+from keil2cmake.tinyml.runtime import validate_model_consistency
+from keil2cmake.tinyml.runtime.c_runner import run_generated_c_model
+
+
+def _save_model(path, nodes, inputs, outputs, initializers=None, value_info=None) -> None:
+    graph = helper.make_graph(nodes, "tinyml_passes", inputs, outputs, list(initializers or []), value_info=value_info)
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)])
+    onnx.save(model, path)
+
+
+def _bn_params(rng, prefix: str, channels: int) -> list[onnx.TensorProto]:
+    return [
+        numpy_helper.from_array(rng.uniform(0.5, 1.5, (channels,)).astype(np.float32), name=f"{prefix}_scale"),
+        numpy_helper.from_array(rng.uniform(-0.5, 0.5, (channels,)).astype(np.float32), name=f"{prefix}_bias"),
+        numpy_helper.from_array(rng.uniform(-0.5, 0.5, (channels,)).astype(np.float32), name=f"{prefix}_mean"),
+        numpy_helper.from_array(rng.uniform(0.5, 2.0, (channels,)).astype(np.float32), name=f"{prefix}_var"),
+    ]
+
+
+def _bn_inputs(prefix: str) -> list[str]:
+    return [f"{prefix}_scale", f"{prefix}_bias", f"{prefix}_mean", f"{prefix}_var"]
+
+
+def _build_conv_bn_model(path: str) -> None:
+    # Dropout -> Conv -> BN -> Relu -> Identity (graph output), plus a second
+    # Conv -> BN -> Clip branch and a Gemm -> BN -> LeakyRelu head.
+    rng = np.random.default_rng(31)
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 3, 6, 6])
+    a = helper.make_tensor_value_info("a", TensorProto.FLOAT, [2, 5])
+    outputs = [
+        helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 4, 6, 6]),
+        helper.make_tensor_value_info("z", TensorProto.FLOAT, [1, 4, 6, 6]),
+        helper.make_tensor_value_info("g", TensorProto.FLOAT, [2, 3]),
+    ]
+    initializers = [
+        numpy_helper.from_array(rng.uniform(-1, 1, (4, 3, 3, 3)).astype(np.float32), name="w"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (4,)).astype(np.float32), name="b"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (4, 1, 3, 3)).astype(np.float32), name="dw"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (3, 5)).astype(np.float32), name="gw"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (3,)).astype(np.float32), name="gc"),
+    ]
+    initializers += _bn_params(rng, "bn0", 4) + _bn_params(rng, "bn1", 4) + _bn_params(rng, "bn2", 3)
+    nodes = [
+        helper.make_node("Dropout", ["x"], ["xd"]),
+        helper.make_node("Conv", ["xd", "w", "b"], ["c0"], pads=[1, 1, 1, 1]),
+        helper.make_node("BatchNormalization", ["c0"] + _bn_inputs("bn0"), ["n0"], epsilon=1e-3),
+        helper.make_node("Relu", ["n0"], ["r0"]),
+        helper.make_node("Identity", ["r0"], ["y"]),
+        helper.make_node("Conv", ["y", "dw"], ["c1"], group=4, pads=[1, 1, 1, 1]),
+        helper.make_node("BatchNormalization", ["c1"] + _bn_inputs("bn1"), ["n1"]),
+        helper.make_node("Clip", ["n1", "lo", "hi"], ["z"]),
+        helper.make_node("Gemm", ["a", "gw", "gc"], ["m"], transB=1, beta=0.5),
+        helper.make_node("BatchNormalization", ["m"] + _bn_inputs("bn2"), ["mn"]),
+        helper.make_node("LeakyRelu", ["mn"], ["g"], alpha=0.2),
+    ]
+    initializers += [
+        numpy_helper.from_array(np.array(0.0, dtype=np.float32), name="lo"),
+        numpy_helper.from_array(np.array(1.5, dtype=np.float32), name="hi"),
+    ]
+    _save_model(path, nodes, [x, a], outputs, initializers)
+
+
+def _build_pointwise_head_model(path: str) -> None:
+    # 1x1 Conv -> Relu and MatMul -> Clip, both large enough for kernel_lib.
+    rng = np.random.default_rng(33)
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 8, 6, 6])
+    a = helper.make_tensor_value_info("a", TensorProto.FLOAT, [4, 16])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 6, 6, 6])
+    z = helper.make_tensor_value_info("z", TensorProto.FLOAT, [4, 8])
+    initializers = [
+        numpy_helper.from_array(rng.uniform(-1, 1, (6, 8, 1, 1)).astype(np.float32), name="w"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (6,)).astype(np.float32), name="b"),
+        numpy_helper.from_array(rng.uniform(-1, 1, (16, 8)).astype(np.float32), name="mw"),
+        numpy_helper.from_array(np.array(-0.5, dtype=np.float32), name="lo"),
+        numpy_helper.from_array(np.array(0.5, dtype=np.float32), name="hi"),
+    ]
+    nodes = [
+        helper.make_node("Conv", ["x", "w", "b"], ["c"]),
+        helper.make_node("Relu", ["c"], ["y"]),
+        helper.make_node("MatMul", ["a", "mw"], ["m"]),
+        helper.make_node("Clip", ["m", "lo", "hi"], ["z"]),
+    ]
+    _save_model(path, nodes, [x, a], [y, z], initializers)
+
+
+def _build_shape_arith_model(path: str) -> None:
+    # Reshape target computed from Shape/Gather/Concat, a duplicated Sigmoid,
+    # duplicate constants and a branch nothing reads.
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [2, 3, 4])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [2, 12])
+    initializers = [
+        numpy_helper.from_array(np.array([0], dtype=np.int64), name="idx"),
+        numpy_helper.from_array(np.array([-1], dtype=np.int64), name="rest"),
+        numpy_helper.from_array(np.full((2, 12), 0.5, dtype=np.float32), name="k0"),
+        numpy_helper.from_array(np.full((2, 12), 0.5, dtype=np.float32), name="k1"),
+    ]
+    nodes = [
+        helper.make_node("Shape", ["x"], ["s"]),
+        helper.make_node("Gather", ["s", "idx"], ["n"], axis=0),
+        helper.make_node("Concat", ["n", "rest"], ["target"], axis=0),
+        helper.make_node("Reshape", ["x", "target"], ["flat"]),
+        helper.make_node("Sigmoid", ["flat"], ["s0"]),
+        helper.make_node("Sigmoid", ["flat"], ["s1"]),
+        helper.make_node("Mul", ["s0", "k0"], ["m0"]),
+        helper.make_node("Mul", ["s1", "k1"], ["m1"]),
+        helper.make_node("Exp", ["flat"], ["unused"]),
+        helper.make_node("Add", ["m0", "m1"], ["y"]),
+    ]
+    _save_model(path, nodes, [x], [y], initializers)
+
+
+def _build_qdq_conv_model(path: str) -> None:
+    rng = np.random.default_rng(32)
+    x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 2, 5, 5])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 3, 5, 5])
+    initializers = [
+        numpy_helper.from_array(rng.uniform(-1, 1, (3, 2, 3, 3)).astype(np.float32), name="w"),
+        numpy_helper.from_array(np.array(0.02, dtype=np.float32), name="sx"),
+        numpy_helper.from_array(np.array(0.01, dtype=np.float32), name="sw"),
+        numpy_helper.from_array(np.array(3, dtype=np.int8), name="zx"),
+        numpy_helper.from_array(np.array(0, dtype=np.int8), name="zero"),
+    ]
+    nodes = [
+        helper.make_node("QuantizeLinear", ["x", "sx", "zx"], ["qx"]),
+        helper.make_node("QuantizeLinear", ["w", "sw", "zero"], ["qw"]),
+        helper.make_node("Conv", ["qx", "qw"], ["qc"], pads=[1, 1, 1, 1]),
+        helper.make_node("Relu", ["qc"], ["qr"]),
+        helper.make_node("DequantizeLinear", ["qr", "sx", "zx"], ["y"]),
+    ]
+    shapes = {"qx": [1, 2, 5, 5], "qw": [3, 2, 3, 3], "qc": [1, 3, 5, 5], "qr": [1, 3, 5, 5]}
+    value_info = [helper.make_tensor_value_info(name, TensorProto.INT8, shape) for name, shape in shapes.items()]
+    _save_model(path, nodes, [x], [y], initializers, value_info)
+
+
+class TestTinyMlGraphPasses(unittest.TestCase):
+    def _validate(self, model, model_path: str, out_dir: str, **kwargs) -> dict:
+        result = generate_c_code(model, out_dir, "model", "flash", **kwargs)
+        validation = validate_model_consistency(
+            model,
+            model_path,
+            source_path=str(result["source"]),
+            header_path=str(result["header"]),
+        )
+        if validation.status == "skipped":
+            self.skipTest(validation.reason)
+        self.assertEqual(validation.status, "passed", msg=validation.reason)
+        return result
+
+    def test_batchnorm_folding_and_activation_fusion(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "conv_bn.onnx")
+            _build_conv_bn_model(model_path)
+            model, report = optimize_model(load_onnx_model(model_path))
+            self.assertEqual([n.op_type for n in model.nodes], ["Conv", "Conv", "Gemm"])
+            acts = [n.attrs["fused_activation"] for n in model.nodes]
+            self.assertEqual(acts[0], {"op": "Relu"})
+            self.assertEqual(acts[1], {"op": "Clip", "min": 0.0, "max": 1.5})
+            self.assertEqual(acts[2]["op"], "LeakyRelu")
+            self.assertAlmostEqual(acts[2]["alpha"], 0.2, places=6)
+            # The first Conv writes the graph output that the Identity used to copy.
+            self.assertEqual(model.nodes[0].outputs, ["y"])
+            self.assertEqual(model.nodes[1].inputs[0], "y")
+            self.assertNotIn("bn0_scale", model.tensors)
+            self.assertNotIn("w", model.tensors)
+            self.assertEqual((report.nodes_before, report.nodes_after), (11, 3))
+            self._validate(model, model_path, os.path.join(td, "out"))
+
+    def test_fused_activation_is_applied_on_store(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "pointwise.onnx")
+            _build_pointwise_head_model(model_path)
+            model, _ = optimize_model(load_onnx_model(model_path))
+            self.assertEqual([n.op_type for n in model.nodes], ["Conv", "MatMul"])
+            result = self._validate(model, model_path, os.path.join(td, "lib"))
+            source = Path(result["source"]).read_text(encoding="utf-8")
+            self.assertRegex(source, r"k2c_conv2d_f32_1x1\(.*, &k2c_act_\d+\);")
+            self.assertRegex(source, r"k2c_gemm_f32\(.*, &k2c_act_\d+\);")
+            # No separate pass over the outputs after the kernels.
+            self.assertNotIn("v > 0.0f ? v : 0.0f", source)
+            self.assertNotIn("if (v < -0.50000000f)", source)
+
+            result = self._validate(model, model_path, os.path.join(td, "ref"), kernels="reference")
+            source = Path(result["source"]).read_text(encoding="utf-8")
+            self.assertIn("= (sum > 0.0f ? sum : 0.0f);", source)
+            self.assertIn("= (sum < -0.50000000f ? -0.50000000f : (sum > 0.50000000f ? 0.50000000f : sum));", source)
+
+    def test_constant_folding_cse_and_dead_nodes(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "shape_arith.onnx")
+            _build_shape_arith_model(model_path)
+            model, _ = optimize_model(load_onnx_model(model_path))
+            self.assertEqual([n.op_type for n in model.nodes], ["Reshape", "Sigmoid", "Mul", "Add"])
+            target = model.tensors[model.nodes[0].inputs[1]]
+            self.assertEqual(target.data.tolist(), [2, -1])
+            mul = model.nodes[2]
+            self.assertEqual(model.nodes[3].inputs, [mul.outputs[0], mul.outputs[0]])
+            self.assertEqual(len([t for t in model.tensors.values() if t.data is not None]), 2)
+            self._validate(model, model_path, os.path.join(td, "out"))
+
+    def test_quantized_weights_fold_and_relu_fuses(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "qdq.onnx")
+            _build_qdq_conv_model(model_path)
+            model, _ = optimize_model(load_onnx_model(model_path))
+            self.assertEqual([n.op_type for n in model.nodes], ["QuantizeLinear", "Conv", "DequantizeLinear"])
+            self.assertEqual(model.nodes[1].attrs["fused_activation"], {"op": "Relu"})
+            qw = model.tensors["qw"]
+            self.assertEqual(qw.dtype, "int8")
+            self.assertAlmostEqual(qw.qscale, 0.01, places=6)
+            self.assertIsNotNone(qw.data)
+            self.assertNotIn("w", model.tensors)
+            # onnxruntime has no int8 Conv kernel; compare against the unoptimized build.
+            feeds = {"x": np.random.default_rng(6).uniform(-2, 2, (1, 2, 5, 5)).astype(np.float32)}
+            outputs = []
+            for tag, variant in (("base", load_onnx_model(model_path)), ("opt", model)):
+                result = generate_c_code(variant, os.path.join(td, tag), "model", "flash")
+                run = run_generated_c_model(variant, str(result["source"]), str(result["header"]), feeds)
+                if not run.ok and "compiler" in run.reason:
+                    self.skipTest(run.reason)
+                self.assertTrue(run.ok, msg=run.reason)
+                outputs.append(run.outputs["y"])
+            np.testing.assert_array_equal(outputs[1], outputs[0])
+
+    def test_pass_manager_reports_each_pass(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "shape_arith.onnx")
+            _build_shape_arith_model(model_path)
+            model = load_onnx_model(model_path)
+            _, report = PassManager((("eliminate_dead_nodes", eliminate_dead_nodes),)).run(model)
+            self.assertEqual(report.rounds, 2)
+            first, second = report.stats
+            self.assertEqual((first.name, first.nodes_before, first.nodes_after), ("eliminate_dead_nodes", 10, 9))
+            self.assertEqual(second.rewrites, 0)
+
+            result = generate_tinyml_project(model_path, td, "flash", "c")
+            self.assertEqual(result["validation"].status, "passed")
+            manifest = json.loads(Path(result["manifest"]).read_text(encoding="utf-8"))
+            passes = manifest["graph_passes"]
+            self.assertEqual((passes["nodes_before"], passes["nodes_after"]), (10, 4))
+            self.assertEqual(len(manifest["ops"]), 10)
+            self.assertEqual(manifest["optimized_ops"], ["Reshape", "Sigmoid", "Mul", "Add"])
+            entry = passes["passes"][0]
+            self.assertEqual(
+                set(entry), {"pass", "round", "nodes_before", "nodes_after", "rewrites", "elapsed_ms"}
+            )
+            folded = [p for p in passes["passes"] if p["pass"] == "fold_constants" and p["round"] == 1][0]
+            self.assertEqual(folded["nodes_before"] - folded["nodes_after"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
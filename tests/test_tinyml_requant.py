@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+if importlib.util.find_spec('numpy') is None or importlib.util.find_spec('onnx') is None:
+    raise unittest.SkipTest('tinyml optional dependencies numpy/onnx are missing')
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+import sys
+
+sys.path.insert(0, str(SRC))
+
+from keil2cmake.tinyml.backends.c.ops.requant_common import requant_params
+from keil2cmake.tinyml.codegen import generate_c_code
+from keil2cmake.tinyml.converter import load_onnx_model
+from keil2cmake.tinyml.runtime import validate_model_consistency
+
+
+def _save_model(
+    path: str,
+    nodes: list[onnx.NodeProto],
+    inputs: list[onnx.ValueInfoProto],
+    outputs: list[onnx.ValueInfoProto],
+    initializers: list[onnx.TensorProto] | None = None,
+) -> None:
+    graph = helper.make_graph(
+        nodes,
+        "tinyml_requant",
+        inputs,
+        outputs,
+        list(initializers or []),
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)])
+    onnx.save(model, path)
+
+
+def _build_qlinear_conv_per_channel_model(path: str) -> None:
+    rng = np.random.default_rng(11)
+    x = helper.make_tensor_value_info("x", TensorProto.INT8, [1, 3, 6, 6])
+    y = helper.make_tensor_value_info("y", TensorProto.INT8, [1, 4, 6, 6])
+    w = rng.integers(-90, 90, (4, 3, 3, 3), dtype=np.int8)
+    bias = rng.integers(-2000, 2000, (4,), dtype=np.int32)
+    inits = [
+        numpy_helper.from_array(np.array(0.05, dtype=np.float32), name="x_scale"),
+        numpy_helper.from_array(np.array(3, dtype=np.int8), name="x_zero"),
+        numpy_helper.from_array(w, name="w"),
+        numpy_helper.from_array(np.array([0.01, 0.02, 0.015, 0.03], dtype=np.float32), name="w_scale"),
+        numpy_helper.from_array(np.zeros((4,), dtype=np.int8), name="w_zero"),
+        numpy_helper.from_array(np.array(0.2, dtype=np.float32), name="y_scale"),
+        numpy_helper.from_array(np.array(-5, dtype=np.int8), name="y_zero"),
+        numpy_helper.from_array(bias, name="bias"),
+    ]
+    node = helper.make_node(
+        "QLinearConv",
+        ["x", "x_scale", "x_zero", "w", "w_scale", "w_zero", "y_scale", "y_zero", "bias"],
+        ["y"],
+        pads=[1, 1, 1, 1],
+    )
+    _save_model(path, [node], [x], [y], inits)
+
+
+def _build_qlinear_matmul_batched_model(path: str) -> None:
+    rng = np.random.default_rng(12)
+    a = helper.make_tensor_value_info("a", TensorProto.INT8, [2, 3, 8])
+    y = helper.make_tensor_value_info("y", TensorProto.INT8, [2, 3, 5])
+    inits = [
+        numpy_helper.from_array(np.array(0.04, dtype=np.float32), name="a_scale"),
+        numpy_helper.from_array(np.array(-2, dtype=np.int8), name="a_zero"),
+        numpy_helper.from_array(rng.integers(-100, 100, (8, 5), dtype=np.int8), name="b"),
+        numpy_helper.from_array(np.array(0.03, dtype=np.float32), name="b_scale"),
+        numpy_helper.from_array(np.array(1, dtype=np.int8), name="b_zero"),
+        numpy_helper.from_array(np.array(0.25, dtype=np.float32), name="y_scale"),
+        numpy_helper.from_array(np.array(4, dtype=np.int8), name="y_zero"),
+    ]
+    node = helper.make_node(
+        "QLinearMatMul",
+        ["a", "a_scale", "a_zero", "b", "b_scale", "b_zero", "y_scale", "y_zero"],
+        ["y"],
+    )
+    _save_model(path, [node], [a], [y], inits)
+
+
+class TestTinyMlIntegerRequant(unittest.TestCase):
+    def test_requant_params_match_float_rounding(self) -> None:
+        rng = np.random.default_rng(7)
+        for real in (0.0004, 0.0123, 0.37, 0.999, 1.7):
+            mult, shift = requant_params(real, 1 << 20)
+            for acc in rng.integers(-(1 << 20), 1 << 20, 200):
+                prod = int(acc) * mult
+                half = 1 << (shift - 1)
+                got = (prod + half) >> shift if prod >= 0 else -((half - prod) >> shift)
+                self.assertLessEqual(abs(got - int(acc) * real), 1.0)
+
+    def test_requant_params_reduce_precision_for_wide_accumulators(self) -> None:
+        mult, shift = requant_params(0.5, 1 << 40)
+        self.assertLess(abs(mult).bit_length() + 41, 63)
+        self.assertAlmostEqual(mult / float(1 << shift), 0.5, places=6)
+        self.assertIsNone(requant_params(0.0, 100))
+        self.assertIsNone(requant_params(-1.0, 100))
+
+    def _assert_integer_kernel(self, builder, name: str) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, f"{name}.onnx")
+            out_dir = os.path.join(td, "out")
+            builder(model_path)
+            model = load_onnx_model(model_path)
+            result = generate_c_code(model, out_dir, name, "flash")
+            source = Path(result["source"]).read_text(encoding="utf-8")
+            # Inline requant loops, or the shared integer kernels for larger ops.
+            self.assertTrue("rq_prod" in source or "k2c_requantize(" in source)
+            self.assertNotIn("roundf", source)
+            self.assertNotIn("float real_v", source)
+
+            validation = validate_model_consistency(
+                model,
+                model_path,
+                source_path=str(result["source"]),
+                header_path=str(result["header"]),
+            )
+            if validation.status == "skipped":
+                self.skipTest(validation.reason)
+            self.assertEqual(validation.status, "passed", msg=validation.reason)
+
+    def test_qlinear_conv_per_channel_integer_kernel(self) -> None:
+        self._assert_integer_kernel(_build_qlinear_conv_per_channel_model, "qconv_pc")
+
+    def test_qlinear_matmul_batched_integer_kernel(self) -> None:
+        self._assert_integer_kernel(_build_qlinear_matmul_batched_model, "qmm_batched")
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import os
+import tempfile
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest import mock
+
+if importlib.util.find_spec('numpy') is None or importlib.util.find_spec('onnx') is None:
+    raise unittest.SkipTest('tinyml optional dependencies numpy/onnx are missing')
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+import sys
+
+sys.path.insert(0, str(SRC))
+
+from keil2cmake.tinyml.codegen import generate_c_code
+from keil2cmake.tinyml.converter import load_onnx_model
+from keil2cmake.tinyml.runtime import statistical_validation, validate_model_statistics
+from keil2cmake.tinyml.runtime.c_runner import (
+    RUNNER_CACHE_ENV,
+    _default_cache_dir,
+    run_generated_c_model,
+    run_generated_c_model_batch,
+)
+from keil2cmake.tinyml.runtime.reference_engine import ReferenceSession, has_reference_backend
+
+
+def _build_affine_model(path: str) -> np.ndarray:
+    w_arr = np.random.default_rng(5).uniform(-1, 1, (6, 4)).astype(np.float32)
+    a = helper.make_tensor_value_info("a", TensorProto.FLOAT, [1, 6])
+    y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 4])
+    w = numpy_helper.from_array(w_arr, name="w")
+    nodes = [
+        helper.make_node("MatMul", ["a", "w"], ["m"]),
+        helper.make_node("Relu", ["m"], ["y"]),
+    ]
+    graph = helper.make_graph(nodes, "tinyml_runner", [a], [y], [w])
+    model = helper.make_model(graph, opset_imports=[helper.make_operatorsetid("", 13)])
+    onnx.save(model, path)
+    return w_arr
+
+
+class TestTinyMlCompiledRunner(unittest.TestCase):
+    def _generate(self, td: str, name: str = "affine"):
+        model_path = os.path.join(td, f"{name}.onnx")
+        w_arr = _build_affine_model(model_path)
+        model = load_onnx_model(model_path)
+        result = generate_c_code(model, os.path.join(td, name), name, "flash")
+        return model, result, w_arr
+
+    def test_batch_runs_all_samples_in_one_exec(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model, result, w_arr = self._generate(td)
+            cache_dir = os.path.join(td, "cache")
+            samples = [
+                np.random.default_rng(seed).uniform(-1, 1, (1, 6)).astype(np.float32)
+                for seed in range(5)
+            ]
+            batch = run_generated_c_model_batch(
+                model,
+                str(result["source"]),
+                str(result["header"]),
+                samples,
+                cache_dir=cache_dir,
+            )
+            if not batch.ok and "compiler" in batch.reason:
+                self.skipTest(batch.reason)
+            self.assertTrue(batch.ok, msg=batch.reason)
+            self.assertFalse(batch.cached)
+            self.assertEqual(len(batch.outputs), len(samples))
+            for sample, outputs in zip(samples, batch.outputs):
+                expected = np.maximum(sample @ w_arr, 0.0)
+                np.testing.assert_allclose(outputs["y"], expected, rtol=1e-5, atol=1e-6)
+
+            single = run_generated_c_model(
+                model,
+                str(result["source"]),
+                str(result["header"]),
+                samples[2],
+                cache_dir=cache_dir,
+            )
+            self.assertTrue(single.ok, msg=single.reason)
+            self.assertTrue(single.cached)
+            np.testing.assert_array_equal(single.output, batch.outputs[2]["y"])
+
+    def test_cache_key_follows_generated_source(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model, result, _ = self._generate(td)
+            cache_dir = os.path.join(td, "cache")
+            x = np.ones((1, 6), dtype=np.float32)
+            first = run_generated_c_model(
+                model, str(result["source"]), str(result["header"]), x, cache_dir=cache_dir
+            )
+            if not first.ok and "compiler" in first.reason:
+                self.skipTest(first.reason)
+            self.assertTrue(first.ok, msg=first.reason)
+            self.assertFalse(first.cached)
+
+            source = Path(result["source"])
+            source.write_text(source.read_text(encoding="utf-8") + "\n/* edited */\n", encoding="utf-8")
+            second = run_generated_c_model(
+                model, str(result["source"]), str(result["header"]), x, cache_dir=cache_dir
+            )
+            self.assertTrue(second.ok, msg=second.reason)
+            self.assertFalse(second.cached)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+            uncached = run_generated_c_model(
+                model,
+                str(result["source"]),
+                str(result["header"]),
+                x,
+                cache_dir=os.path.join(td, "unused"),
+                use_cache=False,
+            )
+            self.assertTrue(uncached.ok, msg=uncached.reason)
+            self.assertFalse(os.path.exists(os.path.join(td, "unused")))
+
+    def test_default_cache_dir_is_per_user(self) -> None:
+        saved = os.environ.pop(RUNNER_CACHE_ENV, None)
+        try:
+            cache = _default_cache_dir()
+        finally:
+            if saved is not None:
+                os.environ[RUNNER_CACHE_ENV] = saved
+        self.assertNotEqual(cache.parent, Path(tempfile.gettempdir()))
+        self.assertEqual(cache.parts[-2:], ("keil2cmake", "runner_cache"))
+
+    @unittest.skipIf(os.name == "nt", "POSIX permission bits")
+    def test_cache_ignores_untrusted_entries(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model, result, _ = self._generate(td)
+            cache_dir = os.path.join(td, "cache")
+            x = np.ones((1, 6), dtype=np.float32)
+            first = run_generated_c_model(
+                model, str(result["source"]), str(result["header"]), x, cache_dir=cache_dir
+            )
+            if not first.ok and "compiler" in first.reason:
+                self.skipTest(first.reason)
+            self.assertTrue(first.ok, msg=first.reason)
+            self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+            (entry,) = os.listdir(cache_dir)
+            self.assertFalse(os.stat(os.path.join(cache_dir, entry)).st_mode & 0o022)
+
+            # A group/world-writable entry could have been swapped by someone else.
+            os.chmod(os.path.join(cache_dir, entry), 0o777)
+            second = run_generated_c_model(
+                model, str(result["source"]), str(result["header"]), x, cache_dir=cache_dir
+            )
+            self.assertTrue(second.ok, msg=second.reason)
+            self.assertFalse(second.cached)
+
+            # A shared cache directory disables caching altogether.
+            os.chmod(cache_dir, 0o777)
+            for _ in range(2):
+                third = run_generated_c_model(
+                    model, str(result["source"]), str(result["header"]), x, cache_dir=cache_dir
+                )
+                self.assertTrue(third.ok, msg=third.reason)
+                self.assertFalse(third.cached)
+
+
+class TestTinyMlStatisticalValidation(unittest.TestCase):
+    def setUp(self) -> None:
+        if not has_reference_backend():
+            self.skipTest("onnxruntime/reference evaluator unavailable")
+
+    def test_reference_session_reuses_backend(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "affine.onnx")
+            w_arr = _build_affine_model(model_path)
+            session = ReferenceSession(model_path, ["y"])
+            for seed in range(3):
+                x = np.random.default_rng(seed).uniform(-1, 1, (1, 6)).astype(np.float32)
+                outputs, engine, reason = session.run({"a": x})
+                self.assertIsNotNone(outputs, msg=reason)
+                self.assertTrue(engine.startswith(("onnxruntime", "onnx.reference")), msg=engine)
+                np.testing.assert_allclose(outputs["y"], np.maximum(x @ w_arr, 0.0), rtol=1e-5, atol=1e-6)
+
+    def test_random_samples_report_statistics(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "affine.onnx")
+            _build_affine_model(model_path)
+            model = load_onnx_model(model_path)
+            result = generate_c_code(model, os.path.join(td, "out"), "affine", "flash")
+            stats = validate_model_statistics(
+                model,
+                model_path,
+                source_path=str(result["source"]),
+                header_path=str(result["header"]),
+                num_samples=12,
+                workers=1,
+            )
+            if stats.status == "skipped":
+                self.skipTest(stats.reason)
+            self.assertEqual(stats.status, "passed", msg=stats.reason)
+            self.assertEqual(stats.samples, 12)
+            self.assertEqual(stats.failed_samples, 0)
+            self.assertTrue(stats.engine.startswith("generated-c vs "))
+            y_stats = stats.outputs["y"]
+            self.assertEqual(sum(count for _, _, count in y_stats.histogram), 12 * 4)
+            self.assertEqual(set(y_stats.percentiles), {"p50", "p90", "p99"})
+            self.assertLessEqual(y_stats.percentiles["p99"], y_stats.max_abs)
+            self.assertIsNotNone(y_stats.top1_agreement)
+            self.assertGreaterEqual(y_stats.top1_agreement, 0.9)
+            report = stats.to_dict()
+            self.assertEqual(report["outputs"][0]["histogram"][-1]["hi"], None)
+
+    def test_npz_dataset_with_worker_pool(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "affine.onnx")
+            _build_affine_model(model_path)
+            model = load_onnx_model(model_path)
+            dataset = os.path.join(td, "samples.npz")
+            # Samples stacked along the model's unit batch dimension.
+            np.savez(dataset, a=np.random.default_rng(9).uniform(-1, 1, (8, 6)).astype(np.float32))
+            stats = validate_model_statistics(model, model_path, dataset_path=dataset, workers=2)
+            if stats.status == "skipped":
+                self.skipTest(stats.reason)
+            self.assertEqual(stats.status, "passed", msg=stats.reason)
+            self.assertEqual(stats.samples, 8)
+            self.assertTrue(stats.engine.startswith("python-eval vs "))
+
+            bad = os.path.join(td, "bad.npz")
+            np.savez(bad, a=np.zeros((3, 5), dtype=np.float32))
+            skipped = validate_model_statistics(model, model_path, dataset_path=bad)
+            self.assertEqual(skipped.status, "skipped")
+            self.assertIn("dataset shape mismatch", skipped.reason)
+
+    def test_broken_worker_pool_falls_back_in_process(self) -> None:
+        class _BrokenPool:
+            def __init__(self, *args, **kwargs) -> None:
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc) -> None:
+                return None
+
+            def submit(self, *args):
+                future = mock.Mock()
+                future.result.side_effect = BrokenProcessPool("worker died")
+                return future
+
+        with tempfile.TemporaryDirectory() as td:
+            model_path = os.path.join(td, "affine.onnx")
+            _build_affine_model(model_path)
+            samples = [{"a": np.ones((1, 6), dtype=np.float32)} for _ in range(4)]
+            submitted = mock.Mock()
+            with mock.patch.object(statistical_validation, "ProcessPoolExecutor", _BrokenPool):
+                results = statistical_validation._run_reference_outputs(
+                    model_path,
+                    samples,
+                    ["y"],
+                    workers=2,
+                    allow_reference_fallback=True,
+                    on_submitted=submitted,
+                )
+            self.assertEqual(submitted.call_count, 1)
+            self.assertEqual(len(results), 4)